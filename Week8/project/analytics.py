@@ -4,8 +4,48 @@ Demonstrates: Lambda functions, map, filter, reduce
 Functions for analyzing library data
 """
 
+from collections import Counter
 from functools import reduce
-from datetime import datetime
+from operator import attrgetter
+
+
+class StoreAnalytics:
+    """
+    Queries a book or member store can answer without visiting each record
+
+    A store that keeps its records in a form it can aggregate directly
+    (ColumnarBookStore's arrays, SQLiteLibrary's tables) subclasses this
+    and overrides the queries it is faster at. The rest return
+    NotImplemented, and the functions below then map, filter and reduce
+    over the records themselves.
+    """
+
+    def author_counts(self):
+        """Get a mapping of author -> number of books"""
+        return NotImplemented
+
+    def published_between(self, start_year, end_year):
+        """Get the books published in a year range (inclusive)"""
+        return NotImplemented
+
+    def total_file_size(self):
+        """Get the total file size of all ebooks in MB"""
+        return NotImplemented
+
+    def borrowed_counts(self):
+        """Get the number of books each member has on loan"""
+        return NotImplemented
+
+    def at_borrowing_limit(self):
+        """Get the members who have borrowed as many books as they may"""
+        return NotImplemented
+
+
+def _ask_store(store, query, *args):
+    """Run a StoreAnalytics query on a store (NotImplemented if it has none)"""
+    if isinstance(store, StoreAnalytics):
+        return getattr(store, query)(*args)
+    return NotImplemented
 
 
 def get_popular_authors(library, top_n=5):
@@ -21,13 +61,12 @@ def get_popular_authors(library, top_n=5):
     Returns:
         list: List of tuples (author, count)
     """
-    # Get all authors
-    authors = list(map(lambda book: book.author, library.books.values()))
-
-    # Count occurrences
-    author_counts = {}
-    for author in authors:
-        author_counts[author] = author_counts.get(author, 0) + 1
+    author_counts = _ask_store(library.books, "author_counts")
+    if author_counts is NotImplemented:
+        # Count occurrences. Counter tallies in C, and because loaded books
+        # share one interned string per author, each lookup matches on
+        # identity instead of comparing characters.
+        author_counts = Counter(map(attrgetter("author"), library.books.values()))
 
     # Sort by count using lambda
     sorted_authors = sorted(author_counts.items(), key=lambda x: x[1], reverse=True)
@@ -49,6 +88,10 @@ def filter_books_by_year(library, start_year, end_year):
     Returns:
         list: Filtered list of books
     """
+    books = _ask_store(library.books, "published_between", start_year, end_year)
+    if books is not NotImplemented:
+        return books
+
     return list(filter(
         lambda book: start_year <= book.year <= end_year,
         library.books.values()
@@ -68,8 +111,8 @@ def get_available_ebooks(library):
         list: List of available ebooks
     """
     return list(filter(
-        lambda book: book._type == "EBook" and book.is_available,
-        library.books.values()
+        lambda book: book.is_available,
+        library.get_books_by_type("EBook")
     ))
 
 
@@ -77,7 +120,7 @@ def calculate_total_file_size(library):
     """
     Calculate total file size of all ebooks
 
-    Uses filter, map, and reduce
+    Uses map and reduce
 
     Args:
         library: Library object
@@ -85,8 +128,12 @@ def calculate_total_file_size(library):
     Returns:
         float: Total file size in MB
     """
-    # Get all ebooks
-    ebooks = filter(lambda book: book._type == "EBook", library.books.values())
+    total = _ask_store(library.books, "total_file_size")
+    if total is not NotImplemented:
+        return total
+
+    # Get all ebooks (from the library's type index)
+    ebooks = library.get_books_by_type("EBook")
 
     # Extract file sizes
     file_sizes = map(lambda ebook: ebook.file_size_mb, ebooks)
@@ -109,8 +156,12 @@ def get_members_with_max_books(library):
     Returns:
         list: List of members at their borrowing limit
     """
+    members = _ask_store(library.members, "at_borrowing_limit")
+    if members is not NotImplemented:
+        return members
+
     return list(filter(
-        lambda member: len(member._borrowed_books) >= member.max_books,
+        lambda member: member.borrowed_count >= member.max_books,
         library.members.values()
     ))
 
@@ -128,10 +179,12 @@ def get_borrowing_statistics(library):
         dict: Statistics about borrowing
     """
     # Get number of books borrowed by each member
-    borrowed_counts = list(map(
-        lambda member: len(member._borrowed_books),
-        library.members.values()
-    ))
+    borrowed_counts = _ask_store(library.members, "borrowed_counts")
+    if borrowed_counts is NotImplemented:
+        borrowed_counts = list(map(
+            lambda member: member.borrowed_count,
+            library.members.values()
+        ))
 
     if not borrowed_counts:
         return {
@@ -192,7 +245,8 @@ def group_books_by_type(library):
     """
     Group books by their type
 
-    Uses filter and lambda
+    Uses map and lambda over the library's type index, instead of
+    filtering the whole catalog once per type
 
     Args:
         library: Library object
@@ -202,21 +256,17 @@ def group_books_by_type(library):
     """
     types = ["Book", "EBook", "PhysicalBook"]
 
-    grouped = {}
-    for book_type in types:
-        grouped[book_type] = list(filter(
-            lambda book: book._type == book_type,
-            library.books.values()
-        ))
-
-    return grouped
+    return dict(map(
+        lambda book_type: (book_type, library.get_books_by_type(book_type)),
+        types
+    ))
 
 
 def find_overdue_by_member_type(library, member_type):
     """
     Find overdue books borrowed by a specific member type
 
-    Uses filter, map, and lambda
+    Uses filter and lambda over the library's due-date index
 
     Args:
         library: Library object
@@ -225,34 +275,19 @@ def find_overdue_by_member_type(library, member_type):
     Returns:
         list: List of overdue books borrowed by specified member type
     """
-    today = datetime.now().strftime("%Y-%m-%d")
-
-    # Get members of specified type
-    target_members = filter(
-        lambda member: member._member_type == member_type,
-        library.members.values()
-    )
-
-    # Get their member IDs
-    member_ids = set(map(lambda member: member.member_id, target_members))
-
-    # Filter overdue books borrowed by these members
-    overdue = list(filter(
-        lambda book: (not book.is_available and
-                     book.due_date and
-                     book.due_date < today and
-                     book.borrowed_by in member_ids),
-        library.books.values()
+    # Only overdue books are visited, not the whole catalog
+    return list(filter(
+        lambda book: (book.borrowed_by in library.members and
+                      library.members[book.borrowed_by]._member_type == member_type),
+        library.get_overdue_books()
     ))
 
-    return overdue
-
 
 def calculate_library_value(library, price_per_physical=25, price_per_ebook=15):
     """
     Calculate estimated total value of library collection
 
-    Uses map, filter, reduce, and lambda
+    Uses reduce and lambda over the library's O(1) type counts
 
     Args:
         library: Library object
@@ -262,26 +297,10 @@ def calculate_library_value(library, price_per_physical=25, price_per_ebook=15):
     Returns:
         float: Total estimated value
     """
-    # Physical books value
-    physical_books = filter(
-        lambda book: book._type == "PhysicalBook",
-        library.books.values()
-    )
-    physical_value = reduce(
-        lambda acc, _: acc + price_per_physical,
-        physical_books,
-        0
-    )
+    prices = {"PhysicalBook": price_per_physical, "EBook": price_per_ebook}
 
-    # Ebooks value
-    ebooks = filter(
-        lambda book: book._type == "EBook",
-        library.books.values()
-    )
-    ebook_value = reduce(
-        lambda acc, _: acc + price_per_ebook,
-        ebooks,
+    return reduce(
+        lambda acc, book_type: acc + library.count_books_by_type(book_type) * prices[book_type],
+        prices,
         0
     )
-
-    return physical_value + ebook_value
@@ -0,0 +1,61 @@
+"""
+Week 8 Benchmark: Full saves vs incremental saves from the record cache
+Run with: python benchmarks/bench_autosave.py [num_books]
+
+"full save" is save_to_file without autosave: every record is turned
+into a dict and encoded again. "incremental save" is the same call
+while autosaving, after a number of borrow/return changes: only the
+changed books, members and loans are encoded, the rest is written from
+the cached text. Also reports the memory the cache takes.
+"""
+
+import os
+import sys
+import tempfile
+
+from common import best_time, make_library, print_table
+from autosave import RecordCache
+
+
+def main():
+    num_books = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    library = make_library(num_books, num_members=num_books // 10)
+    members = list(library.members)
+    isbns = list(library._available_books)
+    for index, isbn in enumerate(isbns[:num_books // 4]):
+        library.borrow_book(members[index % len(members)], isbn)
+    shelf = isbns[num_books // 4:]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "library.json")
+        full = best_time(lambda: library.save_to_file(filename), repeat=3)
+        rows.append(("full save", "-", f"{full:.2f} s", "1.0x"))
+
+        library._record_cache = RecordCache()
+        first = best_time(lambda: library.save_to_file(filename), repeat=1)
+        rows.append(("first save filling the cache", "all", f"{first:.2f} s", f"{full / first:.1f}x"))
+
+        for changes in (10, 1_000, 10_000):
+            # Make the changes untimed, then time the save on its own
+            seconds = float("inf")
+            for _ in range(3):
+                for index in range(min(changes // 2, len(shelf))):
+                    member_id = members[index % len(members)]
+                    library.borrow_book(member_id, shelf[index])
+                    library.return_book(member_id, shelf[index])
+                seconds = min(seconds, best_time(lambda: library.save_to_file(filename), repeat=1))
+            rows.append(("incremental save", f"{changes:,}", f"{seconds:.2f} s", f"{full / seconds:.1f}x"))
+
+    cache = library._record_cache
+    cached = sum(map(sys.getsizeof, cache.books.values())) + sum(map(sys.getsizeof, cache.members.values()))
+    cached += sum(map(sys.getsizeof, cache.loans))
+
+    print(f"save_to_file to JSON ({num_books:,} books, {len(library.ledger):,} loan rows)")
+    print_table(["save", "changes since last save", "time", "speedup"], rows)
+    print(f"\nRecord cache: {cached / 1e6:.0f} MB of encoded text")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Week 8 Benchmark: Batch borrow/return vs one call per book
+Run with: python benchmarks/bench_batch.py [num_books] [batch_size]
+"""
+
+import os
+import sys
+import tempfile
+
+from common import make_library, best_time, print_table
+from members import TeacherMember
+
+
+def checkout_loop(library, loans, filename=None):
+    """Borrow then return each book with its own call (and save)"""
+    for member_id, isbn in loans:
+        library.borrow_book(member_id, isbn)
+        if filename:
+            library.save_to_file(filename)
+    for member_id, isbn in loans:
+        library.return_book(member_id, isbn)
+        if filename:
+            library.save_to_file(filename)
+
+
+def checkout_batch(library, loans, filename=None):
+    """Borrow then return the whole batch with one call (and save) each"""
+    library.borrow_many(loans, filename)
+    library.return_many(loans, filename)
+
+
+def main():
+    num_books = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+
+    library = make_library(num_books)
+    rows = []
+
+    # Many teachers each borrowing a class set, no persistence
+    teachers = []
+    for index in range(num_books // batch_size):
+        teacher = TeacherMember(f"BT{index}", "Teacher", "t@example.com", f"F{index}", "Math")
+        teacher._max_books = batch_size
+        library.add_member(teacher)
+        teachers.append(teacher.member_id)
+
+    isbns = list(library.books)
+    batches = [[(member_id, isbn) for isbn in isbns[i * batch_size:(i + 1) * batch_size]]
+               for i, member_id in enumerate(teachers)]
+    loans = [loan for batch in batches for loan in batch]
+
+    loop = best_time(lambda: checkout_loop(library, loans), repeat=3)
+    batch = best_time(lambda: [checkout_batch(library, b) for b in batches], repeat=3)
+    rows.append(("in memory", len(loans), f"{loop * 1000:.1f}", f"{batch * 1000:.1f}",
+                 f"{len(loans) * 2 / batch:,.0f}", f"{loop / batch:.1f}x"))
+
+    # A single class set, saving after every change vs once per batch
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "library.json")
+        loop = best_time(lambda: checkout_loop(library, batches[0], filename), repeat=1)
+        batch = best_time(lambda: checkout_batch(library, batches[0], filename), repeat=1)
+        rows.append(("with save", len(batches[0]), f"{loop * 1000:.1f}", f"{batch * 1000:.1f}",
+                     f"{len(batches[0]) * 2 / batch:,.0f}", f"{loop / batch:.1f}x"))
+
+    print(f"Catalog: {num_books:,} books, batch size {batch_size}")
+    print_table(["mode", "loans", "per-call ms", "batch ms", "batch ops/s", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Week 8 Benchmark: Library with a dict book store vs a ColumnarBookStore
+Run with: python benchmarks/bench_columnar.py [num_books]
+
+Both libraries are built with add_books, so the memory column covers the
+whole Library: the book store plus the SearchIndex, the type and
+availability indexes and the loan ledger, which are the same for both
+stores. The timed rows go through the public Library and analytics calls.
+"""
+
+import random
+import sys
+import tracemalloc
+
+from common import make_book, best_time, print_table
+from analytics import calculate_total_file_size, filter_books_by_year, get_popular_authors
+from columnar import ColumnarBookStore
+from library import Library
+from members import Member
+
+
+def build(num_books, book_store):
+    """Fill a library and measure the memory it holds"""
+    rng = random.Random(42)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    library = Library("Benchmark Library", book_store=book_store)
+    books = [make_book(index, rng) for index in range(num_books)]
+    library.add_books(books)
+    library.add_member(Member("M1", "Benchmark", "benchmark@example.com"))
+    del books  # The dict store keeps these objects, the columnar store copies them
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return library, after - before
+
+
+def main():
+    num_books = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    dict_library, dict_bytes = build(num_books, None)
+    columnar_library, columnar_bytes = build(num_books, ColumnarBookStore())
+    isbns = list(dict_library.books)[::max(1, num_books // 1000)]
+
+    operations = [
+        ("filter_books_by_year 1990-2000", lambda library: filter_books_by_year(library, 1990, 2000)),
+        ("calculate_total_file_size", calculate_total_file_size),
+        ("get_popular_authors", lambda library: get_popular_authors(library, 10)),
+        ("search_books 'python'", lambda library: library.search_books("python")),
+        ("borrow + return x1000", lambda library: [(library.borrow_book("M1", isbn), library.return_book("M1", isbn))
+                                                   for isbn in isbns]),
+    ]
+
+    rows = [("memory (MB)", f"{dict_bytes / 1e6:.1f}", f"{columnar_bytes / 1e6:.1f}",
+             f"{dict_bytes / columnar_bytes:.2f}x")]
+    for name, operation in operations:
+        times = []
+        for library in (dict_library, columnar_library):
+            times.append(best_time(lambda: operation(library), repeat=3))
+        rows.append((f"{name} (ms)", f"{times[0] * 1000:.1f}", f"{times[1] * 1000:.1f}",
+                     f"{times[0] / times[1]:.2f}x"))
+
+    print(f"Library with each book store ({num_books:,} books)")
+    print_table(["measure", "dict", "columnar", "dict / columnar"], rows)
+
+
+if __name__ == "__main__":
+    main()
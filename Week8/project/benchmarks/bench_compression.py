@@ -0,0 +1,53 @@
+"""
+Week 8 Benchmark: Compressed library files, by codec and level
+Run with: python benchmarks/bench_compression.py [num_books]
+
+For the JSON and binary formats, uncompressed and through each codec at
+a fast, a middle and its strongest level: file size, save_to_file time
+and Library.load_from_file(lazy=True) time (as main.py loads).
+"""
+
+import os
+import sys
+import tempfile
+
+from common import best_time, make_library, print_table
+from library import Library
+
+CODECS = [
+    ("none", None, ""),
+    ("gzip", 1, ".gz"), ("gzip", 6, ".gz"), ("gzip", 9, ".gz"),
+    ("bz2", 1, ".bz2"), ("bz2", 9, ".bz2"),
+    ("lzma", 0, ".xz"), ("lzma", 6, ".xz"), ("lzma", 9, ".xz"),
+]
+
+
+def main():
+    num_books = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    library = make_library(num_books, num_members=num_books // 10)
+    members = list(library.members)
+    for index, isbn in enumerate(list(library._available_books)[:num_books // 2]):
+        library.borrow_book(members[index % len(members)], isbn)
+        if index % 2:
+            library.return_book(members[index % len(members)], isbn)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for file_format, extension in (("json", ".json"), ("binary", ".bin")):
+            plain_size = None
+            for codec, level, codec_extension in CODECS:
+                filename = os.path.join(directory, f"library{extension}{codec_extension}")
+                save = best_time(lambda: library.save_to_file(filename, compression=codec, level=level), repeat=1)
+                load = best_time(lambda: Library.load_from_file(filename, lazy=True), repeat=1)
+                size = os.path.getsize(filename)
+                plain_size = plain_size or size
+                rows.append((file_format, codec, "-" if level is None else level, f"{size / 1e6:.1f} MB",
+                             f"{plain_size / size:.1f}x", f"{save:.2f} s", f"{load:.2f} s"))
+
+    print(f"Compressed library files ({num_books:,} books, {len(library.ledger):,} loan rows)")
+    print_table(["format", "codec", "level", "size", "smaller", "save", "lazy load"], rows)
+
+
+if __name__ == "__main__":
+    main()
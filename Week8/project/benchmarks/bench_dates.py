@@ -0,0 +1,92 @@
+"""
+Week 8 Benchmark: Day-ordinal dates vs formatted date strings
+Run with: python benchmarks/bench_dates.py [num_loans]
+
+"before" uses a copy of the original Book, which formatted every due date
+with strftime on borrow, compared due dates as strings, and re-parsed them
+with strptime for each row of the overdue report. "after" uses books.py,
+which stores day ordinals and formats them only for display and JSON.
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta
+
+from common import best_time, print_table
+from books import Book
+from dates import today_ordinal
+
+
+class StringDateBook:
+    """Book with the original string due dates"""
+
+    __slots__ = ("isbn", "is_available", "borrowed_by", "due_date")
+
+    def __init__(self, isbn):
+        self.isbn = isbn
+        self.is_available = True
+        self.borrowed_by = None
+        self.due_date = None
+
+    def borrow(self, member_id, days=14):
+        if not self.is_available:
+            return False
+        self.is_available = False
+        self.borrowed_by = member_id
+        self.due_date = (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
+        return True
+
+
+def borrow_all(books):
+    """Borrow every book once, then reset it for the next run"""
+    for book in books:
+        book.borrow("M001")
+        book.is_available = True
+
+
+def overdue_before(books):
+    """Original overdue report: string compare, then strptime per row"""
+    today = datetime.now().strftime("%Y-%m-%d")
+    now = datetime.now()
+    return [(book.isbn, (now - datetime.strptime(book.due_date, "%Y-%m-%d")).days)
+            for book in books if book.due_date < today]
+
+
+def overdue_after(books):
+    """Ordinal overdue report: integer compare and subtraction"""
+    today = today_ordinal()
+    return [(book.isbn, today - book.due_ordinal)
+            for book in books if book.due_ordinal < today]
+
+
+def main():
+    num_loans = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(42)
+
+    before_books = [StringDateBook(f"978-{i:09d}") for i in range(num_loans)]
+    after_books = [Book(f"978-{i:09d}", "Title", "Author", 2020) for i in range(num_loans)]
+
+    rows = []
+    before = best_time(lambda: borrow_all(before_books), repeat=3)
+    after = best_time(lambda: borrow_all(after_books), repeat=3)
+    rows.append(("borrow", f"{num_loans / before:,.0f}/s", f"{num_loans / after:,.0f}/s",
+                 f"{before / after:.1f}x"))
+
+    # Spread due dates from 60 days ago to 30 days ahead, about two thirds overdue
+    today = today_ordinal()
+    for old, new in zip(before_books, after_books):
+        due = today + rng.randint(-60, 30)
+        new.due_ordinal = due
+        old.due_date = new.due_date
+
+    before = best_time(lambda: overdue_before(before_books), repeat=3)
+    after = best_time(lambda: overdue_after(after_books), repeat=3)
+    assert overdue_before(before_books) == overdue_after(after_books)
+    rows.append(("overdue report", f"{before:.2f} s", f"{after:.2f} s", f"{before / after:.1f}x"))
+
+    print(f"Date handling ({num_loans:,} loans)")
+    print_table(["operation", "strings", "ordinals", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
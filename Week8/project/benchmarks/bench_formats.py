@@ -0,0 +1,58 @@
+"""
+Week 8 Benchmark: library.json vs the binary snapshot format
+Run with: python benchmarks/bench_formats.py [num_books]
+
+For each format: file size, save_to_file time, the time to read every
+record from the file (no books or members built), and the full
+Library.load_from_file time, eager and lazy (as main.py loads).
+"""
+
+import os
+import sys
+import tempfile
+
+from common import best_time, make_library, print_table
+from binary_format import read_library
+from library import Library
+
+
+def read_records(filename):
+    """Decode every record without building the library"""
+    with open(filename, 'rb') as file:
+        for _ in read_library(file):
+            pass
+
+
+def main():
+    num_books = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    library = make_library(num_books, num_members=num_books // 10)
+    members = list(library.members)
+    for index, isbn in enumerate(list(library._available_books)[:num_books // 2]):
+        library.borrow_book(members[index % len(members)], isbn)
+        if index % 2:
+            library.return_book(members[index % len(members)], isbn)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, file_format in [("JSON", "json"), ("binary", "binary")]:
+            filename = os.path.join(directory, f"library.{'bin' if file_format == 'binary' else 'json'}")
+            save = best_time(lambda: library.save_to_file(filename, file_format), repeat=3)
+            read = best_time(lambda: read_records(filename), repeat=3)
+            load = best_time(lambda: Library.load_from_file(filename), repeat=1)
+            lazy = best_time(lambda: Library.load_from_file(filename, lazy=True), repeat=3)
+            rows.append([name, os.path.getsize(filename), save, read, load, lazy])
+
+    json_row = rows[0]
+    table = [(name, f"{size / 1e6:.1f} MB", *(f"{seconds:.2f} s" for seconds in times))
+             for name, size, *times in rows]
+    table.append(("JSON / binary", *(f"{json_value / value:.1f}x"
+                                     for json_value, value in zip(json_row[1:], rows[1][1:]))))
+
+    print(f"Library file formats ({num_books:,} books, {num_books // 10:,} members, "
+          f"{len(library.ledger.isbns):,} loans)")
+    print_table(["format", "size", "save", "read records", "load", "lazy load"], table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Week 8 Benchmark: Streaming bulk import vs one add_book call per row
+Run with: python benchmarks/bench_import.py [num_rows]
+
+Both paths read the same CSV file. "import memory" is the peak Python
+allocation during the import beyond what the finished library holds,
+which stays flat as the file grows because rows are streamed in batches.
+"""
+
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from common import make_book, print_table
+from books import create_book_from_dict
+from bulk_import import import_books, BOOK_CONVERTERS
+from library import Library
+
+COLUMNS = ["type", "isbn", "title", "author", "year", "file_size_mb",
+           "file_format", "shelf_location", "condition"]
+
+
+def write_feed(path, num_rows):
+    """Write a synthetic acquisition list as CSV"""
+    rng = random.Random(7)
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for index in range(num_rows):
+            writer.writerow(make_book(index, rng).to_dict())
+
+
+def import_row_by_row(library, path):
+    """Read the CSV and call add_book for every row"""
+    with open(path, newline='') as file:
+        for row in csv.DictReader(file):
+            record = {column: BOOK_CONVERTERS.get(column, str)(value)
+                      for column, value in row.items() if value != ""}
+            library.add_book(create_book_from_dict(record))
+
+
+def measure(func, path):
+    """Run an import into a fresh library, returning (seconds, extra peak MB)"""
+    library = Library("Import Benchmark")
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(library, path)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, (peak - current) / 1024 / 1024
+
+
+def main():
+    sizes = [int(sys.argv[1])] if len(sys.argv) > 1 else [20_000, 100_000]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for num_rows in sizes:
+            path = os.path.join(directory, f"feed_{num_rows}.csv")
+            write_feed(path, num_rows)
+
+            loop_time, loop_memory = measure(import_row_by_row, path)
+            bulk_time, bulk_memory = measure(lambda library, p: import_books(library, p), path)
+            rows.append((f"{num_rows:,}", f"{num_rows / loop_time:,.0f}", f"{num_rows / bulk_time:,.0f}",
+                         f"{loop_memory:.1f}", f"{bulk_memory:.1f}"))
+
+    print_table(["rows", "add_book rows/s", "import_books rows/s",
+                 "add_book import memory MB", "import_books import memory MB"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Week 8 Benchmark: Memory held by repeated book attributes
+Run with: python benchmarks/bench_interning.py [num_books]
+
+Books are created the way load_from_file creates them: JSON text is
+parsed (which makes a new string object for every value) and passed to a
+factory. "before" uses a copy of the original factory; "after" uses
+create_book_from_dict inside a StringPool, as load_from_file does, which
+interns author, file_format and condition (shelf_location is shown for
+comparison; it is nearly unique per book, so it is not interned). The
+table counts the distinct string objects those attributes point to and
+the bytes they take.
+"""
+
+import json
+import random
+import sys
+from collections import Counter
+from operator import attrgetter
+
+from common import make_book, best_time, print_table
+from books import Book, EBook, PhysicalBook, create_book_from_dict
+from interning import StringPool
+
+ATTRIBUTES = ("author", "file_format", "shelf_location", "condition")
+CHUNK = 100_000
+
+
+def factory_before(data):
+    """Original create_book_from_dict, without interning"""
+    book_type = data.get("type", "Book")
+    if book_type == "EBook":
+        book = EBook(data["isbn"], data["title"], data["author"], data["year"],
+                     data.get("file_size_mb", 0), data.get("file_format", "PDF"))
+    elif book_type == "PhysicalBook":
+        book = PhysicalBook(data["isbn"], data["title"], data["author"], data["year"],
+                            data.get("shelf_location", "Unknown"), data.get("condition", "Good"))
+    else:
+        book = Book(data["isbn"], data["title"], data["author"], data["year"])
+    return book
+
+
+def load_books(num_books, factory):
+    """Create books chunk by chunk from JSON text"""
+    rng = random.Random(42)
+    books = []
+    for start in range(0, num_books, CHUNK):
+        text = json.dumps([make_book(i, rng).to_dict() for i in range(start, min(start + CHUNK, num_books))])
+        books.extend(map(factory, json.loads(text)))
+    return books
+
+
+def string_usage(books):
+    """Count distinct string objects and their bytes for each attribute"""
+    usage = {}
+    for attribute in ATTRIBUTES:
+        seen = {}
+        for book in books:
+            value = getattr(book, attribute, None)
+            if value is not None:
+                seen[id(value)] = sys.getsizeof(value)
+        usage[attribute] = (len(seen), sum(seen.values()))
+    return usage
+
+
+def measure(num_books, factory):
+    """Load a catalog, then measure its strings and author grouping time"""
+    books = load_books(num_books, factory)
+    usage = string_usage(books)
+    grouping = best_time(lambda: Counter(map(attrgetter("author"), books)), repeat=3)
+    return usage, grouping
+
+
+def main():
+    num_books = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+
+    # Run one case at a time so only one catalog is in memory
+    before, before_grouping = measure(num_books, factory_before)
+    after, after_grouping = measure(num_books, StringPool().factory(create_book_from_dict))
+
+    rows = []
+    for attribute in ATTRIBUTES:
+        rows.append((attribute, f"{before[attribute][0]:,}", f"{after[attribute][0]:,}",
+                     f"{before[attribute][1] / 1e6:.1f}", f"{after[attribute][1] / 1e6:.1f}"))
+    before_total = sum(size for _, size in before.values())
+    after_total = sum(size for _, size in after.values())
+    rows.append(("total", "", "", f"{before_total / 1e6:.1f}", f"{after_total / 1e6:.1f}"))
+
+    print(f"Repeated attribute strings ({num_books:,} books)")
+    print_table(["attribute", "objects before", "objects after", "MB before", "MB after"], rows)
+    print(f"\nget_popular_authors grouping: {before_grouping:.2f} s before, "
+          f"{after_grouping:.2f} s after ({before_grouping / after_grouping:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Week 8 Benchmark: Durable change latency, journal vs full save
+Run with: python benchmarks/bench_journal.py [num_books]
+
+Each row makes borrow/return changes durable in a different way and
+reports the time per change and changes per second:
+
+- "full save": save_to_file after every change (the only option before)
+- "journal": open_journal(); each change waits for its own fsync
+- "journal, 8 threads": the same, with concurrent changes sharing fsyncs
+- "journal, 10 ms sync": sync_interval=0.01, changes do not wait and a
+  crash can lose the last 10 ms
+
+It also times loading the save plus replaying a journal of 10,000 changes.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from common import best_time, make_library, print_table
+from library import Library
+
+
+def pairs(library, count):
+    """(member_id, isbn) pairs for count loans (books repeat if count exceeds the catalog)"""
+    members = list(library.members)
+    isbns = list(library._available_books)
+    return [(members[index % len(members)], isbns[index % len(isbns)]) for index in range(count)]
+
+
+def churn(library, loans, save=None):
+    """Borrow then return each pair; return the mean time per change"""
+    start = time.perf_counter()
+    for member_id, isbn in loans:
+        library.borrow_book(member_id, isbn)
+        if save:
+            save()
+        library.return_book(member_id, isbn)
+        if save:
+            save()
+    return (time.perf_counter() - start) / (2 * len(loans))
+
+
+def churn_threads(library, loans, num_threads):
+    """churn() split across threads; return wall time per change"""
+    chunks = [loans[index::num_threads] for index in range(num_threads)]
+    threads = [threading.Thread(target=churn, args=(library, chunk)) for chunk in chunks]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return (time.perf_counter() - start) / (2 * len(loans))
+
+
+def main():
+    num_books = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "data", "library.json")
+        library = make_library(num_books, num_members=num_books // 10)
+        library.save_to_file(filename)
+        size_mb = os.path.getsize(filename) / 1e6
+
+        rows = []
+
+        def add(name, per_change):
+            rows.append((name, f"{per_change * 1000:.3f} ms", f"{1 / per_change:,.0f}"))
+
+        add("full save", churn(library, pairs(library, 10), lambda: library.save_to_file(filename)))
+
+        library.open_journal(filename, compact_after=None)
+        add("journal", churn(library, pairs(library, 1000)))
+        add("journal, 8 threads", churn_threads(library, pairs(library, 4000), 8))
+        library.close_journal()
+
+        library.open_journal(filename, sync_interval=0.01, compact_after=None)
+        add("journal, 10 ms sync", churn(library, pairs(library, 5000)))
+        library.close_journal()
+
+        # Replay: a fresh save plus 10,000 journaled changes
+        library.open_journal(filename, compact_after=None)
+        library.save_to_file(filename)
+        churn(library, pairs(library, 5000))
+        library.close_journal()
+        with_journal = best_time(lambda: Library.load_from_file(filename), repeat=3)
+
+        library.save_to_file(filename)
+        without_journal = best_time(lambda: Library.load_from_file(filename), repeat=3)
+
+    print(f"Durable changes ({num_books:,} books, {size_mb:.0f} MB JSON)")
+    print_table(["mode", "per change", "changes/s"], rows)
+    print(f"\nLoad: {without_journal:.2f} s, "
+          f"with 10,000 journaled changes to replay: {with_journal:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
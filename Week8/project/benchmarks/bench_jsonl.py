@@ -0,0 +1,74 @@
+"""
+Week 8 Benchmark: Loading a JSON Lines file with worker processes
+Run with: python benchmarks/bench_jsonl.py [num_books] [max_workers]
+
+The same catalog saved as library.json and as library.jsonl, then
+loaded with Library.load_from_file: the JSON document in one process,
+and the JSON Lines file with 1, 2, 4, ... worker processes (up to
+max_workers, default the number of CPUs) that parse byte ranges of it
+and build the books and members. Times are for eager loads. "records"
+is the time to get every record into this process without storing it
+(the part the workers share out); the rest of a load is storing and
+indexing the records, which happens in this process.
+"""
+
+import os
+import sys
+import tempfile
+
+from common import best_time, make_library, print_table
+from binary_format import read_library
+from jsonl_format import read_jsonl_parallel
+from library import Library
+
+
+def read_records(filename):
+    """Decode every record in this process without building the library"""
+    with open(filename, 'rb') as file:
+        for _ in read_library(file):
+            pass
+
+
+def read_records_parallel(filename, workers):
+    """Have the workers parse and build every record, without storing them"""
+    for _ in read_jsonl_parallel(filename, workers):
+        pass
+
+
+def main():
+    num_books = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    library = make_library(num_books, num_members=num_books // 10)
+    members = list(library.members)
+    for index, isbn in enumerate(list(library._available_books)[:num_books // 4]):
+        library.borrow_book(members[index % len(members)], isbn)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        json_file = os.path.join(directory, "library.json")
+        jsonl_file = os.path.join(directory, "library.jsonl")
+        library.save_to_file(json_file)
+        library.save_to_file(jsonl_file)
+        del library
+
+        baseline = best_time(lambda: Library.load_from_file(json_file), repeat=1)
+        records = best_time(lambda: read_records(json_file), repeat=1)
+        rows.append((".json", "-", f"{records:.2f} s", f"{baseline:.2f} s", "1.0x"))
+        sequential = best_time(lambda: Library.load_from_file(jsonl_file), repeat=1)
+        records = best_time(lambda: read_records(jsonl_file), repeat=1)
+        rows.append((".jsonl", "-", f"{records:.2f} s", f"{sequential:.2f} s", f"{baseline / sequential:.1f}x"))
+
+        workers = 1
+        while workers <= max_workers:
+            records = best_time(lambda: read_records_parallel(jsonl_file, workers), repeat=1)
+            seconds = best_time(lambda: Library.load_from_file(jsonl_file, workers=workers), repeat=1)
+            rows.append((".jsonl", workers, f"{records:.2f} s", f"{seconds:.2f} s", f"{baseline / seconds:.1f}x"))
+            workers *= 2
+
+    print(f"Library.load_from_file ({num_books:,} books, {os.cpu_count()} CPUs)")
+    print_table(["file", "workers", "records", "load", "vs .json"], rows)
+
+
+if __name__ == "__main__":
+    main()
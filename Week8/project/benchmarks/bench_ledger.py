@@ -0,0 +1,99 @@
+"""
+Week 8 Benchmark: Loan history from the ledger vs a scanned loan log
+Run with: python benchmarks/bench_ledger.py [num_loans]
+
+"log" keeps every loan as a dictionary in a list, the simplest way to add
+history to the original catalog, and answers each question by scanning
+it. "ledger" is LoanLedger: array columns plus per-ISBN and per-member row
+lists. Also measured: memory for the rows, and the cost of the ledger
+copy taken by Library.snapshot().
+"""
+
+import random
+import sys
+import tracemalloc
+from collections import Counter
+
+from common import best_time, print_table
+from dates import format_date, today_ordinal
+from ledger import LoanLedger
+
+
+def make_loans(num_loans, rng):
+    """Random closed loans over the last two years, about 20 per book"""
+    today = today_ordinal()
+    num_books, num_members = max(1, num_loans // 20), max(1, num_loans // 50)
+    loans = []
+    for _ in range(num_loans):
+        start = today - rng.randint(15, 730)
+        loans.append((f"978-{rng.randrange(num_books):09d}", f"M{rng.randrange(num_members):07d}",
+                      start, start + 14, start + rng.randint(1, 20)))
+    return loans
+
+
+def build_log(loans):
+    """The scanned alternative: one dictionary per loan"""
+    return [{"isbn": isbn, "member_id": member_id, "start": format_date(start),
+             "due": format_date(due), "returned": format_date(returned)}
+            for isbn, member_id, start, due, returned in loans]
+
+
+def build_ledger(loans):
+    """Record every loan in a LoanLedger"""
+    ledger = LoanLedger()
+    for isbn, member_id, start, due, returned in loans:
+        ledger.open_loan(isbn, member_id, start, due)
+        ledger.close_loan(isbn, returned)
+    return ledger
+
+
+def measure(build, loans):
+    """Build the rows and report the memory they hold"""
+    tracemalloc.start()
+    rows = build(loans)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, size
+
+
+def main():
+    num_loans = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(42)
+    loans = make_loans(num_loans, rng)
+    isbns = [loan[0] for loan in rng.sample(loans, 100)]
+    members = [loan[1] for loan in rng.sample(loans, 100)]
+
+    log, log_size = measure(build_log, loans)
+    ledger, ledger_size = measure(build_ledger, loans)
+
+    def book_history_log():
+        for isbn in isbns:
+            [row for row in log if row["isbn"] == isbn]
+
+    def member_history_log():
+        for member_id in members:
+            [row for row in log if row["member_id"] == member_id]
+
+    rows = [("memory", f"{log_size / 1e6:.0f} MB", f"{ledger_size / 1e6:.0f} MB",
+             f"{log_size / ledger_size:.1f}x")]
+    for name, before, after in [
+        ("100 book histories", book_history_log, lambda: [ledger.history(isbn) for isbn in isbns]),
+        ("100 member histories", member_history_log, lambda: [ledger.member_history(m) for m in members]),
+        ("loans per title per month", lambda: Counter((row["isbn"], row["start"][:7]) for row in log),
+         ledger.loans_per_month),
+    ]:
+        before_time = best_time(before, repeat=3)
+        after_time = best_time(after, repeat=3)
+        rows.append((name, f"{before_time * 1000:.1f} ms", f"{after_time * 1000:.1f} ms",
+                     f"{before_time / after_time:.1f}x"))
+
+    assert ledger.loans_per_month() == Counter((row["isbn"], row["start"][:7]) for row in log)
+    copy_time = best_time(ledger.copy, repeat=3)
+
+    print(f"Loan history ({num_loans:,} loans)")
+    print_table(["operation", "log", "ledger", "speedup"], rows)
+    print(f"\nLedger copy for a snapshot: {copy_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Week 8 Benchmark: MappedLibrary vs loading a binary snapshot
+Run with: python benchmarks/bench_mapped.py [num_books ...]
+
+For each catalog size: the time to open a .snap file with MappedLibrary
+against Library.load_from_file of the same data saved as .bin (lazy, as
+main.py loads), then 1,000 lookups by ISBN, a title search
+("secret journey") and a type count on each.
+"""
+
+import os
+import random
+import sys
+import tempfile
+
+from common import best_time, make_library, print_table
+from library import Library
+from mapped import MappedLibrary
+
+
+def lookups(library, keys):
+    """Look up every key"""
+    for key in keys:
+        library.books[key]
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 200_000]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for num_books in sizes:
+            library = make_library(num_books, num_members=num_books // 10)
+            members = list(library.members)
+            for index, isbn in enumerate(list(library._available_books)[:num_books // 4]):
+                library.borrow_book(members[index % len(members)], isbn)
+            snap = os.path.join(directory, f"library-{num_books}.snap")
+            binary = os.path.join(directory, f"library-{num_books}.bin")
+            library.save_to_file(snap)
+            library.save_to_file(binary)
+            keys = random.Random(0).sample(list(library.books), 1000)
+            del library
+
+            def open_mapped():
+                MappedLibrary(snap).close()
+
+            timings = {"MappedLibrary": [best_time(open_mapped, repeat=5)],
+                       "lazy load .bin": [best_time(lambda: Library.load_from_file(binary, lazy=True), repeat=1)]}
+            opened = {"MappedLibrary": MappedLibrary(snap),
+                      "lazy load .bin": Library.load_from_file(binary, lazy=True)}
+            for name, target in opened.items():
+                timings[name] += [
+                    best_time(lambda: lookups(target, keys), repeat=3),
+                    best_time(lambda: target.search_books("secret journey"), repeat=3),
+                    best_time(lambda: target.count_books_by_type("EBook"), repeat=3),
+                ]
+            opened["MappedLibrary"].close()
+
+            for name, (open_time, lookup, search, count) in timings.items():
+                rows.append((f"{num_books:,}", name, f"{open_time * 1e3:.2f} ms",
+                             f"{lookup * 1e3:.2f} ms", f"{search * 1e3:.2f} ms", f"{count * 1e6:.1f} µs"))
+
+    print("MappedLibrary (.snap) vs Library.load_from_file(.bin, lazy=True)")
+    print_table(["books", "backend", "open / load", "1,000 lookups", "search", "count EBooks"], rows)
+
+
+if __name__ == "__main__":
+    main()
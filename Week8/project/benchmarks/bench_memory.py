@@ -0,0 +1,128 @@
+"""
+Week 8 Benchmark: Bytes per Book/Member record
+Run with: python benchmarks/bench_memory.py [num_records]
+
+"before" uses copies of the original classes, which kept every attribute
+(including the per-type constants) in a per-instance __dict__. "after"
+uses the slotted classes from books.py and members.py.
+"""
+
+import sys
+import tracemalloc
+from datetime import datetime
+
+from common import print_table
+from books import Book, EBook, PhysicalBook
+from members import Member, StudentMember, TeacherMember
+
+
+class DictBook:
+    """Book layout before __slots__"""
+
+    def __init__(self, isbn, title, author, year):
+        self.isbn = isbn
+        self.title = title
+        self.author = author
+        self.year = year
+        self.is_available = True
+        self.borrowed_by = None
+        self.due_date = None
+        self._type = "Book"
+
+
+class DictEBook(DictBook):
+    """EBook layout before __slots__"""
+
+    def __init__(self, isbn, title, author, year, file_size_mb, file_format):
+        super().__init__(isbn, title, author, year)
+        self.file_size_mb = file_size_mb
+        self.file_format = file_format.upper()
+        self._type = "EBook"
+
+
+class DictPhysicalBook(DictBook):
+    """PhysicalBook layout before __slots__"""
+
+    def __init__(self, isbn, title, author, year, shelf_location, condition="Good"):
+        super().__init__(isbn, title, author, year)
+        self.shelf_location = shelf_location
+        self.condition = condition
+        self._type = "PhysicalBook"
+
+
+class DictMember:
+    """Member layout before __slots__"""
+
+    def __init__(self, member_id, name, email):
+        self._member_id = member_id
+        self._name = name
+        self._email = email
+        self._borrowed_books = {}
+        self._join_date = datetime.now().strftime("%Y-%m-%d")
+        self._member_type = "Member"
+        self._max_books = 3
+
+
+class DictStudentMember(DictMember):
+    """StudentMember layout before __slots__"""
+
+    def __init__(self, member_id, name, email, student_id, major):
+        super().__init__(member_id, name, email)
+        self.student_id = student_id
+        self.major = major
+        self._member_type = "Student"
+        self._max_books = 5
+
+
+class DictTeacherMember(DictMember):
+    """TeacherMember layout before __slots__"""
+
+    def __init__(self, member_id, name, email, faculty_id, department):
+        super().__init__(member_id, name, email)
+        self.faculty_id = faculty_id
+        self.department = department
+        self._member_type = "Teacher"
+        self._max_books = 10
+        self._extended_loan = True
+
+
+# Shared field values, so only the per-record object overhead is measured
+BOOK_ARGS = ("978-000000000", "A Title", "An Author", 2020)
+
+CASES = [
+    ("Book", DictBook, Book, BOOK_ARGS),
+    ("EBook", DictEBook, EBook, BOOK_ARGS + (2.5, "EPUB")),
+    ("PhysicalBook", DictPhysicalBook, PhysicalBook, BOOK_ARGS + ("A1-3", "Good")),
+    ("Member", DictMember, Member, ("M1", "Name", "a@b.c")),
+    ("StudentMember", DictStudentMember, StudentMember, ("S1", "Name", "a@b.c", "STU1", "CS")),
+    ("TeacherMember", DictTeacherMember, TeacherMember, ("T1", "Name", "a@b.c", "FAC1", "Math")),
+]
+
+
+def bytes_per_record(cls, args, count):
+    """Measure allocated bytes per instance for count instances"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [cls(*args) for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Subtract the list holding the records (one pointer each)
+    return (after - before) / len(records) - 8
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    rows = []
+    for name, before_cls, after_cls, args in CASES:
+        before = bytes_per_record(before_cls, args, count)
+        after = bytes_per_record(after_cls, args, count)
+        rows.append((name, f"{before:.0f}", f"{after:.0f}", f"{(1 - after / before) * 100:.0f}%"))
+
+    print(f"Object overhead per record ({count:,} records, field values shared)")
+    print_table(["class", "before bytes", "after bytes", "saved"], rows)
+
+
+if __name__ == "__main__":
+    main()
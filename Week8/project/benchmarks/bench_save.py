@@ -0,0 +1,89 @@
+"""
+Week 8 Benchmark: Memory and time of save_to_file, record lists vs streaming
+Run with: python benchmarks/bench_save.py [num_books]
+
+"lists + json.dump" is the save before streaming: every record's
+to_dict() is collected into lists, then the whole structure is passed
+to json.dump. "streaming" is Library.save_to_file, which makes each
+record's dictionary as it writes it; "streaming, compact" adds
+compact=True. Each save runs in a fresh process that first loads the
+library, and reports how far the save raised memory above the loaded
+library (peak RSS during the save minus RSS before it), the save time
+and the file size.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import make_library, memory_status, print_table, reset_peak_memory
+from library import Library
+
+
+def save_with_json_dump(library, filename):
+    """The original save: build every record dictionary, then json.dump"""
+    view = library.snapshot()
+    data = {
+        "name": view.name,
+        "loans": list(view.loans.to_dicts()),
+        "books": list(view.book_dicts()),
+        "members": list(view.member_dicts()),
+        "journal_seq": 0
+    }
+    with open(filename, 'w') as file:
+        json.dump(data, file, indent=4)
+
+
+def child(mode, source, target):
+    """Load, then save once and print the memory the save added and its time"""
+    library = Library.load_from_file(source)
+    _, before = memory_status()
+    reset_peak_memory()
+
+    start = time.perf_counter()
+    if mode == "lists + json.dump":
+        save_with_json_dump(library, target)
+    else:
+        library.save_to_file(target, compact=mode == "streaming, compact")
+    elapsed = time.perf_counter() - start
+    peak, _ = memory_status()
+    print(json.dumps([peak - before, before, elapsed, os.path.getsize(target)]))
+
+
+def measure(mode, source, target):
+    """Run child() in a fresh interpreter and return its numbers"""
+    output = subprocess.run([sys.executable, __file__, "--child", mode, source, target],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        child(*sys.argv[2:5])
+        return
+
+    num_books = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "source.json")
+        library = make_library(num_books, num_members=num_books // 10)
+        for member_id, isbn in zip(list(library.members), list(library._available_books)):
+            library.borrow_book(member_id, isbn)
+        library.save_to_file(source)
+        del library
+
+        rows = []
+        for mode in ("lists + json.dump", "streaming", "streaming, compact"):
+            added, loaded, elapsed, size = measure(mode, source, os.path.join(directory, "library.json"))
+            rows.append((mode, f"{added / 1e6:.0f} MB", f"{loaded / 1e6:.0f} MB", f"{elapsed:.2f} s",
+                         f"{size / 1e6:.0f} MB"))
+
+    print(f"save_to_file ({num_books:,} books, {num_books // 10:,} members)")
+    print_table(["save", "memory added", "library RSS", "time", "file"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Week 8 Benchmark: Indexed search vs linear scan
+Run with: python benchmarks/bench_search.py [num_books]
+"""
+
+import sys
+
+from common import make_library, best_time, print_table
+
+KEYWORDS = ["python", "lovelace", "river code", "ocean", "xyz", "secret journey"]
+
+
+def main():
+    num_books = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"Building catalog of {num_books:,} books...")
+    library = make_library(num_books)
+
+    rows = []
+    for keyword in KEYWORDS:
+        results = len(library.search_books(keyword))
+        scan = best_time(lambda: library.search_books(keyword, mode="scan"), repeat=3)
+        indexed = best_time(lambda: library.search_books(keyword), repeat=3)
+        token = best_time(lambda: library.search_books(keyword, mode="token"), repeat=3)
+        rows.append((keyword, results, f"{scan * 1000:.2f}", f"{indexed * 1000:.2f}",
+                     f"{token * 1000:.2f}", f"{scan / indexed:.1f}x"))
+
+    print_table(["keyword", "results", "scan ms", "substring ms", "token ms", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
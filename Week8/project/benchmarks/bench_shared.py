@@ -0,0 +1,117 @@
+"""
+Week 8 Benchmark: Several processes changing one library file
+Run with: python benchmarks/bench_shared.py [num_books] [max_processes]
+
+1, 2, 4, ... processes (up to max_processes, default 8) all borrow and
+return books in the same data file at once, each with its own member
+and books. Rows:
+
+- "reload + rewrite": the only safe way before shared journals; under
+  the lock file each change loads the file, makes the change and saves
+- "shared journal": open_journal(shared=True); each change takes the
+  lock, applies the other processes' journal records, appends its own
+  and waits for its fsync
+- "shared journal, 10 ms sync": the same with sync_interval=0.01
+
+Changes/s counts every process's changes over the time the slowest one
+took. After each run the file is checked for lost updates.
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from common import make_library, print_table
+from library import Library
+from shared import FileLock, lock_path
+
+MODES = {
+    "reload + rewrite": 5,  # Changes per process
+    "shared journal": 200,
+    "shared journal, 10 ms sync": 200,
+}
+
+
+def worker(filename, mode, member_id, isbns, barrier, results):
+    """Borrow and return each of isbns in turn; put the seconds taken on results"""
+    if mode == "reload + rewrite":
+        lock = FileLock(lock_path(filename))
+        barrier.wait()
+        start = time.perf_counter()
+        for index, isbn in enumerate(isbns):
+            with lock.hold():
+                library = Library.load_from_file(filename)
+                if index % 2 == 0:
+                    library.borrow_book(member_id, isbn)
+                else:
+                    library.return_book(member_id, isbns[index - 1])
+                library.save_to_file(filename)
+        results.put(time.perf_counter() - start)
+        return
+
+    library = Library.load_from_file(filename)
+    library.open_journal(filename, shared=True, compact_after=None,
+                         sync_interval=0.01 if mode.endswith("sync") else None)
+    barrier.wait()
+    start = time.perf_counter()
+    for index, isbn in enumerate(isbns):
+        if index % 2 == 0:
+            library.borrow_book(member_id, isbn)
+        else:
+            library.return_book(member_id, isbns[index - 1])
+    results.put(time.perf_counter() - start)
+    library.close_journal()
+
+
+def run(filename, mode, processes, member_ids, isbns):
+    """Run one mode with several processes; return changes per second"""
+    count = MODES[mode]
+    barrier = multiprocessing.Barrier(processes)
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=worker, args=(filename, mode, member_ids[index],
+                                                            isbns[index * count:(index + 1) * count],
+                                                            barrier, results))
+               for index in range(processes)]
+    for process in workers:
+        process.start()
+    slowest = max(results.get() for _ in workers)
+    for process in workers:
+        process.join()
+
+    # No lost updates: the ledger has a row for every borrow of every process
+    library = Library.load_from_file(filename)
+    borrows = processes * ((count + 1) // 2)
+    assert len(library.ledger) == borrows, (len(library.ledger), borrows)
+    return processes * count / slowest
+
+
+def main():
+    num_books = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    max_processes = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    template = make_library(num_books, num_members=max_processes)
+    member_ids = list(template.members)
+    isbns = list(template._available_books)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "library.json")
+        for mode in MODES:
+            processes = 1
+            while processes <= max_processes:
+                template.save_to_file(filename)
+                for path in (filename + ".journal", filename + ".journal.old"):
+                    if os.path.exists(path):
+                        os.remove(path)
+                rate = run(filename, mode, processes, member_ids, isbns)
+                rows.append((mode, processes, f"{rate:,.1f}", f"{processes / rate * 1000:.2f} ms"))
+                processes *= 2
+
+    print(f"Borrow/return from several processes ({num_books:,} books, {os.cpu_count()} CPUs)")
+    print_table(["mode", "processes", "changes/s", "per change"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Week 8 Benchmark: Copy-on-write snapshots vs deepcopy
+Run with: python benchmarks/bench_snapshot.py [num_books]
+
+Reports the time to take a snapshot, the cost of the first write to a
+record a snapshot shares, and the time for copy.deepcopy of the catalog.
+"""
+
+import copy
+import sys
+import time
+
+from common import make_library, best_time, print_table
+
+DEEPCOPY_LIMIT = 200_000
+
+
+def main():
+    num_books = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    num_members = max(num_books // 20, 1)
+
+    print(f"Building catalog of {num_books:,} books and {num_members:,} members...")
+    library = make_library(num_books, num_members)
+    isbns = list(library.books)[:1000]
+    member_ids = list(library.members)
+
+    rows = []
+
+    snapshot_time = best_time(library.snapshot, repeat=5)
+    rows.append(("snapshot()", f"{snapshot_time * 1000:.1f}"))
+
+    # Borrow/return cycles without and with an open snapshot
+    def cycle():
+        for index, isbn in enumerate(isbns):
+            member_id = member_ids[index % len(member_ids)]
+            library.borrow_book(member_id, isbn)
+            library.return_book(member_id, isbn)
+
+    plain = best_time(cycle, repeat=3)
+    view = library.snapshot()
+    start = time.perf_counter()
+    cycle()
+    shared = time.perf_counter() - start
+    del view
+
+    rows.append((f"{len(isbns)} borrow+return, no snapshot", f"{plain * 1000:.1f}"))
+    rows.append((f"{len(isbns)} borrow+return, snapshot open", f"{shared * 1000:.1f}"))
+
+    # A full deepcopy of a large catalog needs as much memory again, so above
+    # DEEPCOPY_LIMIT books it is timed on a sample and scaled up
+    if num_books <= DEEPCOPY_LIMIT:
+        deep = best_time(lambda: copy.deepcopy((library.books, library.members)), repeat=1)
+        rows.append(("copy.deepcopy(books, members)", f"{deep * 1000:.1f}"))
+    else:
+        sample = dict(list(library.books.items())[:DEEPCOPY_LIMIT])
+        members = dict(list(library.members.items())[:DEEPCOPY_LIMIT // 20])
+        deep = best_time(lambda: copy.deepcopy((sample, members)), repeat=1) * num_books / DEEPCOPY_LIMIT
+        rows.append(("copy.deepcopy(books, members) (estimated)", f"{deep * 1000:.1f}"))
+
+    print_table(["operation", "ms"], rows)
+    print(f"\nsnapshot() is {deep / snapshot_time:.0f}x faster than deepcopy")
+
+
+if __name__ == "__main__":
+    main()
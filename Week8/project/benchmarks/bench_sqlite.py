@@ -0,0 +1,98 @@
+"""
+Week 8 Benchmark: Library (dicts in memory) vs SQLiteLibrary (database file)
+Run with: python benchmarks/bench_sqlite.py [num_books]
+
+Both libraries hold the same catalog, with members and a share of books
+on loan. Reports the Python memory each one holds, the database file
+size, and the time of the queries SQLiteLibrary answers in SQL.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+
+from common import best_time, make_book, make_member, print_table
+from analytics import get_borrowing_statistics, get_popular_authors
+from dates import today_ordinal
+from library import Library
+from sqlite_library import SQLiteLibrary
+
+
+def fill(library, num_books, num_members):
+    """Add the synthetic catalog and lend every tenth book"""
+    rng = random.Random(42)
+    library.add_books([make_book(index, rng) for index in range(num_books)])
+    library.add_members([make_member(index, rng) for index in range(num_members)])
+
+    member_ids = list(library.members)
+    isbns = list(library.books)
+    for index in range(0, num_books, 10):
+        library.borrow_book(member_ids[index // 10 % len(member_ids)], isbns[index])
+
+
+def measure(build):
+    """Build a library and report the memory it holds"""
+    tracemalloc.start()
+    library = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return library, size
+
+
+def main():
+    num_books = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    num_members = num_books // 5
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, "library.db")
+
+        def build_dict():
+            library = Library("Benchmark Library")
+            fill(library, num_books, num_members)
+            return library
+
+        def build_sqlite():
+            library = SQLiteLibrary("Benchmark Library", database)
+            fill(library, num_books, num_members)
+            return library
+
+        in_memory, dict_bytes = measure(build_dict)
+        on_disk, sqlite_bytes = measure(build_sqlite)
+        database_mb = sum(os.path.getsize(database + suffix) for suffix in ("", "-wal")) / 1e6
+
+        lookups = random.Random(1).sample(list(in_memory.books), 1000)
+        rows = [("Python memory", f"{dict_bytes / 1e6:.0f} MB", f"{sqlite_bytes / 1e6:.0f} MB",
+                 f"{dict_bytes / sqlite_bytes:.1f}x")]
+        for name, query in [
+            ("1,000 lookups by ISBN", lambda library: [library.books[isbn] for isbn in lookups]),
+            ("search 'river' (substring)", lambda library: library.search_books("river")),
+            ("search 'ocean night' (token)", lambda library: library.search_books("ocean night", "token")),
+            ("count available ebooks", lambda library: library.count_books_by_type("EBook", True)),
+            ("overdue in 20 days", lambda library: library.get_overdue_books(as_of=today_ordinal() + 20)),
+            ("top 10 authors", lambda library: get_popular_authors(library, 10)),
+            ("borrowing statistics", get_borrowing_statistics),
+            ("borrow + return", lambda library: churn(library)),
+        ]:
+            before = best_time(lambda: query(in_memory), repeat=3)
+            after = best_time(lambda: query(on_disk), repeat=3)
+            rows.append((name, f"{before * 1000:.2f} ms", f"{after * 1000:.2f} ms",
+                         f"{before / after:.2f}x"))
+        on_disk.close()
+
+    print(f"Library vs SQLiteLibrary ({num_books:,} books, {num_members:,} members, "
+          f"{database_mb:.0f} MB database)")
+    print_table(["operation", "Library", "SQLiteLibrary", "SQLite speedup"], rows)
+
+
+def churn(library):
+    """Borrow and return one available book"""
+    member_id = next(iter(library.members))
+    isbn = "978-000000001"
+    library.borrow_book(member_id, isbn)
+    library.return_book(member_id, isbn)
+
+
+if __name__ == "__main__":
+    main()
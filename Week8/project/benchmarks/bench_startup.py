@@ -0,0 +1,85 @@
+"""
+Week 8 Benchmark: Startup time with eager vs lazy loading
+Run with: python benchmarks/bench_startup.py [num_books]
+
+Saves a synthetic catalog as data/library.json in a temporary directory,
+then starts main.py there and times how long it takes for the menu prompt
+to appear, first with the original eager load_from_file and then with
+lazy=True. It also times the first search and first loan afterwards,
+which is where the lazy library does the work it skipped at startup.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import PROJECT_DIR, make_library, print_table
+from library import Library
+
+# Starts main.py with load_from_file forced to one mode
+LAUNCHER = """
+import sys
+sys.path.insert(0, {project!r})
+import main
+from library import Library
+load = Library.load_from_file
+Library.load_from_file = staticmethod(lambda *args, **kwargs: load(*args, **dict(kwargs, lazy={lazy})))
+main.main()
+"""
+
+
+def time_to_prompt(directory, lazy):
+    """Start main.py and time until the menu asks for a choice"""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", LAUNCHER.format(project=PROJECT_DIR, lazy=lazy)],
+                               cwd=directory, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL)
+    output = b""
+    while b"Enter choice" not in output:
+        chunk = os.read(process.stdout.fileno(), 65536)
+        if not chunk:
+            raise RuntimeError("main.py exited before showing the menu")
+        output += chunk
+    elapsed = time.perf_counter() - start
+    process.kill()
+    process.wait()
+    return elapsed
+
+
+def first_use(filename, lazy):
+    """Time loading, then the first search and the first loan"""
+    start = time.perf_counter()
+    library = Library.load_from_file(filename, lazy=lazy)
+    loaded = time.perf_counter()
+    library.search_books("history")
+    searched = time.perf_counter()
+    member_id = next(iter(library.members))
+    isbn = next(isbn for isbn in library._available_books)
+    library.borrow_book(member_id, isbn)
+    borrowed = time.perf_counter()
+    return loaded - start, searched - loaded, borrowed - searched
+
+
+def main():
+    num_books = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "data", "library.json")
+        make_library(num_books, num_members=num_books // 10).save_to_file(filename)
+        size_mb = os.path.getsize(filename) / 1e6
+
+        rows = []
+        for lazy in (False, True):
+            prompt = time_to_prompt(directory, lazy)
+            load, search, borrow = first_use(filename, lazy)
+            rows.append(("lazy" if lazy else "eager", f"{prompt:.2f}", f"{load:.2f}",
+                         f"{search:.2f}", f"{borrow * 1000:.1f}"))
+
+    print(f"Startup ({num_books:,} books, {num_books // 10:,} members, {size_mb:.0f} MB JSON)")
+    print_table(["mode", "to prompt (s)", "load (s)", "first search (s)", "first loan (ms)"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Week 8 Benchmark: Peak memory of loading library.json, json.load vs streaming
+Run with: python benchmarks/bench_stream.py [num_books]
+
+"json.load" is the loader before streaming: it reads the whole document
+into dicts and lists, then builds the library from them. "streaming" is
+Library.load_from_file, which reads one record at a time. Each load runs
+in a fresh process and reports its peak RSS (the most memory it ever
+held), its RSS once loading is done, and the load time.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import make_library, memory_status, print_table
+from books import create_book_from_dict
+from library import Library
+from members import create_member_from_dict
+
+
+def load_with_json_load(filename):
+    """The original loader: parse everything, then build the objects"""
+    with open(filename, 'r') as file:
+        data = json.load(file)
+
+    library = Library(data["name"])
+    library.ledger.load_dicts(data.get("loans", []))
+    for book_data in data.get("books", []):
+        library._store_book(create_book_from_dict(book_data))
+    for member_data in data.get("members", []):
+        library._store_member(create_member_from_dict(member_data))
+    return library
+
+
+def child(mode, filename):
+    """Load once and print peak RSS, final RSS and time (run in a new process)"""
+    start = time.perf_counter()
+    library = load_with_json_load(filename) if mode == "json.load" else Library.load_from_file(filename)
+    elapsed = time.perf_counter() - start
+    peak, final = memory_status()
+    print(json.dumps([peak, final, elapsed, len(library.books)]))
+
+
+def measure(mode, filename):
+    """Run child() in a fresh interpreter and return its numbers"""
+    output = subprocess.run([sys.executable, __file__, "--child", mode, filename],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], sys.argv[3])
+        return
+
+    num_books = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "data", "library.json")
+        library = make_library(num_books, num_members=num_books // 10)
+        for member_id, isbn in zip(list(library.members), list(library._available_books)):
+            library.borrow_book(member_id, isbn)
+        library.save_to_file(filename)
+        size_mb = os.path.getsize(filename) / 1e6
+        del library
+
+        rows = []
+        for mode in ("json.load", "streaming"):
+            peak, final, elapsed, count = measure(mode, filename)
+            assert count == num_books
+            rows.append((mode, f"{peak / 1e6:.0f} MB", f"{final / 1e6:.0f} MB",
+                         f"{peak / final:.2f}x", f"{elapsed:.2f} s"))
+
+    print(f"Loading library.json ({num_books:,} books, {size_mb:.0f} MB file)")
+    print_table(["loader", "peak RSS", "RSS after load", "peak / after", "time"], rows)
+
+
+if __name__ == "__main__":
+    main()
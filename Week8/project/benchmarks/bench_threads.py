@@ -0,0 +1,67 @@
+"""
+Week 8 Benchmark: Checkout throughput with several terminal threads
+Run with: python benchmarks/bench_threads.py [operations_per_thread]
+
+Each thread plays one checkout terminal with its own members and books,
+borrowing and returning in a loop. The "global lock" column wraps every
+call in one shared lock for comparison with the per-key locking.
+"""
+
+import sys
+import threading
+import time
+
+from common import make_library, print_table
+from members import Member
+
+
+def run_terminals(library, num_threads, operations, global_lock=None):
+    """Run borrow/return loops on several threads and return ops per second"""
+    barrier = threading.Barrier(num_threads + 1)
+
+    def terminal(number):
+        member_id = f"BENCH{number}"
+        isbns = [f"978-{(number * 10 + offset):09d}" for offset in range(3)]
+        barrier.wait()
+        for step in range(operations // 2):
+            isbn = isbns[step % 3]
+            if global_lock is not None:
+                with global_lock:
+                    library.borrow_book(member_id, isbn)
+                with global_lock:
+                    library.return_book(member_id, isbn)
+            else:
+                library.borrow_book(member_id, isbn)
+                library.return_book(member_id, isbn)
+
+    threads = [threading.Thread(target=terminal, args=(number,)) for number in range(num_threads)]
+    for thread in threads:
+        thread.start()
+
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return num_threads * operations / elapsed
+
+
+def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    library = make_library(1_000)
+    for number in range(32):
+        library.add_member(Member(f"BENCH{number}", "Terminal", "t@example.com"))
+
+    rows = []
+    for num_threads in [1, 2, 4, 8, 16]:
+        keyed = run_terminals(library, num_threads, operations)
+        single = run_terminals(library, num_threads, operations, threading.Lock())
+        rows.append((num_threads, f"{keyed:,.0f}", f"{single:,.0f}"))
+
+    print(f"{operations:,} operations per thread")
+    print_table(["threads", "per-key locks ops/s", "global lock ops/s"], rows)
+
+
+if __name__ == "__main__":
+    main()
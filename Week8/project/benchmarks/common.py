@@ -0,0 +1,132 @@
+"""
+Week 8 Project: Benchmark Helpers
+Synthetic catalogs and timing utilities shared by the benchmark scripts
+"""
+
+import os
+import random
+import sys
+import time
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_DIR)
+
+from books import Book, EBook, PhysicalBook
+from members import Member, StudentMember, TeacherMember
+from library import Library
+
+WORDS = ["python", "data", "history", "garden", "ocean", "night", "river", "code",
+         "science", "stories", "modern", "guide", "secret", "journey", "music",
+         "design", "winter", "empire", "machine", "learning", "city", "light"]
+FIRST_NAMES = ["Ada", "Alan", "Grace", "Linus", "Barbara", "Donald", "Edsger",
+               "Margaret", "Ken", "Dennis", "Frances", "John", "Radia", "Tim"]
+LAST_NAMES = ["Lovelace", "Turing", "Hopper", "Torvalds", "Liskov", "Knuth",
+              "Dijkstra", "Hamilton", "Thompson", "Ritchie", "Allen", "Backus",
+              "Perlman", "Berners-Lee"]
+FORMATS = ["PDF", "EPUB", "MOBI"]
+CONDITIONS = ["New", "Good", "Fair", "Poor"]
+DEPARTMENTS = ["Physics", "History", "Computer Science", "Biology", "Music"]
+
+
+def make_book(index, rng):
+    """Create a random book with a unique ISBN"""
+    isbn = f"978-{index:09d}"
+    title = " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(2, 5)))
+    author = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    year = rng.randint(1950, 2024)
+    kind = index % 3
+
+    if kind == 0:
+        return EBook(isbn, title, author, year, round(rng.uniform(0.5, 50), 1), rng.choice(FORMATS))
+    if kind == 1:
+        shelf = f"{rng.choice('ABCDEFGH')}{rng.randint(1, 9)}-{rng.randint(1, 40)}"
+        return PhysicalBook(isbn, title, author, year, shelf, rng.choice(CONDITIONS))
+    return Book(isbn, title, author, year)
+
+
+def make_member(index, rng):
+    """Create a random member with a unique member ID"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    email = f"user{index}@example.com"
+    kind = index % 3
+
+    if kind == 0:
+        return StudentMember(f"S{index:07d}", name, email, f"STU{index}", rng.choice(DEPARTMENTS))
+    if kind == 1:
+        return TeacherMember(f"T{index:07d}", name, email, f"FAC{index}", rng.choice(DEPARTMENTS))
+    return Member(f"M{index:07d}", name, email)
+
+
+def make_library(num_books, num_members=0, seed=42):
+    """
+    Build a library filled with synthetic books and members
+
+    Args:
+        num_books: Number of books to create
+        num_members: Number of members to create
+        seed: Random seed so runs are repeatable
+
+    Returns:
+        Library: Populated library
+    """
+    rng = random.Random(seed)
+    library = Library("Benchmark Library")
+
+    for index in range(num_books):
+        library.add_book(make_book(index, rng))
+
+    for index in range(num_members):
+        library.add_member(make_member(index, rng))
+
+    return library
+
+
+def best_time(func, repeat=5):
+    """
+    Run a function several times and return the fastest wall time
+
+    Args:
+        func: Callable taking no arguments
+        repeat: Number of runs
+
+    Returns:
+        float: Fastest run in seconds
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def print_table(headers, rows):
+    """Print rows as a simple aligned text table"""
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    line = "  ".join(f"{{:>{width}}}" for width in widths)
+
+    print(line.format(*headers))
+    print("  ".join("-" * width for width in widths))
+    for row in rows:
+        print(line.format(*row))
+
+
+def memory_status():
+    """
+    Peak and current resident memory of this process, in bytes
+
+    Read from /proc rather than getrusage: ru_maxrss also counts the
+    parent's memory, which a child maps between fork and exec.
+    """
+    fields = {}
+    with open("/proc/self/status") as file:
+        for line in file:
+            key, _, value = line.partition(":")
+            fields[key] = value
+    return int(fields["VmHWM"].split()[0]) * 1024, int(fields["VmRSS"].split()[0]) * 1024
+
+
+def reset_peak_memory():
+    """Start measuring peak memory from now on (Linux: resets VmHWM to VmRSS)"""
+    with open("/proc/self/clear_refs", "w") as file:
+        file.write("5")
@@ -0,0 +1,549 @@
+"""
+Week 8 Project: Binary Snapshot Format
+Compact, versioned alternative to library.json
+
+File layout (all integers little-endian):
+
+    header   MAGIC, version (u16), flags (u16), journal_seq (u64), name
+    sections tag (4 bytes), payload size (u64), payload -- in this order:
+        STRS  string table: every repeated value (authors, formats, shelves,
+              conditions, majors, departments, member IDs, loan ISBNs)
+        LOAN  loan rows: ISBN and member codes, start/due/returned ordinals
+        BOOK  one row per book: type, ISBN, title, author code, year,
+              availability, borrower code, due ordinal
+        EBOK  file size and format code of each EBook, in catalog order
+        PHYS  shelf and condition codes of each PhysicalBook
+        MEMB  one row per member: type, ID, name, email, join ordinal,
+              limit, number of borrowed books; then their ISBNs
+        STUD  student ID and major code of each StudentMember
+        TEAC  faculty ID, department code and loan flag of each TeacherMember
+
+A payload is a series of columns. A fixed-width column is its array
+typecode (1 byte), item count (u64) and the items; a text column is a
+column of character lengths followed by the UTF-8 bytes of all its
+strings (u64 size first). NONE marks a missing value in length and code
+columns, and dates are day ordinals with NO_DATE for "no date". Readers
+skip sections with tags they do not know, so later versions can add
+sections without breaking older readers.
+"""
+
+import io
+import os
+import struct
+import sys
+from array import array
+
+from compressed import codec_for, compressing, decompressing, strip_extension
+from dates import format_date, to_ordinal
+from interning import StringTable
+from json_stream import encode_element, read_sections, write_sections
+from jsonl_format import MAGIC as JSONL_MAGIC, read_jsonl, write_jsonl
+from mapped import MAGIC as MAPPED_MAGIC, read_mapped, write_mapped
+
+MAGIC = b"LIBSNAP\x00"
+VERSION = 1
+
+HEADER = struct.Struct("<HHQ")  # version, flags, journal_seq
+SECTION = struct.Struct("<4sQ")  # tag, payload size
+COLUMN = struct.Struct("<cQ")  # array typecode, item count
+SIZE = struct.Struct("<Q")
+
+NONE = 0xFFFFFFFF  # Missing string length or code
+NO_DATE = 0  # Day ordinal meaning "no date"
+
+BOOK_TYPES = ("Book", "EBook", "PhysicalBook")
+MEMBER_TYPES = ("Member", "Student", "Teacher")
+
+FORMATS = ("json", "binary", "mapped", "jsonl")
+BINARY_EXTENSIONS = (".bin",)
+MAPPED_EXTENSIONS = (".snap",)  # Snapshots for MappedLibrary, see mapped.py
+JSONL_EXTENSIONS = (".jsonl",)  # One record per line, see jsonl_format.py
+
+# Keys whose values are lists of records in both formats
+RECORD_KEYS = ("loans", "books", "members")
+
+
+def format_for(filename, file_format=None):
+    """
+    Choose the format to save a file in
+
+    Args:
+        filename: File to write
+        file_format: "json", "binary", "mapped" or "jsonl"; None picks by
+                     extension (BINARY_EXTENSIONS, MAPPED_EXTENSIONS,
+                     JSONL_EXTENSIONS, JSON otherwise), ignoring a
+                     compression extension ("library.bin.gz")
+
+    Returns:
+        str: "json", "binary", "mapped" or "jsonl"
+    """
+    if file_format is None:
+        extension = os.path.splitext(strip_extension(filename))[1].lower()
+        if extension in BINARY_EXTENSIONS:
+            return "binary"
+        if extension in MAPPED_EXTENSIONS:
+            return "mapped"
+        if extension in JSONL_EXTENSIONS:
+            return "jsonl"
+        return "json"
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown file format: {file_format}")
+    return file_format
+
+
+def read_library(file):
+    """
+    Read a library file in any format, one record at a time
+
+    Compressed files (see compressed.py) are recognized by their first
+    bytes and decompressed as they are read.
+
+    Args:
+        file: File opened in binary mode
+
+    Yields:
+        tuple: (key, value) pairs like json_stream.read_sections
+    """
+    file, codec = decompressing(file)
+    magic = file.peek(len(MAGIC))[:len(MAGIC)]
+    if magic == MAGIC:
+        return read_snapshot(file)
+    if magic == MAPPED_MAGIC:
+        if codec is not None:
+            raise ValueError("A mapped snapshot cannot be read compressed")
+        return read_mapped(file)
+    if file.peek(len(JSONL_MAGIC))[:len(JSONL_MAGIC)] == JSONL_MAGIC:
+        return read_jsonl(file)
+    return read_sections(io.TextIOWrapper(file, encoding="utf-8"))
+
+
+def check_compression(file_format, codec):
+    """Refuse to compress a mapped snapshot, which is read in place"""
+    if file_format == "mapped" and codec is not None:
+        raise ValueError("Mapped snapshots cannot be compressed")
+
+
+def write_library(file, data, file_format, compact=False):
+    """
+    Write library data (as saved by Library.save_to_file) in a format
+
+    The loans, books and members may be any iterables of record
+    dictionaries, such as generators; the JSON, JSON Lines and binary
+    writers go through each once, so they are never all in memory.
+
+    Args:
+        file: File opened in binary mode
+        data: Dictionary with name, loans, books, members and journal_seq
+        file_format: "json", "binary", "mapped" or "jsonl"
+        compact: Write JSON without whitespace (other formats ignore it)
+    """
+    if file_format == "jsonl":
+        write_jsonl(file, data)
+        return
+    if file_format == "binary":
+        write_snapshot(file, data)
+        return
+    if file_format == "mapped":
+        write_mapped(file, data)
+        return
+
+    # Each record is encoded and written on its own, then dropped
+    sections = [(key, (encode_element(record, compact) for record in value) if key in RECORD_KEYS else value)
+                for key, value in data.items()]
+    text = io.TextIOWrapper(file, encoding="utf-8")
+    write_sections(text, sections, RECORD_KEYS, compact)
+    text.flush()
+    text.detach()
+
+
+def convert(source, target, file_format=None, compression=None, level=None, compact=False):
+    """
+    Convert a library file between JSON and the binary formats
+
+    Records are copied as they are, without building books or members,
+    and streamed: the source is read once for its name and journal_seq
+    and once more for each section, so no section is ever all in memory.
+    The target is replaced only once complete (see save_library), so it
+    may be the source itself.
+
+    Args:
+        source: File to read (any format, compressed or not)
+        target: File to write
+        file_format: Format of target, see format_for
+        compression: Codec of target, see compressed.codec_for
+        level: Compression level, see compressed.compressing
+        compact: Write JSON without whitespace
+    """
+    header = {"name": None, "journal_seq": 0}
+    seen = set()
+    with open(source, 'rb') as file:
+        # The binary and JSON Lines headers come first; a JSON file may keep them anywhere
+        for key, value in read_library(file):
+            if key not in RECORD_KEYS:
+                header[key] = value
+                seen.add(key)
+                if seen >= {"name", "journal_seq"}:
+                    break
+
+    data = {"name": header["name"]}
+    for key in RECORD_KEYS:
+        data[key] = _section(source, key)
+    data["journal_seq"] = header["journal_seq"]
+    save_library(target, data, file_format, compression, level, compact)
+
+
+def _section(filename, key):
+    """Yield the records of one section of a library file"""
+    with open(filename, 'rb') as file:
+        for record_key, value in read_library(file):
+            if record_key == key:
+                yield value
+
+
+def save_library(filename, data, file_format=None, compression=None, level=None, compact=False):
+    """
+    Write library data to a file, replacing it only once complete
+
+    The data goes to filename + ".tmp", which is synced to disk and then
+    renamed over filename, so a crash leaves either the old file or the
+    new one (an error while writing removes the temporary file). Records
+    are written as write_library reads them, so generators are never all
+    in memory.
+
+    Args:
+        filename: Path to the file (its directory is created if missing)
+        data: Dictionary with name, loans, books, members and journal_seq
+        file_format: Format of the file, see format_for
+        compression: Codec of the file, see compressed.codec_for
+        level: Compression level, see compressed.compressing
+        compact: Write JSON without whitespace
+    """
+    file_format = format_for(filename, file_format)
+    codec = codec_for(filename, compression)
+    check_compression(file_format, codec)
+
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temporary = filename + ".tmp"
+    try:
+        with open(temporary, 'wb') as raw:
+            with compressing(raw, codec, level) as file:
+                write_library(file, data, file_format, compact)
+            raw.flush()
+            os.fsync(raw.fileno())
+    except BaseException:
+        # The records may come from a source that failed part way
+        os.remove(temporary)
+        raise
+    os.replace(temporary, filename)
+
+
+# ---- Writing ----
+
+def _code(strings, value):
+    """Get a string's code in a StringTable (NONE for None)"""
+    return NONE if value is None else strings.encode(value)
+
+
+def _array_bytes(values):
+    """Items of an array in little-endian order"""
+    if sys.byteorder == "big":
+        values = values[:]
+        values.byteswap()
+    return values.tobytes()
+
+
+def _write_column(out, values):
+    """Write a fixed-width column (an array)"""
+    out.write(COLUMN.pack(values.typecode.encode(), len(values)))
+    out.write(_array_bytes(values))
+
+
+def _write_text(out, values):
+    """Write a text column (None is allowed)"""
+    _write_column(out, array("I", (NONE if value is None else len(value) for value in values)))
+    data = "".join(value for value in values if value is not None).encode("utf-8")
+    out.write(SIZE.pack(len(data)))
+    out.write(data)
+
+
+def _write_section(file, tag, columns):
+    """Write a section whose payload is the given columns, in order"""
+    out = io.BytesIO()
+    for kind, values in columns:
+        if kind == "text":
+            _write_text(out, values)
+        else:
+            _write_column(out, values)
+    payload = out.getbuffer()
+    file.write(SECTION.pack(tag, len(payload)))
+    file.write(payload)
+
+
+def _date(value):
+    """Saved date ("YYYY-MM-DD", ordinal or None) as an ordinal column value"""
+    ordinal = to_ordinal(value)
+    return NO_DATE if ordinal is None else ordinal
+
+
+def write_snapshot(file, data):
+    """
+    Write library data in the binary format
+
+    Args:
+        file: File opened in binary mode
+        data: Dictionary with name, loans, books, members (records as
+              saved to JSON) and journal_seq
+    """
+    strings = StringTable()
+
+    loan_isbns, loan_members = array("I"), array("I")
+    starts, dues, returns = array("i"), array("i"), array("i")
+    for loan in data.get("loans", []):
+        loan_isbns.append(_code(strings, loan["isbn"]))
+        loan_members.append(_code(strings, loan["member_id"]))
+        starts.append(_date(loan.get("start")))
+        dues.append(_date(loan.get("due")))
+        returns.append(_date(loan.get("returned")))
+
+    book_types, isbns, titles, authors = array("B"), [], [], array("I")
+    years, available, borrowers, due_dates = array("i"), array("B"), array("I"), array("i")
+    sizes, file_formats, shelves, conditions = array("d"), array("I"), array("I"), array("I")
+    for book in data.get("books", []):
+        book_type = book.get("type", "Book")
+        book_types.append(BOOK_TYPES.index(book_type))
+        isbns.append(book["isbn"])
+        titles.append(book["title"])
+        authors.append(_code(strings, book["author"]))
+        years.append(book["year"])
+        available.append(1 if book.get("is_available", True) else 0)
+        borrowers.append(_code(strings, book.get("borrowed_by")))
+        due_dates.append(_date(book.get("due_date")))
+        if book_type == "EBook":
+            sizes.append(book.get("file_size_mb", 0))
+            file_formats.append(_code(strings, book.get("file_format", "PDF")))
+        elif book_type == "PhysicalBook":
+            shelves.append(_code(strings, book.get("shelf_location", "Unknown")))
+            conditions.append(_code(strings, book.get("condition", "Good")))
+
+    member_types, member_ids, names, emails = array("B"), [], [], []
+    joined, limits, borrowed_counts, borrowed = array("i"), array("I"), array("I"), []
+    student_ids, majors = [], array("I")
+    faculty_ids, departments, extended = [], array("I"), array("B")
+    for member in data.get("members", []):
+        member_type = member.get("type", "Member")
+        member_types.append(MEMBER_TYPES.index(member_type))
+        member_ids.append(member["member_id"])
+        names.append(member["name"])
+        emails.append(member["email"])
+        joined.append(_date(member.get("join_date")))
+        limits.append(NONE if member.get("max_books") is None else member["max_books"])
+        books = member.get("borrowed_books", [])
+        borrowed_counts.append(len(books))
+        borrowed.extend(books)
+        if member_type == "Student":
+            student_ids.append(member.get("student_id", ""))
+            majors.append(_code(strings, member.get("major", "")))
+        elif member_type == "Teacher":
+            faculty_ids.append(member.get("faculty_id", ""))
+            departments.append(_code(strings, member.get("department", "")))
+            extended.append(1 if member.get("extended_loan", True) else 0)
+
+    name = data["name"].encode("utf-8")
+    file.write(MAGIC)
+    file.write(HEADER.pack(VERSION, 0, data.get("journal_seq", 0)))
+    file.write(SIZE.pack(len(name)))
+    file.write(name)
+
+    _write_section(file, b"STRS", [("text", strings.values)])
+    _write_section(file, b"LOAN", [("codes", loan_isbns), ("codes", loan_members),
+                                   ("dates", starts), ("dates", dues), ("dates", returns)])
+    _write_section(file, b"BOOK", [("types", book_types), ("text", isbns), ("text", titles),
+                                   ("codes", authors), ("years", years), ("flags", available),
+                                   ("codes", borrowers), ("dates", due_dates)])
+    _write_section(file, b"EBOK", [("sizes", sizes), ("codes", file_formats)])
+    _write_section(file, b"PHYS", [("codes", shelves), ("codes", conditions)])
+    _write_section(file, b"MEMB", [("types", member_types), ("text", member_ids), ("text", names),
+                                   ("text", emails), ("dates", joined), ("limits", limits),
+                                   ("counts", borrowed_counts), ("text", borrowed)])
+    _write_section(file, b"STUD", [("text", student_ids), ("codes", majors)])
+    _write_section(file, b"TEAC", [("text", faculty_ids), ("codes", departments), ("flags", extended)])
+
+
+# ---- Reading ----
+
+class _Payload:
+    """Reads columns from a section payload in order"""
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def column(self):
+        """Read a fixed-width column as an array"""
+        typecode, count = COLUMN.unpack_from(self.data, self.pos)
+        self.pos += COLUMN.size
+        values = array(typecode.decode())
+        end = self.pos + count * values.itemsize
+        values.frombytes(self.data[self.pos:end])
+        if sys.byteorder == "big":
+            values.byteswap()
+        self.pos = end
+        return values
+
+    def text(self):
+        """Read a text column as a list of strings (and None)"""
+        lengths = self.column()
+        size, = SIZE.unpack_from(self.data, self.pos)
+        self.pos += SIZE.size
+        text = str(self.data[self.pos:self.pos + size], "utf-8")
+        self.pos += size
+
+        values = []
+        append = values.append
+        position = 0
+        for length in lengths:
+            if length == NONE:
+                append(None)
+            else:
+                end = position + length
+                append(text[position:end])
+                position = end
+        return values
+
+    def codes(self, strings):
+        """Read a code column and look the codes up in the string table"""
+        return [None if code == NONE else strings[code] for code in self.column()]
+
+
+def _date_text(ordinal):
+    """Ordinal column value back to the saved "YYYY-MM-DD" form"""
+    return None if ordinal == NO_DATE else format_date(ordinal)
+
+
+def read_snapshot(file):
+    """
+    Read a binary library file
+
+    Each section's columns are decoded at once (compact arrays and string
+    lists); the record dictionaries are built one at a time as they are
+    yielded, in the same form as the JSON file.
+
+    Args:
+        file: File opened in binary mode, positioned at the start
+
+    Yields:
+        tuple: (key, value) pairs like json_stream.read_sections
+    """
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a binary library file")
+    version, _, journal_seq = HEADER.unpack(file.read(HEADER.size))
+    if version > VERSION:
+        raise ValueError(f"Binary library file version {version} is newer than supported ({VERSION})")
+    size, = SIZE.unpack(file.read(SIZE.size))
+    yield "name", file.read(size).decode("utf-8")
+    yield "journal_seq", journal_seq
+
+    sections = {}
+    while True:
+        header = file.read(SECTION.size)
+        if not header:
+            break
+        if len(header) < SECTION.size:
+            raise ValueError("Binary library file is truncated")
+        tag, size = SECTION.unpack(header)
+        payload = file.read(size)
+        if len(payload) < size:
+            raise ValueError("Binary library file is truncated")
+        sections[tag] = _Payload(memoryview(payload))
+
+    strings = sections[b"STRS"].text()
+
+    loans = sections[b"LOAN"]
+    loan_isbns, loan_members = loans.codes(strings), loans.codes(strings)
+    starts, dues, returns = loans.column(), loans.column(), loans.column()
+    for row in range(len(loan_isbns)):
+        yield "loans", {
+            "isbn": loan_isbns[row],
+            "member_id": loan_members[row],
+            "start": _date_text(starts[row]),
+            "due": _date_text(dues[row]),
+            "returned": _date_text(returns[row])
+        }
+    del loan_isbns, loan_members, starts, dues, returns
+
+    yield from _read_books(sections, strings)
+    yield from _read_members(sections, strings)
+
+
+def _read_books(sections, strings):
+    """Yield ("books", record) for each book"""
+    books = sections[b"BOOK"]
+    types, isbns, titles = books.column(), books.text(), books.text()
+    authors, years, available = books.codes(strings), books.column(), books.column()
+    borrowers, due_dates = books.codes(strings), books.column()
+    ebooks, physical = sections[b"EBOK"], sections[b"PHYS"]
+    sizes, file_formats = iter(ebooks.column()), iter(ebooks.codes(strings))
+    shelves, conditions = iter(physical.codes(strings)), iter(physical.codes(strings))
+
+    for row in range(len(isbns)):
+        book_type = BOOK_TYPES[types[row]]
+        record = {
+            "type": book_type,
+            "isbn": isbns[row],
+            "title": titles[row],
+            "author": authors[row],
+            "year": years[row],
+            "is_available": bool(available[row]),
+            "borrowed_by": borrowers[row],
+            "due_date": _date_text(due_dates[row])
+        }
+        if book_type == "EBook":
+            record["file_size_mb"] = next(sizes)
+            record["file_format"] = next(file_formats)
+        elif book_type == "PhysicalBook":
+            record["shelf_location"] = next(shelves)
+            record["condition"] = next(conditions)
+        yield "books", record
+
+
+def _read_members(sections, strings):
+    """Yield ("members", record) for each member"""
+    members = sections[b"MEMB"]
+    types, member_ids, names, emails = members.column(), members.text(), members.text(), members.text()
+    joined, limits, counts, borrowed = members.column(), members.column(), members.column(), members.text()
+    students, teachers = sections[b"STUD"], sections[b"TEAC"]
+    student_ids, majors = iter(students.text()), iter(students.codes(strings))
+    faculty_ids, departments = iter(teachers.text()), iter(teachers.codes(strings))
+    extended = iter(teachers.column())
+
+    position = 0
+    for row in range(len(member_ids)):
+        member_type = MEMBER_TYPES[types[row]]
+        end = position + counts[row]
+        record = {
+            "type": member_type,
+            "member_id": member_ids[row],
+            "name": names[row],
+            "email": emails[row],
+            "borrowed_books": borrowed[position:end],
+            "join_date": _date_text(joined[row])
+        }
+        if limits[row] != NONE:
+            record["max_books"] = limits[row]
+        position = end
+        if member_type == "Student":
+            record["student_id"] = next(student_ids)
+            record["major"] = next(majors)
+        elif member_type == "Teacher":
+            record["faculty_id"] = next(faculty_ids)
+            record["department"] = next(departments)
+            record["extended_loan"] = bool(next(extended))
+        yield "members", record
+
+
+if __name__ == "__main__":
+    # python binary_format.py data/library.json data/library.bin [format [compression [level]]]
+    convert(sys.argv[1], sys.argv[2], *sys.argv[3:5], *map(int, sys.argv[5:6]))
@@ -4,12 +4,22 @@ Demonstrates: Inheritance, Polymorphism
 Classes: Book (base), EBook, PhysicalBook
 """
 
-from datetime import datetime, timedelta
+import copy
+
+from dates import format_date, to_ordinal, today_ordinal
+from interning import intern_string
 
 
 class Book:
     """Base class representing a book in the library"""
 
+    # Slots instead of a per-instance __dict__ keep millions of books compact;
+    # __weakref__ lets SQLiteLibrary track the books callers still hold
+    __slots__ = ("isbn", "title", "author", "year", "is_available", "borrowed_by", "due_ordinal",
+                 "__weakref__")
+
+    _type = "Book"  # Protected class attribute, the same for every instance
+
     def __init__(self, isbn, title, author, year):
         """
         Initialize a book
@@ -26,8 +36,17 @@ class Book:
         self.year = year
         self.is_available = True
         self.borrowed_by = None
-        self.due_date = None
-        self._type = "Book"  # Protected attribute
+        self.due_ordinal = None  # Due date as a day ordinal while on loan
+
+    @property
+    def due_date(self):
+        """Due date as a "YYYY-MM-DD" string (None when not borrowed)"""
+        return format_date(self.due_ordinal)
+
+    @due_date.setter
+    def due_date(self, value):
+        """Set the due date from a "YYYY-MM-DD" string, date or day ordinal"""
+        self.due_ordinal = to_ordinal(value)
 
     def borrow(self, member_id, days=14):
         """
@@ -45,7 +64,7 @@ class Book:
 
         self.is_available = False
         self.borrowed_by = member_id
-        self.due_date = (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
+        self.due_ordinal = today_ordinal() + days
         return True
 
     def return_book(self):
@@ -60,9 +79,34 @@ class Book:
 
         self.is_available = True
         self.borrowed_by = None
-        self.due_date = None
+        self.due_ordinal = None
         return True
 
+    def with_loan(self, member_id, due_ordinal):
+        """
+        Get a copy of this book marked as borrowed (this book is unchanged)
+
+        Args:
+            member_id: ID of the member borrowing the book
+            due_ordinal: Due date as a day ordinal
+
+        Returns:
+            Book: New book of the same type
+        """
+        book = copy.copy(self)
+        book.is_available = False
+        book.borrowed_by = member_id
+        book.due_ordinal = due_ordinal
+        return book
+
+    def without_loan(self):
+        """Get a copy of this book marked as available (this book is unchanged)"""
+        book = copy.copy(self)
+        book.is_available = True
+        book.borrowed_by = None
+        book.due_ordinal = None
+        return book
+
     def get_info(self):
         """Get book information - polymorphic method"""
         status = "Available" if self.is_available else f"Borrowed (Due: {self.due_date})"
@@ -89,6 +133,10 @@ class Book:
 class EBook(Book):
     """Electronic book with file size and format"""
 
+    __slots__ = ("file_size_mb", "file_format")
+
+    _type = "EBook"
+
     def __init__(self, isbn, title, author, year, file_size_mb, file_format):
         """
         Initialize an e-book
@@ -104,7 +152,6 @@ class EBook(Book):
         super().__init__(isbn, title, author, year)
         self.file_size_mb = file_size_mb
         self.file_format = file_format.upper()
-        self._type = "EBook"
 
     def borrow(self, member_id, days=30):
         """
@@ -135,6 +182,10 @@ class EBook(Book):
 class PhysicalBook(Book):
     """Physical book with shelf location and condition"""
 
+    __slots__ = ("shelf_location", "condition")
+
+    _type = "PhysicalBook"
+
     def __init__(self, isbn, title, author, year, shelf_location, condition="Good"):
         """
         Initialize a physical book
@@ -150,7 +201,6 @@ class PhysicalBook(Book):
         super().__init__(isbn, title, author, year)
         self.shelf_location = shelf_location
         self.condition = condition
-        self._type = "PhysicalBook"
 
     def borrow(self, member_id, days=14):
         """
@@ -201,27 +251,36 @@ def create_book_from_dict(data):
         Book object (Book, EBook, or PhysicalBook)
     """
     book_type = data.get("type", "Book")
+    # Titles and authors are indexed for search, which needs text
+    for field in ("title", "author"):
+        if not isinstance(data[field], str):
+            raise TypeError(f"{field} must be a string, not {type(data[field]).__name__}")
+
+    # Repeated values such as authors share one string object while a
+    # StringPool is active (see interning.py)
+    author = intern_string("author", data["author"])
 
     if book_type == "EBook":
         book = EBook(
             data["isbn"],
             data["title"],
-            data["author"],
+            author,
             data["year"],
             data.get("file_size_mb", 0),
             data.get("file_format", "PDF")
         )
+        book.file_format = intern_string("file_format", book.file_format)
     elif book_type == "PhysicalBook":
         book = PhysicalBook(
             data["isbn"],
             data["title"],
-            data["author"],
+            author,
             data["year"],
             data.get("shelf_location", "Unknown"),
-            data.get("condition", "Good")
+            intern_string("condition", data.get("condition", "Good"))
         )
     else:
-        book = Book(data["isbn"], data["title"], data["author"], data["year"])
+        book = Book(data["isbn"], data["title"], author, data["year"])
 
     # Restore borrowing state
     book.is_available = data.get("is_available", True)
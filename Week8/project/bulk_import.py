@@ -0,0 +1,204 @@
+"""
+Week 8 Project: Bulk Import
+Streams books and members from CSV or JSON Lines files into a library
+"""
+
+import csv
+import json
+import os
+
+from books import create_book_from_dict
+from members import create_member_from_dict
+from interning import StringPool
+
+TRUE_VALUES = {"true", "1", "yes", "y"}
+
+
+def _to_bool(value):
+    """Convert a CSV cell to a boolean"""
+    return value.strip().lower() in TRUE_VALUES
+
+
+def _empty_to_none(value):
+    """Treat an empty CSV cell as a missing value"""
+    return value if value not in ("", None) else None
+
+
+# CSV cells are text, so these converters restore the types the
+# factory functions expect (JSON Lines records already have them)
+BOOK_CONVERTERS = {
+    "year": int,
+    "file_size_mb": float,
+    "is_available": _to_bool,
+    "borrowed_by": _empty_to_none,
+    "due_date": _empty_to_none,
+}
+
+MEMBER_CONVERTERS = {
+    "max_books": int,
+    "extended_loan": _to_bool,
+    "borrowed_books": lambda value: [isbn for isbn in value.split(";") if isbn],
+}
+
+
+def detect_format(path):
+    """
+    Work out the file format from its extension
+
+    Args:
+        path: File path
+
+    Returns:
+        str: "csv" or "jsonl"
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Cannot tell import format from extension: {extension}")
+
+
+def iter_records(path, file_format=None, converters=None):
+    """
+    Generator that yields one record at a time from a CSV or JSONL file
+
+    Only one line is held in memory at a time. Rows that cannot be read are
+    yielded as errors instead of stopping the import.
+
+    Args:
+        path: File to read
+        file_format: "csv" or "jsonl" (detected from the extension if None)
+        converters: Dictionary of column -> function applied to CSV cells
+
+    Yields:
+        tuple: (line_number, record dict or None, error message or None)
+    """
+    file_format = file_format or detect_format(path)
+
+    with open(path, 'r', newline='', encoding='utf-8') as file:
+        if file_format == "csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                try:
+                    record = {}
+                    for column, value in row.items():
+                        if column is None or value is None or value == "":
+                            continue
+                        converter = (converters or {}).get(column)
+                        record[column] = converter(value) if converter else value
+                    yield reader.line_num, record, None
+                except ValueError as e:
+                    yield reader.line_num, None, f"Invalid value: {e}"
+        else:
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line), None
+                except json.JSONDecodeError as e:
+                    yield line_number, None, f"Invalid JSON: {e.msg}"
+
+
+def _import(path, file_format, converters, factory, key, add_batch, batch_size, max_rejects):
+    """Shared streaming loop behind import_books and import_members"""
+    report = {"imported": 0, "rejected": 0, "rejects": []}
+    batch = {}  # key -> (line_number, object), dedups within the batch
+
+    def reject(line_number, reason):
+        report["rejected"] += 1
+        if len(report["rejects"]) < max_rejects:
+            report["rejects"].append((line_number, reason))
+
+    def flush():
+        line_of = {id(obj): line_number for line_number, obj in batch.values()}
+        objects = [obj for _, obj in batch.values()]
+        failed = 0
+        try:
+            duplicates = add_batch(objects)
+        except (TypeError, ValueError, AttributeError):
+            # The batch was added all-or-nothing: add one at a time to find the rows refused
+            duplicates = []
+            for obj in objects:
+                try:
+                    duplicates.extend(add_batch([obj]))
+                except (TypeError, ValueError, AttributeError) as e:
+                    reject(line_of[id(obj)], f"Invalid record: {e}")
+                    failed += 1
+        for obj in duplicates:
+            reject(line_of[id(obj)], f"Duplicate {key}: {getattr(obj, key)}")
+        report["imported"] += len(batch) - len(duplicates) - failed
+        batch.clear()
+
+    # Repeated strings are shared within this import (see interning.py)
+    factory = StringPool().factory(factory)
+    for line_number, record, error in iter_records(path, file_format, converters):
+        if error:
+            reject(line_number, error)
+            continue
+
+        try:
+            obj = factory(record)
+        except KeyError as e:
+            reject(line_number, f"Missing field: {e.args[0]}")
+            continue
+        except (TypeError, ValueError, AttributeError) as e:
+            reject(line_number, f"Invalid record: {e}")
+            continue
+
+        value = getattr(obj, key)
+        if value in batch:
+            reject(line_number, f"Duplicate {key}: {value}")
+            continue
+
+        batch[value] = (line_number, obj)
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+
+    return report
+
+
+def import_books(library, path, file_format=None, batch_size=1000, max_rejects=100):
+    """
+    Stream books from a CSV or JSONL file into a library
+
+    Rows go through create_book_from_dict and are added in batches, so
+    memory stays bounded by batch_size no matter how large the file is.
+    CSV files use the same column names as Book.to_dict().
+
+    Args:
+        library: Library object
+        path: File to import
+        file_format: "csv" or "jsonl" (detected from the extension if None)
+        batch_size: Number of books added per batch
+        max_rejects: Number of rejected rows to keep details for
+
+    Returns:
+        dict: {"imported": int, "rejected": int, "rejects": [(line_number, reason), ...]}
+    """
+    return _import(path, file_format, BOOK_CONVERTERS, create_book_from_dict,
+                   "isbn", library.add_books, batch_size, max_rejects)
+
+
+def import_members(library, path, file_format=None, batch_size=1000, max_rejects=100):
+    """
+    Stream members from a CSV or JSONL file into a library
+
+    CSV files use the same column names as Member.to_dict(), with
+    borrowed_books written as ISBNs separated by semicolons.
+
+    Args:
+        library: Library object
+        path: File to import
+        file_format: "csv" or "jsonl" (detected from the extension if None)
+        batch_size: Number of members added per batch
+        max_rejects: Number of rejected rows to keep details for
+
+    Returns:
+        dict: {"imported": int, "rejected": int, "rejects": [(line_number, reason), ...]}
+    """
+    return _import(path, file_format, MEMBER_CONVERTERS, create_member_from_dict,
+                   "member_id", library.add_members, batch_size, max_rejects)
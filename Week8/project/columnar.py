@@ -0,0 +1,259 @@
+"""
+Week 8 Project: Columnar Book Store
+Keeps books in column arrays instead of one Python object per book
+"""
+
+from array import array
+from collections.abc import MutableMapping
+from itertools import compress
+
+from analytics import StoreAnalytics
+from books import Book, EBook, PhysicalBook
+from interning import StringTable
+
+# Type codes stored in the type column
+TYPE_CODES = {"Book": 0, "EBook": 1, "PhysicalBook": 2}
+
+NO_DATE = 0  # Due-date ordinal meaning "no due date"
+
+
+def _both(mask_a, mask_b):
+    """AND two equal-length 0/1 byte masks (done as one big-integer AND)"""
+    both = int.from_bytes(mask_a, "little") & int.from_bytes(mask_b, "little")
+    return both.to_bytes(len(mask_a), "little")
+
+
+# Book class for each type code
+BOOK_CLASSES = [Book, EBook, PhysicalBook]
+
+# Every per-row column, in the order _compact rebuilds them
+COLUMNS = ("alive", "isbns", "titles", "borrowers", "types", "years", "available", "due_ordinals",
+           "file_sizes", "authors", "file_formats", "shelf_locations", "conditions")
+
+
+class ColumnarBookStore(MutableMapping, StoreAnalytics):
+    """
+    ISBN -> Book mapping backed by column arrays
+
+    Each field is one column: array('i') for years and due-date ordinals,
+    array('b') for type codes, array('d') for file sizes, a bytearray
+    availability map, and StringTable codes for repeated text such as
+    authors. Whole-column questions such as "how many books are available"
+    are answered from the columns without creating any Book objects.
+
+    Reading store[isbn] builds a standalone Book, EBook or PhysicalBook
+    from the row: a copy of the book as stored at that moment. Changing it
+    does not change the store; store it again (as Library does after a
+    loan) to write the change back.
+
+    Removing or retyping a book marks its old row dead. Once dead rows
+    outnumber live ones the columns are rebuilt without them, so a catalog
+    that shrinks gives its memory back. The StringTables only grow: an
+    author or shelf that no live book uses any more keeps its entry, which
+    costs one string per distinct value.
+    """
+
+    def __init__(self):
+        """Initialize an empty store"""
+        self._rows = {}  # ISBN -> row number, in insertion order
+        self._dead = 0  # Rows marked dead since the columns were last rebuilt
+        self.alive = bytearray()
+        self.isbns = []
+        self.titles = []
+        self.borrowers = []  # member_id or None
+        self.types = bytearray()  # TYPE_CODES value per row
+        self.years = array('i')
+        self.available = bytearray()
+        self.due_ordinals = array('i')
+        self.file_sizes = array('d')
+        self.authors = array('i')
+        self.file_formats = array('i')
+        self.shelf_locations = array('i')
+        self.conditions = array('i')
+        self.authors_table = StringTable()
+        self.file_formats_table = StringTable()
+        self.shelf_locations_table = StringTable()
+        self.conditions_table = StringTable()
+        self._empty = self.file_formats_table.encode("")
+        for table in (self.shelf_locations_table, self.conditions_table):
+            table.encode("")
+
+    def __len__(self):
+        """Number of books in the store"""
+        return len(self._rows)
+
+    def __iter__(self):
+        """Iterate over ISBNs in insertion order"""
+        return iter(self._rows)
+
+    def __contains__(self, isbn):
+        """Check whether a book is in the store"""
+        return isbn in self._rows
+
+    def __getitem__(self, isbn):
+        """Build a standalone copy of the book with this ISBN"""
+        row = self._rows[isbn]
+        book = object.__new__(BOOK_CLASSES[self.types[row]])
+        book.isbn = self.isbns[row]
+        book.title = self.titles[row]
+        book.author = self.authors_table.values[self.authors[row]]
+        book.year = self.years[row]
+        book.is_available = bool(self.available[row])
+        book.borrowed_by = self.borrowers[row]
+        ordinal = self.due_ordinals[row]
+        book.due_ordinal = ordinal if ordinal != NO_DATE else None
+        if book._type == "EBook":
+            book.file_size_mb = self.file_sizes[row]
+            book.file_format = self.file_formats_table.values[self.file_formats[row]]
+        elif book._type == "PhysicalBook":
+            book.shelf_location = self.shelf_locations_table.values[self.shelf_locations[row]]
+            book.condition = self.conditions_table.values[self.conditions[row]]
+        return book
+
+    def __setitem__(self, isbn, book):
+        """Store a book's fields in a row (a new row unless the ISBN exists)"""
+        old = self._rows.get(isbn)
+        if old is not None and self.types[old] == TYPE_CODES[book._type]:
+            row = old
+        else:
+            row = self._append_row()
+
+        try:
+            self._write_row(row, book)
+        except BaseException:
+            # A book whose fields do not fit the columns is not stored
+            if row != old:
+                self._kill(row)
+            raise
+
+        if row != old:
+            if old is not None:
+                self._kill(old)
+            self._rows[isbn] = row
+
+        if self._dead > len(self._rows):
+            self._compact()
+
+    def _write_row(self, row, book):
+        """Write a book's fields into every column of a row"""
+        self.types[row] = TYPE_CODES[book._type]
+        self.isbns[row] = book.isbn
+        self.titles[row] = book.title
+        self.authors[row] = self.authors_table.encode(book.author)
+        self.years[row] = book.year
+        self.available[row] = 1 if book.is_available else 0
+        self.borrowers[row] = book.borrowed_by
+        self.due_ordinals[row] = NO_DATE if book.due_ordinal is None else book.due_ordinal
+        if book._type == "EBook":
+            self.file_sizes[row] = book.file_size_mb
+            self.file_formats[row] = self.file_formats_table.encode(book.file_format)
+        elif book._type == "PhysicalBook":
+            self.shelf_locations[row] = self.shelf_locations_table.encode(book.shelf_location)
+            self.conditions[row] = self.conditions_table.encode(book.condition)
+
+    def __delitem__(self, isbn):
+        """Remove a book"""
+        self._kill(self._rows.pop(isbn))
+        if self._dead > len(self._rows):
+            self._compact()
+
+    def _append_row(self):
+        """Add an empty row to every column"""
+        self.alive.append(1)
+        self.isbns.append(None)
+        self.titles.append(None)
+        self.borrowers.append(None)
+        self.types.append(0)
+        self.years.append(0)
+        self.available.append(1)
+        self.due_ordinals.append(NO_DATE)
+        self.file_sizes.append(0.0)
+        self.authors.append(0)
+        self.file_formats.append(self._empty)
+        self.shelf_locations.append(self._empty)
+        self.conditions.append(self._empty)
+        return len(self.alive) - 1
+
+    def _kill(self, row):
+        """Mark a row dead and drop its per-row strings (StringTable entries stay)"""
+        self.alive[row] = 0
+        self.isbns[row] = self.titles[row] = self.borrowers[row] = None
+        self._dead += 1
+
+    def _compact(self):
+        """Rebuild every column from the live rows, in insertion order"""
+        rows = list(self._rows.values())
+        for name in COLUMNS:
+            column = getattr(self, name)
+            kept = map(column.__getitem__, rows)
+            setattr(self, name, array(column.typecode, kept) if isinstance(column, array) else type(column)(kept))
+        self._rows = dict(zip(self._rows, range(len(rows))))
+        self._dead = 0
+
+    def copy(self):
+        """
+        Copy the store (arrays are copied in bulk, strings are shared)
+
+        Returns:
+            ColumnarBookStore: Independent store with the same books
+        """
+        store = ColumnarBookStore.__new__(ColumnarBookStore)
+        for name, value in self.__dict__.items():
+            setattr(store, name, value.copy() if hasattr(value, "copy") else value)
+        return store
+
+    # ---- Column scans, and the StoreAnalytics queries built on them ----
+
+    def _type_mask(self, book_type):
+        """Get a 0/1 byte per row marking live rows of one book type"""
+        table = bytes(1 if code == TYPE_CODES[book_type] else 0 for code in range(256))
+        return _both(self.alive, self.types.translate(table))
+
+    def isbns_published_between(self, start_year, end_year):
+        """
+        Find books published within a year range
+
+        Tests each row's year in turn (no Book objects are built, but the
+        work still grows with the number of rows).
+
+        Args:
+            start_year: Start year (inclusive)
+            end_year: End year (inclusive)
+
+        Returns:
+            list: ISBNs in storage order (insertion order, except for books
+                  retyped since the columns were last rebuilt)
+        """
+        years = range(start_year, end_year + 1)
+        if len(years) <= 4096:
+            years = frozenset(years)  # Hash lookups beat range checks per row
+        in_range = map(years.__contains__, self.years)
+        return list(compress(compress(self.isbns, self.alive), compress(in_range, self.alive)))
+
+    def published_between(self, start_year, end_year):
+        """Get the books published in a year range, building only the matches"""
+        return [self[isbn] for isbn in self.isbns_published_between(start_year, end_year)]
+
+    def isbns_of_type(self, book_type):
+        """Find books of one type by scanning the type column"""
+        return list(compress(self.isbns, self._type_mask(book_type)))
+
+    def total_file_size(self):
+        """Sum the file size column over live ebooks"""
+        return sum(compress(self.file_sizes, self._type_mask("EBook")))
+
+    def count_available(self):
+        """Count live available books using the availability map"""
+        return _both(self.alive, self.available).count(1)
+
+    def author_counts(self):
+        """
+        Count live books per author using the author code column
+
+        Returns:
+            dict: author -> number of books
+        """
+        counts = [0] * len(self.authors_table)
+        for code in compress(self.authors, self.alive):
+            counts[code] += 1
+        return {author: count for author, count in zip(self.authors_table.values, counts) if count}
@@ -0,0 +1,97 @@
+"""
+Week 8 Project: Compressed Library Files
+gzip, bz2 and lzma streams around the JSON and binary formats
+"""
+
+import bz2
+import contextlib
+import gzip
+import lzma
+import os
+
+CODECS = ("gzip", "bz2", "lzma")
+EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma"}
+SIGNATURES = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\xfd7zXZ\x00": "lzma"}  # First bytes of each stream
+SIGNATURE_SIZE = max(map(len, SIGNATURES))
+
+
+def codec_for(filename, compression=None):
+    """
+    Choose the codec to save a file with
+
+    Args:
+        filename: File to write
+        compression: "gzip", "bz2", "lzma" or "none"; None picks by
+                     extension (.gz, .bz2, .xz, uncompressed otherwise)
+
+    Returns:
+        str: Codec name, or None for no compression
+    """
+    if compression is None:
+        return EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+    if compression == "none":
+        return None
+    if compression not in CODECS:
+        raise ValueError(f"Unknown compression: {compression}")
+    return compression
+
+
+def strip_extension(filename):
+    """The filename without a compression extension ("a.bin.gz" -> "a.bin")"""
+    root, extension = os.path.splitext(filename)
+    return root if extension.lower() in EXTENSIONS else filename
+
+
+def compressing(file, codec, level=None):
+    """
+    Compress what is written to a file, a chunk at a time
+
+    The compressor keeps only its own small buffer and passes compressed
+    blocks on to file as they fill; closing it writes the end of the
+    stream but leaves file open.
+
+    Args:
+        file: File opened in binary mode for writing
+        codec: "gzip", "bz2", "lzma", or None to write file as it is
+        level: Compression level (gzip and bz2 1-9, lzma preset 0-9);
+               None uses the codec's default (9, 9 and 6)
+
+    Returns:
+        Context manager giving the file to write to
+    """
+    if codec is None:
+        return contextlib.nullcontext(file)
+    if codec == "gzip":
+        # No name or time in the header (the name would be the temporary
+        # file's), so saving the same library twice gives the same bytes
+        return gzip.GzipFile(filename="", fileobj=file, mode="wb",
+                             compresslevel=9 if level is None else level, mtime=0)
+    if codec == "bz2":
+        return bz2.BZ2File(file, "wb", compresslevel=9 if level is None else level)
+    if codec == "lzma":
+        return lzma.LZMAFile(file, "wb", preset=level)
+    raise ValueError(f"Unknown compression: {codec}")
+
+
+def decompressing(file):
+    """
+    Recognize a compressed file by its first bytes and decompress it
+
+    Args:
+        file: File opened in binary mode for reading
+
+    Returns:
+        tuple: (file to read from, codec name or None if not compressed)
+    """
+    start = file.peek(SIGNATURE_SIZE)[:SIGNATURE_SIZE]
+    for signature, codec in SIGNATURES.items():
+        if start.startswith(signature):
+            break
+    else:
+        return file, None
+
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=file, mode="rb"), codec
+    if codec == "bz2":
+        return bz2.BZ2File(file, "rb"), codec
+    return lzma.LZMAFile(file, "rb"), codec
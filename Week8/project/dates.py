@@ -0,0 +1,90 @@
+"""
+Week 8 Project: Date Helpers
+Dates are kept as integer day ordinals and only formatted for display/JSON
+"""
+
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+DATE_FORMAT = "%Y-%m-%d"
+
+# (ordinal of today, time.time() at which today ends)
+_today = (0, 0.0)
+
+
+def today_ordinal():
+    """
+    Get today's date as a day ordinal
+
+    The value is computed once per day and then served from a cache, so
+    calling this on every loan costs a single time.time() check.
+
+    Returns:
+        int: date.today().toordinal()
+    """
+    global _today
+    ordinal, ends_at = _today
+    if time.time() < ends_at:
+        return ordinal
+
+    now = datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    ordinal = now.date().toordinal()
+    _today = (ordinal, time.time() + (midnight - now).total_seconds())
+    return ordinal
+
+
+@lru_cache(maxsize=4096)
+def format_date(ordinal):
+    """
+    Format a day ordinal as "YYYY-MM-DD"
+
+    Args:
+        ordinal: Day ordinal, or None
+
+    Returns:
+        str: Formatted date, or None if ordinal is None
+    """
+    if ordinal is None:
+        return None
+    return date.fromordinal(ordinal).isoformat()
+
+
+@lru_cache(maxsize=4096)
+def format_month(ordinal):
+    """
+    Format a day ordinal as its month, "YYYY-MM"
+
+    Args:
+        ordinal: Day ordinal
+
+    Returns:
+        str: Year and month
+    """
+    return format_date(ordinal)[:7]
+
+
+@lru_cache(maxsize=4096)
+def _parse(text):
+    """Parse a "YYYY-MM-DD" string into a day ordinal"""
+    return datetime.strptime(text, DATE_FORMAT).toordinal()
+
+
+def to_ordinal(value):
+    """
+    Convert a date given in any supported form to a day ordinal
+
+    Args:
+        value: Day ordinal, date/datetime, "YYYY-MM-DD" string, or None
+
+    Returns:
+        int: Day ordinal, or None if value is None or empty
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, date):
+        return value.toordinal()
+    return _parse(value)
@@ -0,0 +1,99 @@
+"""
+Week 8 Project: Due Date Index
+Keeps borrowed books ordered by due date for fast overdue queries
+"""
+
+from bisect import bisect_left, insort
+
+
+class DueDateIndex:
+    """
+    Sorted list of (due_date, isbn) pairs
+
+    Due dates are integer day ordinals (see dates.py), which compare faster
+    than formatted date strings. Finding everything due before a date is a binary search
+    followed by a slice, so it costs O(log n + k) for k results.
+    """
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self._entries = []  # Sorted list of (due_date, isbn)
+        self._due_dates = {}  # ISBN -> due date currently in the index
+
+    def __len__(self):
+        """Number of books in the index"""
+        return len(self._entries)
+
+    def __contains__(self, isbn):
+        """Check whether a book is in the index"""
+        return isbn in self._due_dates
+
+    def add(self, isbn, due_date):
+        """
+        Record a book's due date, replacing any previous entry
+
+        Args:
+            isbn: ISBN of the borrowed book
+            due_date: Due date as a day ordinal
+        """
+        self.remove(isbn)
+        insort(self._entries, (due_date, isbn))
+        self._due_dates[isbn] = due_date
+
+    def remove(self, isbn):
+        """
+        Remove a book from the index
+
+        Args:
+            isbn: ISBN of the book
+
+        Returns:
+            bool: True if the book was in the index, False otherwise
+        """
+        due_date = self._due_dates.pop(isbn, None)
+        if due_date is None:
+            return False
+
+        position = bisect_left(self._entries, (due_date, isbn))
+        del self._entries[position]
+        return True
+
+    def clear(self):
+        """Remove every entry"""
+        self._entries.clear()
+        self._due_dates.clear()
+
+    def copy(self):
+        """Copy the index"""
+        index = DueDateIndex()
+        index._entries = self._entries.copy()
+        index._due_dates = self._due_dates.copy()
+        return index
+
+    def due_before(self, date):
+        """
+        Get books due strictly before a date
+
+        Args:
+            date: Day ordinal
+
+        Returns:
+            list: ISBNs ordered by due date (earliest first)
+        """
+        end = bisect_left(self._entries, (date,))
+        return [isbn for _, isbn in self._entries[:end]]
+
+    def due_between(self, start, end):
+        """
+        Get books due on or after start and strictly before end
+
+        Args:
+            start: First day ordinal to include
+            end: First day ordinal to exclude
+
+        Returns:
+            list: ISBNs ordered by due date (earliest first)
+        """
+        low = bisect_left(self._entries, (start,))
+        high = bisect_left(self._entries, (end,))
+        return [isbn for _, isbn in self._entries[low:high]]
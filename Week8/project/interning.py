@@ -0,0 +1,148 @@
+"""
+Week 8 Project: String Interning
+Dictionary encoding for catalog attributes that repeat across many records
+"""
+
+import threading
+
+# Attributes whose values repeat heavily across books and members (shelf
+# locations are close to unique per book, so they are not interned)
+INTERNED_ATTRIBUTES = ("author", "file_format", "condition", "department", "major")
+
+
+class StringTable:
+    """
+    Stores each distinct string once and refers to it by a small integer
+
+    The table is both a dictionary encoding (encode() gives a code, values
+    maps it back) and an intern pool (intern() gives the one shared string
+    object for a value). Records that hold interned strings share them
+    instead of each keeping a copy.
+    """
+
+    def __init__(self):
+        """Initialize an empty table"""
+        self.values = []  # code -> string
+        self._codes = {}  # string -> code
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Number of distinct strings"""
+        return len(self.values)
+
+    def encode(self, value):
+        """Get the code for a string, adding it if new"""
+        code = self._codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(value)
+                if code is None:
+                    code = len(self.values)
+                    self.values.append(value)
+                    self._codes[value] = code
+        return code
+
+    def intern(self, value):
+        """Get the shared copy of a string (None is passed through)"""
+        if value is None:
+            return None
+        return self.values[self.encode(value)]
+
+    def lookup(self, value):
+        """Get the code for a string, or None if it is not in the table"""
+        return self._codes.get(value)
+
+    def copy(self):
+        """Copy the table"""
+        table = StringTable()
+        table.values = list(self.values)
+        table._codes = dict(self._codes)
+        return table
+
+
+class StringPool:
+    """
+    The shared strings of one load: a StringTable per repeated attribute
+
+    While a pool is active (with pool: ...) in a thread, the record
+    factories intern through it; outside any pool they keep the strings
+    they are given. load_from_file and bulk import use one pool per call,
+    so once the records are built only the records hold the strings, and
+    nothing stays pinned after the library is gone.
+    """
+
+    def __init__(self):
+        """Initialize empty tables"""
+        self.tables = {attribute: StringTable() for attribute in INTERNED_ATTRIBUTES}
+
+    def intern(self, attribute, value):
+        """Get the shared copy of an attribute value (None is passed through)"""
+        return self.tables[attribute].intern(value)
+
+    def __enter__(self):
+        """Make this the pool the factories use in this thread"""
+        _active.pools = getattr(_active, "pools", ()) + (self,)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Go back to the pool active before"""
+        _active.pools = _active.pools[:-1]
+
+    def factory(self, build):
+        """
+        Wrap a record factory to intern through this pool whenever it runs
+
+        For factories called after the load, such as LazyRecords'.
+
+        Args:
+            build: Function like create_book_from_dict
+
+        Returns:
+            function: build, run with this pool active
+        """
+        def pooled(record):
+            with self:
+                return build(record)
+
+        return pooled
+
+
+_active = threading.local()  # .pools: active StringPools in this thread, innermost last
+
+
+def intern_string(attribute, value):
+    """
+    Get the shared copy of a repeated attribute value from the active pool
+
+    Args:
+        attribute: Attribute name, one of INTERNED_ATTRIBUTES
+        value: String value (None is passed through)
+
+    Returns:
+        str: The pool's string object for this value, or value itself
+             when no StringPool is active
+    """
+    pools = getattr(_active, "pools", ())
+    if not pools:
+        return value
+    return pools[-1].intern(attribute, value)
+
+
+def intern_attributes(record):
+    """
+    Point a record's repeated attributes at the active pool's strings
+
+    For records built in another process (and pickled back), whose
+    strings are copies rather than the ones in the pool.
+
+    Args:
+        record: Book or Member object
+
+    Returns:
+        The same record
+    """
+    for attribute in INTERNED_ATTRIBUTES:
+        value = getattr(record, attribute, None)
+        if value is not None:
+            setattr(record, attribute, intern_string(attribute, value))
+    return record
@@ -0,0 +1,199 @@
+"""
+Week 8 Project: Write-Ahead Journal
+Append-only file of library changes, replayed on top of the last save
+"""
+
+import json
+import os
+import shutil
+import threading
+from functools import wraps
+
+
+def journal_path(filename):
+    """Get the journal file that belongs to a library JSON file"""
+    return filename + ".journal"
+
+
+def read_journal(path):
+    """
+    Read the records of a journal file, oldest first
+
+    A crash can leave the last line half written; reading stops there.
+
+    Args:
+        path: Journal file (a missing file has no records)
+
+    Yields:
+        list: [sequence number, operation, *arguments]
+    """
+    try:
+        file = open(path, 'r', encoding="utf-8")
+    except FileNotFoundError:
+        return
+
+    with file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                return
+            yield record
+
+
+class Journal:
+    """
+    Append-only journal of library changes with batched fsync
+
+    Each record is one compact JSON line, [seq, operation, *arguments],
+    numbered from the sequence number of the last save. Appending only
+    writes to the file buffer. wait() then makes a record durable: the
+    first waiting thread flushes and fsyncs everything written so far,
+    and threads that arrive while it does are covered by that same fsync
+    (group commit). With sync_interval set, a background thread fsyncs
+    at that interval instead and wait() returns at once, so a crash can
+    lose the last sync_interval seconds of changes.
+    """
+
+    def __init__(self, path, seq=0, sync_interval=None):
+        """
+        Open a journal for appending
+
+        Args:
+            path: Journal file, created if missing
+            seq: Sequence number of the last record already applied
+            sync_interval: Seconds between background fsyncs, or None to
+                           fsync in wait() before each change returns
+        """
+        self.path = path
+        self.seq = seq
+        self.base_seq = seq  # Sequence number when the file was last emptied
+        self.synced_seq = seq
+        self.sync_interval = sync_interval
+        self._file = open(path, 'a', encoding="utf-8")
+        self._lock = threading.Lock()  # Guards the file and seq
+        self._sync_lock = threading.Lock()  # One fsync at a time
+        self._stop = threading.Event()
+        self._flusher = None
+
+        if sync_interval is not None:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    def __len__(self):
+        """Number of records in the journal file"""
+        return self.seq - self.base_seq
+
+    def append(self, operation, *args):
+        """
+        Write a record (not yet durable, see wait)
+
+        Returns:
+            int: Sequence number of the record
+        """
+        with self._lock:
+            self.seq += 1
+            self._file.write(json.dumps([self.seq, operation, *args], separators=(",", ":")))
+            self._file.write("\n")
+            return self.seq
+
+    def wait(self, seq):
+        """
+        Block until a record is on disk
+
+        Args:
+            seq: Sequence number returned by append
+        """
+        if self.sync_interval is not None or self.synced_seq >= seq:
+            return
+        with self._sync_lock:
+            # An fsync that finished while we waited may already cover us
+            if self.synced_seq < seq:
+                self._sync()
+
+    def sync(self):
+        """Flush and fsync every record written so far"""
+        with self._sync_lock:
+            if self.synced_seq < self.seq:
+                self._sync()
+
+    def _sync(self):
+        """Flush and fsync (hold _sync_lock)"""
+        with self._lock:
+            self._file.flush()
+            seq = self.seq
+        os.fsync(self._file.fileno())
+        self.synced_seq = seq
+
+    def _flush_loop(self):
+        """Background thread: fsync every sync_interval seconds"""
+        while not self._stop.wait(self.sync_interval):
+            self.sync()
+
+    def rotate(self):
+        """
+        Start an empty journal file before a save
+
+        The records so far move to path + ".old" until the save that
+        includes them is on disk; call discard_old() after it. If an
+        earlier save failed, they are appended to the .old file already
+        there, so nothing is lost.
+
+        Returns:
+            int: Sequence number of the last record moved
+        """
+        old = self.path + ".old"
+        with self._sync_lock, self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+            if os.path.exists(old):
+                with open(self.path, 'rb') as source, open(old, 'ab') as target:
+                    shutil.copyfileobj(source, target)
+                    target.flush()
+                    os.fsync(target.fileno())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, old)
+
+            self._file = open(self.path, 'a', encoding="utf-8")
+            self.synced_seq = self.base_seq = self.seq
+            return self.seq
+
+    def discard_old(self):
+        """Delete the records moved by rotate() once they are saved"""
+        try:
+            os.remove(self.path + ".old")
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        """Stop the background fsync, sync and close the file"""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.sync()
+        self._file.close()
+
+
+def durable(method):
+    """
+    Decorator for Library methods that change records
+
+    After the method returns, waits until the journal records it wrote
+    (if a journal is open) are on disk. Waiting happens after the
+    method's locks are released, so concurrent changes share an fsync.
+    With a shared journal the method runs holding the library file's
+    lock, after the changes of other processes have been applied.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._file_access():
+            result = method(self, *args, **kwargs)
+        journal = self._journal
+        if journal is not None:
+            journal.wait(getattr(self._journal_local, "seq", 0))
+        return result
+
+    return wrapper
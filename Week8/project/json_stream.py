@@ -0,0 +1,160 @@
+"""
+Week 8 Project: Streaming JSON Reader
+Reads a library JSON file one record at a time instead of all at once,
+and writes one from records already encoded
+"""
+
+import json
+import re
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+INDENT = 4  # Library files are written as json.dump(data, file, indent=4)
+ELEMENT_PREFIX = " " * (2 * INDENT)  # Indentation of an element of a top-level array
+
+_decoder = json.JSONDecoder()
+_indented_encoder = json.JSONEncoder(indent=INDENT)
+_compact_encoder = json.JSONEncoder(separators=(",", ":"))
+
+
+class _Buffer:
+    """Text read from a file so far, with a read position"""
+
+    def __init__(self, file, chunk_size):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Read another chunk, dropping text already consumed"""
+        if self.pos:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        chunk = self.file.read(self.chunk_size)
+        if chunk:
+            self.text += chunk
+        else:
+            self.eof = True
+
+    def peek(self):
+        """Skip whitespace and return the next character ("" at the end)"""
+        while True:
+            self.pos = WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text) or self.eof:
+                return self.text[self.pos:self.pos + 1]
+            self.fill()
+
+    def expect(self, characters):
+        """Consume the next character, which must be one of characters"""
+        character = self.peek()
+        if not character or character not in characters:
+            raise json.JSONDecodeError(f"Expecting one of {characters!r}", self.text, self.pos)
+        self.pos += 1
+        return character
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # A number at the end of the text may continue in the next chunk
+                if end < len(self.text) or self.eof:
+                    self.pos = end
+                    return value
+            self.fill()
+
+
+def read_sections(file, chunk_size=1 << 16):
+    """
+    Read the top-level object of a JSON file one piece at a time
+
+    Only chunk_size characters of text and one record are held at once,
+    so a file with millions of books is read without building the whole
+    document first (as json.load does). Arrays are yielded one element
+    at a time, other values whole.
+
+    Args:
+        file: Text file opened for reading
+        chunk_size: Characters to read from the file at a time
+
+    Yields:
+        tuple: (key, value) for each non-array member of the object, and
+               (key, element) for each element of an array member
+    """
+    buffer = _Buffer(file, chunk_size)
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        return
+
+    while True:
+        key = buffer.value()
+        buffer.expect(":")
+
+        if buffer.peek() == "[":
+            buffer.pos += 1
+            if buffer.peek() == "]":
+                buffer.pos += 1
+            else:
+                while True:
+                    yield key, buffer.value()
+                    if buffer.expect(",]") == "]":
+                        break
+        else:
+            yield key, buffer.value()
+
+        if buffer.expect(",}") == "}":
+            return
+
+
+def encode_element(value, compact=False):
+    """
+    Encode one element of a top-level array as json.dump would
+
+    Args:
+        value: Record dictionary (or any JSON value)
+        compact: No whitespace (separators=(",", ":")) instead of indent=4
+
+    Returns:
+        str: The element's text, indented for its place in the file
+    """
+    if compact:
+        return _compact_encoder.encode(value)
+    return ELEMENT_PREFIX + _indented_encoder.encode(value).replace("\n", "\n" + ELEMENT_PREFIX)
+
+
+def write_sections(file, sections, arrays, compact=False):
+    """
+    Write a top-level JSON object whose arrays are given as encoded elements
+
+    The text is the same as json.dump(data, file, indent=4) writes (or
+    with separators=(",", ":") when compact), but the arrays are written
+    one element at a time as they are produced, and elements kept from an
+    earlier save need not be encoded again.
+
+    Args:
+        file: Text file opened for writing
+        sections: List of (key, value) pairs in file order
+        arrays: Keys whose value is an iterable of encode_element() strings
+        compact: Elements were encoded with compact=True; write no whitespace
+    """
+    newline, indent, colon = ("", "", ":") if compact else ("\n", " " * INDENT, ": ")
+    file.write("{")
+    for index, (key, value) in enumerate(sections):
+        file.write(f"{',' if index else ''}{newline}{indent}{json.dumps(key)}{colon}")
+        if key not in arrays:
+            file.write(json.dumps(value))
+            continue
+
+        separator = "[" + newline
+        for element in value:
+            file.write(separator)
+            file.write(element)
+            separator = "," + newline
+        file.write("[]" if separator == "[" + newline else f"{newline}{indent}]")
+    file.write(f"{newline}}}" if sections else "}")
@@ -0,0 +1,141 @@
+"""
+Week 8 Project: JSON Lines Library Files
+One record per line, so a file can be split and parsed by several processes
+"""
+
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from books import create_book_from_dict
+from members import create_member_from_dict
+
+MAGIC = b'{"library_jsonl":'  # Start of the header line
+VERSION = 1
+
+# Keys of the record lines, in file order
+RECORD_KEYS = ("loans", "books", "members")
+CHUNKS_PER_WORKER = 4  # Byte ranges per process, so a slow range does not hold up the rest
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def write_jsonl(file, data):
+    """
+    Write library data as JSON Lines
+
+    The first line is a header object (format version, name and
+    journal_seq); every other line is ["loans" | "books" | "members", record],
+    loans first, then books, then members.
+
+    Args:
+        file: File opened in binary mode
+        data: Dictionary with name, loans, books, members and journal_seq
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="\n")
+    header = {"library_jsonl": VERSION, "name": data["name"], "journal_seq": data.get("journal_seq", 0)}
+    text.write(_encoder.encode(header) + "\n")
+    for key in RECORD_KEYS:
+        for record in data.get(key, []):
+            text.write(_encoder.encode([key, record]) + "\n")
+    text.flush()
+    text.detach()
+
+
+def _read_header(line):
+    """Decode and check the header line"""
+    header = json.loads(line)
+    if not isinstance(header, dict) or "library_jsonl" not in header:
+        raise ValueError("Not a JSON Lines library file")
+    if header["library_jsonl"] > VERSION:
+        raise ValueError(f"JSON Lines library file version {header['library_jsonl']} "
+                         f"is newer than supported ({VERSION})")
+    return header
+
+
+def read_jsonl(file):
+    """
+    Read a JSON Lines library file one line at a time
+
+    Args:
+        file: File opened in binary mode, positioned at the start
+
+    Yields:
+        tuple: (key, value) pairs like json_stream.read_sections
+    """
+    header = _read_header(file.readline())
+    yield "name", header["name"]
+    yield "journal_seq", header.get("journal_seq", 0)
+    for line in file:
+        yield tuple(json.loads(line))
+
+
+def _read_range(filename, start, end, build):
+    """
+    Parse the lines that start within a byte range (run in a worker process)
+
+    Args:
+        filename: JSON Lines library file
+        start: First byte of the range (after the header line)
+        end: Byte after the range
+        build: Build Book and Member objects instead of returning dicts
+
+    Returns:
+        tuple: Lists of loans, books and members, in file order
+    """
+    records = {key: [] for key in RECORD_KEYS}
+    with open(filename, 'rb') as file:
+        # A line that started before the range belongs to the previous one
+        file.seek(start - 1)
+        file.readline()
+        position = file.tell()
+        while position < end:
+            line = file.readline()
+            if not line:
+                break
+            position += len(line)
+            key, record = json.loads(line)
+            records[key].append(record)
+
+    if build:
+        records["books"] = list(map(create_book_from_dict, records["books"]))
+        records["members"] = list(map(create_member_from_dict, records["members"]))
+    return tuple(records[key] for key in RECORD_KEYS)
+
+
+def read_jsonl_parallel(filename, workers, build=True):
+    """
+    Read a JSON Lines library file with several processes
+
+    The file after the header is cut into byte ranges; each worker parses
+    the lines starting in its range and, with build, turns them into Book
+    and Member objects (create_book_from_dict / create_member_from_dict).
+    The results are merged back in file order.
+
+    Args:
+        filename: Uncompressed JSON Lines library file
+        workers: Number of worker processes
+        build: Build objects in the workers; False returns the dicts
+
+    Yields:
+        tuple: (key, value) pairs like read_jsonl, with Book and Member
+               objects as the books and members values when build is True
+    """
+    with open(filename, 'rb') as file:
+        header = _read_header(file.readline())
+        first = file.tell()
+    size = os.path.getsize(filename)
+
+    chunks = max(1, workers * CHUNKS_PER_WORKER)
+    bounds = [first + (size - first) * index // chunks for index in range(chunks + 1)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parts = list(executor.map(_read_range, [filename] * chunks, bounds[:-1], bounds[1:], [build] * chunks))
+
+    yield "name", header["name"]
+    yield "journal_seq", header.get("journal_seq", 0)
+    for index, key in enumerate(RECORD_KEYS):
+        for part in parts:
+            for value in part[index]:
+                yield key, value
+            part[index].clear()  # Drop each list once its records are handed out
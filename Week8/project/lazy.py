@@ -0,0 +1,141 @@
+"""
+Week 8 Project: Lazy Records
+Mappings that keep raw JSON records and build objects on first access
+"""
+
+import threading
+from collections.abc import MutableMapping
+
+from dates import to_ordinal
+
+
+class LazyRecords(MutableMapping):
+    """
+    Key -> record mapping that builds each record the first time it is read
+
+    Raw JSON dictionaries are stored as they were loaded. Reading a key
+    passes its dictionary to the factory (for example create_book_from_dict)
+    once and keeps the result, so later reads return the same object.
+    Otherwise it behaves like the plain dict it replaces: insertion order,
+    len() and membership tests do not build anything, while values() and
+    items() build every record they reach.
+    """
+
+    def __init__(self, factory):
+        """
+        Initialize an empty mapping
+
+        Args:
+            factory: Function turning a raw record dictionary into an object
+        """
+        self._factory = factory
+        self._records = {}  # key -> built object, or its raw dict until first read
+        self._lock = threading.Lock()
+
+    def add_raw(self, key, record):
+        """
+        Store a raw record to be built on first access
+
+        Args:
+            key: ISBN or member ID
+            record: Dictionary as loaded from JSON
+        """
+        self._records[key] = record
+
+    def __getitem__(self, key):
+        """Get a record, building it first if needed"""
+        value = self._records[key]
+        if type(value) is dict:
+            with self._lock:
+                # Another thread may have built it while we waited
+                value = self._records[key]
+                if type(value) is dict:
+                    value = self._factory(value)
+                    self._records[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        """Store a built record"""
+        self._records[key] = value
+
+    def __delitem__(self, key):
+        """Remove a record"""
+        del self._records[key]
+
+    def __iter__(self):
+        """Iterate over keys in insertion order"""
+        return iter(self._records)
+
+    def __len__(self):
+        """Number of records, built or not"""
+        return len(self._records)
+
+    def __contains__(self, key):
+        """Check whether a key is present without building its record"""
+        return key in self._records
+
+    def is_built(self, key):
+        """Check whether a record has been built yet"""
+        return type(self._records[key]) is not dict
+
+    def built_count(self):
+        """Number of records built so far"""
+        return sum(1 for value in self._records.values() if type(value) is not dict)
+
+    def copy(self):
+        """
+        Copy the mapping (built records and raw dicts are shared, not copied)
+
+        Returns:
+            LazyRecords: Mapping with the same keys and records
+        """
+        copied = LazyRecords(self._factory)
+        copied._records = self._records.copy()
+        return copied
+
+    def to_dicts(self):
+        """
+        Get every record as a dictionary, in order, without building any
+
+        Yields:
+            dict: The raw record, or to_dict() of a built one
+        """
+        for value in self._records.values():
+            yield value if type(value) is dict else value.to_dict()
+
+
+class RawBook:
+    """
+    Read-only Book-like view of a raw book record
+
+    Offers just the attributes Library needs to index a book, so a lazily
+    loaded catalog can be indexed without building the Book objects.
+    """
+
+    __slots__ = ("_record",)
+
+    def __init__(self, record):
+        """
+        Wrap a record
+
+        Args:
+            record: Book dictionary as loaded from JSON
+        """
+        self._record = record
+
+    isbn = property(lambda self: self._record["isbn"])
+    title = property(lambda self: self._record["title"])
+    author = property(lambda self: self._record["author"])
+    is_available = property(lambda self: self._record.get("is_available", True))
+    borrowed_by = property(lambda self: self._record.get("borrowed_by"))
+
+    @property
+    def _type(self):
+        """Book type name"""
+        return self._record.get("type", "Book")
+
+    @property
+    def due_ordinal(self):
+        """Due date as a day ordinal"""
+        return to_ordinal(self._record.get("due_date"))
+
@@ -0,0 +1,306 @@
+"""
+Week 8 Project: Loan Ledger
+Every borrow and return as a row, kept apart from the catalog records
+"""
+
+from array import array
+from collections import Counter, namedtuple
+
+from dates import format_date, format_month, to_ordinal
+from due_index import DueDateIndex
+
+NO_DATE = 0  # Stored for an unknown start date or a loan not yet returned
+
+# One ledger row; dates are day ordinals, returned is None while on loan
+Loan = namedtuple("Loan", ["isbn", "member_id", "start", "due", "returned"])
+
+
+class LoanLedger:
+    """
+    Append-only table of loans with indexes by ISBN, member and due date
+
+    Each loan is one row across five columns: ISBN, member ID, and the
+    start, due and returned dates as day ordinals in array('i') columns.
+    Rows are never deleted, so returning a book keeps its history. Per-ISBN
+    and per-member row lists answer history questions without scanning
+    the catalog, and a DueDateIndex over open loans answers overdue
+    questions.
+    """
+
+    def __init__(self):
+        """Initialize an empty ledger"""
+        self.isbns = []
+        self.member_ids = []
+        self.starts = array('i')
+        self.dues = array('i')
+        self.returns = array('i')
+        self._by_isbn = {}  # ISBN -> row numbers, oldest first
+        self._by_member = {}  # member_id -> row numbers, oldest first
+        self._open = {}  # ISBN -> row number of its current loan
+        self._due = DueDateIndex()  # Open loans ordered by due date
+        self._shared = False  # Row lists are shared with a copy (see copy)
+
+    def __len__(self):
+        """Number of loans ever recorded"""
+        return len(self.isbns)
+
+    @property
+    def open_count(self):
+        """Number of loans not yet returned"""
+        return len(self._open)
+
+    def open_loan(self, isbn, member_id, start, due):
+        """
+        Record a new loan
+
+        Args:
+            isbn: ISBN of the borrowed book
+            member_id: ID of the borrowing member
+            start: Day ordinal the loan started (None if unknown)
+            due: Day ordinal the book is due back (None if no due date)
+
+        Returns:
+            int: Row number of the loan
+
+        Raises:
+            ValueError: If the book is already on loan
+        """
+        if isbn in self._open:
+            raise ValueError(f"Book {isbn} is already on loan")
+
+        row = self._append(isbn, member_id, start, due, None)
+        self._open[isbn] = row
+        if due is not None:
+            self._due.add(isbn, due)
+        return row
+
+    def close_loan(self, isbn, returned):
+        """
+        Record that a book came back
+
+        Args:
+            isbn: ISBN of the returned book
+            returned: Day ordinal of the return
+
+        Returns:
+            int: Row number of the closed loan, or None if it was not on loan
+        """
+        row = self._open.pop(isbn, None)
+        if row is None:
+            return None
+
+        self.returns[row] = returned
+        self._due.remove(isbn)
+        return row
+
+    def cancel_loan(self, isbn):
+        """
+        Remove the newest row, an open loan of a book (undo open_loan)
+
+        For rolling back a batch that failed part way; cancel the loans
+        it opened newest first. Snapshots already taken keep the row: the
+        first cancel after a copy() gives this ledger its own row lists,
+        since the freed row number is used again by the next loan.
+
+        Args:
+            isbn: ISBN of the book lent by the newest row
+
+        Returns:
+            int: Row number that was removed
+
+        Raises:
+            ValueError: If the newest row is not an open loan of the book
+        """
+        row = len(self.isbns) - 1
+        if row < 0 or self._open.get(isbn) != row:
+            raise ValueError(f"The newest loan is not an open loan of {isbn}")
+
+        if self._shared:
+            self._by_isbn = {key: rows.copy() for key, rows in self._by_isbn.items()}
+            self._by_member = {key: rows.copy() for key, rows in self._by_member.items()}
+            self._shared = False
+
+        del self._open[isbn]
+        self._due.remove(isbn)
+        for index, key in ((self._by_isbn, isbn), (self._by_member, self.member_ids[row])):
+            rows = index[key]
+            rows.pop()
+            if not rows:
+                del index[key]
+        for column in (self.isbns, self.member_ids, self.starts, self.dues, self.returns):
+            column.pop()
+        return row
+
+    def reopen_loan(self, isbn):
+        """
+        Mark a book's newest loan as not returned (undo close_loan)
+
+        Args:
+            isbn: ISBN of the book whose last loan was just closed
+
+        Returns:
+            Loan: The reopened row
+
+        Raises:
+            ValueError: If the book is on loan or has never been lent
+        """
+        rows = self._rows(self._by_isbn, isbn)
+        if isbn in self._open or not rows:
+            raise ValueError(f"Book {isbn} has no closed loan to reopen")
+
+        row = rows[-1]
+        self.returns[row] = NO_DATE
+        self._open[isbn] = row
+        if self.dues[row] != NO_DATE:
+            self._due.add(isbn, self.dues[row])
+        return self.loan(row)
+
+    def _append(self, isbn, member_id, start, due, returned):
+        """Add a row and index it by ISBN and member"""
+        row = len(self.isbns)
+        self.isbns.append(isbn)
+        self.member_ids.append(member_id)
+        self.starts.append(NO_DATE if start is None else start)
+        self.dues.append(NO_DATE if due is None else due)
+        self.returns.append(NO_DATE if returned is None else returned)
+        self._by_isbn.setdefault(isbn, []).append(row)
+        self._by_member.setdefault(member_id, []).append(row)
+        return row
+
+    def loan(self, row):
+        """
+        Get one row
+
+        Args:
+            row: Row number
+
+        Returns:
+            Loan: The row (None for dates that are not set)
+        """
+        start, due, returned = self.starts[row], self.dues[row], self.returns[row]
+        return Loan(self.isbns[row], self.member_ids[row],
+                    start if start != NO_DATE else None,
+                    due if due != NO_DATE else None,
+                    returned if returned != NO_DATE else None)
+
+    def current(self, isbn):
+        """Get the open loan of a book, or None if it is on the shelf"""
+        row = self._open.get(isbn)
+        return self.loan(row) if row is not None else None
+
+    def holder(self, isbn):
+        """Get the member ID holding a book, or None"""
+        row = self._open.get(isbn)
+        return self.member_ids[row] if row is not None else None
+
+    def history(self, isbn):
+        """Get every loan of a book, oldest first"""
+        return [self.loan(row) for row in self._rows(self._by_isbn, isbn)]
+
+    def member_history(self, member_id):
+        """Get every loan by a member, oldest first"""
+        return [self.loan(row) for row in self._rows(self._by_member, member_id)]
+
+    def due_before(self, date):
+        """Get ISBNs of open loans due strictly before a day ordinal, earliest first"""
+        return self._due.due_before(date)
+
+    def due_between(self, start, end):
+        """Get ISBNs of open loans due on or after start and before end, earliest first"""
+        return self._due.due_between(start, end)
+
+    def loans_per_month(self, isbn=None):
+        """
+        Count loans by the month they started
+
+        Args:
+            isbn: Count only this book's loans (uses the ISBN index);
+                  by default every loan in the ledger is counted
+
+        Returns:
+            Counter: (isbn, "YYYY-MM") -> number of loans. Loans with an
+                     unknown start date are not counted.
+        """
+        starts = self.starts
+        if isbn is not None:
+            return Counter((isbn, format_month(starts[row]))
+                           for row in self._rows(self._by_isbn, isbn) if starts[row] != NO_DATE)
+
+        # Format each distinct start day once, then count pairs at C speed
+        months = {day: format_month(day) for day in set(starts) if day != NO_DATE}
+        months[NO_DATE] = None
+        counts = Counter(zip(self.isbns, map(months.__getitem__, starts)))
+        for key in [key for key in counts if key[1] is None]:
+            del counts[key]
+        return counts
+
+    def copy(self):
+        """
+        Copy the ledger for a snapshot
+
+        The columns, open loans and due-date index are copied in bulk. The
+        per-ISBN and per-member row lists are shared with the original:
+        rows are appended, so the copy ignores row numbers past its own
+        length, and cancel_loan unshares them before removing a row.
+
+        Returns:
+            LoanLedger: Ledger frozen at the rows recorded so far
+        """
+        ledger = LoanLedger()
+        ledger.isbns = self.isbns.copy()
+        ledger.member_ids = self.member_ids.copy()
+        ledger.starts = self.starts[:]
+        ledger.dues = self.dues[:]
+        ledger.returns = self.returns[:]
+        ledger._by_isbn = self._by_isbn
+        ledger._by_member = self._by_member
+        ledger._open = self._open.copy()
+        ledger._due = self._due.copy()
+        ledger._shared = self._shared = True
+        return ledger
+
+    def _rows(self, index, key):
+        """Row numbers for a key, oldest first, limited to this ledger's rows"""
+        rows = index.get(key, [])
+        count = len(self.isbns)
+        if rows and rows[-1] >= count:
+            return [row for row in rows if row < count]
+        return rows
+
+    def to_dicts(self):
+        """
+        Get every row as a dictionary for JSON, oldest first
+
+        Yields:
+            dict: isbn, member_id, start, due and returned ("YYYY-MM-DD" or None)
+        """
+        for row in range(len(self.isbns)):
+            yield self.row_dict(row)
+
+    def row_dict(self, row):
+        """Get one row as a dictionary for JSON (see to_dicts)"""
+        loan = self.loan(row)
+        return {
+            "isbn": loan.isbn,
+            "member_id": loan.member_id,
+            "start": format_date(loan.start),
+            "due": format_date(loan.due),
+            "returned": format_date(loan.returned)
+        }
+
+    def load_dicts(self, records):
+        """
+        Add rows saved by to_dicts()
+
+        Args:
+            records: Iterable of row dictionaries
+        """
+        for record in records:
+            returned = to_ordinal(record.get("returned"))
+            due = to_ordinal(record.get("due"))
+            row = self._append(record["isbn"], record["member_id"],
+                               to_ordinal(record.get("start")), due, returned)
+            if returned is None:
+                self._open[record["isbn"]] = row
+                if due is not None:
+                    self._due.add(record["isbn"], due)
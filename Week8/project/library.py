@@ -3,125 +3,462 @@ Week 6 Project: Enhanced Library Class
 Works with book and member hierarchies
 """
 
-import json
+import io
 import os
+import threading
+import weakref
+from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
+from dates import to_ordinal, today_ordinal
 from books import create_book_from_dict
 from members import create_member_from_dict, TeacherMember
+from search_index import SearchIndex
+from ledger import LoanLedger
+from journal import Journal, durable, journal_path, read_journal
+from binary_format import check_compression, format_for, read_library, write_library
+from compressed import codec_for, compressing
+from jsonl_format import MAGIC as JSONL_MAGIC, read_jsonl_parallel
+from interning import StringPool, intern_attributes
+from json_stream import write_sections
+from autosave import AutoSaver, RecordCache
+from shared import ChangeWatcher, FileLock, MissedChanges, SharedJournal, file_key, lock_path
+from locks import KeyLocks
+from lazy import LazyRecords, RawBook
+from snapshots import LibrarySnapshot, clone_member
+
+# What a reload from the file replaces (see Library._reload); locks,
+# journal and settings stay
+_RECORD_ATTRIBUTES = ("name", "books", "members", "_search_index", "_books_by_type", "_members_by_type",
+                      "_available_books", "_borrowed_books", "_available_by_type", "ledger",
+                      "_dirty_books", "_dirty_members", "_dirty_loans", "_unjournaled", "_journal_seq",
+                      "_loaded_from")
 
 
 class Library:
     """Enhanced library system supporting different book and member types"""
 
-    def __init__(self, name):
+    def __init__(self, name, book_store=None):
         """
         Initialize a library
 
         Args:
             name: Name of the library
+            book_store: Optional mapping to keep books in (for example a
+                        ColumnarBookStore); a plain dict is used by default
         """
         self.name = name
-        self.books = {}  # ISBN -> Book object (Book, EBook, or PhysicalBook)
+        self.books = book_store if book_store is not None else {}  # ISBN -> Book object (Book, EBook, or PhysicalBook)
         self.members = {}  # member_id -> Member object (Member, Student, or Teacher)
+        self._search_index = SearchIndex()  # Title/author index for search_books
+
+        # Secondary indexes kept up to date by every mutating method.
+        # Dicts are used as insertion-ordered sets (key -> None) and hold
+        # keys only, so records are always read from books/members.
+        self._books_by_type = {}  # book type -> {ISBN: None}
+        self._members_by_type = {}  # member type -> {member_id: None}
+        self._available_books = {}  # ISBNs of books on the shelf
+        self._borrowed_books = {}  # ISBNs of books on loan
+        self._available_by_type = {}  # book type -> number of available books
+        self.ledger = LoanLedger()  # Every loan, indexed by ISBN, member and due date
+
+        # Locking: operations hold the locks for the members and ISBNs they
+        # touch (members before books), so unrelated checkouts run in
+        # parallel. _state_lock is only held for the brief moment records
+        # and the shared indexes above are updated or read.
+        self._member_locks = KeyLocks()
+        self._book_locks = KeyLocks()
+        self._state_lock = threading.RLock()
+        self._snapshots = weakref.WeakSet()  # Open snapshots sharing our records
+        self._save_lock = threading.Lock()  # One save_to_file at a time
+
+        # Write-ahead journal, see open_journal (None while not journaling)
+        self._journal = None
+        self._journal_file = None  # Absolute path of the library file it belongs to
+        self._journal_seq = 0  # Last journal record included in this library
+        self._journal_local = threading.local()  # .seq: each thread's last record
+        self._compact_after = None
+        self._compactor = None  # Background save folding the journal in
+        self._watcher = None  # ChangeWatcher of a shared journal, see open_journal
+        self._loaded_from = None  # (path, file_key) of the file last loaded or saved
 
+        # Records changed since the last save (key -> None), marked by the
+        # _store/_unstore/_lend/_take_back helpers every change goes through
+        self._dirty_books = {}
+        self._dirty_members = {}
+        self._dirty_loans = {}  # Ledger rows closed since the last save
+        self._unjournaled = False  # Changed with no journal open since the last save or load
+        self._record_cache = None  # RecordCache while autosaving, see start_autosave
+        self._autosaver = None
+
+    @durable
     def add_book(self, book):
         """Add a book to the library"""
-        if book.isbn in self.books:
-            return False, f"Book with ISBN {book.isbn} already exists"
+        with self._book_locks.hold(book.isbn):
+            if book.isbn in self.books:
+                return False, f"Book with ISBN {book.isbn} already exists"
 
-        self.books[book.isbn] = book
-        return True, f"Book '{book.title}' added successfully"
+            with self._state_lock:
+                self._store_book(book)
+                self._log("add_book", book)
+            return True, f"Book '{book.title}' added successfully"
 
+    @durable
     def remove_book(self, isbn):
         """Remove a book from the library"""
-        if isbn not in self.books:
-            return False, "Book not found"
+        with self._book_locks.hold(isbn):
+            if isbn not in self.books:
+                return False, "Book not found"
 
-        if not self.books[isbn].is_available:
-            return False, "Cannot remove borrowed book"
+            if not self.books[isbn].is_available:
+                return False, "Cannot remove borrowed book"
 
-        del self.books[isbn]
-        return True, "Book removed successfully"
+            with self._state_lock:
+                self._unstore_book(self.books[isbn])
+                self._log("remove_book", isbn)
+            return True, "Book removed successfully"
 
+    @durable
     def add_member(self, member):
         """Add a member to the library"""
-        if member.member_id in self.members:
-            return False, f"Member with ID {member.member_id} already exists"
+        with self._member_locks.hold(member.member_id):
+            if member.member_id in self.members:
+                return False, f"Member with ID {member.member_id} already exists"
+
+            with self._state_lock:
+                self._store_member(member)
+                self._log("add_member", member)
+            return True, f"Member '{member.name}' added successfully"
+
+    @durable
+    def add_books(self, books):
+        """
+        Add many books at once, skipping ISBNs that already exist
+
+        Unlike add_book, no message is built for each book. The batch is
+        all-or-nothing: if a book cannot be stored, the ones stored before
+        it are taken out again and the error is raised.
+
+        Args:
+            books: List of Book objects
+
+        Returns:
+            list: Books that were not added because their ISBN was taken
+        """
+        duplicates = []
+        added = []
+        with self._book_locks.hold(*(book.isbn for book in books)), self._state_lock:
+            loans = len(self.ledger)
+            try:
+                for book in books:
+                    if book.isbn in self.books:
+                        duplicates.append(book)
+                    else:
+                        self._store_book(book)
+                        added.append(["add_book", book])
+            except BaseException:
+                for _, book in reversed(added):
+                    self._borrowed_books.pop(book.isbn, None)  # Cancel its loan below, not close it
+                    self._unstore_book(book)
+                while len(self.ledger) > loans:
+                    self.ledger.cancel_loan(self.ledger.isbns[-1])
+                raise
+            self._log("batch", *added)
+        return duplicates
 
-        self.members[member.member_id] = member
-        return True, f"Member '{member.name}' added successfully"
+    @durable
+    def add_members(self, members):
+        """
+        Add many members at once, skipping member IDs that already exist
+
+        Args:
+            members: List of Member objects
+
+        Returns:
+            list: Members that were not added because their ID was taken
+        """
+        duplicates = []
+        added = []
+        with self._member_locks.hold(*(member.member_id for member in members)), self._state_lock:
+            for member in members:
+                if member.member_id in self.members:
+                    duplicates.append(member)
+                else:
+                    self._store_member(member)
+                    added.append(["add_member", member])
+            self._log("batch", *added)
+        return duplicates
 
+    @durable
     def remove_member(self, member_id):
         """Remove a member from the library"""
-        if member_id not in self.members:
-            return False, "Member not found"
+        with self._member_locks.hold(member_id):
+            if member_id not in self.members:
+                return False, "Member not found"
 
-        if self.members[member_id].borrowed_books:
-            return False, "Cannot remove member with borrowed books"
+            if self.members[member_id].borrowed_count:
+                return False, "Cannot remove member with borrowed books"
 
-        del self.members[member_id]
-        return True, "Member removed successfully"
+            with self._state_lock:
+                self._unstore_member(self.members[member_id])
+                self._log("remove_member", member_id)
+            return True, "Member removed successfully"
 
+    @durable
     def borrow_book(self, member_id, isbn):
         """
         Process a book borrowing transaction
         Uses polymorphism - different member types have different limits
         """
-        if member_id not in self.members:
-            return False, "Member not found"
+        # Member lock first, then book lock: every method uses this order
+        with self._member_locks.hold(member_id), self._book_locks.hold(isbn):
+            if member_id not in self.members:
+                return False, "Member not found"
 
-        if isbn not in self.books:
-            return False, "Book not found"
+            if isbn not in self.books:
+                return False, "Book not found"
 
-        book = self.books[isbn]
-        member = self.members[member_id]
-
-        if not book.is_available:
-            return False, "Book is already borrowed"
+            book = self.books[isbn]
+            member = self.members[member_id]
 
-        # Check if member can borrow (polymorphic - different limits for different member types)
-        can_borrow, message = member.borrow_book(isbn)
-        if not can_borrow:
-            return False, message
+            if not book.is_available:
+                return False, "Book is already borrowed"
 
-        # Get loan period based on member type and book type
-        days = 14  # Default
+            with self._state_lock:
+                member = self._writable_member(member)
 
-        # Teachers get extended loan periods
-        if isinstance(member, TeacherMember):
-            days = member.get_loan_period()
+                # Check if member can borrow (polymorphic - different limits for different member types)
+                can_borrow, message = member.borrow_book(isbn)
+                if not can_borrow:
+                    return False, message
 
-        # Process the borrowing
-        if book.borrow(member_id, days):
-            return True, f"Book borrowed successfully. Due date: {book.due_date}"
-
-        # Rollback if book borrowing failed
-        member.return_book(isbn)
-        return False, "Failed to process borrowing"
+                # Process the borrowing
+                today = today_ordinal()
+                due = today + self._loan_period(member)
+                book = self._lend(book, member_id, due, today)
+                self._log("borrow", member_id, isbn, today, due)
+                return True, f"Book borrowed successfully. Due date: {book.due_date}"
 
+    @durable
     def return_book(self, member_id, isbn):
         """Process a book return transaction"""
-        if member_id not in self.members:
-            return False, "Member not found"
+        with self._member_locks.hold(member_id), self._book_locks.hold(isbn):
+            if member_id not in self.members:
+                return False, "Member not found"
 
-        if isbn not in self.books:
-            return False, "Book not found"
+            if isbn not in self.books:
+                return False, "Book not found"
 
-        book = self.books[isbn]
-        member = self.members[member_id]
+            book = self.books[isbn]
+            member = self.members[member_id]
+
+            if book.borrowed_by != member_id:
+                return False, "This book was not borrowed by this member"
+
+            with self._state_lock:
+                member = self._writable_member(member)
+
+                # Process the return
+                return_success, return_msg = member.return_book(isbn)
+
+                if return_success:
+                    today = today_ordinal()
+                    self._take_back(book, today)
+                    self._log("return", member_id, isbn, today)
+                    return True, "Book returned successfully"
+
+                return False, "Failed to process return"
+
+    @durable
+    def borrow_many(self, loans, filename=None):
+        """
+        Borrow a batch of books as a single all-or-nothing transaction
+
+        The whole batch is checked first (members, books, availability,
+        duplicates and each member's limit including the rest of the batch).
+        Nothing is changed unless every item passes.
+
+        Args:
+            loans: Iterable of (member_id, isbn) pairs
+            filename: Optional path to save the library to once the batch is applied
+
+        Returns:
+            tuple: (success: bool, results: list of (success, message) per item,
+                    where the message of a successful loan is its due date)
+        """
+        loans = list(loans)
+        member_ids = [member_id for member_id, _ in loans]
+        isbns = [isbn for _, isbn in loans]
+
+        with self._member_locks.hold(*member_ids), self._book_locks.hold(*isbns):
+            errors = {}
+            pending = {}  # member_id -> number of books requested in this batch
+            seen = set()
+
+            for index, (member_id, isbn) in enumerate(loans):
+                member = self.members.get(member_id)
+                book = self.books.get(isbn)
+
+                if member is None:
+                    errors[index] = "Member not found"
+                elif book is None:
+                    errors[index] = "Book not found"
+                elif isbn in seen:
+                    errors[index] = "Book appears more than once in batch"
+                elif not book.is_available:
+                    errors[index] = "Book is already borrowed"
+                elif member.has_borrowed(isbn):
+                    errors[index] = "Book already borrowed by this member"
+                elif member.borrowed_count + pending.get(member_id, 0) >= member.max_books:
+                    errors[index] = f"Borrowing limit reached ({member.max_books} books)"
+                else:
+                    pending[member_id] = pending.get(member_id, 0) + 1
+
+                seen.add(isbn)
+
+            if errors:
+                return False, self._batch_rejected(len(loans), errors)
+
+            results = []
+            journaled = []
+            today = today_ordinal()
+            with self._state_lock:
+                for member_id, isbn in loans:
+                    member = self._writable_member(self.members[member_id])
+                    member.borrow_book(isbn)
+                    due = today + self._loan_period(member)
+                    book = self._lend(self.books[isbn], member_id, due, today)
+                    results.append((True, book.due_date))
+                    journaled.append(["borrow", member_id, isbn, today, due])
+                self._log("batch", *journaled)
+
+        # Saving happens after the record locks are released
+        if filename:
+            self.save_to_file(filename)
+
+        return True, results
+
+    @durable
+    def return_many(self, returns, filename=None):
+        """
+        Return a batch of books as a single all-or-nothing transaction
+
+        Args:
+            returns: Iterable of (member_id, isbn) pairs
+            filename: Optional path to save the library to once the batch is applied
+
+        Returns:
+            tuple: (success: bool, results: list of (success, message) per item)
+        """
+        returns = list(returns)
+        member_ids = [member_id for member_id, _ in returns]
+        isbns = [isbn for _, isbn in returns]
+
+        with self._member_locks.hold(*member_ids), self._book_locks.hold(*isbns):
+            errors = {}
+            seen = set()
+
+            for index, (member_id, isbn) in enumerate(returns):
+                book = self.books.get(isbn)
 
-        if book.borrowed_by != member_id:
-            return False, "This book was not borrowed by this member"
+                if member_id not in self.members:
+                    errors[index] = "Member not found"
+                elif book is None:
+                    errors[index] = "Book not found"
+                elif isbn in seen:
+                    errors[index] = "Book appears more than once in batch"
+                elif book.borrowed_by != member_id:
+                    errors[index] = "This book was not borrowed by this member"
 
-        # Process the return
-        return_success, return_msg = member.return_book(isbn)
+                seen.add(isbn)
 
-        if return_success and book.return_book():
-            return True, "Book returned successfully"
+            if errors:
+                return False, self._batch_rejected(len(returns), errors)
 
-        return False, "Failed to process return"
+            today = today_ordinal()
+            with self._state_lock:
+                for member_id, isbn in returns:
+                    self._writable_member(self.members[member_id]).return_book(isbn)
+                    self._take_back(self.books[isbn], today)
+                self._log("batch", *(["return", member_id, isbn, today] for member_id, isbn in returns))
 
-    def search_books(self, keyword):
-        """Search for books by title or author"""
+        if filename:
+            self.save_to_file(filename)
+
+        return True, [(True, "Returned")] * len(returns)
+
+    def _lend(self, book, member_id, due, start=None):
+        """
+        Record a loan and store the borrowed version of the book (hold _state_lock)
+
+        The stored Book is replaced, not changed, so catalog objects that
+        callers or snapshots hold stay as they were.
+
+        Returns:
+            Book: The borrowed version now in the catalog
+        """
+        start = today_ordinal() if start is None else start
+        self.ledger.open_loan(book.isbn, member_id, start, due)
+        book = book.with_loan(member_id, due)
+        self.books[book.isbn] = book
+        self._mark_borrowed(book)
+        self._dirty_books[book.isbn] = None
+        self._dirty_members[member_id] = None
+        return book
+
+    def _take_back(self, book, returned=None):
+        """Close a loan and store the available version of the book (hold _state_lock)"""
+        row = self.ledger.close_loan(book.isbn, today_ordinal() if returned is None else returned)
+        if row is not None:
+            self._dirty_loans[row] = None
+        self._dirty_books[book.isbn] = None
+        self._dirty_members[book.borrowed_by] = None
+        book = book.without_loan()
+        self.books[book.isbn] = book
+        self._mark_available(book)
+        return book
+
+    @staticmethod
+    def _batch_rejected(size, errors):
+        """Build per-item results for a batch that failed validation"""
+        return [(False, errors.get(index, "Not processed: batch rejected"))
+                for index in range(size)]
+
+    @staticmethod
+    def _loan_period(member):
+        """Get loan period in days based on member type"""
+        # Teachers get extended loan periods
+        if isinstance(member, TeacherMember):
+            return member.get_loan_period()
+        return 14  # Default
+
+    def search_books(self, keyword, mode="substring"):
+        """
+        Search for books by title or author
+
+        Args:
+            keyword: Text to search for (case-insensitive)
+            mode: "substring" matches any part of the title or author,
+                  "token" matches whole words only,
+                  "scan" is the original substring search without the index
+
+        Returns:
+            list: Matching books in catalog order
+        """
+        with self._state_lock:
+            if mode == "substring":
+                isbns = self._search_index.search_substring(keyword)
+            elif mode == "token":
+                isbns = self._search_index.search_tokens(keyword)
+            elif mode == "scan":
+                return self._scan_books(keyword)
+            else:
+                raise ValueError(f"Unknown search mode: {mode}")
+
+            return [self.books[isbn] for isbn in isbns]
+
+    def _scan_books(self, keyword):
+        """Linear substring search over every book"""
         keyword_lower = keyword.lower()
         results = []
 
@@ -142,7 +479,8 @@ class Library:
         Returns:
             list: List of books of the specified type
         """
-        return [book for book in self.books.values() if book._type == book_type]
+        with self._state_lock:
+            return [self.books[isbn] for isbn in self._books_by_type.get(book_type, {})]
 
     def get_members_by_type(self, member_type):
         """
@@ -154,75 +492,745 @@ class Library:
         Returns:
             list: List of members of the specified type
         """
-        return [member for member in self.members.values() if member._member_type == member_type]
+        with self._state_lock:
+            return [self.members[member_id] for member_id in self._members_by_type.get(member_type, {})]
 
     def get_available_books(self):
         """Get all available books"""
-        return [book for book in self.books.values() if book.is_available]
+        with self._state_lock:
+            return [self.books[isbn] for isbn in self._available_books]
 
     def get_borrowed_books(self):
         """Get all borrowed books"""
-        return [book for book in self.books.values() if not book.is_available]
+        with self._state_lock:
+            return [self.books[isbn] for isbn in self._borrowed_books]
 
-    def get_overdue_books(self):
-        """Get all overdue books"""
-        from datetime import datetime
+    def count_books_by_type(self, book_type, available=None):
+        """
+        Count books of a specific type without building a list
 
-        overdue = []
-        today = datetime.now().strftime("%Y-%m-%d")
+        Args:
+            book_type: Type name ("EBook", "PhysicalBook", or "Book")
+            available: True to count only available books, False to count
+                       only borrowed books, None to count all of them
 
-        for book in self.books.values():
-            if not book.is_available and book.due_date and book.due_date < today:
-                overdue.append(book)
+        Returns:
+            int: Number of matching books
+        """
+        total = len(self._books_by_type.get(book_type, {}))
+        if available is None:
+            return total
+
+        on_shelf = self._available_by_type.get(book_type, 0)
+        return on_shelf if available else total - on_shelf
+
+    def count_members_by_type(self, member_type):
+        """
+        Count members of a specific type without building a list
 
-        return overdue
+        Args:
+            member_type: Type name ("Student", "Teacher", or "Member")
+
+        Returns:
+            int: Number of members of the specified type
+        """
+        return len(self._members_by_type.get(member_type, {}))
+
+    def count_available_books(self):
+        """Count available books"""
+        return len(self._available_books)
+
+    def count_borrowed_books(self):
+        """Count borrowed books"""
+        return len(self._borrowed_books)
+
+    def get_overdue_books(self, as_of=None):
+        """
+        Get all overdue books
+
+        Args:
+            as_of: Date to check against ("YYYY-MM-DD", date or day ordinal),
+                   defaults to today
+
+        Returns:
+            list: Overdue books, earliest due date first
+        """
+        as_of = today_ordinal() if as_of is None else to_ordinal(as_of)
+
+        with self._state_lock:
+            return [self.books[isbn] for isbn in self.ledger.due_before(as_of)]
+
+    def get_books_due_between(self, start, end):
+        """
+        Get borrowed books due on or after start and before end
+
+        Args:
+            start: First date to include ("YYYY-MM-DD", date or day ordinal)
+            end: First date to exclude ("YYYY-MM-DD", date or day ordinal)
+
+        Returns:
+            list: Books ordered by due date
+        """
+        start, end = to_ordinal(start), to_ordinal(end)
+        with self._state_lock:
+            return [self.books[isbn] for isbn in self.ledger.due_between(start, end)]
 
     def get_member_borrowed_books(self, member_id):
         """Get all books borrowed by a specific member"""
         if member_id not in self.members:
             return []
 
+        # Member loans are an ordered set, iterated without copying it
         member = self.members[member_id]
-        borrowed_books = []
+        with self._state_lock:
+            return [self.books[isbn] for isbn in member.iter_borrowed() if isbn in self.books]
+
+    def get_borrower(self, isbn):
+        """
+        Get the member currently borrowing a book
+
+        Args:
+            isbn: ISBN of the book
+
+        Returns:
+            Member object, or None if the book is not on loan
+        """
+        member_id = self.ledger.holder(isbn)
+        return self.members.get(member_id) if member_id is not None else None
+
+    def get_loan_history(self, isbn):
+        """
+        Get every loan of a book, including returned ones
+
+        Args:
+            isbn: ISBN of the book
+
+        Returns:
+            list: Loan rows (isbn, member_id, start, due, returned as day
+                  ordinals; returned is None while on loan), oldest first
+        """
+        with self._state_lock:
+            return self.ledger.history(isbn)
+
+    def get_member_loan_history(self, member_id):
+        """Get every loan by a member, including returned ones, oldest first"""
+        with self._state_lock:
+            return self.ledger.member_history(member_id)
+
+    def get_loans_per_month(self, isbn=None):
+        """
+        Count loans by book and the month they started
+
+        Answered from the loan ledger alone, without reading the catalog.
+
+        Args:
+            isbn: Count only this book's loans, default all books
+
+        Returns:
+            Counter: (isbn, "YYYY-MM") -> number of loans
+        """
+        with self._state_lock:
+            return self.ledger.loans_per_month(isbn)
+
+    def _store_book(self, book):
+        """Put a book in the catalog and keep the indexes up to date"""
+        with self._state_lock:
+            # Index first, so a book that cannot be indexed or stored leaves nothing behind
+            self._search_index.add(book)
+            try:
+                self.books[book.isbn] = book
+            except BaseException:
+                self._search_index.remove(book.isbn)
+                raise
+            self._dirty_books[book.isbn] = None
+            self._books_by_type.setdefault(book._type, {})[book.isbn] = None
+
+            if book.is_available:
+                self._mark_available(book)
+            else:
+                self._mark_borrowed(book)
+
+    def _store_raw_book(self, record):
+        """Index a JSON book record without building the Book (self.books is LazyRecords)"""
+        book = RawBook(record)
+        with self._state_lock:
+            self.books.add_raw(book.isbn, record)
+            self._search_index.defer(book.isbn, book.title, book.author)
+            self._books_by_type.setdefault(book._type, {})[book.isbn] = None
+
+            if book.is_available:
+                self._mark_available(book)
+            else:
+                self._mark_borrowed(book)
+
+    def _load_loans(self, records):
+        """
+        Add loan rows read from a saved file
+
+        Files saved before loans were written first list them after the
+        books. Loading those books opened a loan with an unknown start for
+        each borrowed one (see _mark_borrowed); they are replaced here.
+
+        Args:
+            records: Iterable of row dictionaries (LoanLedger.to_dicts)
+        """
+        with self._state_lock:
+            if not self._borrowed_books:
+                self.ledger.load_dicts(records)
+                return
 
-        for isbn in member.borrowed_books:
-            if isbn in self.books:
-                borrowed_books.append(self.books[isbn])
+            self.ledger = LoanLedger()
+            self.ledger.load_dicts(records)
+            for isbn in self._borrowed_books:
+                if self.ledger.holder(isbn) is None:
+                    book = self.books[isbn]
+                    self.ledger.open_loan(isbn, book.borrowed_by, None, book.due_ordinal)
 
-        return borrowed_books
+    def _unstore_book(self, book):
+        """Take a book out of the catalog and all indexes"""
+        with self._state_lock:
+            del self.books[book.isbn]
+            self._dirty_books[book.isbn] = None
+            self._search_index.remove(book.isbn)
+            del self._books_by_type[book._type][book.isbn]
 
-    def save_to_file(self, filename="data/library.json"):
-        """Save library data to JSON file"""
-        data = {
-            "name": self.name,
-            "books": [book.to_dict() for book in self.books.values()],
-            "members": [member.to_dict() for member in self.members.values()]
-        }
+            if book.isbn in self._available_books:
+                del self._available_books[book.isbn]
+                self._available_by_type[book._type] -= 1
+            if book.isbn in self._borrowed_books:
+                del self._borrowed_books[book.isbn]
+                row = self.ledger.close_loan(book.isbn, today_ordinal())
+                if row is not None:
+                    self._dirty_loans[row] = None
 
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
+    def _store_member(self, member):
+        """Put a member in the directory and keep the indexes up to date"""
+        with self._state_lock:
+            self.members[member.member_id] = member
+            self._dirty_members[member.member_id] = None
+            self._members_by_type.setdefault(member._member_type, {})[member.member_id] = None
 
-        with open(filename, 'w') as file:
-            json.dump(data, file, indent=4)
+    def _store_raw_member(self, record):
+        """Index a JSON member record without building the Member (self.members is LazyRecords)"""
+        with self._state_lock:
+            self.members.add_raw(record["member_id"], record)
+            self._members_by_type.setdefault(record.get("type", "Member"), {})[record["member_id"]] = None
+
+    def _unstore_member(self, member):
+        """Take a member out of the directory and all indexes"""
+        with self._state_lock:
+            del self.members[member.member_id]
+            self._dirty_members[member.member_id] = None
+            del self._members_by_type[member._member_type][member.member_id]
+
+    def _mark_borrowed(self, book):
+        """Move a book from the available index to the borrowed index (hold _state_lock)"""
+        if book.isbn in self._available_books:
+            del self._available_books[book.isbn]
+            self._available_by_type[book._type] -= 1
+        self._borrowed_books[book.isbn] = None
+        if self.ledger.holder(book.isbn) is None:
+            # A loan saved before the ledger existed: its start date is unknown
+            self.ledger.open_loan(book.isbn, book.borrowed_by, None, book.due_ordinal)
+
+    def _mark_available(self, book):
+        """Move a book from the borrowed index to the available index (hold _state_lock)"""
+        self._borrowed_books.pop(book.isbn, None)
+        if book.isbn not in self._available_books:
+            self._available_books[book.isbn] = None
+            self._available_by_type[book._type] = self._available_by_type.get(book._type, 0) + 1
+
+    def snapshot(self):
+        """
+        Take a cheap, read-only, point-in-time view of the library
+
+        Only the key -> record maps and the loan ledger's columns are
+        copied. Books are never changed in place (a loan stores a new
+        version), and members are copied before the library changes one that
+        a snapshot still shares (copy-on-write), so records stay shared.
+
+        Returns:
+            LibrarySnapshot: View with the same read methods as Library
+        """
+        with self._state_lock:
+            view = LibrarySnapshot(self.name, self.books.copy(), self.members.copy(), self.ledger.copy())
+            self._snapshots.add(view)
+        return view
+
+    def _writable_member(self, member):
+        """Get a version of a member that is safe to change (hold _state_lock)"""
+        if not any(view.shares(member) for view in self._snapshots):
+            return member
+
+        clone = clone_member(member)
+        self.members[member.member_id] = clone
+        return clone
+
+    def open_journal(self, filename="data/library.json", sync_interval=None, compact_after=10000,
+                     shared=False, poll_interval=None):
+        """
+        Start journaling changes to the library saved in filename
+
+        From now on every add, remove, borrow and return (single or batch)
+        appends a compact record to filename + ".journal" and returns only
+        once the record is on disk, so a crash loses no change that was
+        reported as done. load_from_file replays the journal on top of the
+        last save. Saving to filename folds the journal into the save and
+        empties it; a background save does this every compact_after records.
+
+        Args:
+            filename: Library JSON file the journal belongs to (saved now
+                      if it does not exist yet, or if this library has
+                      changes the file does not)
+            sync_interval: Seconds between batched fsyncs. Changes then
+                           return without waiting for the disk, and a crash
+                           can lose the last interval. None (default) waits
+                           for an fsync on every change; concurrent changes
+                           share one fsync.
+            compact_after: Journal records that trigger a background save,
+                           or None to only fold the journal in on save_to_file
+            shared: Share the file with other processes that open it shared
+                    (POSIX only). Every change takes the lock file
+                    filename + ".lock", applies the changes other processes
+                    journaled since, and appends its own; no change is lost
+                    and none is checked against an out-of-date library.
+                    The library should be the one loaded from filename
+                    (or a new one if there is no file); if another process
+                    saved since, it is loaded again. That would drop
+                    changes made here with no journal open, so then a
+                    ValueError is raised instead.
+            poll_interval: With shared, seconds between background checks
+                           for other processes' changes (see refresh), or
+                           None to only check on each change and refresh()
+        """
+        self.close_journal()
+        path = journal_path(filename)
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if shared:
+            self._open_shared_journal(filename, path, sync_interval, compact_after, poll_interval)
+            return
+
+        with self._state_lock:
+            self._journal = Journal(path, self._journal_seq, sync_interval)
+            self._journal_file = os.path.abspath(filename)
+            self._compact_after = compact_after
+
+        # Start from a save that holds everything, including changes made
+        # before the journal was opened, with an empty journal (a journal
+        # left by a crash may end in a half-written record)
+        if (not os.path.exists(filename) or self.has_unsaved_changes() or os.path.getsize(path)
+                or os.path.exists(path + ".old")):
+            self.save_to_file(filename)
+
+    def _open_shared_journal(self, filename, path, sync_interval, compact_after, poll_interval):
+        """Open a journal shared with other processes, see open_journal"""
+        lock = FileLock(lock_path(filename))
+        unsaved = self._unjournaled  # Changes neither saved nor in the journal
+        with lock.hold():
+            # Saved by another process since we read it (or we never did)
+            stale = (os.path.exists(filename)
+                     and self._loaded_from != (os.path.abspath(filename), file_key(os.stat(filename))))
+            if not (stale and unsaved):
+                with self._state_lock:
+                    self._journal = SharedJournal(path, self._journal_seq, sync_interval, lock)
+                    self._journal_file = os.path.abspath(filename)
+                    self._compact_after = compact_after
+
+                if not os.path.exists(filename):
+                    self.save_to_file(filename)
+                elif stale:
+                    self._reload(self._journal)
+                else:
+                    self._catch_up(self._journal)
+                    if unsaved:
+                        self.save_to_file(filename)
+
+        if stale and unsaved:
+            lock.close()
+            raise ValueError(f"{filename} changed since this library was loaded; "
+                             "reloading it would lose the changes made here")
+
+        if poll_interval is not None:
+            self._watcher = ChangeWatcher(self, poll_interval)
+            self._watcher.start()
+
+    @contextmanager
+    def _file_access(self, exclusive=True):
+        """
+        Hold a shared journal's file lock, with other processes' changes applied
+
+        Does nothing unless the journal is shared (see open_journal).
+
+        Args:
+            exclusive: False for reading only, so other readers can share it
+        """
+        journal = self._journal
+        if not isinstance(journal, SharedJournal):
+            yield
+            return
+        with journal.lock.hold(exclusive):
+            self._catch_up(journal)
+            yield
+
+    def _catch_up(self, journal):
+        """Apply the records other processes added to a shared journal (hold its lock)"""
+        try:
+            with self._state_lock:
+                for record in journal.read_new():
+                    self._apply(*record[1:])
+        except MissedChanges:
+            self._reload(journal)
+
+    def _reload(self, journal):
+        """
+        Load the shared library file again and take its records (hold the lock)
+
+        Needed when another process saved changes this one never read:
+        the journal records were folded into the file and removed.
+        """
+        lazy = isinstance(self.members, LazyRecords)
+        book_store = None if lazy or type(self.books) is dict else type(self.books)()
+        fresh = Library.load_from_file(self._journal_file, book_store, lazy)
+        if fresh is None:
+            raise ValueError(f"Could not reload {self._journal_file}")
+
+        with self._state_lock:
+            for attribute in _RECORD_ATTRIBUTES:
+                setattr(self, attribute, getattr(fresh, attribute))
+            if self._record_cache is not None:
+                self._record_cache = RecordCache(self._record_cache.compact)
+            journal.restart(fresh._journal_seq)
+            for record in journal.read_new():
+                self._apply(*record[1:])
+
+    def refresh(self):
+        """
+        Apply the changes other processes made to a shared library file
+
+        Changes do this by themselves; call it before reading to see the
+        latest data. Only the journal's size and modification time are
+        checked unless it changed. Does nothing unless the journal was
+        opened with shared=True.
+
+        Returns:
+            bool: True if the journal had changed
+        """
+        journal = self._journal
+        if not isinstance(journal, SharedJournal) or not journal.changed():
+            return False
+        with self._file_access(exclusive=False):
+            return True
+
+    def close_journal(self):
+        """Stop journaling (call once no changes are in progress)"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        if self._compactor is not None:
+            self._compactor.join()
+
+        with self._state_lock:
+            journal, self._journal = self._journal, None
+            self._journal_file = None
+        if journal is not None:
+            journal.close()
+            self._journal_seq = journal.seq
+
+    def _log(self, operation, *args):
+        """
+        Append a journal record for a change just made (hold _state_lock)
+
+        Books and members are written as their to_dict(); a "batch" record
+        takes [operation, *args] lists and is replayed all-or-nothing.
+        """
+        if operation == "batch" and not args:
+            return
+        journal = self._journal
+        if journal is None:
+            self._unjournaled = True
+            return
+
+        if operation == "batch":
+            args = [[item[0], *map(_encode, item[1:])] for item in args]
+        else:
+            args = map(_encode, args)
+        self._journal_local.seq = journal.append(operation, *args)
+
+        if (self._compact_after is not None and len(journal) >= self._compact_after
+                and (self._compactor is None or not self._compactor.is_alive())):
+            self._compactor = threading.Thread(target=self.save_to_file, args=(self._journal_file,),
+                                               daemon=True)
+            self._compactor.start()
+
+    def _apply(self, operation, *args):
+        """
+        Apply one journal record while replaying or catching up (nothing journaled)
+
+        Raises:
+            ValueError: A borrow or return no longer fits the library, so the
+                        journal does not belong to the file it is replayed on
+        """
+        if operation == "add_book":
+            self._store_book(create_book_from_dict(args[0]))
+        elif operation == "remove_book":
+            self._unstore_book(self.books[args[0]])
+        elif operation == "add_member":
+            self._store_member(create_member_from_dict(args[0]))
+        elif operation == "remove_member":
+            self._unstore_member(self.members[args[0]])
+        elif operation == "borrow":
+            member_id, isbn, start, due = args
+            book = self.books[isbn]
+            if not book.is_available:
+                raise ValueError(f"Cannot replay borrow of {isbn} by {member_id}: already borrowed")
+            success, message = self._writable_member(self.members[member_id]).borrow_book(isbn)
+            if not success:
+                raise ValueError(f"Cannot replay borrow of {isbn} by {member_id}: {message}")
+            self._lend(book, member_id, due, start)
+        elif operation == "return":
+            member_id, isbn, returned = args
+            book = self.books[isbn]
+            if book.borrowed_by != member_id:
+                raise ValueError(f"Cannot replay return of {isbn} by {member_id}: not borrowed by this member")
+            success, message = self._writable_member(self.members[member_id]).return_book(isbn)
+            if not success:
+                raise ValueError(f"Cannot replay return of {isbn} by {member_id}: {message}")
+            self._take_back(book, returned)
+        elif operation == "batch":
+            for item in args:
+                self._apply(*item)
+        else:
+            raise ValueError(f"Unknown journal operation: {operation}")
+
+    def _replay_journal(self, filename, seq):
+        """
+        Apply the journal records saved after a library file
+
+        Args:
+            filename: Library JSON file
+            seq: Last journal record included in that file
+        """
+        path = journal_path(filename)
+        # Records of an interrupted save are still in the .old file
+        for part in (path + ".old", path):
+            for record in read_journal(part):
+                if record[0] > seq:
+                    self._apply(*record[1:])
+                    seq = record[0]
+        self._journal_seq = seq
+
+    def has_unsaved_changes(self):
+        """Check whether any book, member or loan changed since the last save or load"""
+        return bool(self._dirty_books or self._dirty_members or self._dirty_loans)
+
+    def _take_changes(self):
+        """Get the keys changed since the last save and start new sets (hold _state_lock)"""
+        changes = self._dirty_books, self._dirty_members, self._dirty_loans
+        self._dirty_books, self._dirty_members, self._dirty_loans = {}, {}, {}
+        return changes
+
+    def _restore_changes(self, changes, unjournaled):
+        """Mark the changes of a failed save as unsaved again"""
+        books, members, loans = changes
+        with self._state_lock:
+            self._unjournaled = self._unjournaled or unjournaled
+            self._dirty_books = {**books, **self._dirty_books}
+            self._dirty_members = {**members, **self._dirty_members}
+            self._dirty_loans = {**loans, **self._dirty_loans}
+
+    def start_autosave(self, filename="data/library.json", interval=5.0, compact=False):
+        """
+        Save the library in a background thread whenever it has changes
+
+        Every interval seconds a thread checks has_unsaved_changes() and,
+        if so, calls save_to_file(filename). While autosaving, JSON saves
+        keep the encoded text of every record and encode again only the
+        books, members and loans changed since the previous save, so a
+        save costs little more than writing the file out. The encoded text
+        takes a little more memory than the saved file (see RecordCache).
+
+        Args:
+            filename: File to save to (the journal's file, if one is open,
+                      so each save also empties the journal)
+            interval: Seconds between checks
+            compact: Save JSON without whitespace, see save_to_file
+        """
+        self.stop_autosave()
+        self._record_cache = RecordCache(compact)
+        self._autosaver = AutoSaver(self, filename, interval, compact)
+        self._autosaver.start()
+
+    def stop_autosave(self):
+        """Stop background saves (a save in progress finishes first)"""
+        if self._autosaver is not None:
+            self._autosaver.stop()
+            self._autosaver = None
+        self._record_cache = None
+
+    def save_to_file(self, filename="data/library.json", file_format=None, compression=None, level=None,
+                     compact=False):
+        """
+        Save library data to JSON file
+
+        The data is written to a temporary file that then replaces the old
+        one, so a crash leaves either the previous save or this one. Saving
+        to the journal's file folds the journal in and starts it empty.
+        With a shared journal the save holds the file lock throughout, so
+        other processes wait for it instead of losing their changes.
+        Records are turned into dictionaries and written one at a time, so
+        a save needs little memory beyond the library itself. While
+        autosaving (see start_autosave) only the records changed since the
+        last save are encoded again.
+
+        Args:
+            filename: Path to the file
+            file_format: "json", "binary", "mapped" or "jsonl" (see binary_format.py); by
+                         default by extension: .bin, .snap, .jsonl, JSON otherwise
+            compression: "gzip", "bz2", "lzma" or "none" (see compressed.py); by
+                         default gzip for a .gz file, bz2 for .bz2, lzma for .xz
+            level: Compression level, None for the codec's default
+            compact: Write JSON without indentation or spaces (smaller and
+                     faster to write; loads the same)
+        """
+        file_format = format_for(filename, file_format)
+        codec = codec_for(filename, compression)
+        check_compression(file_format, codec)
+        with self._file_access(), self._save_lock:
+            # Serialize a snapshot so borrowing can continue during the save
+            with self._state_lock:
+                view = self.snapshot()
+                changes = self._take_changes()
+                unjournaled, self._unjournaled = self._unjournaled, False
+                journal = self._journal
+                if journal is None:
+                    seq = self._journal_seq
+                elif os.path.abspath(filename) == self._journal_file:
+                    seq = journal.rotate()
+                else:
+                    seq, journal = journal.seq, None
+
+            try:
+                cache = self._record_cache
+                if cache is not None:
+                    cache.update(view, *changes)
+
+                directory = os.path.dirname(filename)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+
+                temporary = filename + ".tmp"
+                with open(temporary, 'wb') as raw:
+                    # Compressed blocks go to the file as they fill
+                    with compressing(raw, codec, level) as file:
+                        if cache is not None and file_format == "json" and cache.compact == compact:
+                            text = io.TextIOWrapper(file, encoding="utf-8")
+                            write_sections(text, cache.sections(view, seq), ("loans", "books", "members"), compact)
+                            text.flush()
+                            text.detach()
+                        else:
+                            # Generators: each record's dictionary is made as it is
+                            # written. Loans come first so a streaming load has them
+                            # before any book.
+                            data = {
+                                "name": view.name,
+                                "loans": view.loans.to_dicts(),
+                                "books": view.book_dicts(),
+                                "members": view.member_dicts(),
+                                "journal_seq": seq
+                            }
+                            write_library(file, data, file_format, compact)
+                    raw.flush()
+                    os.fsync(raw.fileno())
+                os.replace(temporary, filename)
+                self._loaded_from = (os.path.abspath(filename), file_key(os.stat(filename)))
+            except BaseException:
+                self._restore_changes(changes, unjournaled)
+                raise
+
+            if journal is not None:
+                journal.discard_old()
 
     @staticmethod
-    def load_from_file(filename="data/library.json"):
-        """Load library data from JSON file"""
+    def load_from_file(filename="data/library.json", book_store=None, lazy=False, workers=None):
+        """
+        Load library data from JSON file
+
+        Binary files (see binary_format.py) and compressed files (see
+        compressed.py) are recognized by their first bytes. Changes
+        journaled after the file was saved (see open_journal) are replayed
+        on top of it.
+
+        Args:
+            filename: Path to the JSON or binary file, compressed or not
+            book_store: Optional empty mapping to load the books into
+                        (for example a ColumnarBookStore)
+            lazy: Keep the raw records and build each Book/Member only when
+                  it is first read, and build the search index on the first
+                  search. Cannot be combined with book_store.
+            workers: Number of processes to parse an uncompressed JSON Lines
+                     file with (see jsonl_format.py); other files, and None,
+                     are read in this process
+        """
+        if lazy and book_store is not None:
+            raise ValueError("lazy loading cannot be combined with a book_store")
+
+        # Repeated strings are shared within this load (see interning.py)
+        strings = StringPool()
         try:
-            with open(filename, 'r') as file:
-                data = json.load(file)
+            with strings, open(filename, 'rb') as file:
+                # Before reading: a text wrapper closes the file when done
+                loaded_from = (os.path.abspath(filename), file_key(os.fstat(file.fileno())))
+                # Worker processes parse the records (and build them unless lazy)
+                parallel = workers and file.peek(len(JSONL_MAGIC))[:len(JSONL_MAGIC)] == JSONL_MAGIC
+                if lazy:
+                    library = Library(None, LazyRecords(strings.factory(create_book_from_dict)))
+                    library.members = LazyRecords(strings.factory(create_member_from_dict))
+                    store_book, store_member = library._store_raw_book, library._store_raw_member
+                else:
+                    library = Library(None, book_store)
+                    # Build each record with its factory function, or take the
+                    # one a worker built and share its strings with this load
+                    build_book = intern_attributes if parallel else create_book_from_dict
+                    build_member = intern_attributes if parallel else create_member_from_dict
 
-            library = Library(data["name"])
+                    def store_book(record):
+                        library._store_book(build_book(record))
 
-            # Load books using factory function
-            for book_data in data.get("books", []):
-                book = create_book_from_dict(book_data)
-                library.books[book.isbn] = book
+                    def store_member(record):
+                        library._store_member(build_member(record))
 
-            # Load members using factory function
-            for member_data in data.get("members", []):
-                member = create_member_from_dict(member_data)
-                library.members[member.member_id] = member
+                if parallel:
+                    records = read_jsonl_parallel(filename, workers, build=not lazy)
+                else:
+                    # Read one record at a time and drop it once stored, so
+                    # the whole document is never in memory at once
+                    records = read_library(file)
 
+                journal_seq = 0
+                for key, items in groupby(records, key=itemgetter(0)):
+                    values = map(itemgetter(1), items)
+                    if key == "books":
+                        for record in values:
+                            store_book(record)
+                    elif key == "members":
+                        for record in values:
+                            store_member(record)
+                    elif key == "loans":
+                        library._load_loans(values)
+                    elif key == "name":
+                        library.name = next(values)
+                    elif key == "journal_seq":
+                        journal_seq = next(values)
+            library._take_changes()
+            library._unjournaled = False
+            library._loaded_from = loaded_from
+
+            # Changes made after the save, if they were journaled
+            with strings:
+                library._replay_journal(filename, journal_seq)
             return library
 
         except FileNotFoundError:
@@ -230,3 +1238,8 @@ class Library:
         except Exception as e:
             print(f"Error loading library: {e}")
             return None
+
+
+def _encode(value):
+    """Turn a Book or Member into its dictionary for the journal"""
+    return value.to_dict() if hasattr(value, "to_dict") else value
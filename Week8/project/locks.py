@@ -0,0 +1,53 @@
+"""
+Week 8 Project: Keyed Locks
+Per-key locking so unrelated library operations can run in parallel
+"""
+
+import threading
+from contextlib import contextmanager
+
+
+class KeyLocks:
+    """
+    A fixed pool of locks shared out by key (lock striping)
+
+    Each key (an ISBN or member ID) always maps to the same lock, so two
+    operations on the same key never overlap while operations on different
+    keys almost always get different locks. Keeping the pool fixed avoids
+    creating and cleaning up one lock object per record.
+    """
+
+    def __init__(self, stripes=1024):
+        """
+        Initialize the lock pool
+
+        Args:
+            stripes: Number of locks in the pool
+        """
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def _stripes_for(self, keys):
+        """Get the distinct stripe numbers for keys, in a fixed order"""
+        return sorted({hash(key) % len(self._locks) for key in keys})
+
+    @contextmanager
+    def hold(self, *keys):
+        """
+        Hold the locks for one or more keys
+
+        Locks are always taken in stripe order, so callers that hold
+        several keys at once cannot deadlock with each other.
+
+        Args:
+            *keys: Keys to lock
+        """
+        acquired = []
+        try:
+            for stripe in self._stripes_for(keys):
+                lock = self._locks[stripe]
+                lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
@@ -18,6 +18,7 @@ from reports import (generate_book_catalog, generate_overdue_report,
                      generate_member_activity_report, print_full_report,
                      generate_paginated_books)
 from decorators import log_transaction, timer
+from shared import SHARING_SUPPORTED
 
 
 def show_menu():
@@ -257,7 +258,7 @@ def main():
     print()
 
     # Load library
-    library = Library.load_from_file()
+    library = Library.load_from_file(lazy=True)
 
     if library:
         print(f"✓ Loaded library: {library.name}")
@@ -267,10 +268,21 @@ def main():
         library = Library(name)
         print(f"✓ Created new library: {library.name}")
 
+    # Every change is journaled, so nothing is lost if we exit without saving.
+    # Where file locks are available the journal is shared: other copies of
+    # this program can use the same file at the same time, and each sees the
+    # others' changes.
+    library.open_journal(shared=SHARING_SUPPORTED)
+
     # Main loop
     while True:
         show_menu()
         choice = input("\nEnter choice (1-15): ").strip()
+        # Pick up changes made by other copies while we waited for input
+        try:
+            library.refresh()
+        except Exception as e:
+            print(f"✗ Could not load changes from other copies: {e}")
 
         if choice == '1':
             add_book(library)
@@ -323,6 +335,7 @@ def main():
             print("\nSaving library data...")
             try:
                 library.save_to_file()
+                library.close_journal()
                 print("✓ Data saved!")
                 print("\nThank you for using the Library Management System!")
                 print("Goodbye!")
@@ -0,0 +1,454 @@
+"""
+Week 8 Project: Memory-Mapped Library
+Read-only library served straight from an mmap'ed snapshot file
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping
+from itertools import compress
+
+from books import create_book_from_dict
+from dates import to_ordinal, today_ordinal
+from ledger import LoanLedger
+from members import create_member_from_dict
+from search_index import tokenize
+
+MAGIC = b"LIBMMAP\x00"
+VERSION = 1
+
+# Sections, in the order of the (offset, size) table after the header.
+# Offsets inside ROWS sections are relative to the start of DATA.
+SECTIONS = (
+    "NAME",            # Library name, UTF-8
+    "BOOK_ROWS",       # u64 x 4 per book in catalog order: record offset, record size, key offset, key size
+    "BOOK_SORTED",     # u32 per book: row numbers sorted by ISBN bytes
+    "BOOK_TYPES",      # u8 per book: index into BOOK_TYPES
+    "BOOK_AVAILABLE",  # u8 per book: 1 if on the shelf
+    "BOOK_DUE",        # i32 per book: due day ordinal, NO_DATE if none
+    "BOOK_SEARCH",     # lowercase "title\\nauthor\\0" per book, UTF-8
+    "BOOK_SEARCH_AT",  # u64 per book: where its text starts in BOOK_SEARCH
+    "MEMBER_ROWS",     # as BOOK_ROWS, keyed by member ID
+    "MEMBER_SORTED",   # as BOOK_SORTED
+    "MEMBER_TYPES",    # u8 per member: index into MEMBER_TYPES
+    "LOANS",           # loan rows as one compact JSON array
+    "DATA",            # book and member records as compact JSON, and their keys
+)
+HEADER = struct.Struct(f"<8sHHQQQ{2 * len(SECTIONS)}Q")  # magic, version, flags, journal_seq, counts, table
+ROW_FIELDS = 4
+ALIGNMENT = 8
+
+NO_DATE = 0
+BOOK_TYPES = ("Book", "EBook", "PhysicalBook")
+MEMBER_TYPES = ("Member", "Student", "Teacher")
+
+
+# ---- Writing ----
+
+def _rows(records, key_name, blob):
+    """Append records (and their keys) to blob; return the ROWS and SORTED columns"""
+    rows = array("Q")
+    keys = []
+    for record in records:
+        data = json.dumps(record, separators=(",", ":")).encode("utf-8")
+        key = record[key_name].encode("utf-8")
+        rows.extend((len(blob), len(data), len(blob) + len(data), len(key)))
+        blob += data
+        blob += key
+        keys.append(key)
+    return rows, array("I", sorted(range(len(keys)), key=keys.__getitem__))
+
+
+def _little_endian(values):
+    """Bytes of an array in little-endian order"""
+    if sys.byteorder == "big":
+        values = values[:]
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_mapped(file, data):
+    """
+    Write library data as a snapshot MappedLibrary can open
+
+    Args:
+        file: File opened in binary mode
+        data: Dictionary with name, loans, books, members (records as
+              saved to JSON) and journal_seq
+    """
+    books = list(data.get("books", []))
+    members = list(data.get("members", []))
+    blob = bytearray()
+
+    book_rows, book_sorted = _rows(books, "isbn", blob)
+    member_rows, member_sorted = _rows(members, "member_id", blob)
+
+    search = bytearray()
+    search_at = array("Q")
+    for book in books:
+        search_at.append(len(search))
+        search += f"{book['title'].lower()}\n{book['author'].lower()}\0".encode("utf-8")
+
+    sections = {
+        "NAME": data["name"].encode("utf-8"),
+        "BOOK_ROWS": _little_endian(book_rows),
+        "BOOK_SORTED": _little_endian(book_sorted),
+        "BOOK_TYPES": bytes(BOOK_TYPES.index(book.get("type", "Book")) for book in books),
+        "BOOK_AVAILABLE": bytes(1 if book.get("is_available", True) else 0 for book in books),
+        "BOOK_DUE": _little_endian(array("i", (to_ordinal(book.get("due_date")) or NO_DATE for book in books))),
+        "BOOK_SEARCH": bytes(search),
+        "BOOK_SEARCH_AT": _little_endian(search_at),
+        "MEMBER_ROWS": _little_endian(member_rows),
+        "MEMBER_SORTED": _little_endian(member_sorted),
+        "MEMBER_TYPES": bytes(MEMBER_TYPES.index(member.get("type", "Member")) for member in members),
+        "LOANS": json.dumps(list(data.get("loans", [])), separators=(",", ":")).encode("utf-8"),
+        "DATA": bytes(blob),
+    }
+
+    # Every section starts on an 8-byte boundary so columns can be cast in place
+    table = []
+    offset = HEADER.size
+    for name in SECTIONS:
+        offset += -offset % ALIGNMENT
+        table.extend((offset, len(sections[name])))
+        offset += len(sections[name])
+
+    file.write(HEADER.pack(MAGIC, VERSION, 0, data.get("journal_seq", 0), len(books), len(members), *table))
+    position = HEADER.size
+    for name in SECTIONS:
+        padding = -position % ALIGNMENT
+        file.write(b"\0" * padding)
+        file.write(sections[name])
+        position += padding + len(sections[name])
+
+
+def read_mapped(file):
+    """
+    Read every record of a mapped snapshot, for loading it into a Library
+
+    Args:
+        file: File opened in binary mode
+
+    Yields:
+        tuple: (key, value) pairs like json_stream.read_sections
+    """
+    with MappedLibrary(file.name) as library:
+        yield "name", library.name
+        yield "journal_seq", library.journal_seq
+        for loan in library._loan_dicts():
+            yield "loans", loan
+        for row in range(len(library.books)):
+            yield "books", library.books._record_dict(row)
+        for row in range(len(library.members)):
+            yield "members", library.members._record_dict(row)
+
+
+# ---- Reading ----
+
+class _MappedRecords(Mapping):
+    """
+    Read-only dict-like view of the books or members of a snapshot
+
+    Lookups binary-search the sorted key index in the mapped file and
+    decode only the record found. Each read builds a new Book or Member.
+    """
+
+    def __init__(self, library, prefix, factory):
+        self._map = library._map
+        self._rows = library._column(f"{prefix}_ROWS", "Q")
+        self._sorted = library._column(f"{prefix}_SORTED", "I")
+        self._data = library._bounds("DATA")[0]
+        self._factory = factory
+
+    def __len__(self):
+        return len(self._sorted)
+
+    def _key(self, row):
+        """Key bytes of a row"""
+        start = self._data + self._rows[row * ROW_FIELDS + 2]
+        return self._map[start:start + self._rows[row * ROW_FIELDS + 3]]
+
+    def _find(self, key):
+        """Row number of a key, or None"""
+        target = key.encode("utf-8")
+        low, high = 0, len(self._sorted)
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(self._sorted[middle]) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self._sorted) and self._key(self._sorted[low]) == target:
+            return self._sorted[low]
+        return None
+
+    def _record_dict(self, row):
+        """Decode a row's record dictionary"""
+        start = self._data + self._rows[row * ROW_FIELDS]
+        return json.loads(self._map[start:start + self._rows[row * ROW_FIELDS + 1]])
+
+    def _record(self, row):
+        """Build the Book or Member of a row"""
+        return self._factory(self._record_dict(row))
+
+    def __getitem__(self, key):
+        row = self._find(key) if isinstance(key, str) else None
+        if row is None:
+            raise KeyError(key)
+        return self._record(row)
+
+    def __contains__(self, key):
+        return isinstance(key, str) and self._find(key) is not None
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self._key(row).decode("utf-8")
+
+    def values(self):
+        """Iterate over every record in catalog order"""
+        return map(self._record, range(len(self)))
+
+    def items(self):
+        """Iterate over every (key, record) pair in catalog order"""
+        return zip(self, self.values())
+
+
+class MappedLibrary:
+    """
+    Read-only library that reads records straight from a mapped snapshot
+
+    Opening maps the file and reads its fixed-size header, so it takes
+    the same time for any catalog size, and processes that open the same
+    file share its pages in the OS page cache. Lookups by ISBN or member
+    ID binary-search a sorted index; type, availability and due-date
+    queries scan one-byte and four-byte columns; searches run bytes.find
+    over a lowercase copy of every title and author. Only the records a
+    query returns are decoded, into the usual Book and Member classes.
+
+    Changes are not possible. Write the snapshot with
+    library.save_to_file("data/library.snap"). Journaled changes made
+    after that save are not included.
+    """
+
+    def __init__(self, filename):
+        """
+        Map a snapshot file
+
+        Args:
+            filename: File written with file_format="mapped"
+        """
+        with open(filename, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self._views = [self._view]  # Released by close()
+
+        if len(self._map) < HEADER.size or self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError("Not a mapped library file")
+        magic, version, _, self.journal_seq, _, _, *table = HEADER.unpack_from(self._map)
+        if version > VERSION:
+            self.close()
+            raise ValueError(f"Mapped library file version {version} is newer than supported ({VERSION})")
+        self._sections = {name: (table[2 * index], table[2 * index + 1]) for index, name in enumerate(SECTIONS)}
+
+        self.name = self._bytes("NAME").decode("utf-8")
+        self.books = _MappedRecords(self, "BOOK", create_book_from_dict)
+        self.members = _MappedRecords(self, "MEMBER", create_member_from_dict)
+        self._book_types = self._section("BOOK_TYPES")
+        self._available = self._section("BOOK_AVAILABLE")
+        self._due = self._column("BOOK_DUE", "i")
+        self._search_at = self._column("BOOK_SEARCH_AT", "Q")
+        self._member_types = self._section("MEMBER_TYPES")
+        self._ledger = None  # Loan history, parsed on first use
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Unmap the file"""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+
+    def _bounds(self, name):
+        """Start and end of a section in the mapped file"""
+        offset, size = self._sections[name]
+        return offset, offset + size
+
+    def _bytes(self, name):
+        """Copy of a section's bytes"""
+        start, end = self._bounds(name)
+        return self._map[start:end]
+
+    def _section(self, name):
+        """Bytes of a section (a view into the mapped file)"""
+        offset, size = self._sections[name]
+        view = self._view[offset:offset + size]
+        self._views.append(view)
+        return view
+
+    def _column(self, name, typecode):
+        """Fixed-width section as a sequence of numbers, read in place when possible"""
+        section = self._section(name)
+        if sys.byteorder == "big":
+            values = array(typecode, section)
+            values.byteswap()
+            return values
+        view = section.cast(typecode)
+        self._views.append(view)
+        return view
+
+    # ---- Queries ----
+
+    def _books_at(self, rows):
+        """Build the books of some rows"""
+        return [self.books._record(row) for row in rows]
+
+    def _rows_where(self, column, code):
+        """Rows whose one-byte column value equals code"""
+        return compress(range(len(column)), map(code.__eq__, column))
+
+    def search_books(self, keyword, mode="substring"):
+        """
+        Search for books by title or author
+
+        Args:
+            keyword: Text to search for (case-insensitive)
+            mode: "substring" or "scan" match any part of the title or
+                  author, "token" matches whole words only
+
+        Returns:
+            list: Matching books in catalog order
+        """
+        if mode not in ("substring", "token", "scan"):
+            raise ValueError(f"Unknown search mode: {mode}")
+        tokens = set(tokenize(keyword)) if mode == "token" else None
+        if tokens is not None and not tokens:
+            return []
+
+        # Find the first word (or the whole keyword) with bytes.find, then
+        # check the rest of the words on the decoded candidates
+        needle = (min(tokens, key=len) if tokens else keyword.lower()).encode("utf-8")
+        start, end = self._bounds("BOOK_SEARCH")
+        rows = []
+        position = self._map.find(needle, start, end)
+        while position != -1:
+            row = bisect_right(self._search_at, position - start) - 1
+            rows.append(row)
+            # Continue from the next book's text, so each book is found once
+            if row + 1 == len(self._search_at):
+                break
+            position = self._map.find(needle, start + self._search_at[row + 1], end)
+
+        books = self._books_at(rows)
+        if tokens:
+            books = [book for book in books if tokens <= set(tokenize(book.title)) | set(tokenize(book.author))]
+        return books
+
+    def get_books_by_type(self, book_type):
+        """Get all books of a specific type"""
+        if book_type not in BOOK_TYPES:
+            return []
+        return self._books_at(self._rows_where(self._book_types, BOOK_TYPES.index(book_type)))
+
+    def get_members_by_type(self, member_type):
+        """Get all members of a specific type"""
+        if member_type not in MEMBER_TYPES:
+            return []
+        code = MEMBER_TYPES.index(member_type)
+        return [self.members._record(row) for row in self._rows_where(self._member_types, code)]
+
+    def get_available_books(self):
+        """Get all available books"""
+        return self._books_at(self._rows_where(self._available, 1))
+
+    def get_borrowed_books(self):
+        """Get all borrowed books"""
+        return self._books_at(self._rows_where(self._available, 0))
+
+    def count_books_by_type(self, book_type, available=None):
+        """Count books of a type, optionally only available or borrowed ones"""
+        if book_type not in BOOK_TYPES:
+            return 0
+        code = BOOK_TYPES.index(book_type)
+        if available is None:
+            return self._bytes("BOOK_TYPES").count(code)
+        flag = 1 if available else 0
+        return sum(1 for row in self._rows_where(self._book_types, code) if self._available[row] == flag)
+
+    def count_members_by_type(self, member_type):
+        """Count members of a type"""
+        if member_type not in MEMBER_TYPES:
+            return 0
+        return self._bytes("MEMBER_TYPES").count(MEMBER_TYPES.index(member_type))
+
+    def count_available_books(self):
+        """Count books on the shelf"""
+        return self._bytes("BOOK_AVAILABLE").count(1)
+
+    def count_borrowed_books(self):
+        """Count books on loan"""
+        return len(self.books) - self.count_available_books()
+
+    def get_overdue_books(self, as_of=None):
+        """Get books due before a date (default today), earliest due date first"""
+        as_of = today_ordinal() if as_of is None else to_ordinal(as_of)
+        return self._due_between(NO_DATE + 1, as_of)
+
+    def get_books_due_between(self, start, end):
+        """Get borrowed books due on or after start and before end, earliest first"""
+        return self._due_between(max(to_ordinal(start), NO_DATE + 1), to_ordinal(end))
+
+    def _due_between(self, start, end):
+        """Books with start <= due < end, by due date then catalog order"""
+        rows = [row for row, due in enumerate(self._due) if start <= due < end]
+        rows.sort(key=self._due.__getitem__)
+        return self._books_at(rows)
+
+    def get_member_borrowed_books(self, member_id):
+        """Get all books borrowed by a member"""
+        row = self.members._find(member_id)
+        if row is None:
+            return []
+        isbns = self.members._record_dict(row).get("borrowed_books", [])
+        return [self.books[isbn] for isbn in isbns if isbn in self.books]
+
+    def get_borrower(self, isbn):
+        """Get the member currently borrowing a book, or None"""
+        row = self.books._find(isbn)
+        if row is None:
+            return None
+        member_id = self.books._record_dict(row).get("borrowed_by")
+        return self.members.get(member_id) if member_id is not None else None
+
+    def _loan_dicts(self):
+        """Loan rows as saved"""
+        return json.loads(self._bytes("LOANS"))
+
+    def _loans(self):
+        """The loan history, parsed the first time it is needed"""
+        if self._ledger is None:
+            ledger = LoanLedger()
+            ledger.load_dicts(self._loan_dicts())
+            self._ledger = ledger
+        return self._ledger
+
+    def get_loan_history(self, isbn):
+        """Get every loan of a book, oldest first"""
+        return self._loans().history(isbn)
+
+    def get_member_loan_history(self, member_id):
+        """Get every loan by a member, oldest first"""
+        return self._loans().member_history(member_id)
+
+    def get_loans_per_month(self, isbn=None):
+        """Count loans by book and starting month"""
+        return self._loans().loans_per_month(isbn)
@@ -4,12 +4,21 @@ Demonstrates: Inheritance, Polymorphism, Encapsulation
 Classes: Member (base), StudentMember, TeacherMember
 """
 
-from datetime import datetime
+from dates import format_date, to_ordinal, today_ordinal
+from interning import intern_string
 
 
 class Member:
     """Base class representing a library member"""
 
+    # Slots instead of a per-instance __dict__ keep millions of members compact;
+    # __weakref__ lets SQLiteLibrary track the members callers still hold
+    __slots__ = ("_member_id", "_name", "_email", "_borrowed_books", "_join_ordinal", "_max_books",
+                 "__weakref__")
+
+    _member_type = "Member"  # Protected class attribute, the same for every instance
+    DEFAULT_MAX_BOOKS = 3  # Default borrowing limit for this member type
+
     def __init__(self, member_id, name, email):
         """
         Initialize a member
@@ -22,10 +31,9 @@ class Member:
         self._member_id = member_id  # Protected
         self._name = name  # Protected
         self._email = email  # Protected
-        self._borrowed_books = []  # Protected: List of ISBNs
-        self._join_date = datetime.now().strftime("%Y-%m-%d")
-        self._member_type = "Member"
-        self._max_books = 3  # Protected: Default borrowing limit
+        self._borrowed_books = {}  # Protected: ISBN -> None, an insertion-ordered set
+        self._join_ordinal = today_ordinal()  # Protected: join date as a day ordinal
+        self._max_books = self.DEFAULT_MAX_BOOKS  # Protected: can differ per member (restored from JSON)
 
     # Property for member_id (read-only)
     @property
@@ -33,6 +41,12 @@ class Member:
         """Get member ID"""
         return self._member_id
 
+    # Property for join_date (read-only)
+    @property
+    def join_date(self):
+        """Get the join date as a "YYYY-MM-DD" string"""
+        return format_date(self._join_ordinal)
+
     # Property for name
     @property
     def name(self):
@@ -60,8 +74,21 @@ class Member:
     # Property for borrowed books (read-only)
     @property
     def borrowed_books(self):
-        """Get list of borrowed book ISBNs"""
-        return self._borrowed_books.copy()  # Return copy to protect internal list
+        """Get list of borrowed book ISBNs, in borrowing order"""
+        return list(self._borrowed_books)  # Return copy to protect internal set
+
+    def iter_borrowed(self):
+        """Iterate over borrowed book ISBNs in borrowing order, without copying them"""
+        return iter(self._borrowed_books)
+
+    def has_borrowed(self, isbn):
+        """Check whether the member has a book on loan (without copying the list)"""
+        return isbn in self._borrowed_books
+
+    @property
+    def borrowed_count(self):
+        """Get number of books currently borrowed"""
+        return len(self._borrowed_books)
 
     # Property for max books
     @property
@@ -94,7 +121,7 @@ class Member:
         if not self.can_borrow():
             return False, f"Borrowing limit reached ({self._max_books} books)"
 
-        self._borrowed_books.append(isbn)
+        self._borrowed_books[isbn] = None
         return True, "Book added to borrowed list"
 
     def return_book(self, isbn):
@@ -110,7 +137,7 @@ class Member:
         if isbn not in self._borrowed_books:
             return False, "Book not in borrowed list"
 
-        self._borrowed_books.remove(isbn)
+        del self._borrowed_books[isbn]
         return True, "Book removed from borrowed list"
 
     def get_info(self):
@@ -129,8 +156,8 @@ class Member:
             "member_id": self._member_id,
             "name": self._name,
             "email": self._email,
-            "borrowed_books": self._borrowed_books,
-            "join_date": self._join_date,
+            "borrowed_books": list(self._borrowed_books),
+            "join_date": self.join_date,
             "max_books": self._max_books
         }
 
@@ -138,6 +165,11 @@ class Member:
 class StudentMember(Member):
     """Student member with student ID and major"""
 
+    __slots__ = ("student_id", "major")
+
+    _member_type = "Student"
+    DEFAULT_MAX_BOOKS = 5  # Students can borrow more books
+
     def __init__(self, member_id, name, email, student_id, major):
         """
         Initialize a student member
@@ -152,8 +184,6 @@ class StudentMember(Member):
         super().__init__(member_id, name, email)
         self.student_id = student_id
         self.major = major
-        self._member_type = "Student"
-        self._max_books = 5  # Students can borrow more books
 
     def get_info(self):
         """Get student-specific information - polymorphic override"""
@@ -173,6 +203,11 @@ class StudentMember(Member):
 class TeacherMember(Member):
     """Teacher member with department and faculty ID"""
 
+    __slots__ = ("faculty_id", "department", "_extended_loan")
+
+    _member_type = "Teacher"
+    DEFAULT_MAX_BOOKS = 10  # Teachers can borrow most books
+
     def __init__(self, member_id, name, email, faculty_id, department):
         """
         Initialize a teacher member
@@ -187,8 +222,6 @@ class TeacherMember(Member):
         super().__init__(member_id, name, email)
         self.faculty_id = faculty_id
         self.department = department
-        self._member_type = "Teacher"
-        self._max_books = 10  # Teachers can borrow most books
         self._extended_loan = True  # Teachers get extended loan periods
 
     @property
@@ -239,7 +272,7 @@ def create_member_from_dict(data):
             data["name"],
             data["email"],
             data.get("student_id", ""),
-            data.get("major", "")
+            intern_string("major", data.get("major", ""))
         )
     elif member_type == "Teacher":
         member = TeacherMember(
@@ -247,15 +280,15 @@ def create_member_from_dict(data):
             data["name"],
             data["email"],
             data.get("faculty_id", ""),
-            data.get("department", "")
+            intern_string("department", data.get("department", ""))
         )
         member._extended_loan = data.get("extended_loan", True)
     else:
         member = Member(data["member_id"], data["name"], data["email"])
 
     # Restore borrowing state
-    member._borrowed_books = data.get("borrowed_books", [])
-    member._join_date = data.get("join_date", datetime.now().strftime("%Y-%m-%d"))
+    member._borrowed_books = dict.fromkeys(data.get("borrowed_books", []))
+    member._join_ordinal = to_ordinal(data.get("join_date")) or today_ordinal()
     member._max_books = data.get("max_books", member._max_books)
 
     return member
@@ -4,7 +4,7 @@ Demonstrates: Generators, yield statement
 Functions for generating reports efficiently
 """
 
-from datetime import datetime
+from dates import today_ordinal
 
 
 def generate_book_catalog(library):
@@ -47,21 +47,22 @@ def generate_borrowed_books_report(library):
     Yields:
         dict: Information about each borrowed book
     """
-    for book in library.books.values():
-        if not book.is_available:
-            borrower = library.members.get(book.borrowed_by)
-
-            yield {
-                "isbn": book.isbn,
-                "title": book.title,
-                "author": book.author,
-                "type": book._type,
-                "borrowed_by_id": book.borrowed_by,
-                "borrowed_by_name": borrower.name if borrower else "Unknown",
-                "borrower_type": borrower._member_type if borrower else "Unknown",
-                "due_date": book.due_date,
-                "is_overdue": book.due_date < datetime.now().strftime("%Y-%m-%d") if book.due_date else False
-            }
+    today = today_ordinal()
+
+    for book in library.get_borrowed_books():
+        borrower = library.members.get(book.borrowed_by)
+
+        yield {
+            "isbn": book.isbn,
+            "title": book.title,
+            "author": book.author,
+            "type": book._type,
+            "borrowed_by_id": book.borrowed_by,
+            "borrowed_by_name": borrower.name if borrower else "Unknown",
+            "borrower_type": borrower._member_type if borrower else "Unknown",
+            "due_date": book.due_date,
+            "is_overdue": book.due_ordinal < today if book.due_ordinal is not None else False
+        }
 
 
 def generate_overdue_report(library):
@@ -74,26 +75,23 @@ def generate_overdue_report(library):
     Yields:
         dict: Information about each overdue book
     """
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = today_ordinal()
 
-    for book in library.books.values():
-        if not book.is_available and book.due_date and book.due_date < today:
-            borrower = library.members.get(book.borrowed_by)
+    # The library's due-date index returns only overdue books, earliest first
+    for book in library.get_overdue_books():
+        borrower = library.members.get(book.borrowed_by)
 
-            # Calculate days overdue
-            from datetime import datetime as dt
-            due_date_obj = dt.strptime(book.due_date, "%Y-%m-%d")
-            today_obj = dt.now()
-            days_overdue = (today_obj - due_date_obj).days
+        # Days overdue is a plain subtraction of day ordinals
+        days_overdue = today - book.due_ordinal
 
-            yield {
-                "isbn": book.isbn,
-                "title": book.title,
-                "borrower_name": borrower.name if borrower else "Unknown",
-                "borrower_email": borrower.email if borrower else "Unknown",
-                "due_date": book.due_date,
-                "days_overdue": days_overdue
-            }
+        yield {
+            "isbn": book.isbn,
+            "title": book.title,
+            "borrower_name": borrower.name if borrower else "Unknown",
+            "borrower_email": borrower.email if borrower else "Unknown",
+            "due_date": book.due_date,
+            "days_overdue": days_overdue
+        }
 
 
 def generate_member_activity_report(library):
@@ -108,19 +106,17 @@ def generate_member_activity_report(library):
     """
     for member in library.members.values():
         # Get books currently borrowed
-        borrowed_books = []
-        for isbn in member._borrowed_books:
-            if isbn in library.books:
-                borrowed_books.append(library.books[isbn].title)
+        borrowed_books = [book.title for book in library.get_member_borrowed_books(member.member_id)]
+        books_borrowed = member.borrowed_count
 
         yield {
             "member_id": member.member_id,
             "name": member.name,
             "email": member.email,
             "type": member._member_type,
-            "books_borrowed": len(member._borrowed_books),
+            "books_borrowed": books_borrowed,
             "max_books": member.max_books,
-            "utilization": f"{(len(member._borrowed_books) / member.max_books * 100):.1f}%",
+            "utilization": f"{(books_borrowed / member.max_books * 100):.1f}%",
             "borrowed_titles": borrowed_books
         }
 
@@ -139,23 +135,23 @@ def generate_statistics_by_type(library):
     book_types = ["Book", "EBook", "PhysicalBook"]
 
     for book_type in book_types:
-        books_of_type = [b for b in library.books.values() if b._type == book_type]
-        available = len([b for b in books_of_type if b.is_available])
+        total = library.count_books_by_type(book_type)
+        available = library.count_books_by_type(book_type, available=True)
 
         yield {
             "category": "Book Type",
             "type": book_type,
-            "total": len(books_of_type),
+            "total": total,
             "available": available,
-            "borrowed": len(books_of_type) - available
+            "borrowed": total - available
         }
 
     # Member type statistics
     member_types = ["Member", "Student", "Teacher"]
 
     for member_type in member_types:
-        members_of_type = [m for m in library.members.values() if m._member_type == member_type]
-        active = len([m for m in members_of_type if len(m._borrowed_books) > 0])
+        members_of_type = library.get_members_by_type(member_type)
+        active = len([m for m in members_of_type if m.borrowed_count > 0])
 
         yield {
             "category": "Member Type",
@@ -166,6 +162,30 @@ def generate_statistics_by_type(library):
         }
 
 
+def generate_circulation_report(library):
+    """
+    Generator that yields how many times each title was lent per month
+
+    Counted from the loan ledger, so returned loans are included and the
+    catalog is only read for titles.
+
+    Args:
+        library: Library object or snapshot
+
+    Yields:
+        dict: isbn, title, month ("YYYY-MM") and loans, by ISBN then month
+    """
+    for (isbn, month), loans in sorted(library.get_loans_per_month().items()):
+        book = library.books.get(isbn)
+
+        yield {
+            "isbn": isbn,
+            "title": book.title if book else "Unknown",
+            "month": month,
+            "loans": loans
+        }
+
+
 def generate_paginated_books(library, page_size=10):
     """
     Generator that yields books in pages
@@ -237,6 +257,10 @@ def print_full_report(library):
     Args:
         library: Library object
     """
+    # Report on a consistent point-in-time view while borrowing continues
+    if hasattr(library, "snapshot"):
+        library = library.snapshot()
+
     print("\n" + "=" * 80)
     print(" " * 25 + "LIBRARY COMPREHENSIVE REPORT")
     print("=" * 80)
@@ -0,0 +1,237 @@
+"""
+Week 8 Project: Search Index
+Inverted indexes that keep book searches fast on large catalogs
+"""
+
+import re
+import threading
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """
+    Split text into lowercase word tokens
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        list: Lowercase tokens
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def ngrams(text, size):
+    """
+    Get the set of character n-grams in a string
+
+    Args:
+        text: Lowercase text
+        size: Length of each n-gram
+
+    Returns:
+        set: Distinct n-grams of the given size
+    """
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class SearchIndex:
+    """
+    Token and n-gram inverted index over book titles and authors
+
+    Every indexed book is recorded under each word token and each character
+    n-gram of its title and author. A substring query intersects the
+    posting sets of the keyword's n-grams and then verifies the few
+    remaining candidates, so its cost follows the number of matches instead
+    of the size of the catalog.
+    """
+
+    def __init__(self, ngram_size=3):
+        """
+        Initialize an empty index
+
+        Args:
+            ngram_size: Length of the character n-grams used for substring search
+        """
+        self.ngram_size = ngram_size
+        self._tokens = {}  # token -> set of ISBNs
+        self._ngrams = {}  # n-gram -> set of ISBNs
+        self._fields = {}  # ISBN -> (lowercase title, lowercase author)
+        self._order = {}  # ISBN -> insertion sequence number
+        self._next_order = 0
+        self._pending = {}  # ISBN -> (title, author) queued by defer()
+        self._flush_lock = threading.Lock()
+
+    def __len__(self):
+        """Number of indexed books"""
+        self._flush()
+        return len(self._fields)
+
+    def __contains__(self, isbn):
+        """Check whether a book is indexed"""
+        self._flush()
+        return isbn in self._fields
+
+    def add(self, book):
+        """
+        Index a book by its title and author
+
+        Args:
+            book: Book object to index
+        """
+        self._flush()
+        self._add(book.isbn, book.title, book.author)
+
+    def defer(self, isbn, title, author):
+        """
+        Queue a book to be indexed the first time the index is used
+
+        Lets a large catalog load without paying for indexing until someone
+        searches. Queued books keep their place in catalog order.
+
+        Args:
+            isbn: ISBN of the book
+            title: Book title
+            author: Author name
+        """
+        self._pending[isbn] = (title, author)
+
+    def _flush(self):
+        """Index every queued book"""
+        if not self._pending:
+            return
+
+        with self._flush_lock:
+            # Clear the queue only when done, so other callers wait on the lock
+            for isbn, (title, author) in self._pending.items():
+                self._add(isbn, title, author)
+            self._pending = {}
+
+    def _add(self, isbn, title, author):
+        """Index one book's title and author (nothing changes if they are not text)"""
+        title = title.lower()
+        author = author.lower()
+        if isbn in self._fields:
+            self._remove_indexed(isbn)
+
+        self._fields[isbn] = (title, author)
+        self._order[isbn] = self._next_order
+        self._next_order += 1
+
+        for token in set(tokenize(title)) | set(tokenize(author)):
+            self._tokens.setdefault(token, set()).add(isbn)
+
+        for gram in ngrams(title, self.ngram_size) | ngrams(author, self.ngram_size):
+            self._ngrams.setdefault(gram, set()).add(isbn)
+
+    def remove(self, isbn):
+        """
+        Remove a book from the index
+
+        Args:
+            isbn: ISBN of the book to remove
+
+        Returns:
+            bool: True if the book was indexed, False otherwise
+        """
+        was_pending = self._pending.pop(isbn, None) is not None
+        return self._remove_indexed(isbn) or was_pending
+
+    def _remove_indexed(self, isbn):
+        """Remove a book's postings (ignores the deferred queue)"""
+        fields = self._fields.pop(isbn, None)
+        if fields is None:
+            return False
+
+        del self._order[isbn]
+        title, author = fields
+
+        for token in set(tokenize(title)) | set(tokenize(author)):
+            self._discard(self._tokens, token, isbn)
+
+        for gram in ngrams(title, self.ngram_size) | ngrams(author, self.ngram_size):
+            self._discard(self._ngrams, gram, isbn)
+
+        return True
+
+    def clear(self):
+        """Remove every book from the index"""
+        self._pending.clear()
+        self._tokens.clear()
+        self._ngrams.clear()
+        self._fields.clear()
+        self._order.clear()
+
+    def search_substring(self, keyword):
+        """
+        Find books whose title or author contains the keyword
+
+        Matches exactly what a case-insensitive substring scan would return.
+
+        Args:
+            keyword: Text to look for
+
+        Returns:
+            list: Matching ISBNs in the order the books were indexed
+        """
+        self._flush()
+        keyword = keyword.lower()
+
+        if len(keyword) < self.ngram_size:
+            # Too short to use the n-gram index, fall back to scanning
+            candidates = self._fields.keys()
+        else:
+            candidates = self._intersect(self._ngrams, ngrams(keyword, self.ngram_size))
+
+        matches = [isbn for isbn in candidates
+                   if keyword in self._fields[isbn][0] or keyword in self._fields[isbn][1]]
+        return self._in_order(matches)
+
+    def search_tokens(self, keyword):
+        """
+        Find books containing every word of the keyword as a whole word
+
+        Args:
+            keyword: One or more words to look for
+
+        Returns:
+            list: Matching ISBNs in the order the books were indexed
+        """
+        self._flush()
+        tokens = set(tokenize(keyword))
+        if not tokens:
+            return []
+
+        return self._in_order(self._intersect(self._tokens, tokens))
+
+    def _intersect(self, postings, keys):
+        """Intersect posting sets, starting from the smallest one"""
+        sets = []
+        for key in keys:
+            posting = postings.get(key)
+            if not posting:
+                return set()
+            sets.append(posting)
+
+        sets.sort(key=len)
+        result = set(sets[0])
+        for posting in sets[1:]:
+            result &= posting
+            if not result:
+                break
+
+        return result
+
+    def _in_order(self, isbns):
+        """Sort ISBNs back into catalog order"""
+        return sorted(isbns, key=self._order.__getitem__)
+
+    @staticmethod
+    def _discard(postings, key, isbn):
+        """Remove an ISBN from a posting set, dropping the set when empty"""
+        posting = postings.get(key)
+        if posting is not None:
+            posting.discard(isbn)
+            if not posting:
+                del postings[key]
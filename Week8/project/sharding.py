@@ -0,0 +1,793 @@
+"""
+Week 8 Project: Sharded Library
+Spreads books and members across several worker processes
+"""
+
+import heapq
+import multiprocessing
+import threading
+import zlib
+from collections import Counter
+from collections.abc import Mapping
+from itertools import islice
+
+from binary_format import read_library, save_library
+from books import create_book_from_dict
+from dates import to_ordinal, today_ordinal
+from members import create_member_from_dict
+from interning import StringPool
+from library import Library
+
+
+IMPORT_BATCH = 10_000  # Records sent to a shard per import_records call by load_from_file
+EXPORT_PAGE = 10_000  # Records a shard sends per export_page call during save_to_file
+
+
+class ShardLibrary(Library):
+    """
+    The part of a sharded library that lives in one worker process
+
+    Besides the normal Library methods it has the two halves of a loan, so
+    a member on one shard can borrow a book held by another shard:
+    reserve a slot on the member's shard, then lend the book on the book's
+    shard (or release the slot again if lending fails).
+    """
+
+    def reserve_loans(self, loans):
+        """
+        Reserve borrowing slots for members on this shard (all-or-nothing)
+
+        Args:
+            loans: List of (member_id, isbn) pairs
+
+        Returns:
+            tuple: (success, errors: {position: message}, loan periods in days)
+        """
+        member_ids = [member_id for member_id, _ in loans]
+
+        with self._member_locks.hold(*member_ids), self._state_lock:
+            errors = {}
+            pending = {}
+
+            for position, (member_id, isbn) in enumerate(loans):
+                member = self.members.get(member_id)
+
+                if member is None:
+                    errors[position] = "Member not found"
+                elif member.has_borrowed(isbn):
+                    errors[position] = "Book already borrowed by this member"
+                elif member.borrowed_count + pending.get(member_id, 0) >= member.max_books:
+                    errors[position] = f"Borrowing limit reached ({member.max_books} books)"
+                else:
+                    pending[member_id] = pending.get(member_id, 0) + 1
+
+            if errors:
+                return False, errors, []
+
+            for member_id, isbn in loans:
+                self._writable_member(self.members[member_id]).borrow_book(isbn)
+
+            return True, {}, [self._loan_period(self.members[member_id]) for member_id in member_ids]
+
+    def release_loans(self, loans):
+        """
+        Give back borrowing slots taken by reserve_loans or a returned book
+
+        Args:
+            loans: List of (member_id, isbn) pairs
+        """
+        member_ids = [member_id for member_id, _ in loans]
+
+        with self._member_locks.hold(*member_ids), self._state_lock:
+            for member_id, isbn in loans:
+                if member_id in self.members:
+                    self._writable_member(self.members[member_id]).return_book(isbn)
+
+    def lend_books(self, loans):
+        """
+        Mark books on this shard as borrowed (all-or-nothing)
+
+        Args:
+            loans: List of (member_id, isbn, days, due_date) tuples. due_date
+                   may be None to count the loan period from today.
+
+        Returns:
+            tuple: (success, errors: {position: message}, due dates)
+        """
+        isbns = [loan[1] for loan in loans]
+
+        with self._book_locks.hold(*isbns), self._state_lock:
+            errors = {}
+            seen = set()
+
+            for position, isbn in enumerate(isbns):
+                if isbn not in self.books:
+                    errors[position] = "Book not found"
+                elif isbn in seen:
+                    errors[position] = "Book appears more than once in batch"
+                elif not self.books[isbn].is_available:
+                    errors[position] = "Book is already borrowed"
+                seen.add(isbn)
+
+            if errors:
+                return False, errors, []
+
+            due_dates = []
+            for member_id, isbn, days, due_date in loans:
+                due = to_ordinal(due_date) if due_date is not None else today_ordinal() + days
+                book = self._lend(self.books[isbn], member_id, due)
+                due_dates.append(book.due_date)
+
+            return True, {}, due_dates
+
+    def receive_books(self, returns):
+        """
+        Mark books on this shard as returned (all-or-nothing)
+
+        Args:
+            returns: List of (member_id, isbn) pairs
+
+        Returns:
+            tuple: (success, errors: {position: message}, previous due dates)
+        """
+        isbns = [isbn for _, isbn in returns]
+
+        with self._book_locks.hold(*isbns), self._state_lock:
+            errors = {}
+            seen = set()
+
+            for position, (member_id, isbn) in enumerate(returns):
+                book = self.books.get(isbn)
+                if book is None:
+                    errors[position] = "Book not found"
+                elif isbn in seen:
+                    errors[position] = "Book appears more than once in batch"
+                elif book.borrowed_by != member_id:
+                    errors[position] = "This book was not borrowed by this member"
+                seen.add(isbn)
+
+            if errors:
+                return False, errors, []
+
+            due_dates = []
+            for _, isbn in returns:
+                book = self.books[isbn]
+                due_dates.append(book.due_date)
+                self._take_back(book)
+
+            return True, {}, due_dates
+
+    def unlend_books(self, isbns):
+        """
+        Undo lend_books for a batch another shard refused
+
+        The books are put back on the shelf and their ledger rows removed,
+        so the loans that never happened leave no history.
+
+        Args:
+            isbns: ISBNs lent by one lend_books call
+        """
+        with self._book_locks.hold(*isbns), self._state_lock:
+            for isbn in reversed(isbns):
+                row = self.ledger.cancel_loan(isbn)
+                self._dirty_loans.pop(row, None)
+                book = self.books[isbn]
+                self._dirty_books[isbn] = None
+                self._dirty_members[book.borrowed_by] = None
+                book = book.without_loan()
+                self.books[isbn] = book
+                self._mark_available(book)
+
+    def unreceive_books(self, returns):
+        """
+        Undo receive_books for a batch another shard refused
+
+        Each book's closed ledger row is reopened, so its history keeps a
+        single loan with the original start and due dates.
+
+        Args:
+            returns: List of (member_id, isbn) pairs received by one call
+        """
+        isbns = [isbn for _, isbn in returns]
+
+        with self._book_locks.hold(*isbns), self._state_lock:
+            for member_id, isbn in returns:
+                loan = self.ledger.reopen_loan(isbn)
+                self._dirty_books[isbn] = None
+                self._dirty_members[member_id] = None
+                book = self.books[isbn].with_loan(member_id, loan.due)
+                self.books[isbn] = book
+                self._mark_borrowed(book)
+
+    def has_member(self, member_id):
+        """Check whether a member lives on this shard"""
+        return member_id in self.members
+
+    def get_books(self, isbns):
+        """Get the books on this shard with the given ISBNs"""
+        return [self.books[isbn] for isbn in isbns if isbn in self.books]
+
+    def get_members(self, member_ids):
+        """Get the members on this shard with the given IDs"""
+        return [self.members[member_id] for member_id in member_ids if member_id in self.members]
+
+    def list_books(self):
+        """Get every book on this shard"""
+        with self._state_lock:
+            return list(self.books.values())
+
+    def list_members(self):
+        """Get every member on this shard"""
+        with self._state_lock:
+            return list(self.members.values())
+
+    def list_isbns(self):
+        """Get every ISBN on this shard"""
+        with self._state_lock:
+            return list(self.books)
+
+    def list_member_ids(self):
+        """Get every member ID on this shard"""
+        with self._state_lock:
+            return list(self.members)
+
+    def count_books(self):
+        """Count books on this shard"""
+        return len(self.books)
+
+    def count_members(self):
+        """Count members on this shard"""
+        return len(self.members)
+
+    def begin_export(self):
+        """Take the snapshot that export_page reads from"""
+        view = self.snapshot()
+        self._export = {"loans": view.loans.to_dicts(), "books": view.book_dicts(),
+                        "members": view.member_dicts()}
+
+    def export_page(self, kind):
+        """
+        Get the next records of one kind from the begin_export snapshot
+
+        Args:
+            kind: "loans", "books" or "members"
+
+        Returns:
+            list: Up to EXPORT_PAGE dictionaries, empty once all were sent
+        """
+        return list(islice(self._export[kind], EXPORT_PAGE))
+
+    def import_records(self, book_records, member_records, loan_records=()):
+        """
+        Add books, members and loans from dictionaries
+
+        May be called several times. Loans go before the books in each
+        call; loans of books from earlier calls must all come in one call
+        (see Library._load_loans).
+        """
+        if loan_records:
+            self._load_loans(loan_records)
+        with StringPool():
+            for record in book_records:
+                self._store_book(create_book_from_dict(record))
+            for record in member_records:
+                self._store_member(create_member_from_dict(record))
+
+
+def _serve_shard(connection, name):
+    """
+    Worker process loop: run ShardLibrary methods sent over a pipe
+
+    Each message is (method_name, args). The reply is (True, result) or
+    (False, exception). A None message stops the worker.
+    """
+    library = ShardLibrary(name)
+
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+
+        method, args = message
+        try:
+            connection.send((True, getattr(library, method)(*args)))
+        except Exception as error:
+            connection.send((False, error))
+
+    connection.close()
+
+
+class _ShardedMapping(Mapping):
+    """Read-only dict-like view over books or members spread across shards"""
+
+    def __init__(self, library, kind):
+        self._library = library
+        self._kind = kind  # "books" or "members"
+
+    def __getitem__(self, key):
+        shard = self._library._shard_for(key)
+        getter = "get_books" if self._kind == "books" else "get_members"
+        found = self._library._call(shard, getter, [key])
+        if not found:
+            raise KeyError(key)
+        return found[0]
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        lister = "list_isbns" if self._kind == "books" else "list_member_ids"
+        return iter(self._library._gather(lister))
+
+    def __len__(self):
+        counter = "count_books" if self._kind == "books" else "count_members"
+        return sum(self._library._scatter_all(counter))
+
+    def values(self):
+        """Fetch every record with one request per shard"""
+        lister = "list_books" if self._kind == "books" else "list_members"
+        return self._library._gather(lister)
+
+    def items(self):
+        """Fetch every (key, record) pair with one request per shard"""
+        key_of = (lambda book: book.isbn) if self._kind == "books" else (lambda member: member.member_id)
+        return [(key_of(record), record) for record in self.values()]
+
+
+class ShardedLibrary:
+    """
+    Library whose books and members are partitioned across worker processes
+
+    Books are placed by a stable hash of their ISBN and members by a hash of
+    their member ID. Operations on one key go to the shard that owns it;
+    queries over the whole catalog are sent to every shard at once and the
+    answers are combined. Objects returned by queries are copies, so
+    changes must go through the library's methods.
+    """
+
+    def __init__(self, name, num_shards=4):
+        """
+        Start the worker processes
+
+        Args:
+            name: Name of the library
+            num_shards: Number of worker processes
+        """
+        self.name = name
+        self.num_shards = num_shards
+        self.books = _ShardedMapping(self, "books")
+        self.members = _ShardedMapping(self, "members")
+        self._connections = []
+        self._processes = []
+        self._shard_locks = [threading.Lock() for _ in range(num_shards)]
+        self._save_lock = threading.Lock()  # One save at a time: each shard keeps one export snapshot
+
+        for _ in range(num_shards):
+            parent_end, child_end = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_serve_shard, args=(child_end, name), daemon=True)
+            process.start()
+            child_end.close()
+            self._connections.append(parent_end)
+            self._processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Stop the worker processes"""
+        for connection, process in zip(self._connections, self._processes):
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            process.join(timeout=5)
+            connection.close()
+        self._connections = []
+        self._processes = []
+
+    def _shard_for(self, key):
+        """Get the shard number that owns a key (same in every process)"""
+        return zlib.crc32(str(key).encode("utf-8")) % self.num_shards
+
+    def _call(self, shard, method, *args):
+        """Run a method on one shard and wait for the answer"""
+        return self._scatter({shard: (method, args)})[shard]
+
+    def _scatter(self, calls):
+        """
+        Send calls to several shards at once, then collect the answers
+
+        Args:
+            calls: Dictionary of shard number -> (method_name, args)
+
+        Returns:
+            dict: Shard number -> result
+        """
+        shards = sorted(calls)
+        for shard in shards:
+            self._shard_locks[shard].acquire()
+
+        try:
+            for shard in shards:
+                self._connections[shard].send(calls[shard])
+
+            replies = {shard: self._connections[shard].recv() for shard in shards}
+        finally:
+            for shard in reversed(shards):
+                self._shard_locks[shard].release()
+
+        results = {}
+        for shard, (ok, value) in replies.items():
+            if not ok:
+                raise value
+            results[shard] = value
+        return results
+
+    def _scatter_all(self, method, *args):
+        """Run the same call on every shard, returning results in shard order"""
+        results = self._scatter({shard: (method, args) for shard in range(self.num_shards)})
+        return [results[shard] for shard in range(self.num_shards)]
+
+    def _gather(self, method, *args):
+        """Run the same list-returning call on every shard and join the lists"""
+        return [item for part in self._scatter_all(method, *args) for item in part]
+
+    def _group_by_shard(self, items, key):
+        """Group (position, item) pairs by the shard that owns key(item)"""
+        groups = {}
+        for position, item in enumerate(items):
+            groups.setdefault(self._shard_for(key(item)), []).append((position, item))
+        return groups
+
+    # ---- Single-key operations ----
+
+    def add_book(self, book):
+        """Add a book to the shard that owns its ISBN"""
+        return self._call(self._shard_for(book.isbn), "add_book", book)
+
+    def remove_book(self, isbn):
+        """Remove a book from the shard that owns it"""
+        return self._call(self._shard_for(isbn), "remove_book", isbn)
+
+    def add_member(self, member):
+        """Add a member to the shard that owns its member ID"""
+        return self._call(self._shard_for(member.member_id), "add_member", member)
+
+    def remove_member(self, member_id):
+        """Remove a member from the shard that owns it"""
+        return self._call(self._shard_for(member_id), "remove_member", member_id)
+
+    def borrow_book(self, member_id, isbn):
+        """
+        Process a book borrowing transaction
+
+        When the member and book are on different shards the loan is made in
+        two steps: reserve a slot on the member's shard, then lend the book on
+        the book's shard, releasing the slot if the book cannot be lent.
+        """
+        member_shard = self._shard_for(member_id)
+        book_shard = self._shard_for(isbn)
+
+        if member_shard == book_shard:
+            return self._call(member_shard, "borrow_book", member_id, isbn)
+
+        success, results = self.borrow_many([(member_id, isbn)])
+        if not success:
+            return False, results[0][1]
+        return True, f"Book borrowed successfully. Due date: {results[0][1]}"
+
+    def return_book(self, member_id, isbn):
+        """Process a book return transaction"""
+        member_shard = self._shard_for(member_id)
+        book_shard = self._shard_for(isbn)
+
+        if member_shard == book_shard:
+            return self._call(member_shard, "return_book", member_id, isbn)
+
+        if not self._call(member_shard, "has_member", member_id):
+            return False, "Member not found"
+
+        success, results = self.return_many([(member_id, isbn)])
+        if not success:
+            return False, results[0][1]
+        return True, "Book returned successfully"
+
+    # ---- Batches (two-step protocol across shards) ----
+
+    def borrow_many(self, loans, filename=None):
+        """
+        Borrow a batch of books as a single all-or-nothing transaction
+
+        Step 1 reserves slots on every member shard. Step 2 lends the books on
+        every book shard. If any shard refuses, the steps that already
+        succeeded are undone and nothing changes.
+
+        Args:
+            loans: Iterable of (member_id, isbn) pairs
+            filename: Optional path to save the library to once the batch is applied
+
+        Returns:
+            tuple: (success: bool, results: list of (success, message) per item,
+                    where the message of a successful loan is its due date)
+        """
+        loans = list(loans)
+        errors = {}
+
+        # Step 1: reserve member slots
+        member_groups = self._group_by_shard(loans, key=lambda loan: loan[0])
+        replies = self._scatter({shard: ("reserve_loans", ([loan for _, loan in group],))
+                                 for shard, group in member_groups.items()})
+
+        days = {}
+        reserved = []
+        for shard, (ok, shard_errors, periods) in replies.items():
+            group = member_groups[shard]
+            if ok:
+                reserved.append(shard)
+                for (position, _), period in zip(group, periods):
+                    days[position] = period
+            else:
+                for local, message in shard_errors.items():
+                    errors[group[local][0]] = message
+
+        if errors:
+            self._release(member_groups, reserved)
+            return False, Library._batch_rejected(len(loans), errors)
+
+        # Step 2: lend the books
+        book_groups = self._group_by_shard(loans, key=lambda loan: loan[1])
+        replies = self._scatter({shard: ("lend_books", ([(member_id, isbn, days[position], None)
+                                                         for position, (member_id, isbn) in group],))
+                                 for shard, group in book_groups.items()})
+
+        due_dates = {}
+        lent = []
+        for shard, (ok, shard_errors, shard_due_dates) in replies.items():
+            group = book_groups[shard]
+            if ok:
+                lent.append(shard)
+                for (position, _), due_date in zip(group, shard_due_dates):
+                    due_dates[position] = due_date
+            else:
+                for local, message in shard_errors.items():
+                    errors[group[local][0]] = message
+
+        if errors:
+            self._scatter({shard: ("unlend_books", ([isbn for _, (_, isbn) in book_groups[shard]],))
+                           for shard in lent})
+            self._release(member_groups, member_groups)
+            return False, Library._batch_rejected(len(loans), errors)
+
+        if filename:
+            self.save_to_file(filename)
+
+        return True, [(True, due_dates[position]) for position in range(len(loans))]
+
+    def return_many(self, returns, filename=None):
+        """
+        Return a batch of books as a single all-or-nothing transaction
+
+        Books are marked returned on their shards first, then the members'
+        slots are released. If any book shard refuses, the returns already
+        made are undone, keeping each book's original loan.
+
+        Args:
+            returns: Iterable of (member_id, isbn) pairs
+            filename: Optional path to save the library to once the batch is applied
+
+        Returns:
+            tuple: (success: bool, results: list of (success, message) per item)
+        """
+        returns = list(returns)
+        errors = {}
+
+        book_groups = self._group_by_shard(returns, key=lambda item: item[1])
+        replies = self._scatter({shard: ("receive_books", ([item for _, item in group],))
+                                 for shard, group in book_groups.items()})
+
+        received = []
+        for shard, (ok, shard_errors, _) in replies.items():
+            group = book_groups[shard]
+            if ok:
+                received.append(shard)
+            else:
+                for local, message in shard_errors.items():
+                    errors[group[local][0]] = message
+
+        if errors:
+            if received:
+                self._scatter({shard: ("unreceive_books", ([item for _, item in book_groups[shard]],))
+                               for shard in received})
+            return False, Library._batch_rejected(len(returns), errors)
+
+        self._release(self._group_by_shard(returns, key=lambda item: item[0]))
+
+        if filename:
+            self.save_to_file(filename)
+
+        return True, [(True, "Returned")] * len(returns)
+
+    def _release(self, member_groups, shards=None):
+        """Release member slots on the given shards (all shards in the groups by default)"""
+        shards = member_groups if shards is None else shards
+        if shards:
+            self._scatter({shard: ("release_loans", ([loan for _, loan in member_groups[shard]],))
+                           for shard in shards})
+
+    # ---- Scatter/gather queries ----
+
+    def search_books(self, keyword, mode="substring"):
+        """Search every shard for books by title or author"""
+        return self._gather("search_books", keyword, mode)
+
+    def get_books_by_type(self, book_type):
+        """Get all books of a specific type"""
+        return self._gather("get_books_by_type", book_type)
+
+    def get_members_by_type(self, member_type):
+        """Get all members of a specific type"""
+        return self._gather("get_members_by_type", member_type)
+
+    def get_available_books(self):
+        """Get all available books"""
+        return self._gather("get_available_books")
+
+    def get_borrowed_books(self):
+        """Get all borrowed books"""
+        return self._gather("get_borrowed_books")
+
+    def count_books_by_type(self, book_type, available=None):
+        """Count books of a specific type across all shards"""
+        return sum(self._scatter_all("count_books_by_type", book_type, available))
+
+    def count_members_by_type(self, member_type):
+        """Count members of a specific type across all shards"""
+        return sum(self._scatter_all("count_members_by_type", member_type))
+
+    def count_available_books(self):
+        """Count available books across all shards"""
+        return sum(self._scatter_all("count_available_books"))
+
+    def count_borrowed_books(self):
+        """Count borrowed books across all shards"""
+        return sum(self._scatter_all("count_borrowed_books"))
+
+    def get_overdue_books(self, as_of=None):
+        """Get all overdue books, earliest due date first"""
+        parts = self._scatter_all("get_overdue_books", as_of)
+        return list(heapq.merge(*parts, key=lambda book: book.due_ordinal))
+
+    def get_books_due_between(self, start, end):
+        """Get borrowed books due on or after start and before end"""
+        parts = self._scatter_all("get_books_due_between", start, end)
+        return list(heapq.merge(*parts, key=lambda book: book.due_ordinal))
+
+    def get_member_borrowed_books(self, member_id):
+        """Get all books borrowed by a specific member"""
+        members = self._call(self._shard_for(member_id), "get_members", [member_id])
+        if not members:
+            return []
+
+        isbns = members[0].borrowed_books
+        groups = self._group_by_shard(isbns, key=lambda isbn: isbn)
+        replies = self._scatter({shard: ("get_books", ([isbn for _, isbn in group],))
+                                 for shard, group in groups.items()})
+
+        found = {book.isbn: book for books in replies.values() for book in books}
+        return [found[isbn] for isbn in isbns if isbn in found]
+
+    def get_borrower(self, isbn):
+        """Get the member currently borrowing a book"""
+        books = self._call(self._shard_for(isbn), "get_books", [isbn])
+        if not books or books[0].borrowed_by is None:
+            return None
+        return self.members.get(books[0].borrowed_by)
+
+    def get_loan_history(self, isbn):
+        """Get every loan of a book from its shard's ledger, oldest first"""
+        return self._call(self._shard_for(isbn), "get_loan_history", isbn)
+
+    def get_member_loan_history(self, member_id):
+        """Get every loan by a member across all shards, oldest first"""
+        parts = self._scatter_all("get_member_loan_history", member_id)
+        return list(heapq.merge(*parts, key=lambda loan: loan.start or 0))
+
+    def get_loans_per_month(self, isbn=None):
+        """Count loans by book and starting month across all shards"""
+        if isbn is not None:
+            return self._call(self._shard_for(isbn), "get_loans_per_month", isbn)
+        return sum(self._scatter_all("get_loans_per_month"), Counter())
+
+    # ---- Persistence (same JSON format as Library) ----
+
+    def save_to_file(self, filename="data/library.json", file_format=None, compression=None, level=None,
+                     compact=False):
+        """
+        Save every shard to a single file that Library.load_from_file can read
+
+        Each shard takes a snapshot, then sends its records EXPORT_PAGE at a
+        time as they are written, so this process never holds the whole
+        library. Like Library.save_to_file, the file is replaced only once
+        it is complete (see binary_format.save_library).
+
+        Args:
+            filename: Path to the file
+            file_format: "json", "binary", "mapped" or "jsonl", see Library.save_to_file
+            compression: "gzip", "bz2", "lzma" or "none", see Library.save_to_file
+            level: Compression level, None for the codec's default
+            compact: Write JSON without whitespace, see Library.save_to_file
+        """
+        with self._save_lock:
+            self._scatter_all("begin_export")
+            data = {
+                "name": self.name,
+                "loans": self._exported("loans"),
+                "books": self._exported("books"),
+                "members": self._exported("members"),
+                "journal_seq": 0
+            }
+            save_library(filename, data, file_format, compression, level, compact)
+
+    def _exported(self, kind):
+        """Yield one kind of record from every shard's export snapshot, page by page"""
+        for shard in range(self.num_shards):
+            page = self._call(shard, "export_page", kind)
+            while page:
+                yield from page
+                page = self._call(shard, "export_page", kind)
+
+    @staticmethod
+    def load_from_file(filename="data/library.json", num_shards=4):
+        """
+        Load a library file and spread it across worker processes
+
+        The file is read one record at a time (in any format read_library
+        accepts) and each shard gets its records IMPORT_BATCH at a time, so
+        this process never holds the whole file. Files that list the loans
+        after the books (saved before loans came first) keep each shard's
+        records from the first such loan on until the end.
+
+        Returns:
+            ShardedLibrary, or None if the file does not exist
+        """
+        try:
+            file = open(filename, 'rb')
+        except FileNotFoundError:
+            return None
+
+        library = ShardedLibrary(None, num_shards)
+        batches = [([], [], []) for _ in range(num_shards)]  # Books, members, loans per shard
+        books_seen = late_loans = False
+        try:
+            with file:
+                for key, value in read_library(file):
+                    if key == "books":
+                        books_seen = True
+                        shard, batch = library._shard_for(value["isbn"]), 0
+                    elif key == "members":
+                        shard, batch = library._shard_for(value["member_id"]), 1
+                    elif key == "loans":
+                        late_loans = late_loans or books_seen
+                        shard, batch = library._shard_for(value["isbn"]), 2
+                    else:
+                        if key == "name":
+                            library.name = value
+                        continue
+
+                    batches[shard][batch].append(value)
+                    if not late_loans and sum(map(len, batches[shard])) >= IMPORT_BATCH:
+                        library._call(shard, "import_records", *batches[shard])
+                        batches[shard] = ([], [], [])
+
+            library._scatter({shard: ("import_records", batch) for shard, batch in enumerate(batches)})
+        except BaseException:
+            library.close()
+            raise
+        return library
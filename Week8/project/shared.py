@@ -0,0 +1,224 @@
+"""
+Week 8 Project: Shared Library Files
+Lets several processes use one library file through a locked, shared journal
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: shared mode is not available
+    fcntl = None
+
+from journal import Journal
+
+SHARING_SUPPORTED = fcntl is not None  # Whether open_journal(shared=True) can be used here
+
+
+def lock_path(filename):
+    """Get the lock file that belongs to a library JSON file"""
+    return filename + ".lock"
+
+
+def file_key(stat):
+    """Identify a version of a file by its inode, size and modification time"""
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class MissedChanges(Exception):
+    """Journal records this process never read were folded into a save"""
+
+
+class FileLock:
+    """
+    Advisory lock (fcntl.flock) on a lock file, shared between processes
+
+    Threads of one process take turns holding it, and a thread that
+    already holds it can take it again (keeping the outer mode).
+    """
+
+    def __init__(self, path):
+        """
+        Open the lock file, creating it if missing
+
+        Args:
+            path: Lock file (see lock_path)
+        """
+        if fcntl is None:
+            raise OSError("Shared library files need fcntl, which this platform does not have")
+        self.path = path
+        self._file = open(path, 'a')
+        self._lock = threading.RLock()
+        self._depth = 0
+
+    @contextmanager
+    def hold(self, exclusive=True):
+        """
+        Hold the lock
+
+        Args:
+            exclusive: True to exclude every other holder, False to share
+                       the lock with other processes that only read
+        """
+        with self._lock:
+            if self._depth == 0:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def close(self):
+        """Close the lock file (releasing the lock)"""
+        self._file.close()
+
+
+class SharedJournal(Journal):
+    """
+    Journal appended to by several processes
+
+    Sequence numbers are generation numbers for the whole library file:
+    a process holding the lock first reads the records other processes
+    added (read_new), then numbers its own record after the last one.
+    Records are flushed before the lock is released, so the next holder
+    sees them. The lock is taken by Library, not here.
+    """
+
+    def __init__(self, path, seq, sync_interval, lock):
+        """
+        Open a shared journal
+
+        Args:
+            path: Journal file, created if missing
+            seq: Sequence number of the last record already applied
+            sync_interval: See Journal
+            lock: FileLock guarding the journal
+        """
+        super().__init__(path, seq, sync_interval)
+        self.lock = lock
+        self._reader = open(path, 'rb')
+        self._seen = None  # file_key of the journal when last read
+
+    def changed(self):
+        """Check (without the lock) whether the journal changed since it was last read"""
+        try:
+            return file_key(os.stat(self.path)) != self._seen
+        except FileNotFoundError:
+            return True
+
+    def read_new(self):
+        """
+        Read the records added since the last call (hold the lock)
+
+        A save in another process moves the journal aside and starts a new
+        file; the rest of the old one is read first, through the file
+        still open here.
+
+        Yields:
+            list: [sequence number, operation, *arguments], each numbered
+                  one after the last (self.seq is kept up to date)
+
+        Raises:
+            MissedChanges: Records were skipped; they are in the library file
+        """
+        while True:
+            while True:
+                start = self._reader.tell()
+                line = self._reader.readline()
+                # End of file, or a record cut short by a process that died
+                if not line.endswith(b"\n"):
+                    self._reader.seek(start)
+                    break
+                record = json.loads(line)
+                if record[0] <= self.seq:
+                    continue
+                if record[0] != self.seq + 1:
+                    raise MissedChanges(f"Journal skips from {self.seq} to {record[0]}")
+                self.seq = record[0]
+                yield record
+
+            current = os.stat(self.path)
+            if current.st_ino == os.fstat(self._reader.fileno()).st_ino:
+                self._seen = file_key(current)
+                return
+            self._reader.close()
+            self._reader = open(self.path, 'rb')
+            self.base_seq = self.seq
+
+    def restart(self, seq):
+        """Read the journal from the start again after reloading the library (hold the lock)"""
+        self._reader.close()
+        self._reader = open(self.path, 'rb')
+        self.seq = self.base_seq = seq
+
+    def append(self, operation, *args):
+        """
+        Write a record (hold the lock exclusively, after read_new)
+
+        Returns:
+            int: Sequence number of the record
+        """
+        with self._lock:
+            reader = os.fstat(self._reader.fileno())
+            if os.fstat(self._file.fileno()).st_ino != reader.st_ino:
+                # Another process's save started a new journal file
+                self._file.close()
+                self._file = open(self.path, 'a', encoding="utf-8")
+            if reader.st_size > self._reader.tell():
+                self._file.flush()
+                os.truncate(self.path, self._reader.tell())  # Drop a half-written record
+
+        seq = super().append(operation, *args)
+        with self._lock:
+            self._file.flush()
+        return seq
+
+    def close(self):
+        """Close the journal, then the reader and the lock file"""
+        super().close()
+        self._reader.close()
+        self.lock.close()
+
+
+class ChangeWatcher(threading.Thread):
+    """
+    Thread that applies other processes' changes every few seconds
+
+    Started by Library.open_journal with a poll_interval. Each check only
+    compares the journal's size and modification time unless it changed.
+    """
+
+    def __init__(self, library, interval):
+        """
+        Initialize the watcher (call start() to run it)
+
+        Args:
+            library: Library with a shared journal
+            interval: Seconds between checks
+        """
+        super().__init__(name="library-watcher", daemon=True)
+        self.library = library
+        self.interval = interval
+        self.error = None  # Exception of the last failed refresh, None after a good one
+        self._stopped = threading.Event()
+
+    def run(self):
+        """Refresh the library until stopped"""
+        while not self._stopped.wait(self.interval):
+            try:
+                self.library.refresh()
+            except Exception as e:
+                self.error = e
+            else:
+                self.error = None
+
+    def stop(self):
+        """Stop checking and wait for a refresh in progress to finish"""
+        self._stopped.set()
+        self.join()
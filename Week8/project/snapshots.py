@@ -0,0 +1,177 @@
+"""
+Week 8 Project: Library Snapshots
+Read-only point-in-time views of a library for reports and analytics
+"""
+
+import copy
+from datetime import datetime
+from types import MappingProxyType
+
+from dates import to_ordinal
+from search_index import tokenize
+
+
+def clone_member(member):
+    """Copy a member, including its own copy of the borrowed-books set"""
+    clone = copy.copy(member)
+    clone._borrowed_books = dict(member._borrowed_books)
+    return clone
+
+
+class LibrarySnapshot:
+    """
+    A frozen view of a library at the moment it was taken
+
+    Taking a snapshot copies only the ISBN -> Book and member_id -> Member
+    maps and the loan ledger's columns; the records themselves are shared
+    with the live library. The library never changes a Book in place, and
+    changes a copy of any shared Member instead (copy-on-write), so objects
+    seen through a snapshot never change.
+
+    Snapshots offer the same read methods as Library, so analytics and
+    report functions can run against one while borrowing continues.
+    """
+
+    def __init__(self, name, books, members, loans):
+        """
+        Initialize a snapshot (use Library.snapshot() instead)
+
+        Args:
+            name: Name of the library
+            books: Dictionary of ISBN -> Book owned by this snapshot
+            members: Dictionary of member_id -> Member owned by this snapshot
+            loans: LoanLedger copy owned by this snapshot
+        """
+        self.name = name
+        self._books = books
+        self._members = members
+        self.books = MappingProxyType(books)
+        self.members = MappingProxyType(members)
+        self.loans = loans
+        self.taken_at = datetime.now()
+        self._books_by_type = None  # Built on first use, never changes after
+        self._members_by_type = None
+
+    def shares(self, record):
+        """Check whether a live record is also part of this snapshot"""
+        if hasattr(record, "isbn"):
+            return self._books.get(record.isbn) is record
+        return self._members.get(record.member_id) is record
+
+    def snapshot(self):
+        """A snapshot of a snapshot is itself"""
+        return self
+
+    def book_dicts(self):
+        """Get every book as a dictionary for saving, in catalog order"""
+        return self._record_dicts(self._books)
+
+    def member_dicts(self):
+        """Get every member as a dictionary for saving, in directory order"""
+        return self._record_dicts(self._members)
+
+    @staticmethod
+    def _record_dicts(records):
+        """Use the store's own to_dicts() (which skips building lazy records) when it has one"""
+        if hasattr(records, "to_dicts"):
+            return records.to_dicts()
+        return (record.to_dict() for record in records.values())
+
+    def _book_groups(self):
+        """Group books by type once"""
+        if self._books_by_type is None:
+            groups = {}
+            for book in self._books.values():
+                groups.setdefault(book._type, []).append(book)
+            self._books_by_type = groups
+        return self._books_by_type
+
+    def _member_groups(self):
+        """Group members by type once"""
+        if self._members_by_type is None:
+            groups = {}
+            for member in self._members.values():
+                groups.setdefault(member._member_type, []).append(member)
+            self._members_by_type = groups
+        return self._members_by_type
+
+    def search_books(self, keyword, mode="substring"):
+        """Search for books by title or author (see Library.search_books)"""
+        if mode == "token":
+            tokens = set(tokenize(keyword))
+            return [book for book in self._books.values()
+                    if tokens and tokens <= set(tokenize(book.title)) | set(tokenize(book.author))]
+        if mode not in ("substring", "scan"):
+            raise ValueError(f"Unknown search mode: {mode}")
+
+        keyword_lower = keyword.lower()
+        return [book for book in self._books.values()
+                if keyword_lower in book.title.lower() or keyword_lower in book.author.lower()]
+
+    def get_books_by_type(self, book_type):
+        """Get all books of a specific type"""
+        return list(self._book_groups().get(book_type, []))
+
+    def get_members_by_type(self, member_type):
+        """Get all members of a specific type"""
+        return list(self._member_groups().get(member_type, []))
+
+    def get_available_books(self):
+        """Get all available books"""
+        return [book for book in self._books.values() if book.is_available]
+
+    def get_borrowed_books(self):
+        """Get all borrowed books"""
+        return [book for book in self._books.values() if not book.is_available]
+
+    def count_books_by_type(self, book_type, available=None):
+        """Count books of a specific type"""
+        books = self._book_groups().get(book_type, [])
+        if available is None:
+            return len(books)
+        return sum(1 for book in books if book.is_available == available)
+
+    def count_members_by_type(self, member_type):
+        """Count members of a specific type"""
+        return len(self._member_groups().get(member_type, []))
+
+    def count_available_books(self):
+        """Count available books"""
+        return sum(1 for book in self._books.values() if book.is_available)
+
+    def count_borrowed_books(self):
+        """Count borrowed books"""
+        return len(self._books) - self.count_available_books()
+
+    def get_overdue_books(self, as_of=None):
+        """Get books overdue as of a date (default: when the snapshot was taken)"""
+        as_of = to_ordinal(self.taken_at.date() if as_of is None else as_of)
+        return [self._books[isbn] for isbn in self.loans.due_before(as_of)]
+
+    def get_books_due_between(self, start, end):
+        """Get borrowed books due on or after start and before end"""
+        return [self._books[isbn] for isbn in self.loans.due_between(to_ordinal(start), to_ordinal(end))]
+
+    def get_member_borrowed_books(self, member_id):
+        """Get all books borrowed by a specific member"""
+        member = self._members.get(member_id)
+        if member is None:
+            return []
+        return [self._books[isbn] for isbn in member.iter_borrowed() if isbn in self._books]
+
+    def get_borrower(self, isbn):
+        """Get the member who was borrowing a book"""
+        member_id = self.loans.holder(isbn)
+        return self._members.get(member_id) if member_id is not None else None
+
+    def get_loan_history(self, isbn):
+        """Get every loan of a book up to the snapshot, oldest first"""
+        return self.loans.history(isbn)
+
+    def get_member_loan_history(self, member_id):
+        """Get every loan by a member up to the snapshot, oldest first"""
+        return self.loans.member_history(member_id)
+
+    def get_loans_per_month(self, isbn=None):
+        """Count loans by book and starting month (see LoanLedger.loans_per_month)"""
+        return self.loans.loans_per_month(isbn)
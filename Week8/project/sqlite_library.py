@@ -0,0 +1,835 @@
+"""
+Week 8 Project: SQLite Library
+Keeps books, members and loans in an SQLite database instead of dicts
+"""
+
+import sqlite3
+import threading
+import weakref
+from collections import Counter
+from collections.abc import Mapping
+from contextlib import contextmanager
+from itertools import groupby
+from operator import attrgetter, itemgetter
+
+from analytics import StoreAnalytics
+from binary_format import read_library, save_library
+from books import create_book_from_dict
+from dates import format_date, to_ordinal, today_ordinal
+from ledger import Loan
+from library import Library
+from members import create_member_from_dict
+from search_index import tokenize
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    seq INTEGER PRIMARY KEY,        -- Catalog order
+    isbn TEXT NOT NULL UNIQUE,
+    type TEXT NOT NULL,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    year INTEGER,
+    search TEXT NOT NULL,           -- Lowercased title and author for substring search
+    is_available INTEGER NOT NULL,
+    borrowed_by TEXT,
+    due INTEGER,                    -- Day ordinal while on loan
+    file_size_mb REAL,
+    file_format TEXT,
+    shelf_location TEXT,
+    condition TEXT
+);
+CREATE INDEX IF NOT EXISTS books_author ON books (author);
+CREATE INDEX IF NOT EXISTS books_year ON books (year);
+CREATE INDEX IF NOT EXISTS books_type ON books (type);
+CREATE INDEX IF NOT EXISTS books_type_available ON books (type, is_available);
+CREATE INDEX IF NOT EXISTS books_available ON books (is_available);
+CREATE INDEX IF NOT EXISTS books_due ON books (due) WHERE due IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS book_tokens (
+    token TEXT NOT NULL,            -- Whole word of a title or author
+    book INTEGER NOT NULL,          -- books.seq
+    PRIMARY KEY (token, book)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS members (
+    seq INTEGER PRIMARY KEY,
+    member_id TEXT NOT NULL UNIQUE,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    joined INTEGER,
+    max_books INTEGER NOT NULL,
+    student_id TEXT,
+    major TEXT,
+    faculty_id TEXT,
+    department TEXT,
+    extended_loan INTEGER
+);
+CREATE INDEX IF NOT EXISTS members_type ON members (type);
+
+CREATE TABLE IF NOT EXISTS loans (
+    id INTEGER PRIMARY KEY,
+    isbn TEXT NOT NULL,
+    member_id TEXT NOT NULL,
+    start INTEGER,
+    due INTEGER,
+    returned INTEGER
+);
+CREATE INDEX IF NOT EXISTS loans_isbn ON loans (isbn);
+CREATE INDEX IF NOT EXISTS loans_member ON loans (member_id);
+CREATE INDEX IF NOT EXISTS loans_open ON loans (member_id) WHERE returned IS NULL;
+"""
+
+# Columns read back into a Book / Member, named like their to_dict() keys
+BOOK_COLUMNS = ("seq, type, isbn, title, author, year, is_available, borrowed_by, due AS due_date, "
+                "file_size_mb, file_format, shelf_location, condition")
+BOOK_KEYS = ("type", "isbn", "title", "author", "year", "is_available", "borrowed_by", "due_date",
+             "file_size_mb", "file_format", "shelf_location", "condition")
+MEMBER_COLUMNS = ("seq, type, member_id, name, email, joined AS join_date, max_books, "
+                  "student_id, major, faculty_id, department, extended_loan")
+MEMBER_KEYS = ("type", "member_id", "name", "email", "join_date", "max_books",
+               "student_id", "major", "faculty_id", "department", "extended_loan")
+
+INSERT_BOOK = ("INSERT OR IGNORE INTO books (isbn, type, title, author, year, search, is_available, "
+               "borrowed_by, due, file_size_mb, file_format, shelf_location, condition) "
+               "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+INSERT_MEMBER = ("INSERT OR IGNORE INTO members (member_id, type, name, email, joined, max_books, "
+                 "student_id, major, faculty_id, department, extended_loan) "
+                 "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+INSERT_LOAN = "INSERT INTO loans (isbn, member_id, start, due, returned) VALUES (?, ?, ?, ?, ?)"
+
+# Julian day number of day ordinal 0, to format ordinals inside SQL
+ORDINAL_TO_JULIAN = 1721424.5
+
+PAGE_SIZE = 1000  # Rows fetched per query when iterating a whole table
+
+
+class _SQLiteRecords(Mapping):
+    """Read-only dict-like view of the books or members table"""
+
+    def __init__(self, library, table, key):
+        self._library = library
+        self._table = table
+        self._key = key
+
+    def __getitem__(self, key):
+        record = self._library._get(self._table, key)
+        if record is None:
+            raise KeyError(key)
+        return record
+
+    def __contains__(self, key):
+        return bool(self._library._query(f"SELECT 1 FROM {self._table} WHERE {self._key} = ?", (key,)))
+
+    def __iter__(self):
+        for rows in self._library._pages(f"SELECT seq, {self._key} FROM {self._table}"):
+            for row in rows:
+                yield row[1]
+
+    def __len__(self):
+        return self._library._query(f"SELECT count(*) FROM {self._table}")[0][0]
+
+    def values(self):
+        """Iterate over every record in order, one page of rows at a time"""
+        library = self._library
+        for rows in library._pages(f"SELECT {self._columns} FROM {self._table}"):
+            with library._lock:
+                records = library._records(self._table, rows)
+            yield from records
+
+    def items(self):
+        """Iterate over every (key, record) pair in order"""
+        key_of = attrgetter(self._key)
+        return ((key_of(record), record) for record in self.values())
+
+
+class _SQLiteBooks(_SQLiteRecords, StoreAnalytics):
+    """Books table, answering analytics.py's book queries in SQL"""
+
+    _columns = BOOK_COLUMNS
+
+    def __init__(self, library):
+        super().__init__(library, "books", "isbn")
+
+    def author_counts(self):
+        """Count books per author with GROUP BY over the author index"""
+        return Counter(dict(self._library._query("SELECT author, count(*) FROM books GROUP BY author")))
+
+    def published_between(self, start_year, end_year):
+        """Get books published in a year range using the year index"""
+        return self._library._books_where("year BETWEEN ? AND ?", (start_year, end_year))
+
+    def total_file_size(self):
+        """Sum ebook file sizes in SQL"""
+        return self._library._query("SELECT total(file_size_mb) FROM books WHERE type = 'EBook'")[0][0]
+
+
+class _SQLiteMembers(_SQLiteRecords, StoreAnalytics):
+    """Members table, answering analytics.py's member queries in SQL"""
+
+    _columns = MEMBER_COLUMNS
+
+    def __init__(self, library):
+        super().__init__(library, "members", "member_id")
+
+    def borrowed_counts(self):
+        """Number of books each member has on loan, counted in SQL"""
+        return [count for count, in self._library._query(
+            "SELECT (SELECT count(*) FROM loans WHERE member_id = members.member_id AND returned IS NULL) "
+            "FROM members ORDER BY seq")]
+
+    def at_borrowing_limit(self):
+        """Get members whose open loans reach their limit, found in SQL"""
+        return self._library._members_where(
+            "max_books <= (SELECT count(*) FROM loans WHERE member_id = members.member_id "
+            "AND returned IS NULL)", ())
+
+
+class SQLiteLibrary:
+    """
+    Library whose books, members and loans are rows in an SQLite database
+
+    It has the same methods as Library. Lookups, filters, counts and
+    aggregates run as indexed SQL queries (see SCHEMA), so only the rows a
+    query returns become Python objects and a catalog on disk can be
+    larger than memory. The database uses WAL mode and every change is
+    one transaction; the sqlite3 module reuses prepared statements, since
+    every query is a fixed SQL string with parameters.
+
+    Records are read through library.books and library.members, which act
+    like read-only dicts. While any code holds a Book or Member, reading
+    that key again returns the same object (a weak identity map), and the
+    library's own methods keep those objects up to date; changes made to
+    them directly are not written to the database.
+    """
+
+    def __init__(self, name, database=":memory:", synchronous="NORMAL", cache_mb=64):
+        """
+        Open or create the database
+
+        Args:
+            name: Name of the library
+            database: Path of the SQLite file, or ":memory:"
+            synchronous: SQLite synchronous setting. "NORMAL" (default) can
+                         lose the last transactions on power loss but never
+                         corrupts the database; "FULL" syncs every commit.
+            cache_mb: SQLite page cache size in MB
+        """
+        if synchronous not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            raise ValueError(f"Unknown synchronous setting: {synchronous}")
+
+        self.name = name
+        self.database = database
+        self._connection = sqlite3.connect(database, isolation_level=None, check_same_thread=False,
+                                           cached_statements=256)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute(f"PRAGMA synchronous = {synchronous}")
+        self._connection.execute(f"PRAGMA cache_size = {-cache_mb * 1024}")
+        self._connection.executescript(SCHEMA)
+
+        self._lock = threading.RLock()  # One statement or transaction at a time
+        self._live_books = weakref.WeakValueDictionary()  # ISBN -> Book someone still holds
+        self._live_members = weakref.WeakValueDictionary()  # member_id -> Member
+        self.books = _SQLiteBooks(self)
+        self.members = _SQLiteMembers(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._connection.close()
+
+    # ---- Database helpers ----
+
+    def _query(self, sql, params=()):
+        """Run a query and fetch every row"""
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def _pages(self, select, where="1", params=()):
+        """
+        Run a query over a whole table in pages of PAGE_SIZE rows
+
+        The select must list seq first; each page continues after the last
+        seq seen, so no page holds the lock while the caller works.
+        """
+        sql = f"{select} WHERE ({where}) AND seq > ? ORDER BY seq LIMIT {PAGE_SIZE}"
+        last = 0
+        while True:
+            rows = self._query(sql, (*params, last))
+            if not rows:
+                return
+            yield rows
+            last = rows[-1][0]
+
+    @contextmanager
+    def _transaction(self):
+        """Run the statements in the block as one transaction (hold _lock)"""
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._connection
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def _get(self, table, key):
+        """Get one book or member by key, or None"""
+        live, columns, key_column = ((self._live_books, BOOK_COLUMNS, "isbn") if table == "books" else
+                                     (self._live_members, MEMBER_COLUMNS, "member_id"))
+        with self._lock:
+            record = live.get(key)
+            if record is None:
+                rows = self._query(f"SELECT {columns} FROM {table} WHERE {key_column} = ?", (key,))
+                record = self._records(table, rows)[0] if rows else None
+            return record
+
+    def _records(self, table, rows):
+        """
+        Turn rows into Book or Member objects, reusing live ones
+
+        Hold _lock from the query that read the rows, so no change lands
+        between reading a member and reading its loans.
+        """
+        if table == "books":
+            return [self._book(row) for row in rows]
+
+        # Borrowed books of members that are not live yet, with one query
+        missing = [row[2] for row in rows if row[2] not in self._live_members]
+        borrowed = {}
+        if missing:
+            marks = ", ".join("?" * len(missing))
+            for member_id, isbn in self._query(
+                    f"SELECT member_id, isbn FROM loans WHERE returned IS NULL AND member_id IN ({marks}) "
+                    "ORDER BY id", missing):
+                borrowed.setdefault(member_id, []).append(isbn)
+        return [self._member(row, borrowed) for row in rows]
+
+    def _book(self, row):
+        """Get the live Book for a books row, building it if needed"""
+        book = self._live_books.get(row[2])
+        if book is None:
+            record = dict(zip(BOOK_KEYS, row[1:]))
+            record["is_available"] = bool(record["is_available"])
+            book = create_book_from_dict(record)
+            self._live_books[book.isbn] = book
+        return book
+
+    def _member(self, row, borrowed):
+        """Get the live Member for a members row, building it if needed"""
+        member = self._live_members.get(row[2])
+        if member is None:
+            record = dict(zip(MEMBER_KEYS, row[1:]))
+            if record["extended_loan"] is not None:
+                record["extended_loan"] = bool(record["extended_loan"])
+            record["borrowed_books"] = borrowed.get(record["member_id"], [])
+            member = create_member_from_dict(record)
+            self._live_members[member.member_id] = member
+        return member
+
+    def _books_where(self, where, params, order="seq"):
+        """Get the books matching a WHERE clause"""
+        with self._lock:
+            return self._records("books", self._query(
+                f"SELECT {BOOK_COLUMNS} FROM books WHERE {where} ORDER BY {order}", params))
+
+    def _members_where(self, where, params):
+        """Get the members matching a WHERE clause, in order"""
+        with self._lock:
+            return self._records("members", self._query(
+                f"SELECT {MEMBER_COLUMNS} FROM members WHERE {where} ORDER BY seq", params))
+
+    def _count(self, table, where="1", params=()):
+        """Count rows matching a WHERE clause"""
+        return self._query(f"SELECT count(*) FROM {table} WHERE {where}", params)[0][0]
+
+    def _insert_book(self, book, legacy_loan=True):
+        """
+        Insert a book, its search tokens and any loan it is on (in a transaction)
+
+        Args:
+            book: Book to insert
+            legacy_loan: Open a loan row for a borrowed book that has none;
+                         load_from_file does this once all loans are read
+
+        Returns:
+            bool: False if the ISBN already exists
+        """
+        connection = self._connection
+        cursor = connection.execute(INSERT_BOOK, (
+            book.isbn, book._type, book.title, book.author, book.year,
+            f"{book.title.lower()}\n{book.author.lower()}",
+            int(book.is_available), book.borrowed_by, book.due_ordinal,
+            getattr(book, "file_size_mb", None), getattr(book, "file_format", None),
+            getattr(book, "shelf_location", None), getattr(book, "condition", None)))
+        if not cursor.rowcount:
+            return False
+
+        seq = cursor.lastrowid
+        connection.executemany("INSERT OR IGNORE INTO book_tokens VALUES (?, ?)",
+                               [(token, seq) for token in _book_tokens(book.title, book.author)])
+
+        if legacy_loan and not book.is_available and not connection.execute(
+                "SELECT 1 FROM loans WHERE isbn = ? AND returned IS NULL", (book.isbn,)).fetchone():
+            # A loan saved before the ledger existed: its start date is unknown
+            connection.execute(INSERT_LOAN, (book.isbn, book.borrowed_by, None, book.due_ordinal, None))
+
+        self._live_books[book.isbn] = book
+        return True
+
+    def _insert_member(self, member):
+        """Insert a member (in a transaction); False if the ID already exists"""
+        cursor = self._connection.execute(INSERT_MEMBER, (
+            member.member_id, member._member_type, member.name, member.email,
+            member._join_ordinal, member.max_books,
+            getattr(member, "student_id", None), getattr(member, "major", None),
+            getattr(member, "faculty_id", None), getattr(member, "department", None),
+            getattr(member, "_extended_loan", None)))
+        if not cursor.rowcount:
+            return False
+
+        self._live_members[member.member_id] = member
+        return True
+
+    def _lend(self, book, member_id, due, start):
+        """Record a loan and keep the borrowed version of the book live (in a transaction)"""
+        connection = self._connection
+        connection.execute("UPDATE books SET is_available = 0, borrowed_by = ?, due = ? WHERE isbn = ?",
+                           (member_id, due, book.isbn))
+        connection.execute(INSERT_LOAN, (book.isbn, member_id, start, due, None))
+        book = book.with_loan(member_id, due)
+        self._live_books[book.isbn] = book
+        return book
+
+    def _take_back(self, book, returned):
+        """Close a loan and keep the available version of the book live (in a transaction)"""
+        connection = self._connection
+        connection.execute("UPDATE books SET is_available = 1, borrowed_by = NULL, due = NULL WHERE isbn = ?",
+                           (book.isbn,))
+        connection.execute("UPDATE loans SET returned = ? WHERE isbn = ? AND returned IS NULL",
+                           (returned, book.isbn))
+        book = book.without_loan()
+        self._live_books[book.isbn] = book
+        return book
+
+    # ---- Changes ----
+
+    def add_book(self, book):
+        """Add a book to the library"""
+        with self._lock, self._transaction():
+            if not self._insert_book(book):
+                return False, f"Book with ISBN {book.isbn} already exists"
+        return True, f"Book '{book.title}' added successfully"
+
+    def remove_book(self, isbn):
+        """Remove a book from the library"""
+        with self._lock:
+            book = self._get("books", isbn)
+            if book is None:
+                return False, "Book not found"
+
+            if not book.is_available:
+                return False, "Cannot remove borrowed book"
+
+            with self._transaction() as connection:
+                seq = connection.execute("SELECT seq FROM books WHERE isbn = ?", (isbn,)).fetchone()[0]
+                connection.executemany("DELETE FROM book_tokens WHERE token = ? AND book = ?",
+                                       [(token, seq) for token in _book_tokens(book.title, book.author)])
+                connection.execute("DELETE FROM books WHERE seq = ?", (seq,))
+            self._live_books.pop(isbn, None)
+            return True, "Book removed successfully"
+
+    def add_member(self, member):
+        """Add a member to the library"""
+        with self._lock, self._transaction():
+            if not self._insert_member(member):
+                return False, f"Member with ID {member.member_id} already exists"
+        return True, f"Member '{member.name}' added successfully"
+
+    def add_books(self, books):
+        """
+        Add many books in one transaction, skipping ISBNs that already exist
+
+        Returns:
+            list: Books that were not added because their ISBN was taken
+        """
+        with self._lock, self._transaction():
+            return [book for book in books if not self._insert_book(book)]
+
+    def add_members(self, members):
+        """
+        Add many members in one transaction, skipping IDs that already exist
+
+        Returns:
+            list: Members that were not added because their ID was taken
+        """
+        with self._lock, self._transaction():
+            return [member for member in members if not self._insert_member(member)]
+
+    def remove_member(self, member_id):
+        """Remove a member from the library"""
+        with self._lock:
+            member = self._get("members", member_id)
+            if member is None:
+                return False, "Member not found"
+
+            if member.borrowed_count:
+                return False, "Cannot remove member with borrowed books"
+
+            with self._transaction() as connection:
+                connection.execute("DELETE FROM members WHERE member_id = ?", (member_id,))
+            self._live_members.pop(member_id, None)
+            return True, "Member removed successfully"
+
+    def borrow_book(self, member_id, isbn):
+        """Process a book borrowing transaction"""
+        with self._lock:
+            member = self._get("members", member_id)
+            if member is None:
+                return False, "Member not found"
+
+            book = self._get("books", isbn)
+            if book is None:
+                return False, "Book not found"
+
+            if not book.is_available:
+                return False, "Book is already borrowed"
+
+            can_borrow, message = member.borrow_book(isbn)
+            if not can_borrow:
+                return False, message
+
+            today = today_ordinal()
+            try:
+                with self._transaction():
+                    book = self._lend(book, member_id, today + Library._loan_period(member), today)
+            except sqlite3.Error:
+                member.return_book(isbn)
+                raise
+            return True, f"Book borrowed successfully. Due date: {book.due_date}"
+
+    def return_book(self, member_id, isbn):
+        """Process a book return transaction"""
+        with self._lock:
+            member = self._get("members", member_id)
+            if member is None:
+                return False, "Member not found"
+
+            book = self._get("books", isbn)
+            if book is None:
+                return False, "Book not found"
+
+            if book.borrowed_by != member_id:
+                return False, "This book was not borrowed by this member"
+
+            with self._transaction():
+                self._take_back(book, today_ordinal())
+            member.return_book(isbn)
+            return True, "Book returned successfully"
+
+    def borrow_many(self, loans, filename=None):
+        """
+        Borrow a batch of books as a single all-or-nothing transaction
+
+        Checks the same conditions as Library.borrow_many.
+
+        Returns:
+            tuple: (success: bool, results: list of (success, message) per item)
+        """
+        loans = list(loans)
+
+        with self._lock:
+            errors = {}
+            pending = {}
+            seen = set()
+            for index, (member_id, isbn) in enumerate(loans):
+                member = self._get("members", member_id)
+                book = self._get("books", isbn)
+
+                if member is None:
+                    errors[index] = "Member not found"
+                elif book is None:
+                    errors[index] = "Book not found"
+                elif isbn in seen:
+                    errors[index] = "Book appears more than once in batch"
+                elif not book.is_available:
+                    errors[index] = "Book is already borrowed"
+                elif member.has_borrowed(isbn):
+                    errors[index] = "Book already borrowed by this member"
+                elif member.borrowed_count + pending.get(member_id, 0) >= member.max_books:
+                    errors[index] = f"Borrowing limit reached ({member.max_books} books)"
+                else:
+                    pending[member_id] = pending.get(member_id, 0) + 1
+                seen.add(isbn)
+
+            if errors:
+                return False, Library._batch_rejected(len(loans), errors)
+
+            # Hold the members so the objects updated below are the live ones
+            members = [self._get("members", member_id) for member_id, _ in loans]
+            results = []
+            today = today_ordinal()
+            with self._transaction():
+                for member, (member_id, isbn) in zip(members, loans):
+                    book = self._lend(self._get("books", isbn), member_id,
+                                      today + Library._loan_period(member), today)
+                    results.append((True, book.due_date))
+            for member, (_, isbn) in zip(members, loans):
+                member.borrow_book(isbn)
+
+        if filename:
+            self.save_to_file(filename)
+
+        return True, results
+
+    def return_many(self, returns, filename=None):
+        """
+        Return a batch of books as a single all-or-nothing transaction
+
+        Returns:
+            tuple: (success: bool, results: list of (success, message) per item)
+        """
+        returns = list(returns)
+
+        with self._lock:
+            errors = {}
+            seen = set()
+            for index, (member_id, isbn) in enumerate(returns):
+                book = self._get("books", isbn)
+
+                if member_id not in self.members:
+                    errors[index] = "Member not found"
+                elif book is None:
+                    errors[index] = "Book not found"
+                elif isbn in seen:
+                    errors[index] = "Book appears more than once in batch"
+                elif book.borrowed_by != member_id:
+                    errors[index] = "This book was not borrowed by this member"
+                seen.add(isbn)
+
+            if errors:
+                return False, Library._batch_rejected(len(returns), errors)
+
+            members = [self._get("members", member_id) for member_id, _ in returns]
+            today = today_ordinal()
+            with self._transaction():
+                for _, isbn in returns:
+                    self._take_back(self._get("books", isbn), today)
+            for member, (_, isbn) in zip(members, returns):
+                member.return_book(isbn)
+
+        if filename:
+            self.save_to_file(filename)
+
+        return True, [(True, "Returned")] * len(returns)
+
+    # ---- Queries (filters run in SQL) ----
+
+    def search_books(self, keyword, mode="substring"):
+        """
+        Search for books by title or author
+
+        Args:
+            keyword: Text to search for (case-insensitive)
+            mode: "substring" matches any part of the title or author,
+                  "token" matches whole words only (book_tokens table),
+                  "scan" reads every book in Python like the original search
+
+        Returns:
+            list: Matching books in catalog order
+        """
+        if mode == "substring":
+            return self._books_where("instr(search, ?) > 0", (keyword.lower(),))
+        if mode == "token":
+            tokens = set(tokenize(keyword))
+            if not tokens:
+                return []
+            match = " INTERSECT ".join(["SELECT book FROM book_tokens WHERE token = ?"] * len(tokens))
+            return self._books_where(f"seq IN ({match})", tuple(tokens))
+        if mode == "scan":
+            keyword_lower = keyword.lower()
+            return [book for book in self.books.values()
+                    if keyword_lower in book.title.lower() or keyword_lower in book.author.lower()]
+        raise ValueError(f"Unknown search mode: {mode}")
+
+    def get_books_by_type(self, book_type):
+        """Get all books of a specific type"""
+        return self._books_where("type = ?", (book_type,))
+
+    def get_members_by_type(self, member_type):
+        """Get all members of a specific type"""
+        return self._members_where("type = ?", (member_type,))
+
+    def get_available_books(self):
+        """Get all available books"""
+        return self._books_where("is_available = 1", ())
+
+    def get_borrowed_books(self):
+        """Get all borrowed books"""
+        return self._books_where("is_available = 0", ())
+
+    def count_books_by_type(self, book_type, available=None):
+        """Count books of a type, optionally only available or borrowed ones"""
+        if available is None:
+            return self._count("books", "type = ?", (book_type,))
+        return self._count("books", "type = ? AND is_available = ?", (book_type, int(available)))
+
+    def count_members_by_type(self, member_type):
+        """Count members of a type"""
+        return self._count("members", "type = ?", (member_type,))
+
+    def count_available_books(self):
+        """Count books on the shelf"""
+        return self._count("books", "is_available = 1")
+
+    def count_borrowed_books(self):
+        """Count books on loan"""
+        return self._count("books", "is_available = 0")
+
+    def get_overdue_books(self, as_of=None):
+        """
+        Get books due before a date, earliest due date first
+
+        Args:
+            as_of: Date to compare against (default today)
+        """
+        as_of = today_ordinal() if as_of is None else to_ordinal(as_of)
+        return self._books_where("due < ?", (as_of,), order="due, seq")
+
+    def get_books_due_between(self, start, end):
+        """Get borrowed books due on or after start and before end, earliest first"""
+        return self._books_where("due >= ? AND due < ?", (to_ordinal(start), to_ordinal(end)),
+                                 order="due, seq")
+
+    def get_member_borrowed_books(self, member_id):
+        """Get all books borrowed by a member, in borrowing order"""
+        return self._books_where(
+            "isbn IN (SELECT isbn FROM loans WHERE member_id = ? AND returned IS NULL)", (member_id,),
+            order="(SELECT id FROM loans WHERE loans.isbn = books.isbn AND returned IS NULL)")
+
+    def get_borrower(self, isbn):
+        """Get the member currently borrowing a book, or None"""
+        with self._lock:
+            rows = self._query("SELECT borrowed_by FROM books WHERE isbn = ?", (isbn,))
+            if not rows or rows[0][0] is None:
+                return None
+            return self._get("members", rows[0][0])
+
+    def get_loan_history(self, isbn):
+        """Get every loan of a book, oldest first"""
+        return [Loan(*row) for row in self._query(
+            "SELECT isbn, member_id, start, due, returned FROM loans WHERE isbn = ? ORDER BY id", (isbn,))]
+
+    def get_member_loan_history(self, member_id):
+        """Get every loan by a member, oldest first"""
+        return [Loan(*row) for row in self._query(
+            "SELECT isbn, member_id, start, due, returned FROM loans WHERE member_id = ? ORDER BY id",
+            (member_id,))]
+
+    def get_loans_per_month(self, isbn=None):
+        """Count loans by book and starting month, grouped in SQL"""
+        where, params = ("isbn = ? AND start IS NOT NULL", (isbn,)) if isbn is not None else ("start IS NOT NULL", ())
+        return Counter({(row[0], row[1]): row[2] for row in self._query(
+            f"SELECT isbn, strftime('%Y-%m', start + {ORDINAL_TO_JULIAN}) AS month, count(*) "
+            f"FROM loans WHERE {where} GROUP BY isbn, month", params)})
+
+    # ---- Persistence (same file formats as Library) ----
+
+    def save_to_file(self, filename="data/library.json", file_format=None, compression=None, level=None,
+                     compact=False):
+        """
+        Export the database to a file that Library.load_from_file can read
+
+        Rows are streamed from the tables into the file a page at a time,
+        inside one read transaction under _lock, so the file holds one
+        consistent state without the tables ever being in memory.
+
+        Args:
+            filename: Path to the file
+            file_format: "json", "binary", "mapped" or "jsonl", see Library.save_to_file
+            compression: "gzip", "bz2", "lzma" or "none", see Library.save_to_file
+            level: Compression level, None for the codec's default
+            compact: Write JSON without whitespace, see Library.save_to_file
+        """
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                data = {
+                    "name": self.name,
+                    "loans": self._saved_loans(),
+                    "books": self._saved_records("books", f"SELECT {BOOK_COLUMNS} FROM books ORDER BY seq"),
+                    "members": self._saved_records("members",
+                                                   f"SELECT {MEMBER_COLUMNS} FROM members ORDER BY seq"),
+                    "journal_seq": 0
+                }
+                save_library(filename, data, file_format, compression, level, compact)
+            finally:
+                self._connection.execute("COMMIT")
+
+    def _saved_loans(self):
+        """Yield every loan as a to_dicts() record, oldest first (hold _lock)"""
+        cursor = self._connection.execute("SELECT isbn, member_id, start, due, returned FROM loans ORDER BY id")
+        for rows in iter(lambda: cursor.fetchmany(PAGE_SIZE), []):
+            for isbn, member_id, start, due, returned in rows:
+                yield {"isbn": isbn, "member_id": member_id, "start": format_date(start),
+                       "due": format_date(due), "returned": format_date(returned)}
+
+    def _saved_records(self, table, sql):
+        """Yield every book or member as a to_dict() record, in order (hold _lock)"""
+        cursor = self._connection.execute(sql)
+        for rows in iter(lambda: cursor.fetchmany(PAGE_SIZE), []):
+            for record in self._records(table, rows):
+                yield record.to_dict()
+
+    @staticmethod
+    def load_from_file(filename="data/library.json", database=":memory:"):
+        """
+        Import a library file into a database
+
+        Args:
+            filename: JSON or binary file saved by Library or SQLiteLibrary, compressed or not
+            database: SQLite file to create, or ":memory:"
+
+        Returns:
+            SQLiteLibrary, or None if the file does not exist
+        """
+        try:
+            file = open(filename, 'rb')
+        except FileNotFoundError:
+            return None
+
+        library = SQLiteLibrary(None, database)
+        with file, library._lock, library._transaction() as connection:
+            # Records are read and inserted one at a time (see json_stream)
+            for key, items in groupby(read_library(file), key=itemgetter(0)):
+                values = map(itemgetter(1), items)
+                if key == "books":
+                    for record in values:
+                        library._insert_book(create_book_from_dict(record), legacy_loan=False)
+                elif key == "members":
+                    for record in values:
+                        library._insert_member(create_member_from_dict(record))
+                elif key == "loans":
+                    connection.executemany(INSERT_LOAN, (
+                        (loan["isbn"], loan["member_id"], to_ordinal(loan.get("start")),
+                         to_ordinal(loan.get("due")), to_ordinal(loan.get("returned")))
+                        for loan in values))
+                elif key == "name":
+                    library.name = next(values)
+
+            # Borrowed books with no saved loan (files from before the ledger)
+            connection.execute(
+                "INSERT INTO loans (isbn, member_id, start, due, returned) "
+                "SELECT isbn, borrowed_by, NULL, due, NULL FROM books WHERE is_available = 0 "
+                "AND isbn NOT IN (SELECT isbn FROM loans WHERE returned IS NULL) ORDER BY seq")
+        return library
+
+
+def _book_tokens(title, author):
+    """Distinct whole words of a book's title and author"""
+    return set(tokenize(title)) | set(tokenize(author))
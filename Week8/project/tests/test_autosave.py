@@ -0,0 +1,175 @@
+"""
+Week 8: Unit Tests for Background Saves
+Tests for dirty tracking, RecordCache and Library.start_autosave
+"""
+
+import unittest
+import sys
+import os
+import json
+import time
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from autosave import RecordCache
+from library import Library
+from books import Book, EBook
+from members import Member, StudentMember
+
+
+class TestAutosave(unittest.TestCase):
+    """Test cases for incremental and background saves"""
+
+    def setUp(self):
+        """Build a small library with a loan"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.library = Library("Autosave «Test»")
+        self.library.add_books([
+            Book("ISBN1", "Python Basics", "Author 1", 2000),
+            EBook("ISBN2", "Données", "Author 2", 2020, 3.5, "epub"),
+            Book("ISBN3", "Gardens", "Author 3", 1999),
+        ])
+        self.library.add_members([
+            Member("M001", "John Doe", "john@example.com"),
+            StudentMember("S001", "Alice", "alice@uni.edu", "STU1", "CS"),
+        ])
+        self.library.borrow_book("S001", "ISBN1")
+
+    def tearDown(self):
+        """Stop the saver and remove the temporary directory"""
+        self.library.stop_autosave()
+        self.directory.cleanup()
+
+    def path(self, name):
+        """Path of a file in the temporary directory"""
+        return os.path.join(self.directory.name, name)
+
+    def read(self, name):
+        """Text of a saved file"""
+        with open(self.path(name), encoding="utf-8") as file:
+            return file.read()
+
+    def test_dirty_tracking(self):
+        """Test every kind of change marks the library unsaved, and saving clears it"""
+        self.assertTrue(self.library.has_unsaved_changes())
+        self.library.save_to_file(self.path("library.json"))
+        self.assertFalse(self.library.has_unsaved_changes())
+
+        loaded = Library.load_from_file(self.path("library.json"))
+        self.assertFalse(loaded.has_unsaved_changes())
+
+        changes = [
+            lambda: self.library.return_book("S001", "ISBN1"),
+            lambda: self.library.borrow_book("M001", "ISBN2"),
+            lambda: self.library.remove_book("ISBN3"),
+            lambda: self.library.add_member(Member("M002", "Jane", "jane@example.com")),
+            lambda: self.library.remove_member("M002"),
+            lambda: self.library.borrow_many([("S001", "ISBN1")]),
+            lambda: self.library.return_many([("S001", "ISBN1")]),
+        ]
+        for change in changes:
+            success = change()[0]
+            self.assertTrue(success)
+            self.assertTrue(self.library.has_unsaved_changes())
+            self.library.save_to_file(self.path("library.json"))
+            self.assertFalse(self.library.has_unsaved_changes())
+
+        # A rejected change changes nothing
+        self.library.borrow_book("S001", "ISBN9")
+        self.assertFalse(self.library.has_unsaved_changes())
+
+    def test_incremental_save_matches_full_save(self):
+        """Test saves from the record cache write the same file as a full save"""
+        self.library._record_cache = RecordCache()
+        steps = [
+            lambda: None,
+            lambda: self.library.return_book("S001", "ISBN1"),
+            lambda: self.library.borrow_book("M001", "ISBN3"),
+            lambda: self.library.remove_book("ISBN2"),
+            lambda: self.library.add_book(Book("ISBN2", "Again", "Author 4", 2024)),
+            lambda: self.library.add_member(StudentMember("S002", "Bob", "bob@uni.edu", "STU2", "Art")),
+        ]
+        for step in steps:
+            step()
+            cache = self.library._record_cache
+            self.library.save_to_file(self.path("cached.json"))
+            self.library._record_cache = None
+            self.library.save_to_file(self.path("full.json"))
+            self.library._record_cache = cache
+            self.assertEqual(self.read("cached.json"), self.read("full.json"))
+
+        # Only the changed records are encoded again
+        cache = self.library._record_cache
+        self.library.save_to_file(self.path("cached.json"))
+        unchanged = cache.books["ISBN1"]
+        self.library.borrow_book("S002", "ISBN2")
+        self.library.save_to_file(self.path("cached.json"))
+        self.assertIs(cache.books["ISBN1"], unchanged)
+        self.assertIn('"borrowed_by": "S002"', cache.books["ISBN2"])
+
+        loaded = Library.load_from_file(self.path("cached.json"))
+        self.assertEqual(loaded.get_borrower("ISBN2").member_id, "S002")
+        self.assertEqual(len(loaded.get_loan_history("ISBN1")), 1)
+
+    def test_compact_cache(self):
+        """Test a compact cache writes compact files and is not used for indented ones"""
+        self.library._record_cache = RecordCache(compact=True)
+        self.library.save_to_file(self.path("cached.json"), compact=True)
+        self.library.return_book("S001", "ISBN1")
+        self.library.save_to_file(self.path("cached.json"), compact=True)
+        self.library.save_to_file(self.path("indented.json"))
+        self.library._record_cache = None
+        self.library.save_to_file(self.path("full.json"), compact=True)
+
+        self.assertEqual(self.read("cached.json"), self.read("full.json"))
+        self.assertIn("\n", self.read("indented.json"))
+        self.assertEqual(json.loads(self.read("indented.json")), json.loads(self.read("full.json")))
+
+    def test_lazy_library(self):
+        """Test the cache is filled from a lazily loaded library without building it"""
+        self.library.save_to_file(self.path("library.json"))
+        lazy = Library.load_from_file(self.path("library.json"), lazy=True)
+        lazy._record_cache = RecordCache()
+        lazy.save_to_file(self.path("copy.json"))
+        self.assertFalse(lazy.books.is_built("ISBN3"))
+        self.assertEqual(self.read("copy.json"), self.read("library.json"))
+
+    def test_background_saves(self):
+        """Test the saver writes changes without being asked and only when there are some"""
+        filename = self.path("library.json")
+        self.library.start_autosave(filename, interval=0.01)
+        self.library.return_book("S001", "ISBN1")
+
+        saver = self.library._autosaver
+        deadline = time.monotonic() + 5
+        while not saver.saves and time.monotonic() < deadline:
+            time.sleep(0.01)
+        saves = saver.saves
+        time.sleep(0.05)
+        self.assertEqual(saver.saves, saves)  # Nothing changed, nothing saved
+        self.library.stop_autosave()
+
+        self.assertIsNone(saver.error)
+        self.assertGreaterEqual(saves, 1)
+        with open(filename, encoding="utf-8") as file:
+            data = json.load(file)
+        self.assertTrue(all(book["is_available"] for book in data["books"]))
+
+    def test_failed_save_keeps_changes(self):
+        """Test changes stay marked unsaved when writing the file fails"""
+        self.library._record_cache = RecordCache()
+        blocked = self.path("blocked")
+        with open(blocked, 'w'):
+            pass
+        with self.assertRaises(OSError):
+            self.library.save_to_file(os.path.join(blocked, "library.json"))
+        self.assertTrue(self.library.has_unsaved_changes())
+
+        self.library.save_to_file(self.path("library.json"))
+        self.assertFalse(self.library.has_unsaved_changes())
+        self.assertEqual(Library.load_from_file(self.path("library.json")).get_borrower("ISBN1").member_id, "S001")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,147 @@
+"""
+Week 8: Unit Tests for the Binary Snapshot Format
+Tests for write_snapshot / read_snapshot, format selection and convert
+"""
+
+import unittest
+import sys
+import os
+import io
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from binary_format import MAGIC, VERSION, HEADER, convert, format_for, read_snapshot, write_snapshot
+from library import Library
+from sqlite_library import SQLiteLibrary
+from books import Book, EBook, PhysicalBook
+from members import Member, StudentMember, TeacherMember
+
+
+def library_dicts(library):
+    """Everything a save records, as plain data"""
+    return {
+        "name": library.name,
+        "books": [book.to_dict() for book in library.books.values()],
+        "members": [member.to_dict() for member in library.members.values()],
+        "loans": list(library.ledger.to_dicts())
+    }
+
+
+class TestBinaryFormat(unittest.TestCase):
+    """Test cases for the binary library file"""
+
+    def setUp(self):
+        """Build a library with every record type and some loans"""
+        self.directory = tempfile.TemporaryDirectory()
+
+        self.library = Library("Bibliothèque «Test»")
+        self.library.add_books([
+            Book("ISBN1", "Python Basics", "Author 1", 2000),
+            EBook("ISBN2", "Données et 数据", "Author 2", 2020, 3.5, "epub"),
+            PhysicalBook("ISBN3", "Gardens", "Author 1", 1999, "A-12", "Fair"),
+        ])
+        teacher = TeacherMember("T001", "Dr. Smith", "smith@uni.edu", "FAC1", "Math")
+        teacher._extended_loan = False
+        self.library.add_members([
+            Member("M001", "John Doe", "john@example.com"),
+            StudentMember("S001", "Alice", "alice@uni.edu", "STU1", "CS"),
+            teacher,
+        ])
+        self.library.borrow_book("S001", "ISBN1")
+        self.library.return_book("S001", "ISBN1")
+        self.library.borrow_book("S001", "ISBN2")
+        self.library.borrow_book("T001", "ISBN3")
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.directory.cleanup()
+
+    def path(self, name):
+        """Path of a file in the temporary directory"""
+        return os.path.join(self.directory.name, name)
+
+    def test_round_trip(self):
+        """Test a binary save loads back the same records as a JSON save"""
+        self.library.save_to_file(self.path("library.bin"))
+        self.library.save_to_file(self.path("library.json"))
+
+        with open(self.path("library.bin"), 'rb') as file:
+            self.assertEqual(file.read(len(MAGIC)), MAGIC)
+        self.assertLess(os.path.getsize(self.path("library.bin")), os.path.getsize(self.path("library.json")))
+
+        expected = library_dicts(self.library)
+        for lazy in (False, True):
+            loaded = Library.load_from_file(self.path("library.bin"), lazy=lazy)
+            self.assertEqual(library_dicts(loaded), expected)
+            self.assertFalse(loaded.members["T001"].has_extended_loan)
+            self.assertEqual(loaded.get_borrower("ISBN3").member_id, "T001")
+
+        with SQLiteLibrary.load_from_file(self.path("library.bin")) as imported:
+            self.assertEqual(imported.get_loan_history("ISBN1"), self.library.get_loan_history("ISBN1"))
+            self.assertEqual(imported.books["ISBN2"].title, "Données et 数据")
+
+    def test_format_selection(self):
+        """Test the format follows the extension unless given"""
+        self.assertEqual(format_for("data/library.bin"), "binary")
+        self.assertEqual(format_for("data/library.json"), "json")
+        self.assertEqual(format_for("data/library.json", "binary"), "binary")
+        with self.assertRaises(ValueError):
+            format_for("data/library.json", "xml")
+
+        # Loading looks at the file's first bytes, not its name
+        self.library.save_to_file(self.path("library.json"), file_format="binary")
+        self.assertEqual(Library.load_from_file(self.path("library.json")).count_borrowed_books(), 2)
+
+    def test_convert_both_ways(self):
+        """Test JSON -> binary -> JSON gives back the same file"""
+        self.library.save_to_file(self.path("library.json"))
+        convert(self.path("library.json"), self.path("library.bin"))
+        convert(self.path("library.bin"), self.path("copy.json"))
+
+        with open(self.path("library.json")) as original, open(self.path("copy.json")) as copy:
+            self.assertEqual(copy.read(), original.read())
+
+    def test_convert_replaces_target(self):
+        """Test convert can rewrite a file in place and never leaves a half-written target"""
+        filename = self.path("library.json")
+        self.library.save_to_file(filename)
+        convert(filename, filename, file_format="binary")
+        self.assertEqual(library_dicts(Library.load_from_file(filename)), library_dicts(self.library))
+
+        with open(filename, 'rb') as file:
+            data = file.read()
+        with open(self.path("truncated.bin"), 'wb') as file:
+            file.write(data[:-10])
+        with self.assertRaises(ValueError):
+            convert(self.path("truncated.bin"), filename)
+        with open(filename, 'rb') as file:
+            self.assertEqual(file.read(), data)
+        self.assertFalse(os.path.exists(filename + ".tmp"))
+
+    def test_journal_with_binary_file(self):
+        """Test a journaled library saves and replays against a binary file"""
+        filename = self.path("library.bin")
+        self.library.open_journal(filename)
+        self.library.return_book("T001", "ISBN3")
+        loaded = Library.load_from_file(filename)
+        self.library.close_journal()
+
+        self.assertEqual(loaded.count_borrowed_books(), 1)
+        self.assertEqual(loaded._journal_seq, 1)
+
+    def test_newer_version_rejected(self):
+        """Test a file from a newer format version is refused, not misread"""
+        out = io.BytesIO()
+        write_snapshot(out, {"name": "Empty"})
+        data = bytearray(out.getvalue())
+        data[len(MAGIC):len(MAGIC) + HEADER.size] = HEADER.pack(VERSION + 1, 0, 0)
+
+        with self.assertRaises(ValueError):
+            list(read_snapshot(io.BytesIO(bytes(data))))
+        with self.assertRaises(ValueError):
+            list(read_snapshot(io.BytesIO(b"not a library")))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
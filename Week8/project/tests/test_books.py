@@ -119,6 +119,25 @@ class TestPhysicalBook(unittest.TestCase):
         self.assertEqual(self.physical.condition, "Good")  # Unchanged
 
 
+class TestBookLayout(unittest.TestCase):
+    """Test cases for the slotted book classes"""
+
+    def test_no_instance_dict(self):
+        """Test books store attributes in slots, not a __dict__"""
+        for book in [Book("1", "T", "A", 2020),
+                     EBook("2", "T", "A", 2020, 1.0, "pdf"),
+                     PhysicalBook("3", "T", "A", 2020, "A1")]:
+            self.assertFalse(hasattr(book, "__dict__"))
+            with self.assertRaises(AttributeError):
+                book.unknown_attribute = 1
+
+    def test_type_is_class_attribute(self):
+        """Test the type name is shared by the class"""
+        self.assertEqual(EBook._type, "EBook")
+        self.assertEqual(PhysicalBook._type, "PhysicalBook")
+        self.assertEqual(Book("1", "T", "A", 2020).to_dict()["type"], "Book")
+
+
 class TestBookFactory(unittest.TestCase):
     """Test cases for the book factory function"""
 
@@ -0,0 +1,145 @@
+"""
+Week 8: Unit Tests for Bulk Import
+Tests for streaming books and members from CSV and JSON Lines files
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bulk_import import import_books, import_members, detect_format
+from library import Library
+from columnar import ColumnarBookStore
+from books import Book, EBook, PhysicalBook
+from members import StudentMember, TeacherMember
+
+
+class TestBulkImport(unittest.TestCase):
+    """Test cases for import_books and import_members"""
+
+    def setUp(self):
+        """Set up a library and a temporary directory"""
+        self.library = Library("Import Library")
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.directory.cleanup()
+
+    def write(self, name, text):
+        """Write a file into the temporary directory"""
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        return path
+
+    def test_detect_format(self):
+        """Test the format comes from the extension"""
+        self.assertEqual(detect_format("feed.CSV"), "csv")
+        self.assertEqual(detect_format("feed.ndjson"), "jsonl")
+        with self.assertRaises(ValueError):
+            detect_format("feed.xml")
+
+    def test_import_books_csv(self):
+        """Test books of every type are imported from CSV"""
+        path = self.write("books.csv",
+                          "type,isbn,title,author,year,file_size_mb,file_format,shelf_location,condition\n"
+                          "EBook,E1,Python,Guido,2020,2.5,epub,,\n"
+                          "PhysicalBook,P1,History,Herodotus,1990,,,A1-3,Fair\n"
+                          ",B1,Plain,Someone,2001,,,,\n")
+
+        report = import_books(self.library, path)
+        self.assertEqual(report["imported"], 3)
+        self.assertEqual(report["rejected"], 0)
+        self.assertIsInstance(self.library.books["E1"], EBook)
+        self.assertEqual(self.library.books["E1"].file_size_mb, 2.5)
+        self.assertEqual(self.library.books["P1"].condition, "Fair")
+        self.assertIsInstance(self.library.books["B1"], Book)
+        self.assertEqual(self.library.search_books("history")[0].isbn, "P1")
+
+    def test_rejects_are_reported(self):
+        """Test bad and duplicate rows are rejected with their line numbers"""
+        self.library.add_book(Book("OLD", "Existing", "Author", 2000))
+        path = self.write("books.csv",
+                          "isbn,title,author,year\n"
+                          "A,One,X,2001\n"
+                          "B,Two,X,not-a-year\n"
+                          "A,One again,X,2002\n"
+                          "OLD,Clash,X,2003\n"
+                          "C,Three,X,\n")
+
+        report = import_books(self.library, path, batch_size=2)
+        self.assertEqual(report["imported"], 1)
+        self.assertEqual(report["rejected"], 4)
+        reasons = dict(report["rejects"])
+        self.assertIn("Invalid value", reasons[3])
+        self.assertIn("Duplicate", reasons[4])
+        self.assertIn("Duplicate", reasons[5])
+        self.assertIn("Missing field", reasons[6])
+        self.assertEqual(self.library.books["OLD"].title, "Existing")
+
+    def test_import_books_jsonl(self):
+        """Test books are imported from JSON Lines using to_dict records"""
+        books = [PhysicalBook(f"P{n}", f"Title {n}", "Author", 2000 + n, "B2") for n in range(5)]
+        lines = [json.dumps(book.to_dict()) for book in books] + ["{broken", ""]
+        path = self.write("books.jsonl", "\n".join(lines) + "\n")
+
+        report = import_books(self.library, path, batch_size=2)
+        self.assertEqual(report["imported"], 5)
+        self.assertEqual(report["rejected"], 1)
+        self.assertEqual(report["rejects"][0][0], 6)
+        self.assertEqual(self.library.count_books_by_type("PhysicalBook"), 5)
+
+    def test_rows_that_cannot_be_stored_rejected(self):
+        """Test bad rows are rejected and leave the batch and indexes intact"""
+        lines = [json.dumps({"isbn": "A", "title": "Fine", "author": "Author", "year": 2000}),
+                 json.dumps({"isbn": "B", "title": None, "author": "Author", "year": 2000}),
+                 json.dumps({"isbn": "C", "title": "Fine", "author": "Author", "year": 2000})]
+        path = self.write("books.jsonl", "\n".join(lines) + "\n")
+
+        report = import_books(self.library, path)
+        self.assertEqual(report["imported"], 2)
+        self.assertEqual(report["rejects"], [(2, "Invalid record: title must be a string, not NoneType")])
+        self.assertEqual(self.library.count_available_books(), 2)
+
+        # A store that refuses a book only when adding it: the batch is retried row by row
+        library = Library("Columnar", book_store=ColumnarBookStore())
+        lines[1] = json.dumps({"isbn": "B", "title": "Bad year", "author": "Author", "year": "2000"})
+        path = self.write("books.jsonl", "\n".join(lines) + "\n")
+
+        report = import_books(library, path)
+        self.assertEqual(report["imported"], 2)
+        self.assertEqual(report["rejects"][0][0], 2)
+        self.assertEqual(sorted(library.books), ["A", "C"])
+        self.assertEqual(library.count_available_books(), 2)
+        self.assertEqual([book.isbn for book in library.search_books("fine")], ["A", "C"])
+
+    def test_import_members(self):
+        """Test members are imported from CSV with their loans"""
+        path = self.write("members.csv",
+                          "type,member_id,name,email,student_id,major,faculty_id,department,borrowed_books\n"
+                          "Student,S1,Ann,ann@uni.edu,STU1,CS,,,E1;E2\n"
+                          "Teacher,T1,Bob,bob@uni.edu,,,F1,Math,\n"
+                          "Teacher,T1,Bob again,bob@uni.edu,,,F1,Math,\n")
+
+        report = import_members(self.library, path)
+        self.assertEqual(report["imported"], 2)
+        self.assertEqual(report["rejected"], 1)
+        self.assertIsInstance(self.library.members["S1"], StudentMember)
+        self.assertEqual(list(self.library.members["S1"].borrowed_books), ["E1", "E2"])
+        self.assertIsInstance(self.library.members["T1"], TeacherMember)
+
+    def test_max_rejects_limits_details(self):
+        """Test only the first rejects are kept in detail"""
+        path = self.write("books.jsonl", "{bad\n" * 10)
+        report = import_books(self.library, path, max_rejects=3)
+        self.assertEqual(report["rejected"], 10)
+        self.assertEqual(len(report["rejects"]), 3)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,166 @@
+"""
+Week 8: Unit Tests for the Columnar Book Store
+Tests for ColumnarBookStore and a Library that keeps its books in one
+"""
+
+import unittest
+import sys
+import os
+import copy
+import pickle
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from columnar import ColumnarBookStore
+from library import Library
+from books import Book, EBook, PhysicalBook
+from members import Member
+from analytics import filter_books_by_year, calculate_total_file_size, get_popular_authors
+
+
+class TestColumnarBookStore(unittest.TestCase):
+    """Test cases for ColumnarBookStore"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.store = ColumnarBookStore()
+        self.store["ISBN1"] = Book("ISBN1", "Book 1", "Author 1", 2000)
+        self.store["ISBN2"] = EBook("ISBN2", "EBook 1", "Author 2", 2010, 3.5, "pdf")
+        self.store["ISBN3"] = PhysicalBook("ISBN3", "Physical 1", "Author 1", 2020, "A1", "Fair")
+
+    def test_views_match_stored_books(self):
+        """Test reading a row gives back the same fields and type"""
+        ebook = self.store["ISBN2"]
+        self.assertIsInstance(ebook, EBook)
+        self.assertEqual(ebook.to_dict(), EBook("ISBN2", "EBook 1", "Author 2", 2010, 3.5, "pdf").to_dict())
+
+        physical = self.store["ISBN3"]
+        self.assertIsInstance(physical, PhysicalBook)
+        self.assertEqual(physical.shelf_location, "A1")
+        self.assertEqual(physical.condition, "Fair")
+
+    def test_books_are_copies(self):
+        """Test a book read from the store does not change with it, or change it"""
+        book = self.store["ISBN1"]
+        self.assertTrue(book.borrow("M001"))
+        self.assertTrue(self.store["ISBN1"].is_available)
+
+        self.store["ISBN1"] = book
+        self.assertEqual(self.store["ISBN1"].borrowed_by, "M001")
+        self.assertEqual(self.store["ISBN1"].due_date, book.due_date)
+        self.assertEqual(self.store.count_available(), 2)
+
+        held = self.store["ISBN1"]
+        self.store["ISBN1"] = book.without_loan()
+        self.assertEqual(held.borrowed_by, "M001")
+        self.assertIsNone(self.store["ISBN1"].due_date)
+
+    def test_delete_and_replace(self):
+        """Test removing books and replacing a book with another type"""
+        del self.store["ISBN1"]
+        self.assertNotIn("ISBN1", self.store)
+        self.assertEqual(list(self.store), ["ISBN2", "ISBN3"])
+
+        self.store["ISBN2"] = Book("ISBN2", "Now Plain", "Author 2", 2010)
+        self.assertNotIsInstance(self.store["ISBN2"], EBook)
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(self.store.total_file_size(), 0)
+
+    def test_column_scans(self):
+        """Test whole-column queries skip removed rows"""
+        self.assertEqual(self.store.isbns_published_between(2005, 2020), ["ISBN2", "ISBN3"])
+        self.assertEqual(self.store.isbns_of_type("EBook"), ["ISBN2"])
+        self.assertEqual(self.store.total_file_size(), 3.5)
+        self.assertEqual(self.store.author_counts(), {"Author 1": 2, "Author 2": 1})
+
+        del self.store["ISBN3"]
+        self.assertEqual(self.store.isbns_published_between(2005, 2020), ["ISBN2"])
+        self.assertEqual(self.store.author_counts(), {"Author 1": 1, "Author 2": 1})
+
+    def test_removed_rows_reclaimed(self):
+        """Test the columns shrink once most of their rows are dead"""
+        for index in range(100):
+            self.store[f"X{index}"] = Book(f"X{index}", "Extra", "Author 3", 1990)
+        self.store["ISBN2"] = Book("ISBN2", "Now Plain", "Author 2", 2010)
+        for index in range(100):
+            del self.store[f"X{index}"]
+
+        self.assertLessEqual(len(self.store.years), 2 * len(self.store))
+        self.assertEqual(list(self.store), ["ISBN1", "ISBN2", "ISBN3"])
+        self.assertEqual(self.store.isbns_published_between(1980, 2020), ["ISBN1", "ISBN2", "ISBN3"])
+        self.assertEqual(self.store["ISBN3"].shelf_location, "A1")
+        self.assertEqual(self.store.author_counts(), {"Author 1": 2, "Author 2": 1})
+
+    def test_copy_is_independent(self):
+        """Test a copied store does not see later changes"""
+        copied = self.store.copy()
+        self.store["ISBN1"] = self.store["ISBN1"].with_loan("M001", 1)
+        del self.store["ISBN2"]
+
+        self.assertTrue(copied["ISBN1"].is_available)
+        self.assertIn("ISBN2", copied)
+
+    def test_copy_and_pickle_give_plain_books(self):
+        """Test books read from the store copy and pickle as ordinary books"""
+        for detached in (copy.copy(self.store["ISBN3"]), pickle.loads(pickle.dumps(self.store["ISBN3"]))):
+            self.assertIs(type(detached), PhysicalBook)
+            self.assertEqual(detached.to_dict(), self.store["ISBN3"].to_dict())
+
+
+class TestColumnarLibrary(unittest.TestCase):
+    """Test cases for a Library using a ColumnarBookStore"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.library = Library("Columnar Library", book_store=ColumnarBookStore())
+        self.library.add_book(Book("ISBN1", "Python Basics", "Author 1", 2000))
+        self.library.add_book(EBook("ISBN2", "Advanced Python", "Author 2", 2010, 3.5, "PDF"))
+        self.library.add_book(PhysicalBook("ISBN3", "Data Science", "Author 1", 2020, "A1"))
+        self.library.add_member(Member("M001", "John Doe", "john@example.com"))
+
+    def test_borrow_and_return(self):
+        """Test the loan workflow and indexes work on columnar books"""
+        success, _ = self.library.borrow_book("M001", "ISBN1")
+        self.assertTrue(success)
+        self.assertFalse(self.library.books["ISBN1"].is_available)
+        self.assertEqual(self.library.count_borrowed_books(), 1)
+        self.assertEqual([book.isbn for book in self.library.get_member_borrowed_books("M001")], ["ISBN1"])
+
+        success, _ = self.library.return_book("M001", "ISBN1")
+        self.assertTrue(success)
+        self.assertEqual(self.library.count_available_books(), 3)
+
+    def test_search_and_type_queries(self):
+        """Test search and type lookups return columnar books"""
+        self.assertEqual([book.isbn for book in self.library.search_books("python")], ["ISBN1", "ISBN2"])
+        self.assertEqual([book.isbn for book in self.library.get_books_by_type("PhysicalBook")], ["ISBN3"])
+
+    def test_snapshot_unchanged_by_borrow(self):
+        """Test snapshots of a columnar library stay frozen"""
+        view = self.library.snapshot()
+        self.library.borrow_book("M001", "ISBN1")
+        self.assertTrue(view.books["ISBN1"].is_available)
+        self.assertEqual(view.count_borrowed_books(), 0)
+
+    def test_analytics_use_columns(self):
+        """Test analytics give the same answers as with a dict store"""
+        self.assertEqual([book.isbn for book in filter_books_by_year(self.library, 2005, 2020)], ["ISBN2", "ISBN3"])
+        self.assertEqual(calculate_total_file_size(self.library), 3.5)
+        self.assertEqual(get_popular_authors(self.library, 1), [("Author 1", 2)])
+
+    def test_save_and_load(self):
+        """Test a columnar library round-trips through JSON"""
+        self.library.borrow_book("M001", "ISBN2")
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "library.json")
+            self.library.save_to_file(filename)
+            loaded = Library.load_from_file(filename, book_store=ColumnarBookStore())
+
+        self.assertIsInstance(loaded.books, ColumnarBookStore)
+        self.assertEqual(loaded.books["ISBN2"].borrowed_by, "M001")
+        self.assertEqual(loaded.count_borrowed_books(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Week 8: Unit Tests for Compressed Library Files
+Tests for codec_for, compressing / decompressing and compressed saves
+"""
+
+import unittest
+import sys
+import os
+import io
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from compressed import CODECS, codec_for, compressing, decompressing, strip_extension
+from binary_format import convert, format_for
+from library import Library
+from sqlite_library import SQLiteLibrary
+from books import Book, EBook
+from members import Member, StudentMember
+
+
+class TestCompressed(unittest.TestCase):
+    """Test cases for saving and loading through gzip, bz2 and lzma"""
+
+    def setUp(self):
+        """Build a library with some loans"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.library = Library("Compressed «Test»")
+        self.library.add_books([Book(f"ISBN{index}", f"Title {index % 7}", "Author", 2000 + index % 20)
+                                for index in range(200)])
+        self.library.add_book(EBook("EB1", "Données", "Author 2", 2020, 3.5, "epub"))
+        self.library.add_members([
+            Member("M001", "John Doe", "john@example.com"),
+            StudentMember("S001", "Alice", "alice@uni.edu", "STU1", "CS"),
+        ])
+        self.library.borrow_book("S001", "ISBN1")
+        self.library.borrow_book("M001", "EB1")
+        self.library.return_book("M001", "EB1")
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.directory.cleanup()
+
+    def path(self, name):
+        """Path of a file in the temporary directory"""
+        return os.path.join(self.directory.name, name)
+
+    def test_codec_selection(self):
+        """Test the codec and format follow the extensions unless given"""
+        self.assertEqual(codec_for("library.json.gz"), "gzip")
+        self.assertEqual(codec_for("library.bin.bz2"), "bz2")
+        self.assertEqual(codec_for("library.json.XZ"), "lzma")
+        self.assertIsNone(codec_for("library.json"))
+        self.assertEqual(codec_for("library.json", "lzma"), "lzma")
+        self.assertIsNone(codec_for("library.json.gz", "none"))
+        with self.assertRaises(ValueError):
+            codec_for("library.json", "zip")
+
+        self.assertEqual(strip_extension("data/library.bin.gz"), "data/library.bin")
+        self.assertEqual(format_for("data/library.bin.gz"), "binary")
+        self.assertEqual(format_for("data/library.json.xz"), "json")
+
+    def test_stream_round_trip(self):
+        """Test each codec's stream is recognized and read back"""
+        payload = b"LIBSNAP\x00" + bytes(range(256)) * 100
+        for codec in CODECS:
+            raw = io.BytesIO()
+            with compressing(raw, codec, level=1) as file:
+                file.write(payload)
+            self.assertFalse(raw.closed)
+            self.assertLess(len(raw.getvalue()), len(payload))
+
+            file, found = decompressing(io.BufferedReader(io.BytesIO(raw.getvalue())))
+            self.assertEqual(found, codec)
+            self.assertEqual(file.read(), payload)
+
+        file, found = decompressing(io.BufferedReader(io.BytesIO(b'{"name": "x"}')))
+        self.assertIsNone(found)
+        self.assertEqual(file.read(), b'{"name": "x"}')
+
+    def test_save_and_load(self):
+        """Test every codec and format saves smaller and loads the same library"""
+        self.library.save_to_file(self.path("library.json"))
+        expected = [book.to_dict() for book in self.library.books.values()]
+
+        for name in ("library.json.gz", "library.json.bz2", "library.json.xz",
+                     "library.bin.gz", "library.bin.bz2", "library.bin.xz"):
+            filename = self.path(name)
+            self.library.save_to_file(filename)
+            self.assertLess(os.path.getsize(filename), os.path.getsize(self.path("library.json")))
+
+            for lazy in (False, True):
+                loaded = Library.load_from_file(filename, lazy=lazy)
+                self.assertEqual([book.to_dict() for book in loaded.books.values()], expected)
+                self.assertEqual(loaded.get_borrower("ISBN1").member_id, "S001")
+            with SQLiteLibrary.load_from_file(filename) as imported:
+                self.assertEqual(imported.get_loan_history("EB1"), self.library.get_loan_history("EB1"))
+
+        # An explicit codec overrides the extension, and loading needs no hint
+        self.library.save_to_file(self.path("plain.json"), compression="bz2", level=1)
+        with open(self.path("plain.json"), 'rb') as file:
+            self.assertEqual(file.read(3), b"BZh")
+        self.assertEqual(Library.load_from_file(self.path("plain.json")).count_borrowed_books(), 1)
+
+    def test_same_bytes_every_save(self):
+        """Test saving the same library twice gives the same gzip file"""
+        self.library.save_to_file(self.path("first.json.gz"))
+        self.library.save_to_file(self.path("second.json.gz"))
+        with open(self.path("first.json.gz"), 'rb') as first, open(self.path("second.json.gz"), 'rb') as second:
+            self.assertEqual(first.read(), second.read())
+
+    def test_convert_and_export(self):
+        """Test convert and SQLiteLibrary.save_to_file write compressed files"""
+        self.library.save_to_file(self.path("library.json"))
+        convert(self.path("library.json"), self.path("library.bin.xz"))
+        convert(self.path("library.bin.xz"), self.path("copy.json"))
+        with open(self.path("library.json")) as original, open(self.path("copy.json")) as copy:
+            self.assertEqual(copy.read(), original.read())
+
+        with SQLiteLibrary.load_from_file(self.path("library.bin.xz")) as imported:
+            imported.save_to_file(self.path("export.json.gz"))
+        self.assertEqual(len(Library.load_from_file(self.path("export.json.gz")).books), 201)
+
+    def test_mapped_not_compressed(self):
+        """Test a mapped snapshot, which is read in place, cannot be compressed"""
+        with self.assertRaises(ValueError):
+            self.library.save_to_file(self.path("library.snap.gz"))
+        with self.assertRaises(ValueError):
+            self.library.save_to_file(self.path("library.snap"), compression="gzip")
+        self.assertFalse(os.path.exists(self.path("library.snap")))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
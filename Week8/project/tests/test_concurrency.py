@@ -0,0 +1,145 @@
+"""
+Week 8: Concurrency Tests for the Library Class
+Stress tests that run many checkout threads against one library
+"""
+
+import unittest
+import random
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from library import Library
+from locks import KeyLocks
+from books import Book
+from members import Member, TeacherMember
+
+
+class TestKeyLocks(unittest.TestCase):
+    """Test cases for the KeyLocks class"""
+
+    def test_same_key_is_exclusive(self):
+        """Test a key cannot be held by two threads at once"""
+        locks = KeyLocks(stripes=8)
+        acquired = []
+
+        with locks.hold("ISBN1"):
+            thread = threading.Thread(target=lambda: acquired.append(
+                locks._locks[hash("ISBN1") % 8].acquire(timeout=0.05)))
+            thread.start()
+            thread.join()
+
+        self.assertEqual(acquired, [False])
+
+    def test_hold_many_keys(self):
+        """Test holding several keys that share a stripe does not deadlock"""
+        locks = KeyLocks(stripes=2)
+        with locks.hold("a", "b", "c", "d", "a"):
+            pass
+
+
+class TestLibraryConcurrency(unittest.TestCase):
+    """Stress tests for concurrent borrowing and returning"""
+
+    NUM_THREADS = 8
+    library_class = Library  # Other implementations rerun these tests
+
+    def setUp(self):
+        """Set up a library with a few contested books"""
+        self.old_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # Switch threads as often as possible
+
+        self.library = self.library_class("Concurrent Library")
+        for index in range(20):
+            self.library.add_book(Book(f"ISBN{index}", f"Book {index}", "Author", 2020))
+        for index in range(self.NUM_THREADS * 2):
+            self.library.add_member(Member(f"M{index}", f"Member {index}", f"m{index}@example.com"))
+
+    def tearDown(self):
+        """Restore the thread switch interval"""
+        sys.setswitchinterval(self.old_interval)
+
+    def run_threads(self, target):
+        """Run target(thread_number) on several threads at once"""
+        barrier = threading.Barrier(self.NUM_THREADS)
+
+        def runner(number):
+            barrier.wait()
+            target(number)
+
+        threads = [threading.Thread(target=runner, args=(number,)) for number in range(self.NUM_THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_book_never_double_lent(self):
+        """Test each contested book is lent to exactly one member"""
+        teachers = [TeacherMember(f"T{n}", "Teacher", "t@example.com", f"F{n}", "Math")
+                    for n in range(self.NUM_THREADS)]
+        for teacher in teachers:
+            teacher._max_books = 100
+            self.library.add_member(teacher)
+
+        successes = []
+
+        def grab_everything(number):
+            isbns = [f"ISBN{index}" for index in range(20)]
+            random.Random(number).shuffle(isbns)
+            for isbn in isbns:
+                if self.library.borrow_book(f"T{number}", isbn)[0]:
+                    successes.append(isbn)
+
+        self.run_threads(grab_everything)
+
+        self.assertEqual(sorted(successes), sorted(f"ISBN{index}" for index in range(20)))
+        self.assertEqual(sum(teacher.borrowed_count for teacher in teachers), 20)
+
+    def test_borrow_return_churn_keeps_state_consistent(self):
+        """Test random borrows and returns leave books and members in agreement"""
+        def churn(number):
+            rng = random.Random(number)
+            for _ in range(300):
+                member_id = f"M{rng.randrange(self.NUM_THREADS * 2)}"
+                isbn = f"ISBN{rng.randrange(20)}"
+                if rng.random() < 0.5:
+                    self.library.borrow_book(member_id, isbn)
+                else:
+                    self.library.return_book(member_id, isbn)
+
+        self.run_threads(churn)
+
+        holders = {}
+        for member in self.library.members.values():
+            self.assertLessEqual(member.borrowed_count, member.max_books)
+            for isbn in member.borrowed_books:
+                self.assertNotIn(isbn, holders, "book held by two members")
+                holders[isbn] = member.member_id
+
+        for isbn, book in self.library.books.items():
+            self.assertEqual(book.borrowed_by, holders.get(isbn))
+            self.assertEqual(book.is_available, isbn not in holders)
+            self.assertEqual(self.library.get_borrower(isbn) is None, isbn not in holders)
+
+        self.assertEqual(self.library.count_borrowed_books(), len(holders))
+        self.assertEqual(self.library.count_available_books(), 20 - len(holders))
+
+    def test_concurrent_batches(self):
+        """Test overlapping batches are applied all-or-nothing"""
+        results = []
+
+        def batch(number):
+            isbns = [f"ISBN{(number + offset) % 20}" for offset in range(3)]
+            results.append(self.library.borrow_many([(f"M{number}", isbn) for isbn in isbns])[0])
+
+        self.run_threads(batch)
+
+        lent = sum(member.borrowed_count for member in self.library.members.values())
+        self.assertEqual(lent, 3 * results.count(True))
+        self.assertEqual(self.library.count_borrowed_books(), lent)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,79 @@
+"""
+Week 8: Unit Tests for Date Helpers
+Tests for day-ordinal conversion and the cached "today"
+"""
+
+import unittest
+import sys
+import os
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import dates
+from dates import format_date, to_ordinal, today_ordinal
+from books import Book, create_book_from_dict
+from members import Member, create_member_from_dict
+
+
+class TestDateHelpers(unittest.TestCase):
+    """Test cases for dates.py"""
+
+    def test_to_ordinal_accepts_all_forms(self):
+        """Test strings, dates, datetimes and ordinals give the same ordinal"""
+        expected = date(2024, 3, 10).toordinal()
+        self.assertEqual(to_ordinal("2024-03-10"), expected)
+        self.assertEqual(to_ordinal(date(2024, 3, 10)), expected)
+        self.assertEqual(to_ordinal(datetime(2024, 3, 10, 18, 30)), expected)
+        self.assertEqual(to_ordinal(expected), expected)
+        self.assertIsNone(to_ordinal(None))
+        self.assertIsNone(to_ordinal(""))
+
+    def test_format_round_trip(self):
+        """Test formatting an ordinal gives back the original string"""
+        self.assertEqual(format_date(to_ordinal("2024-02-29")), "2024-02-29")
+        self.assertIsNone(format_date(None))
+
+    def test_today_is_cached(self):
+        """Test today_ordinal matches date.today() and reuses the cached value"""
+        self.assertEqual(today_ordinal(), date.today().toordinal())
+
+        ordinal, ends_at = dates._today
+        dates._today = (ordinal - 1, ends_at)
+        try:
+            self.assertEqual(today_ordinal(), ordinal - 1)
+        finally:
+            dates._today = (0, 0.0)
+        self.assertEqual(today_ordinal(), ordinal)
+
+
+class TestRecordDates(unittest.TestCase):
+    """Test cases for dates stored on books and members"""
+
+    def test_borrow_sets_due_ordinal(self):
+        """Test borrowing stores the due date as an ordinal"""
+        book = Book("ISBN1", "Title", "Author", 2020)
+        book.borrow("M001", days=14)
+        self.assertEqual(book.due_ordinal, today_ordinal() + 14)
+        self.assertEqual(book.due_date, format_date(today_ordinal() + 14))
+
+    def test_due_date_json_round_trip(self):
+        """Test the due date is written and read back as a string"""
+        book = create_book_from_dict({"isbn": "ISBN1", "title": "T", "author": "A", "year": 2020,
+                                      "is_available": False, "borrowed_by": "M001",
+                                      "due_date": "2024-01-15"})
+        self.assertEqual(book.due_ordinal, date(2024, 1, 15).toordinal())
+        self.assertEqual(book.to_dict()["due_date"], "2024-01-15")
+
+    def test_join_date(self):
+        """Test members keep their join date as an ordinal"""
+        self.assertEqual(Member("M001", "Name", "a@b.c").join_date, date.today().isoformat())
+
+        member = create_member_from_dict({"member_id": "M001", "name": "Name", "email": "a@b.c",
+                                          "join_date": "2024-01-01"})
+        self.assertEqual(member.join_date, "2024-01-01")
+        self.assertEqual(member.to_dict()["join_date"], "2024-01-01")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
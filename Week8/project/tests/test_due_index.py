@@ -0,0 +1,50 @@
+"""
+Week 8: Unit Tests for the Due Date Index
+Tests for ordered due-date lookups
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from due_index import DueDateIndex
+from dates import to_ordinal
+
+
+class TestDueDateIndex(unittest.TestCase):
+    """Test cases for the DueDateIndex class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.index = DueDateIndex()
+        self.index.add("ISBN1", to_ordinal("2024-03-10"))
+        self.index.add("ISBN2", to_ordinal("2024-01-05"))
+        self.index.add("ISBN3", to_ordinal("2024-02-20"))
+
+    def test_due_before(self):
+        """Test books due before a date come back earliest first"""
+        self.assertEqual(self.index.due_before(to_ordinal("2024-03-01")), ["ISBN2", "ISBN3"])
+        self.assertEqual(self.index.due_before(to_ordinal("2024-01-05")), [])
+
+    def test_due_between(self):
+        """Test range queries include start and exclude end"""
+        self.assertEqual(self.index.due_between(to_ordinal("2024-02-20"), to_ordinal("2024-03-10")), ["ISBN3"])
+
+    def test_remove(self):
+        """Test removed books are no longer returned"""
+        self.assertTrue(self.index.remove("ISBN2"))
+        self.assertFalse(self.index.remove("ISBN2"))
+        self.assertEqual(self.index.due_before(to_ordinal("2024-12-31")), ["ISBN3", "ISBN1"])
+        self.assertEqual(len(self.index), 2)
+
+    def test_add_replaces_due_date(self):
+        """Test re-adding a book moves it to its new due date"""
+        self.index.add("ISBN1", to_ordinal("2023-12-01"))
+        self.assertEqual(self.index.due_before(to_ordinal("2024-01-01")), ["ISBN1"])
+        self.assertEqual(len(self.index), 3)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,115 @@
+"""
+Week 8: Unit Tests for String Interning
+Tests for StringTable and the shared strings used by the record factories
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from interning import StringPool, StringTable, intern_string
+from books import create_book_from_dict
+from members import create_member_from_dict
+from library import Library
+
+
+class TestStringTable(unittest.TestCase):
+    """Test cases for StringTable"""
+
+    def test_encode_reuses_codes(self):
+        """Test the same string always gets the same code"""
+        table = StringTable()
+        first = table.encode("Austen")
+        self.assertEqual(table.encode("Tolkien"), first + 1)
+        self.assertEqual(table.encode("Austen"), first)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.lookup("Tolkien"), first + 1)
+        self.assertIsNone(table.lookup("Nobody"))
+
+    def test_intern_returns_first_copy(self):
+        """Test equal strings are replaced by the first one seen"""
+        table = StringTable()
+        first = "".join(["Jane ", "Austen"])
+        second = "".join(["Jane ", "Austen"])
+        self.assertIsNot(first, second)
+        self.assertIs(table.intern(first), first)
+        self.assertIs(table.intern(second), first)
+        self.assertIsNone(table.intern(None))
+
+
+class TestFactoryInterning(unittest.TestCase):
+    """Test cases for interning in create_book_from_dict/create_member_from_dict"""
+
+    def test_books_share_repeated_strings(self):
+        """Test books parsed from JSON share author, format and condition strings"""
+        records = json.loads(json.dumps([
+            {"type": "EBook", "isbn": "1", "title": "A", "author": "Jane Austen", "year": 1811,
+             "file_size_mb": 1.0, "file_format": "pdf"},
+            {"type": "EBook", "isbn": "2", "title": "B", "author": "Jane Austen", "year": 1813,
+             "file_size_mb": 2.0, "file_format": "PDF"},
+            {"type": "PhysicalBook", "isbn": "3", "title": "C", "author": "Jane Austen", "year": 1815,
+             "shelf_location": "A1", "condition": "Fair"},
+            {"type": "PhysicalBook", "isbn": "4", "title": "D", "author": "Other", "year": 1816,
+             "shelf_location": "A1", "condition": "Fair"},
+        ]))
+        with StringPool() as pool:
+            first, second, third, fourth = [create_book_from_dict(record) for record in records]
+
+        self.assertIs(first.author, second.author)
+        self.assertIs(first.author, third.author)
+        self.assertIs(first.file_format, second.file_format)
+        self.assertIs(third.condition, fourth.condition)
+        self.assertIsNot(third.shelf_location, fourth.shelf_location)  # Nearly unique, not interned
+        self.assertIs(first.author, pool.intern("author", "Jane Austen"))
+
+    def test_members_share_repeated_strings(self):
+        """Test members parsed from JSON share major and department strings"""
+        records = json.loads(json.dumps([
+            {"type": "Student", "member_id": "S1", "name": "A", "email": "a@x", "major": "CS"},
+            {"type": "Student", "member_id": "S2", "name": "B", "email": "b@x", "major": "CS"},
+            {"type": "Teacher", "member_id": "T1", "name": "C", "email": "c@x", "department": "Math"},
+            {"type": "Teacher", "member_id": "T2", "name": "D", "email": "d@x", "department": "Math"},
+        ]))
+        with StringPool():
+            members = [create_member_from_dict(record) for record in records]
+
+        self.assertIs(members[0].major, members[1].major)
+        self.assertIs(members[2].department, members[3].department)
+
+
+class TestStringPool(unittest.TestCase):
+    """Test cases for the scope of StringPool"""
+
+    def test_nothing_interned_outside_a_pool(self):
+        """Test no strings are pinned by module state once a pool is gone"""
+        value = "".join(["Jane ", "Austen"])
+        self.assertIs(intern_string("author", value), value)
+        with StringPool():
+            self.assertIs(intern_string("author", value), value)
+            self.assertIs(intern_string("author", "".join(["Jane ", "Austen"])), value)
+        self.assertIsNot(intern_string("author", "".join(["Jane ", "Austen"])), value)
+
+    def test_each_load_has_its_own_pool(self):
+        """Test loads share strings within themselves but not across loads"""
+        library = Library("Pools")
+        for isbn in ("1", "2"):
+            library.add_book(create_book_from_dict({"isbn": isbn, "title": "T",
+                                                    "author": "".join(["Jane ", "Austen"]), "year": 1811}))
+        self.assertIsNot(library.books["1"].author, library.books["2"].author)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "library.json")
+            library.save_to_file(filename)
+            for lazy in (False, True):
+                first = Library.load_from_file(filename, lazy=lazy)
+                second = Library.load_from_file(filename, lazy=lazy)
+                self.assertIs(first.books["1"].author, first.books["2"].author)
+                self.assertIsNot(first.books["1"].author, second.books["1"].author)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
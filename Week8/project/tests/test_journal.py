@@ -0,0 +1,224 @@
+"""
+Week 8: Unit Tests for the Write-Ahead Journal
+Tests for Journal and Library.open_journal / replay on load
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from journal import Journal, journal_path, read_journal
+from library import Library
+from books import Book, EBook
+from members import Member, StudentMember
+
+
+class TestJournal(unittest.TestCase):
+    """Test cases for the Journal file"""
+
+    def setUp(self):
+        """Create a temporary directory"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "library.json.journal")
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.directory.cleanup()
+
+    def test_append_and_read(self):
+        """Test records are numbered, compact and read back in order"""
+        journal = Journal(self.path, seq=5)
+        self.assertEqual(journal.append("remove_book", "ISBN1"), 6)
+        journal.wait(journal.append("return", "M001", "ISBN2", 738000))
+        self.assertEqual(journal.synced_seq, 7)
+        self.assertEqual(len(journal), 2)
+        journal.close()
+
+        with open(self.path) as file:
+            self.assertEqual(file.readline(), '[6,"remove_book","ISBN1"]\n')
+        self.assertEqual(list(read_journal(self.path)),
+                         [[6, "remove_book", "ISBN1"], [7, "return", "M001", "ISBN2", 738000]])
+
+    def test_half_written_record_ignored(self):
+        """Test reading stops at a record cut off by a crash"""
+        with open(self.path, 'w') as file:
+            file.write('[1,"remove_book","ISBN1"]\n[2,"remove_bo')
+        self.assertEqual(list(read_journal(self.path)), [[1, "remove_book", "ISBN1"]])
+        self.assertEqual(list(read_journal(self.path + ".missing")), [])
+
+    def test_concurrent_waits_share_fsync(self):
+        """Test every waiting thread's record ends up synced"""
+        journal = Journal(self.path)
+
+        def worker(index):
+            for _ in range(20):
+                journal.wait(journal.append("remove_book", f"ISBN{index}"))
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(journal.synced_seq, 80)
+        journal.close()
+        self.assertEqual([record[0] for record in read_journal(self.path)], list(range(1, 81)))
+
+    def test_background_sync(self):
+        """Test with sync_interval, wait returns at once and close syncs"""
+        journal = Journal(self.path, sync_interval=60)
+        journal.wait(journal.append("remove_book", "ISBN1"))
+        self.assertEqual(journal.synced_seq, 0)
+        journal.close()
+        self.assertEqual(journal.synced_seq, 1)
+
+    def test_rotate_keeps_records_until_discarded(self):
+        """Test rotate moves records aside and appends to a leftover .old file"""
+        journal = Journal(self.path)
+        journal.append("remove_book", "ISBN1")
+        self.assertEqual(journal.rotate(), 1)
+        journal.append("remove_book", "ISBN2")
+        journal.rotate()
+
+        self.assertEqual(len(journal), 0)
+        self.assertEqual([record[0] for record in read_journal(self.path + ".old")], [1, 2])
+        journal.discard_old()
+        self.assertFalse(os.path.exists(self.path + ".old"))
+        journal.close()
+
+
+class TestLibraryJournal(unittest.TestCase):
+    """Test cases for a journaled Library"""
+
+    def setUp(self):
+        """Save a small library and start journaling it"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "library.json")
+
+        self.library = Library("Test Library")
+        self.library.add_book(Book("ISBN1", "Python Basics", "Author 1", 2000))
+        self.library.add_member(Member("M001", "John Doe", "john@example.com"))
+        self.library.open_journal(self.filename)
+
+    def tearDown(self):
+        """Stop journaling and remove the files"""
+        self.library.close_journal()
+        self.directory.cleanup()
+
+    def journaled(self):
+        """Operations recorded in the journal file"""
+        return [record[1] for record in read_journal(journal_path(self.filename))]
+
+    def test_open_saves_new_library(self):
+        """Test opening a journal for a new file saves the library first"""
+        with open(self.filename) as file:
+            self.assertEqual(json.load(file)["journal_seq"], 0)
+        self.assertEqual(self.journaled(), [])
+
+    def test_bare_filename(self):
+        """Test a journal can be opened for a file in the working directory"""
+        self.library.close_journal()
+        cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            self.library.open_journal("bare.json")
+            self.library.remove_book("ISBN1")
+            self.library.close_journal()
+            self.assertNotIn("ISBN1", Library.load_from_file("bare.json").books)
+        finally:
+            os.chdir(cwd)
+
+    def test_changes_replayed_without_save(self):
+        """Test every change since the last save survives a crash"""
+        library = self.library
+        library.add_book(EBook("ISBN2", "Data Science", "Author 2", 2020, 3.5, "PDF"))
+        library.add_member(StudentMember("S001", "Alice", "alice@uni.edu", "STU1", "CS"))
+        library.borrow_book("M001", "ISBN1")
+        library.borrow_many([("S001", "ISBN2")])
+        library.return_book("M001", "ISBN1")
+        library.remove_book("ISBN1")
+        library.add_books([Book("ISBN3", "Gardens", "Author 3", 1999)])
+        library.borrow_book("FAKE", "ISBN3")  # Refused, so not journaled
+
+        self.assertEqual(self.journaled(), ["add_book", "add_member", "borrow", "batch",
+                                            "return", "remove_book", "batch"])
+
+        for lazy in (False, True):
+            loaded = Library.load_from_file(self.filename, lazy=lazy)
+            self.assertEqual(sorted(loaded.books), ["ISBN2", "ISBN3"])
+            self.assertEqual(loaded.get_borrower("ISBN2").member_id, "S001")
+            self.assertEqual(loaded.books["ISBN2"].due_date, library.books["ISBN2"].due_date)
+            self.assertEqual(list(loaded.members["S001"].borrowed_books), ["ISBN2"])
+            self.assertEqual(loaded.members["M001"].borrowed_count, 0)
+            self.assertEqual(list(loaded.ledger.to_dicts()), list(library.ledger.to_dicts()))
+            self.assertEqual(loaded._journal_seq, 7)
+
+    def test_save_folds_journal_in(self):
+        """Test saving empties the journal and records are not applied twice"""
+        self.library.borrow_book("M001", "ISBN1")
+        self.library.save_to_file(self.filename)
+        self.assertEqual(self.journaled(), [])
+
+        self.library.return_book("M001", "ISBN1")
+        self.assertEqual(self.journaled(), ["return"])
+
+        loaded = Library.load_from_file(self.filename)
+        self.assertEqual(loaded.count_available_books(), 1)
+        self.assertEqual(len(loaded.get_loan_history("ISBN1")), 1)
+
+    def test_interrupted_save_replays_old_records(self):
+        """Test records moved aside by a save that never finished are replayed"""
+        self.library.borrow_book("M001", "ISBN1")
+        self.library._journal.rotate()  # A save that crashed before writing
+        self.library.return_book("M001", "ISBN1")
+
+        loaded = Library.load_from_file(self.filename)
+        history = loaded.get_loan_history("ISBN1")
+        self.assertEqual(len(history), 1)
+        self.assertIsNotNone(history[0].returned)
+
+        # Journaling the loaded library starts from a fresh save
+        loaded.open_journal(self.filename)
+        self.assertFalse(os.path.exists(journal_path(self.filename) + ".old"))
+        self.assertEqual(self.journaled(), [])
+        loaded.close_journal()
+
+    def test_changes_before_open_saved(self):
+        """Test changes made before the journal was opened are saved, not dropped"""
+        self.library.close_journal()
+        self.library.add_member(Member("M002", "Jane", "jane@example.com"))
+        self.library.open_journal(self.filename)
+
+        self.assertFalse(self.library.has_unsaved_changes())
+        self.assertIn("M002", Library.load_from_file(self.filename).members)
+
+    def test_replay_that_does_not_fit_raises(self):
+        """Test a journal record the library cannot apply fails the load"""
+        self.library.borrow_book("M001", "ISBN1")
+        with open(journal_path(self.filename), 'a') as file:
+            file.write('[2,"borrow","M001","ISBN1",null,null]\n')
+
+        self.assertIsNone(Library.load_from_file(self.filename))
+
+    def test_background_compaction(self):
+        """Test a background save folds the journal in every compact_after records"""
+        self.library.close_journal()
+        self.library.open_journal(self.filename, compact_after=3)
+        for index in range(3):
+            self.library.add_book(Book(f"NEW{index}", "Title", "Author", 2020))
+        self.library.close_journal()
+
+        with open(self.filename) as file:
+            data = json.load(file)
+        self.assertEqual(data["journal_seq"], 3)
+        self.assertEqual(len(data["books"]), 4)
+        self.assertEqual(self.journaled(), [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,174 @@
+"""
+Week 8: Unit Tests for the Streaming JSON Reader and Writer
+Tests for read_sections, write_sections and streaming load and save
+"""
+
+import unittest
+import sys
+import os
+import io
+import json
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from json_stream import encode_element, read_sections, write_sections
+from library import Library
+from sqlite_library import SQLiteLibrary
+from books import Book, EBook
+from members import Member
+
+
+class TestReadSections(unittest.TestCase):
+    """Test cases for read_sections"""
+
+    DOCUMENT = {
+        "name": "Café \"Library\"",
+        "books": [{"isbn": "ISBN1", "year": 2020, "tags": ["a", "b"]},
+                  {"isbn": "ISBN2", "size": 12345.678, "is_available": False, "due_date": None}],
+        "empty": [],
+        "members": [{"member_id": "M001", "borrowed_books": []}],
+        "journal_seq": 1234567
+    }
+
+    def sections(self, text, chunk_size):
+        """Read a document through read_sections"""
+        return list(read_sections(io.StringIO(text), chunk_size))
+
+    def test_elements_and_values_in_order(self):
+        """Test arrays come one element at a time and other values whole"""
+        expected = [("name", self.DOCUMENT["name"]),
+                    ("books", self.DOCUMENT["books"][0]), ("books", self.DOCUMENT["books"][1]),
+                    ("members", self.DOCUMENT["members"][0]),
+                    ("journal_seq", 1234567)]
+
+        # Every chunk size splits values, including numbers, at different points
+        for indent in (None, 4):
+            text = json.dumps(self.DOCUMENT, indent=indent)
+            for chunk_size in (1, 2, 3, 7, 64, 1 << 16):
+                self.assertEqual(self.sections(text, chunk_size), expected, (indent, chunk_size))
+
+    def test_empty_object(self):
+        """Test an object with no members yields nothing"""
+        self.assertEqual(self.sections(" { } ", 1), [])
+
+    def test_truncated_document(self):
+        """Test a cut-off file is an error rather than a silent partial read"""
+        text = json.dumps(self.DOCUMENT)
+        for end in (len(text) - 1, len(text) // 2, 0):
+            with self.assertRaises(json.JSONDecodeError):
+                self.sections(text[:end], 8)
+
+        with self.assertRaises(json.JSONDecodeError):
+            self.sections('["not", "an object"]', 8)
+
+
+class TestWriteSections(unittest.TestCase):
+    """Test cases for encode_element and write_sections"""
+
+    DOCUMENT = TestReadSections.DOCUMENT
+    ARRAYS = ("books", "empty", "members")
+
+    def write(self, document, compact):
+        """Write a document through write_sections, one element at a time"""
+        sections = [(key, (encode_element(element, compact) for element in value) if key in self.ARRAYS else value)
+                    for key, value in document.items()]
+        out = io.StringIO()
+        write_sections(out, sections, self.ARRAYS, compact)
+        return out.getvalue()
+
+    def test_same_text_as_json_dump(self):
+        """Test the output matches json.dump, indented and compact"""
+        self.assertEqual(self.write(self.DOCUMENT, False), json.dumps(self.DOCUMENT, indent=4))
+        self.assertEqual(self.write(self.DOCUMENT, True), json.dumps(self.DOCUMENT, separators=(",", ":")))
+        for compact in (False, True):
+            self.assertEqual(self.write({}, compact), "{}")
+            self.assertEqual(list(read_sections(io.StringIO(self.write(self.DOCUMENT, compact)))),
+                             list(read_sections(io.StringIO(json.dumps(self.DOCUMENT)))))
+
+
+class TestStreamingLoad(unittest.TestCase):
+    """Test cases for loading library files with the streaming reader"""
+
+    def setUp(self):
+        """Save a library with a loan in the current file layout"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "library.json")
+
+        self.library = Library("Stream Library")
+        self.library.add_book(Book("ISBN1", "Python Basics", "Author 1", 2000))
+        self.library.add_book(EBook("ISBN2", "Data Science", "Author 2", 2020, 3.5, "PDF"))
+        self.library.add_member(Member("M001", "John Doe", "john@example.com"))
+        self.library.borrow_book("M001", "ISBN1")
+        self.library.return_book("M001", "ISBN1")
+        self.library.borrow_book("M001", "ISBN2")
+        self.library.save_to_file(self.filename)
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.directory.cleanup()
+
+    def test_loans_saved_before_books(self):
+        """Test saves list loans first, so a load never opens placeholder loans"""
+        with open(self.filename) as file:
+            self.assertEqual(list(json.load(file)), ["name", "loans", "books", "members", "journal_seq"])
+
+    def test_loans_after_books(self):
+        """Test files with loans after the books (older saves) load the same history"""
+        with open(self.filename) as file:
+            data = json.load(file)
+        data["loans"] = data.pop("loans")
+        with open(self.filename, 'w') as file:
+            json.dump(data, file, indent=4)
+
+        for lazy in (False, True):
+            loaded = Library.load_from_file(self.filename, lazy=lazy)
+            self.assertEqual(loaded.name, "Stream Library")
+            self.assertEqual(list(loaded.ledger.to_dicts()), list(self.library.ledger.to_dicts()))
+            self.assertEqual(loaded.get_borrower("ISBN2").member_id, "M001")
+
+        with SQLiteLibrary.load_from_file(self.filename) as imported:
+            self.assertEqual(imported.get_loan_history("ISBN2"), self.library.get_loan_history("ISBN2"))
+            self.assertEqual(len(imported.get_member_loan_history("M001")), 2)
+
+    def test_streaming_save(self):
+        """Test a save writes what json.dump of the record lists wrote, and compact saves load the same"""
+        expected = {
+            "name": self.library.name,
+            "loans": list(self.library.ledger.to_dicts()),
+            "books": [book.to_dict() for book in self.library.books.values()],
+            "members": [member.to_dict() for member in self.library.members.values()],
+            "journal_seq": 0
+        }
+        with open(self.filename) as file:
+            self.assertEqual(file.read(), json.dumps(expected, indent=4))
+
+        compact = os.path.join(self.directory.name, "compact.json")
+        self.library.save_to_file(compact, compact=True)
+        with open(compact) as file:
+            self.assertEqual(file.read(), json.dumps(expected, separators=(",", ":")))
+        self.assertLess(os.path.getsize(compact), os.path.getsize(self.filename))
+
+        loaded = Library.load_from_file(compact)
+        self.assertEqual(list(loaded.ledger.to_dicts()), expected["loans"])
+        self.assertEqual(loaded.get_borrower("ISBN2").member_id, "M001")
+
+    def test_borrowed_book_without_loans(self):
+        """Test a borrowed book in a file with no loans gets an unknown-start loan"""
+        with open(self.filename) as file:
+            data = json.load(file)
+        del data["loans"]
+        with open(self.filename, 'w') as file:
+            json.dump(data, file)
+
+        loaded = Library.load_from_file(self.filename)
+        history = loaded.get_loan_history("ISBN2")
+        self.assertEqual(len(history), 1)
+        self.assertIsNone(history[0].start)
+
+        with SQLiteLibrary.load_from_file(self.filename) as imported:
+            self.assertEqual(imported.get_loan_history("ISBN2"), history)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,130 @@
+"""
+Week 8: Unit Tests for JSON Lines Library Files
+Tests for write_jsonl / read_jsonl and loading with worker processes
+"""
+
+import unittest
+import sys
+import os
+import io
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from jsonl_format import MAGIC, VERSION, RECORD_KEYS, _read_range, read_jsonl, write_jsonl
+from binary_format import convert, format_for
+from library import Library
+from books import Book, EBook, PhysicalBook
+from members import Member, StudentMember, TeacherMember
+
+
+def library_dicts(library):
+    """Everything a save records, as plain data"""
+    return {
+        "name": library.name,
+        "books": [book.to_dict() for book in library.books.values()],
+        "members": [member.to_dict() for member in library.members.values()],
+        "loans": list(library.ledger.to_dicts())
+    }
+
+
+class TestJsonlFormat(unittest.TestCase):
+    """Test cases for the JSON Lines library file"""
+
+    def setUp(self):
+        """Save a library with every record type and some loans as .jsonl"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "library.jsonl")
+
+        self.library = Library("Lines «Test»")
+        self.library.add_books([Book(f"ISBN{index:03}", f"Title {index}\nwith a newline", "Author", 2000)
+                                for index in range(300)])
+        self.library.add_books([
+            EBook("EB1", "Données et 数据", "Author 2", 2020, 3.5, "epub"),
+            PhysicalBook("PB1", "Gardens", "Author 1", 1999, "A-12", "Fair"),
+        ])
+        self.library.add_members([
+            Member("M001", "John Doe", "john@example.com"),
+            StudentMember("S001", "Alice", "alice@uni.edu", "STU1", "CS"),
+            TeacherMember("T001", "Dr. Smith", "smith@uni.edu", "FAC1", "Math"),
+        ])
+        self.library.borrow_book("S001", "ISBN001")
+        self.library.return_book("S001", "ISBN001")
+        self.library.borrow_book("S001", "EB1")
+        self.library.borrow_book("T001", "PB1")
+        self.library.save_to_file(self.filename)
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.directory.cleanup()
+
+    def test_layout(self):
+        """Test the file is a header line then one record per line"""
+        self.assertEqual(format_for("data/library.jsonl"), "jsonl")
+        with open(self.filename, 'rb') as file:
+            lines = file.read().split(b"\n")
+        self.assertTrue(lines[0].startswith(MAGIC))
+        self.assertEqual(lines[-1], b"")
+        self.assertEqual(len(lines), 1 + 3 + 302 + 3 + 1)  # header, loans, books, members, ""
+        self.assertTrue(lines[1].startswith(b'["loans",'))
+
+    def test_sequential_load(self):
+        """Test loading without workers, eager and lazy"""
+        expected = library_dicts(self.library)
+        for lazy in (False, True):
+            loaded = Library.load_from_file(self.filename, lazy=lazy)
+            self.assertEqual(library_dicts(loaded), expected)
+
+    def test_parallel_load(self):
+        """Test worker processes load the same library, with shared strings"""
+        expected = library_dicts(self.library)
+        for lazy in (False, True):
+            loaded = Library.load_from_file(self.filename, lazy=lazy, workers=2)
+            self.assertEqual(library_dicts(loaded), expected)
+            self.assertEqual(loaded.get_borrower("PB1").member_id, "T001")
+            self.assertEqual(loaded.search_books("données")[0].isbn, "EB1")
+
+        loaded = Library.load_from_file(self.filename, workers=2)
+        self.assertIs(loaded.books["ISBN000"].author, loaded.books["ISBN299"].author)
+
+    def test_ranges_cover_every_line_once(self):
+        """Test any split of the file reads each line exactly once"""
+        with open(self.filename, 'rb') as file:
+            first = len(file.readline())
+        size = os.path.getsize(self.filename)
+
+        with open(self.filename, 'rb') as file:
+            everything = [value for key, value in read_jsonl(file) if key in RECORD_KEYS]
+        for chunks in (1, 3, 7, 50, size - first):
+            bounds = [first + (size - first) * index // chunks for index in range(chunks + 1)]
+            records = [[] for _ in RECORD_KEYS]
+            for start, end in zip(bounds, bounds[1:]):
+                for index, part in enumerate(_read_range(self.filename, start, end, False)):
+                    records[index].extend(part)
+            self.assertEqual(records[0] + records[1] + records[2], everything)
+
+    def test_convert_and_compress(self):
+        """Test converting to and from JSON, and a compressed .jsonl file"""
+        convert(self.filename, os.path.join(self.directory.name, "library.json"))
+        convert(os.path.join(self.directory.name, "library.json"), os.path.join(self.directory.name, "copy.jsonl"))
+        with open(self.filename, 'rb') as original, \
+                open(os.path.join(self.directory.name, "copy.jsonl"), 'rb') as copy:
+            self.assertEqual(copy.read(), original.read())
+
+        compressed = os.path.join(self.directory.name, "library.jsonl.gz")
+        self.library.save_to_file(compressed)
+        # Compressed files cannot be split, so workers are not used
+        self.assertEqual(library_dicts(Library.load_from_file(compressed, workers=2)),
+                         library_dicts(self.library))
+
+    def test_newer_version_rejected(self):
+        """Test a file from a newer format version is refused, not misread"""
+        out = io.BytesIO()
+        write_jsonl(out, {"name": "Empty"})
+        data = out.getvalue().replace(f':{VERSION},'.encode(), f':{VERSION + 1},'.encode(), 1)
+        with self.assertRaises(ValueError):
+            list(read_jsonl(io.BytesIO(data)))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
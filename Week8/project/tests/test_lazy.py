@@ -0,0 +1,137 @@
+"""
+Week 8: Unit Tests for Lazy Loading
+Tests for LazyRecords and Library.load_from_file(lazy=True)
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from lazy import LazyRecords
+from library import Library
+from books import Book, EBook, PhysicalBook, create_book_from_dict
+from dates import to_ordinal
+from members import Member, StudentMember, TeacherMember
+
+
+class TestLazyRecords(unittest.TestCase):
+    """Test cases for the LazyRecords mapping"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.records = LazyRecords(create_book_from_dict)
+        self.records.add_raw("ISBN1", {"isbn": "ISBN1", "title": "A", "author": "X", "year": 2000})
+        self.records.add_raw("ISBN2", {"isbn": "ISBN2", "title": "B", "author": "Y", "year": 2001})
+
+    def test_builds_on_first_read_only(self):
+        """Test a record is built once, on first read"""
+        self.assertEqual(len(self.records), 2)
+        self.assertIn("ISBN1", self.records)
+        self.assertEqual(self.records.built_count(), 0)
+
+        book = self.records["ISBN1"]
+        self.assertIsInstance(book, Book)
+        self.assertIs(self.records["ISBN1"], book)
+        self.assertTrue(self.records.is_built("ISBN1"))
+        self.assertFalse(self.records.is_built("ISBN2"))
+
+    def test_behaves_like_dict(self):
+        """Test order, get, deletion and replacement match a dict"""
+        self.records["ISBN3"] = Book("ISBN3", "C", "Z", 2002)
+        del self.records["ISBN1"]
+        self.assertEqual(list(self.records), ["ISBN2", "ISBN3"])
+        self.assertIsNone(self.records.get("ISBN1"))
+        self.assertEqual([book.title for book in self.records.values()], ["B", "C"])
+
+    def test_to_dicts_does_not_build(self):
+        """Test to_dicts returns raw records without building them"""
+        self.records["ISBN1"].borrow("M001")
+        dicts = list(self.records.to_dicts())
+        self.assertFalse(dicts[0]["is_available"])
+        self.assertEqual(dicts[1]["title"], "B")
+        self.assertFalse(self.records.is_built("ISBN2"))
+
+
+class TestLazyLoad(unittest.TestCase):
+    """Test cases for Library.load_from_file(lazy=True)"""
+
+    def setUp(self):
+        """Save a library and load it both eagerly and lazily"""
+        library = Library("Test Library")
+        library.add_book(Book("ISBN1", "Python Basics", "Author 1", 2000))
+        library.add_book(EBook("ISBN2", "Advanced Python", "Author 2", 2010, 3.5, "PDF"))
+        library.add_book(PhysicalBook("ISBN3", "Data Science", "Author 1", 2020, "A1"))
+        library.add_member(Member("M001", "John Doe", "john@example.com"))
+        library.add_member(StudentMember("S001", "Alice", "alice@uni.edu", "STU1", "CS"))
+        library.add_member(TeacherMember("T001", "Bob", "bob@uni.edu", "FAC1", "Math"))
+        library._lend(library.books["ISBN2"], "S001", to_ordinal("2020-01-01"))
+        library.members["S001"].borrow_book("ISBN2")
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "library.json")
+        library.save_to_file(self.filename)
+
+        self.eager = Library.load_from_file(self.filename)
+        self.lazy = Library.load_from_file(self.filename, lazy=True)
+
+    def tearDown(self):
+        """Remove the temporary file"""
+        self.directory.cleanup()
+
+    def test_nothing_built_on_load(self):
+        """Test loading lazily builds no records"""
+        self.assertIsInstance(self.lazy.books, LazyRecords)
+        self.assertEqual(self.lazy.books.built_count(), 0)
+        self.assertEqual(self.lazy.members.built_count(), 0)
+        self.assertEqual(len(self.lazy.books), 3)
+        self.assertEqual(self.lazy.count_books_by_type("EBook"), 1)
+        self.assertEqual(self.lazy.books.built_count(), 0)
+
+    def test_same_records_and_queries(self):
+        """Test the lazy library answers exactly like the eager one"""
+        self.assertEqual(list(self.lazy.books), list(self.eager.books))
+        self.assertEqual([book.to_dict() for book in self.lazy.books.values()],
+                         [book.to_dict() for book in self.eager.books.values()])
+        self.assertEqual([member.to_dict() for member in self.lazy.members.values()],
+                         [member.to_dict() for member in self.eager.members.values()])
+
+        for library in (self.eager, self.lazy):
+            self.assertEqual([book.isbn for book in library.search_books("python")], ["ISBN1", "ISBN2"])
+            self.assertEqual([book.isbn for book in library.get_overdue_books()], ["ISBN2"])
+            self.assertEqual(library.get_borrower("ISBN2").member_id, "S001")
+            self.assertEqual([member.member_id for member in library.get_members_by_type("Teacher")], ["T001"])
+            self.assertEqual(library.count_available_books(), 2)
+
+    def test_borrow_builds_only_touched_records(self):
+        """Test a loan on a lazy library builds just its member and book"""
+        success, _ = self.lazy.borrow_book("M001", "ISBN1")
+        self.assertTrue(success)
+        self.assertEqual(self.lazy.books.built_count(), 1)
+        self.assertEqual(self.lazy.members.built_count(), 1)
+        self.assertEqual(self.lazy.count_borrowed_books(), 2)
+
+    def test_save_round_trip(self):
+        """Test saving a lazy library keeps unread and changed records"""
+        self.lazy.return_book("S001", "ISBN2")
+        self.lazy.save_to_file(self.filename)
+
+        with open(self.filename) as file:
+            data = json.load(file)
+        self.assertEqual([book["isbn"] for book in data["books"]], ["ISBN1", "ISBN2", "ISBN3"])
+
+        reloaded = Library.load_from_file(self.filename)
+        self.assertEqual(reloaded.count_borrowed_books(), 0)
+        self.assertEqual(reloaded.members["S001"].borrowed_count, 0)
+
+    def test_lazy_with_book_store_rejected(self):
+        """Test lazy loading cannot be combined with a custom book store"""
+        with self.assertRaises(ValueError):
+            Library.load_from_file(self.filename, book_store={}, lazy=True)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
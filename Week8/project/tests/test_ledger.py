@@ -0,0 +1,202 @@
+"""
+Week 8: Unit Tests for the Loan Ledger
+Tests for LoanLedger and the loan history it gives Library
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ledger import Loan, LoanLedger
+from library import Library
+from books import Book
+from members import Member, StudentMember
+from dates import format_month, to_ordinal, today_ordinal
+from reports import generate_circulation_report
+
+JAN_1 = to_ordinal("2024-01-01")
+JAN_20 = to_ordinal("2024-01-20")
+FEB_3 = to_ordinal("2024-02-03")
+
+
+class TestLoanLedger(unittest.TestCase):
+    """Test cases for the LoanLedger table"""
+
+    def setUp(self):
+        """Record two loans of one book and one of another"""
+        self.ledger = LoanLedger()
+        self.ledger.open_loan("ISBN1", "M001", JAN_1, JAN_1 + 14)
+        self.ledger.close_loan("ISBN1", JAN_1 + 10)
+        self.ledger.open_loan("ISBN1", "S001", JAN_20, JAN_20 + 14)
+        self.ledger.open_loan("ISBN2", "M001", FEB_3, FEB_3 + 14)
+
+    def test_history_keeps_returned_loans(self):
+        """Test a book's history lists every loan, oldest first"""
+        self.assertEqual(len(self.ledger), 3)
+        self.assertEqual(self.ledger.open_count, 2)
+        self.assertEqual(self.ledger.history("ISBN1"), [
+            Loan("ISBN1", "M001", JAN_1, JAN_1 + 14, JAN_1 + 10),
+            Loan("ISBN1", "S001", JAN_20, JAN_20 + 14, None)
+        ])
+        self.assertEqual([loan.isbn for loan in self.ledger.member_history("M001")], ["ISBN1", "ISBN2"])
+        self.assertEqual(self.ledger.history("NONE"), [])
+
+    def test_open_loans(self):
+        """Test the current holder and due-date queries see only open loans"""
+        self.assertEqual(self.ledger.holder("ISBN1"), "S001")
+        self.assertEqual(self.ledger.current("ISBN2").due, FEB_3 + 14)
+        self.assertEqual(self.ledger.due_before(FEB_3 + 15), ["ISBN1", "ISBN2"])
+        self.assertEqual(self.ledger.due_between(FEB_3 + 1, FEB_3 + 30), ["ISBN2"])
+
+        self.assertEqual(self.ledger.close_loan("ISBN2", FEB_3 + 1), 2)
+        self.assertIsNone(self.ledger.holder("ISBN2"))
+        self.assertIsNone(self.ledger.close_loan("ISBN2", FEB_3 + 1))
+
+    def test_open_loan_twice_rejected(self):
+        """Test a book cannot be lent while it is already on loan"""
+        with self.assertRaises(ValueError):
+            self.ledger.open_loan("ISBN1", "M002", FEB_3, None)
+
+    def test_cancel_and_reopen(self):
+        """Test rolling back a loan removes its row and rolling back a return reopens it"""
+        with self.assertRaises(ValueError):
+            self.ledger.cancel_loan("ISBN1")  # Not the newest row
+        self.assertEqual(self.ledger.cancel_loan("ISBN2"), 2)
+        self.assertEqual(len(self.ledger), 2)
+        self.assertEqual(self.ledger.member_history("M001"), self.ledger.history("ISBN1")[:1])
+        self.assertEqual(self.ledger.due_before(FEB_3 + 30), ["ISBN1"])
+
+        self.ledger.close_loan("ISBN1", FEB_3)
+        self.assertEqual(self.ledger.reopen_loan("ISBN1"), Loan("ISBN1", "S001", JAN_20, JAN_20 + 14, None))
+        self.assertEqual(self.ledger.holder("ISBN1"), "S001")
+        self.assertEqual(self.ledger.due_before(FEB_3 + 30), ["ISBN1"])
+        with self.assertRaises(ValueError):
+            self.ledger.reopen_loan("ISBN1")
+
+    def test_loans_per_month(self):
+        """Test loans are counted by book and starting month"""
+        counts = self.ledger.loans_per_month()
+        self.assertEqual(counts[("ISBN1", "2024-01")], 2)
+        self.assertEqual(counts[("ISBN2", "2024-02")], 1)
+        self.assertEqual(self.ledger.loans_per_month("ISBN2"), {("ISBN2", "2024-02"): 1})
+
+        self.ledger.close_loan("ISBN1", FEB_3)
+        self.ledger.open_loan("ISBN1", "M001", None, None)
+        self.assertEqual(self.ledger.loans_per_month("ISBN1"), {("ISBN1", "2024-01"): 2})
+
+    def test_copy_is_frozen(self):
+        """Test a copy does not see loans recorded after it was made"""
+        copied = self.ledger.copy()
+        self.ledger.close_loan("ISBN1", FEB_3)
+        self.ledger.open_loan("ISBN1", "M002", FEB_3, FEB_3 + 14)
+
+        self.assertEqual(len(copied), 3)
+        self.assertEqual(copied.holder("ISBN1"), "S001")
+        self.assertEqual(len(copied.history("ISBN1")), 2)
+        self.assertIsNone(copied.history("ISBN1")[1].returned)
+        self.assertEqual(len(self.ledger.history("ISBN1")), 3)
+
+    def test_copy_survives_cancel(self):
+        """Test cancelling a loan and lending again does not change a copy"""
+        copied = self.ledger.copy()
+        self.assertEqual(self.ledger.cancel_loan("ISBN2"), 2)
+        self.assertEqual(self.ledger.open_loan("ISBN3", "S001", FEB_3, None), 2)  # Row number reused
+
+        self.assertEqual(copied.history("ISBN2"), [Loan("ISBN2", "M001", FEB_3, FEB_3 + 14, None)])
+        self.assertEqual(copied.history("ISBN3"), [])
+        self.assertEqual([loan.isbn for loan in copied.member_history("M001")], ["ISBN1", "ISBN2"])
+        self.assertEqual([loan.isbn for loan in copied.member_history("S001")], ["ISBN1"])
+
+        self.assertEqual(self.ledger.history("ISBN2"), [])
+        self.assertEqual([loan.isbn for loan in self.ledger.member_history("S001")], ["ISBN1", "ISBN3"])
+
+    def test_dicts_round_trip(self):
+        """Test to_dicts and load_dicts rebuild the same ledger"""
+        loaded = LoanLedger()
+        loaded.load_dicts(self.ledger.to_dicts())
+
+        self.assertEqual(list(loaded.to_dicts()), list(self.ledger.to_dicts()))
+        self.assertEqual(loaded.holder("ISBN1"), "S001")
+        self.assertEqual(loaded.due_before(FEB_3 + 15), ["ISBN1", "ISBN2"])
+        self.assertEqual(list(self.ledger.to_dicts())[0]["start"], "2024-01-01")
+
+
+class TestLibraryLedger(unittest.TestCase):
+    """Test cases for loans recorded through Library"""
+
+    def setUp(self):
+        """Set up a library with two books and two members"""
+        self.library = Library("Test Library")
+        self.library.add_book(Book("ISBN1", "Python Basics", "Author 1", 2000))
+        self.library.add_book(Book("ISBN2", "Data Science", "Author 2", 2020))
+        self.library.add_member(Member("M001", "John Doe", "john@example.com"))
+        self.library.add_member(StudentMember("S001", "Alice", "alice@uni.edu", "STU1", "CS"))
+
+    def test_borrow_and_return_recorded(self):
+        """Test each borrow and return adds to the book's history"""
+        self.library.borrow_book("M001", "ISBN1")
+        self.library.return_book("M001", "ISBN1")
+        self.library.borrow_book("S001", "ISBN1")
+
+        today = today_ordinal()
+        history = self.library.get_loan_history("ISBN1")
+        self.assertEqual([loan.member_id for loan in history], ["M001", "S001"])
+        self.assertEqual(history[0].returned, today)
+        self.assertEqual(history[1].due, self.library.books["ISBN1"].due_ordinal)
+        self.assertEqual(len(self.library.get_member_loan_history("M001")), 1)
+        self.assertEqual(self.library.get_loans_per_month(), {("ISBN1", format_month(today)): 2})
+
+    def test_removed_book_keeps_history(self):
+        """Test removing a book keeps its loan history"""
+        self.library.borrow_book("M001", "ISBN2")
+        self.library.return_book("M001", "ISBN2")
+        success, _ = self.library.remove_book("ISBN2")
+        self.assertTrue(success)
+        self.assertEqual(len(self.library.get_loan_history("ISBN2")), 1)
+        self.assertEqual(len(self.library.get_member_loan_history("M001")), 1)
+
+    def test_snapshot_history(self):
+        """Test a snapshot answers history as of when it was taken"""
+        self.library.borrow_book("M001", "ISBN1")
+        view = self.library.snapshot()
+        self.library.return_book("M001", "ISBN1")
+
+        self.assertIsNone(view.get_loan_history("ISBN1")[0].returned)
+        self.assertIsNotNone(self.library.get_loan_history("ISBN1")[0].returned)
+
+    def test_save_and_load_history(self):
+        """Test loan history survives saving and loading, eager or lazy"""
+        self.library.borrow_book("M001", "ISBN1")
+        self.library.return_book("M001", "ISBN1")
+        self.library.borrow_book("S001", "ISBN2")
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "library.json")
+            self.library.save_to_file(filename)
+
+            for lazy in (False, True):
+                loaded = Library.load_from_file(filename, lazy=lazy)
+                self.assertEqual(list(loaded.ledger.to_dicts()), list(self.library.ledger.to_dicts()))
+                self.assertEqual(loaded.get_borrower("ISBN2").member_id, "S001")
+                success, _ = loaded.return_book("S001", "ISBN2")
+                self.assertTrue(success)
+
+    def test_circulation_report(self):
+        """Test the circulation report lists loans per title per month"""
+        self.library.borrow_book("M001", "ISBN2")
+        self.library.return_book("M001", "ISBN2")
+        self.library.borrow_book("S001", "ISBN2")
+        self.library.borrow_book("M001", "ISBN1")
+
+        month = format_month(today_ordinal())
+        self.assertEqual(list(generate_circulation_report(self.library.snapshot())), [
+            {"isbn": "ISBN1", "title": "Python Basics", "month": month, "loans": 1},
+            {"isbn": "ISBN2", "title": "Data Science", "month": month, "loans": 2}
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -6,6 +6,7 @@ Tests for library management operations
 import unittest
 import sys
 import os
+import tempfile
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -17,9 +18,11 @@ from members import Member, StudentMember, TeacherMember
 class TestLibrary(unittest.TestCase):
     """Test cases for the Library class"""
 
+    library_class = Library  # Other implementations rerun these tests
+
     def setUp(self):
         """Set up test fixtures"""
-        self.library = Library("Test Library")
+        self.library = self.library_class("Test Library")
         self.book1 = Book("ISBN1", "Book 1", "Author 1", 2020)
         self.book2 = EBook("ISBN2", "EBook 1", "Author 2", 2021, 3.5, "PDF")
         self.member1 = Member("M001", "John Doe", "john@example.com")
@@ -96,7 +99,7 @@ class TestLibrary(unittest.TestCase):
 
         success, message = self.library.borrow_book("M001", "ISBN1")
         self.assertTrue(success)
-        self.assertFalse(self.book1.is_available)
+        self.assertFalse(self.library.books["ISBN1"].is_available)
         self.assertIn("ISBN1", self.member1.borrowed_books)
 
     def test_borrow_nonexistent_book(self):
@@ -153,6 +156,26 @@ class TestLibrary(unittest.TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0].title, "Python Programming")
 
+    def test_search_modes(self):
+        """Test indexed search agrees with the linear scan"""
+        book3 = Book("ISBN3", "Python Programming", "Author 3", 2022)
+        self.library.add_book(self.book1)
+        self.library.add_book(self.book2)
+        self.library.add_book(book3)
+
+        for keyword in ["book", "author", "ok 1", "b", "missing"]:
+            self.assertEqual(self.library.search_books(keyword),
+                             self.library.search_books(keyword, mode="scan"))
+
+        self.assertEqual(len(self.library.search_books("Book", mode="token")), 1)
+        self.assertEqual(len(self.library.search_books("Boo", mode="token")), 0)
+
+    def test_search_after_remove(self):
+        """Test removed books drop out of search results"""
+        self.library.add_book(self.book1)
+        self.library.remove_book("ISBN1")
+        self.assertEqual(self.library.search_books("Book"), [])
+
     def test_get_available_books(self):
         """Test getting available books"""
         self.library.add_book(self.book1)
@@ -193,6 +216,128 @@ class TestLibrary(unittest.TestCase):
         self.assertEqual(len(students), 1)
         self.assertIsInstance(students[0], StudentMember)
 
+    def test_type_and_availability_counts(self):
+        """Test maintained counts follow borrow, return and remove"""
+        self.library.add_book(self.book1)
+        self.library.add_book(self.book2)
+        self.library.add_member(self.member1)
+        self.library.borrow_book("M001", "ISBN2")
+
+        self.assertEqual(self.library.count_books_by_type("EBook"), 1)
+        self.assertEqual(self.library.count_books_by_type("EBook", available=True), 0)
+        self.assertEqual(self.library.count_books_by_type("EBook", available=False), 1)
+        self.assertEqual(self.library.count_borrowed_books(), 1)
+
+        self.library.return_book("M001", "ISBN2")
+        self.assertEqual(self.library.count_books_by_type("EBook", available=True), 1)
+        self.assertEqual(self.library.count_available_books(), 2)
+
+        self.library.remove_book("ISBN2")
+        self.assertEqual(self.library.get_books_by_type("EBook"), [])
+        self.assertEqual(self.library.count_books_by_type("EBook", available=True), 0)
+
+    def test_members_by_type_after_remove(self):
+        """Test removed members drop out of the type index"""
+        self.library.add_member(self.member2)
+        self.library.remove_member("S001")
+        self.assertEqual(self.library.get_members_by_type("Student"), [])
+        self.assertEqual(self.library.count_members_by_type("Student"), 0)
+
+    def test_get_overdue_books(self):
+        """Test overdue lookup follows borrow and return"""
+        self.library.add_book(self.book1)
+        self.library.add_book(self.book2)
+        self.library.add_member(self.member1)
+        self.library.borrow_book("M001", "ISBN1")
+        self.library.borrow_book("M001", "ISBN2")
+
+        self.assertEqual(self.library.get_overdue_books(), [])
+        overdue = self.library.get_overdue_books(as_of="9999-12-31")
+        self.assertEqual(len(overdue), 2)
+
+        self.library.return_book("M001", "ISBN1")
+        overdue = self.library.get_overdue_books(as_of="9999-12-31")
+        self.assertEqual([book.isbn for book in overdue], ["ISBN2"])
+
+    def test_get_borrower(self):
+        """Test the loan index finds who holds a book"""
+        self.library.add_book(self.book1)
+        self.library.add_member(self.member1)
+        self.assertIsNone(self.library.get_borrower("ISBN1"))
+
+        self.library.borrow_book("M001", "ISBN1")
+        self.assertIs(self.library.get_borrower("ISBN1"), self.member1)
+        self.assertEqual(self.library.get_member_borrowed_books("M001"), [self.library.books["ISBN1"]])
+
+        self.library.return_book("M001", "ISBN1")
+        self.assertIsNone(self.library.get_borrower("ISBN1"))
+
+    def test_borrow_many(self):
+        """Test a valid batch is applied in one call"""
+        self.library.add_book(self.book1)
+        self.library.add_book(self.book2)
+        self.library.add_member(self.member2)
+
+        success, results = self.library.borrow_many([("S001", "ISBN1"), ("S001", "ISBN2")])
+        self.assertTrue(success)
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(ok for ok, _ in results))
+        self.assertEqual(list(self.member2.borrowed_books), ["ISBN1", "ISBN2"])
+        self.assertEqual(self.library.count_borrowed_books(), 2)
+
+    def test_borrow_many_all_or_nothing(self):
+        """Test one bad item rejects the whole batch"""
+        self.library.add_book(self.book1)
+        self.library.add_member(self.member1)
+
+        success, results = self.library.borrow_many([("M001", "ISBN1"), ("M001", "FAKE")])
+        self.assertFalse(success)
+        self.assertEqual(results[1], (False, "Book not found"))
+        self.assertFalse(results[0][0])
+        self.assertTrue(self.book1.is_available)
+        self.assertEqual(self.member1.borrowed_count, 0)
+
+    def test_borrow_many_checks_limit_across_batch(self):
+        """Test member limits count the other items in the batch"""
+        for index in range(4):
+            self.library.add_book(Book(f"B{index}", f"Title {index}", "Author", 2020))
+        self.library.add_member(self.member1)  # Limit of 3 books
+
+        success, results = self.library.borrow_many([("M001", f"B{index}") for index in range(4)])
+        self.assertFalse(success)
+        self.assertIn("limit", results[3][1].lower())
+        self.assertEqual(self.library.count_borrowed_books(), 0)
+
+    def test_borrow_many_duplicate_isbn(self):
+        """Test the same book twice in one batch is rejected"""
+        self.library.add_book(self.book1)
+        self.library.add_member(self.member1)
+        self.library.add_member(self.member2)
+
+        success, results = self.library.borrow_many([("M001", "ISBN1"), ("S001", "ISBN1")])
+        self.assertFalse(success)
+        self.assertTrue(self.book1.is_available)
+
+    def test_return_many(self):
+        """Test returning a batch and saving once"""
+        self.library.add_book(self.book1)
+        self.library.add_book(self.book2)
+        self.library.add_member(self.member1)
+        self.library.borrow_many([("M001", "ISBN1"), ("M001", "ISBN2")])
+
+        success, results = self.library.return_many([("M001", "ISBN1"), ("S001", "ISBN2")])
+        self.assertFalse(success)
+        self.assertFalse(self.library.books["ISBN1"].is_available)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "library.json")
+            success, results = self.library.return_many([("M001", "ISBN1"), ("M001", "ISBN2")], filename)
+            self.assertTrue(success)
+            self.assertEqual(self.library.count_available_books(), 2)
+
+            loaded = Library.load_from_file(filename)
+            self.assertEqual(loaded.count_available_books(), 2)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -0,0 +1,160 @@
+"""
+Week 8: Unit Tests for the Memory-Mapped Library
+Tests for write_mapped, MappedLibrary and loading .snap files
+"""
+
+import unittest
+import sys
+import os
+import io
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from binary_format import convert, format_for
+from mapped import MAGIC, VERSION, HEADER, MappedLibrary, write_mapped
+from library import Library
+from books import Book, EBook, PhysicalBook
+from members import Member, StudentMember, TeacherMember
+
+
+def isbns(books):
+    """ISBNs of a list of books"""
+    return [book.isbn for book in books]
+
+
+class TestMappedLibrary(unittest.TestCase):
+    """Test cases for MappedLibrary against the Library it was saved from"""
+
+    def setUp(self):
+        """Save a library with every record type and some loans as a .snap file"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "library.snap")
+
+        self.library = Library("Bibliothèque «Test»")
+        self.library.add_books([
+            Book("ISBN1", "Python Basics", "Author One", 2000),
+            EBook("ISBN2", "Données et 数据", "Author Two", 2020, 3.5, "epub"),
+            PhysicalBook("ISBN3", "Advanced Python", "Author One", 1999, "A-12", "Fair"),
+            Book("ISBN0", "Gardens", "Python Smith", 2010),
+        ])
+        self.library.add_members([
+            Member("M001", "John Doe", "john@example.com"),
+            StudentMember("S001", "Alice", "alice@uni.edu", "STU1", "CS"),
+            TeacherMember("T001", "Dr. Smith", "smith@uni.edu", "FAC1", "Math"),
+        ])
+        self.library.borrow_book("S001", "ISBN1")
+        self.library.return_book("S001", "ISBN1")
+        self.library.borrow_book("S001", "ISBN2")
+        self.library.borrow_book("T001", "ISBN3")
+        self.library.save_to_file(self.filename)
+
+        self.mapped = MappedLibrary(self.filename)
+
+    def tearDown(self):
+        """Unmap the file and remove the temporary directory"""
+        self.mapped.close()
+        self.directory.cleanup()
+
+    def test_lookups(self):
+        """Test lookups by key decode the same records the library holds"""
+        self.assertEqual(self.mapped.name, "Bibliothèque «Test»")
+        self.assertEqual(len(self.mapped.books), 4)
+        self.assertEqual(list(self.mapped.books), list(self.library.books))
+        for isbn, book in self.library.books.items():
+            self.assertEqual(self.mapped.books[isbn].to_dict(), book.to_dict())
+        for member_id, member in self.library.members.items():
+            self.assertEqual(self.mapped.members[member_id].to_dict(), member.to_dict())
+
+        self.assertIsInstance(self.mapped.books["ISBN2"], EBook)
+        self.assertIsInstance(self.mapped.members["T001"], TeacherMember)
+        self.assertIn("ISBN0", self.mapped.books)
+        self.assertNotIn("ISBN9", self.mapped.books)
+        self.assertIsNone(self.mapped.books.get("ISBN9"))
+        with self.assertRaises(KeyError):
+            self.mapped.members["X999"]
+
+    def test_search_matches_library(self):
+        """Test every search mode finds what the library finds"""
+        for mode in ("substring", "token", "scan"):
+            for keyword in ("python", "PYTHON basics", "author one", "数据", "données", "zzz"):
+                self.assertEqual(isbns(self.mapped.search_books(keyword, mode)),
+                                 isbns(self.library.search_books(keyword, mode)), (keyword, mode))
+        with self.assertRaises(ValueError):
+            self.mapped.search_books("python", "regex")
+
+    def test_type_and_availability_queries(self):
+        """Test the column queries and counts"""
+        for book_type in ("Book", "EBook", "PhysicalBook", "Magazine"):
+            self.assertEqual(isbns(self.mapped.get_books_by_type(book_type)),
+                             isbns(self.library.get_books_by_type(book_type)))
+            for available in (None, True, False):
+                self.assertEqual(self.mapped.count_books_by_type(book_type, available),
+                                 self.library.count_books_by_type(book_type, available))
+        for member_type in ("Member", "Student", "Teacher"):
+            self.assertEqual(self.mapped.count_members_by_type(member_type), 1)
+            self.assertEqual([member.member_id for member in self.mapped.get_members_by_type(member_type)],
+                             [member.member_id for member in self.library.get_members_by_type(member_type)])
+
+        self.assertEqual(self.mapped.count_available_books(), 2)
+        self.assertEqual(self.mapped.count_borrowed_books(), 2)
+        self.assertEqual(isbns(self.mapped.get_available_books()), ["ISBN1", "ISBN0"])
+        self.assertEqual(isbns(self.mapped.get_borrowed_books()), ["ISBN2", "ISBN3"])
+
+    def test_loans(self):
+        """Test due dates, borrowers and loan history"""
+        self.assertEqual(isbns(self.mapped.get_overdue_books()), [])
+        self.assertEqual(isbns(self.mapped.get_overdue_books("2999-01-01")),
+                         isbns(self.library.get_overdue_books("2999-01-01")))
+        self.assertEqual(isbns(self.mapped.get_books_due_between("2000-01-01", "2999-01-01")),
+                         isbns(self.library.get_books_due_between("2000-01-01", "2999-01-01")))
+
+        self.assertEqual(self.mapped.get_borrower("ISBN3").member_id, "T001")
+        self.assertIsNone(self.mapped.get_borrower("ISBN1"))
+        self.assertIsNone(self.mapped.get_borrower("ISBN9"))
+        self.assertEqual(isbns(self.mapped.get_member_borrowed_books("S001")), ["ISBN2"])
+        self.assertEqual(self.mapped.get_member_borrowed_books("X999"), [])
+
+        self.assertEqual(self.mapped.get_loan_history("ISBN1"), self.library.get_loan_history("ISBN1"))
+        self.assertEqual(self.mapped.get_member_loan_history("S001"), self.library.get_member_loan_history("S001"))
+        self.assertEqual(self.mapped.get_loans_per_month(), self.library.get_loans_per_month())
+
+    def test_load_and_convert(self):
+        """Test a .snap file loads into a Library and converts to JSON"""
+        self.assertEqual(format_for("data/library.snap"), "mapped")
+
+        loaded = Library.load_from_file(self.filename)
+        self.assertEqual([book.to_dict() for book in loaded.books.values()],
+                         [book.to_dict() for book in self.library.books.values()])
+        self.assertEqual(loaded.get_borrower("ISBN2").member_id, "S001")
+
+        json_file = os.path.join(self.directory.name, "library.json")
+        copy_file = os.path.join(self.directory.name, "copy.snap")
+        convert(self.filename, json_file)
+        convert(json_file, copy_file)
+        with open(self.filename, 'rb') as original, open(copy_file, 'rb') as copy:
+            self.assertEqual(copy.read(), original.read())
+
+    def test_rejects_other_files(self):
+        """Test a newer version or a different file is refused, not misread"""
+        out = io.BytesIO()
+        write_mapped(out, {"name": "Empty"})
+        data = bytearray(out.getvalue())
+        HEADER.pack_into(data, 0, MAGIC, VERSION + 1, 0, 0, 0, 0, *HEADER.unpack_from(data)[6:])
+
+        for contents in (bytes(data), b"not a library file, but long enough to hold a header" * 4):
+            filename = os.path.join(self.directory.name, "other.snap")
+            with open(filename, 'wb') as file:
+                file.write(contents)
+            with self.assertRaises(ValueError):
+                MappedLibrary(filename)
+
+    def test_close(self):
+        """Test closing unmaps the file"""
+        with MappedLibrary(self.filename) as mapped:
+            self.assertEqual(mapped.count_available_books(), 2)
+        self.assertTrue(mapped._map.closed)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
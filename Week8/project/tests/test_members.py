@@ -83,6 +83,27 @@ class TestMember(unittest.TestCase):
         success, message = self.member.return_book("ISBN999")
         self.assertFalse(success)
 
+    def test_borrowed_books_is_a_copy(self):
+        """Test borrowed_books is a list in borrowing order that cannot change the member"""
+        self.member.borrow_book("ISBN2")
+        self.member.borrow_book("ISBN1")
+        borrowed = self.member.borrowed_books
+
+        self.assertEqual(borrowed, ["ISBN2", "ISBN1"])
+        borrowed.append("ISBN3")
+        self.assertEqual(self.member.borrowed_count, 2)
+        self.assertEqual(list(self.member.iter_borrowed()), ["ISBN2", "ISBN1"])
+        self.assertTrue(self.member.has_borrowed("ISBN1"))
+        self.assertFalse(self.member.has_borrowed("ISBN3"))
+
+        self.member.return_book("ISBN2")
+        self.assertEqual(self.member.borrowed_books, ["ISBN1"])
+
+    def test_to_dict_borrowed_books_list(self):
+        """Test borrowed books are still serialized as a JSON list"""
+        self.member.borrow_book("ISBN1")
+        self.assertEqual(self.member.to_dict()["borrowed_books"], ["ISBN1"])
+
 
 class TestStudentMember(unittest.TestCase):
     """Test cases for the StudentMember class"""
@@ -141,6 +162,30 @@ class TestTeacherMember(unittest.TestCase):
         self.assertEqual(loan_period, 30)
 
 
+class TestMemberLayout(unittest.TestCase):
+    """Test cases for the slotted member classes"""
+
+    def test_no_instance_dict(self):
+        """Test members store attributes in slots, not a __dict__"""
+        for member in [Member("M1", "A", "a@x.com"),
+                       StudentMember("S1", "B", "b@x.com", "STU1", "CS"),
+                       TeacherMember("T1", "C", "c@x.com", "FAC1", "Math")]:
+            self.assertFalse(hasattr(member, "__dict__"))
+
+    def test_type_constants_are_class_attributes(self):
+        """Test member type and default limit come from the class"""
+        self.assertEqual(StudentMember._member_type, "Student")
+        self.assertEqual(TeacherMember.DEFAULT_MAX_BOOKS, 10)
+        self.assertEqual(StudentMember("S1", "B", "b@x.com", "STU1", "CS").max_books, 5)
+
+    def test_custom_limit_restored(self):
+        """Test a per-member limit from JSON still overrides the default"""
+        member = create_member_from_dict({"type": "Student", "member_id": "S1", "name": "B",
+                                          "email": "b@x.com", "max_books": 7})
+        self.assertEqual(member.max_books, 7)
+        self.assertEqual(StudentMember.DEFAULT_MAX_BOOKS, 5)
+
+
 class TestMemberFactory(unittest.TestCase):
     """Test cases for the member factory function"""
 
@@ -159,6 +204,16 @@ class TestMemberFactory(unittest.TestCase):
         self.assertIsInstance(member, Member)
         self.assertEqual(member._member_type, "Member")
 
+    def test_round_trip_borrowed_books(self):
+        """Test borrowed books survive a to_dict/from_dict round trip"""
+        member = Member("M001", "Test User", "test@example.com")
+        member.borrow_book("ISBN2")
+        member.borrow_book("ISBN1")
+
+        restored = create_member_from_dict(member.to_dict())
+        self.assertEqual(list(restored.borrowed_books), ["ISBN2", "ISBN1"])
+        self.assertFalse(restored.borrow_book("ISBN1")[0])
+
     def test_create_student(self):
         """Test creating student from dict"""
         data = {
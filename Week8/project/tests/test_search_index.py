@@ -0,0 +1,76 @@
+"""
+Week 8: Unit Tests for the Search Index
+Tests for token and n-gram book searches
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from search_index import SearchIndex, tokenize
+from books import Book
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Test cases for the SearchIndex class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.index = SearchIndex()
+        self.index.add(Book("ISBN1", "Python Programming", "Guido Rossum", 2020))
+        self.index.add(Book("ISBN2", "Learning Java", "James Gosling", 2018))
+        self.index.add(Book("ISBN3", "Fluent Python", "Luciano Ramalho", 2022))
+
+    def test_tokenize(self):
+        """Test text is split into lowercase words"""
+        self.assertEqual(tokenize("Fluent Python, 2nd Ed."), ["fluent", "python", "2nd", "ed"])
+
+    def test_substring_search(self):
+        """Test substring search matches inside words"""
+        self.assertEqual(self.index.search_substring("ytho"), ["ISBN1", "ISBN3"])
+        self.assertEqual(self.index.search_substring("GOSL"), ["ISBN2"])
+
+    def test_short_keyword(self):
+        """Test keywords shorter than an n-gram still match"""
+        self.assertEqual(self.index.search_substring("ja"), ["ISBN2"])
+        self.assertEqual(len(self.index.search_substring("")), 3)
+
+    def test_no_match(self):
+        """Test searching for missing text returns nothing"""
+        self.assertEqual(self.index.search_substring("rust"), [])
+
+    def test_token_search(self):
+        """Test token search matches whole words only"""
+        self.assertEqual(self.index.search_tokens("python"), ["ISBN1", "ISBN3"])
+        self.assertEqual(self.index.search_tokens("pyth"), [])
+        self.assertEqual(self.index.search_tokens("fluent python"), ["ISBN3"])
+
+    def test_remove(self):
+        """Test removed books are no longer found"""
+        self.assertTrue(self.index.remove("ISBN1"))
+        self.assertFalse(self.index.remove("ISBN1"))
+        self.assertEqual(self.index.search_substring("python"), ["ISBN3"])
+        self.assertNotIn("ISBN1", self.index)
+
+    def test_readd_moves_to_end(self):
+        """Test re-indexing a book moves it to the end of catalog order"""
+        self.index.remove("ISBN1")
+        self.index.add(Book("ISBN1", "Python Programming", "Guido Rossum", 2020))
+        self.assertEqual(self.index.search_substring("python"), ["ISBN3", "ISBN1"])
+
+    def test_deferred_books(self):
+        """Test deferred books are indexed on first use and keep catalog order"""
+        self.index.defer("ISBN4", "Python Cookbook", "David Beazley")
+        self.index.defer("ISBN5", "Java Puzzlers", "Joshua Bloch")
+        self.assertTrue(self.index.remove("ISBN5"))
+        self.index.add(Book("ISBN6", "Python Tricks", "Dan Bader", 2017))
+
+        self.assertEqual(self.index.search_substring("python"), ["ISBN1", "ISBN3", "ISBN4", "ISBN6"])
+        self.assertEqual(self.index.search_tokens("java"), ["ISBN2"])
+        self.assertEqual(len(self.index), 5)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
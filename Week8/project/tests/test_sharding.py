@@ -0,0 +1,230 @@
+"""
+Week 8: Unit Tests for the Sharded Library
+Tests for routing, scatter/gather queries and cross-shard loans
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sharding import ShardedLibrary
+from library import Library
+from books import Book, EBook
+from members import Member
+from analytics import get_popular_authors
+
+
+class TestShardedLibrary(unittest.TestCase):
+    """Test cases for the ShardedLibrary class"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Start one set of worker processes for all tests"""
+        cls.library = ShardedLibrary("Sharded Library", num_shards=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the worker processes"""
+        cls.library.close()
+
+    def setUp(self):
+        """Fill the shards with books and members"""
+        library = self.library
+        for isbn in list(library.books):
+            book = library.books[isbn]
+            if not book.is_available:
+                library.return_book(book.borrowed_by, isbn)
+            library.remove_book(isbn)
+        for member_id in list(library.members):
+            library.remove_member(member_id)
+
+        for index in range(12):
+            library.add_book(Book(f"ISBN{index}", f"Title {index}", f"Author {index % 3}", 2000 + index))
+        library.add_book(EBook("EB1", "Python Tricks", "Dan Bader", 2017, 2.0, "PDF"))
+        for index in range(6):
+            library.add_member(Member(f"M{index}", f"Member {index}", f"m{index}@example.com"))
+
+        # Pick a member and book that live on different shards
+        self.cross = next((f"M{m}", f"ISBN{b}") for m in range(6) for b in range(12)
+                          if library._shard_for(f"M{m}") != library._shard_for(f"ISBN{b}"))
+
+    def test_records_are_spread_across_shards(self):
+        """Test every shard holds part of the catalog"""
+        counts = self.library._scatter_all("count_books")
+        self.assertEqual(sum(counts), 13)
+        self.assertEqual(len(self.library.books), 13)
+        self.assertTrue(all(count > 0 for count in counts))
+
+    def test_duplicate_add_is_rejected(self):
+        """Test adding an existing ISBN fails on its owning shard"""
+        success, message = self.library.add_book(Book("ISBN1", "Again", "Someone", 2020))
+        self.assertFalse(success)
+
+    def test_cross_shard_borrow_and_return(self):
+        """Test a member on one shard can borrow a book from another"""
+        member_id, isbn = self.cross
+        success, message = self.library.borrow_book(member_id, isbn)
+        self.assertTrue(success, message)
+        self.assertIn("Due date", message)
+
+        self.assertFalse(self.library.books[isbn].is_available)
+        self.assertEqual(self.library.books[isbn].borrowed_by, member_id)
+        self.assertEqual(list(self.library.members[member_id].borrowed_books), [isbn])
+        self.assertEqual(self.library.get_borrower(isbn).member_id, member_id)
+        self.assertEqual([book.isbn for book in self.library.get_member_borrowed_books(member_id)], [isbn])
+
+        success, message = self.library.return_book(member_id, isbn)
+        self.assertTrue(success, message)
+        self.assertTrue(self.library.books[isbn].is_available)
+        self.assertEqual(self.library.members[member_id].borrowed_count, 0)
+
+    def test_failed_cross_shard_borrow_releases_slot(self):
+        """Test a refused loan leaves the member's slot free"""
+        member_id, isbn = self.cross
+        other = next(f"M{m}" for m in range(6) if f"M{m}" != member_id)
+        self.assertTrue(self.library.borrow_book(other, isbn)[0])
+
+        success, message = self.library.borrow_book(member_id, isbn)
+        self.assertFalse(success)
+        self.assertEqual(message, "Book is already borrowed")
+        self.assertEqual(self.library.members[member_id].borrowed_count, 0)
+
+        success, message = self.library.borrow_book(member_id, "FAKE")
+        self.assertFalse(success)
+        self.assertEqual(self.library.members[member_id].borrowed_count, 0)
+
+    def test_borrow_many_across_shards_is_all_or_nothing(self):
+        """Test one refused item undoes the loans on every shard"""
+        loans = [("M0", f"ISBN{index}") for index in range(3)]
+        success, results = self.library.borrow_many(loans + [("M1", "FAKE")])
+        self.assertFalse(success)
+        self.assertEqual(results[3], (False, "Book not found"))
+        self.assertEqual(self.library.count_borrowed_books(), 0)
+        self.assertEqual(self.library.members["M0"].borrowed_count, 0)
+
+        success, results = self.library.borrow_many(loans)
+        self.assertTrue(success)
+        self.assertEqual(self.library.count_borrowed_books(), 3)
+
+        success, results = self.library.return_many(loans + [("M0", "ISBN5")])
+        self.assertFalse(success)
+        self.assertEqual(self.library.count_borrowed_books(), 3)
+
+        success, results = self.library.return_many(loans)
+        self.assertTrue(success)
+        self.assertEqual(self.library.count_borrowed_books(), 0)
+        self.assertEqual(self.library.members["M0"].borrowed_count, 0)
+
+    def test_rejected_batches_leave_ledger_unchanged(self):
+        """Test undoing a cross-shard batch writes no loan rows and keeps open loans whole"""
+        loans = [("M0", f"ISBN{index}") for index in range(3)]
+        isbns = [isbn for _, isbn in loans]
+        before = {isbn: self.library.get_loan_history(isbn) for isbn in isbns}
+        per_month = self.library.get_loans_per_month()
+
+        self.assertFalse(self.library.borrow_many(loans + [("M1", "FAKE")])[0])
+        self.assertEqual({isbn: self.library.get_loan_history(isbn) for isbn in isbns}, before)
+        self.assertEqual(self.library.get_loans_per_month(), per_month)
+
+        self.assertTrue(self.library.borrow_many(loans)[0])
+        lent = {isbn: self.library.get_loan_history(isbn) for isbn in isbns}
+        self.assertFalse(self.library.return_many(loans + [("M0", "ISBN5")])[0])
+        self.assertEqual({isbn: self.library.get_loan_history(isbn) for isbn in isbns}, lent)
+        for isbn in isbns:
+            self.assertIsNone(lent[isbn][-1].returned)
+            self.assertEqual(self.library.get_borrower(isbn).member_id, "M0")
+        self.assertEqual(len(self.library.get_overdue_books(as_of="9999-12-31")), 3)
+
+    def test_member_limit_applies_across_shards(self):
+        """Test a member's limit counts books from every shard"""
+        for index in range(3):
+            self.assertTrue(self.library.borrow_book("M2", f"ISBN{index}")[0])
+
+        success, message = self.library.borrow_book("M2", "ISBN3")
+        self.assertFalse(success)
+        self.assertIn("limit", message.lower())
+
+    def test_scatter_gather_queries(self):
+        """Test catalog-wide queries combine every shard"""
+        self.assertEqual({book.isbn for book in self.library.search_books("title 1")},
+                         {"ISBN1", "ISBN10", "ISBN11"})
+        self.assertEqual(len(self.library.get_books_by_type("EBook")), 1)
+        self.assertEqual(self.library.count_books_by_type("Book"), 12)
+
+        self.library.borrow_book("M0", "ISBN0")
+        self.library.borrow_book("M1", "EB1")
+        overdue = self.library.get_overdue_books(as_of="9999-12-31")
+        self.assertEqual(len(overdue), 2)
+        self.assertLessEqual(overdue[0].due_date, overdue[1].due_date)
+        self.assertEqual(len(self.library.get_available_books()), 11)
+
+        self.assertEqual(get_popular_authors(self.library, 1)[0][1], 4)
+
+    def test_save_and_load(self):
+        """Test a sharded library saves to and loads from the files Library uses"""
+        self.library.borrow_book(*self.cross)
+
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("library.json", "library.bin.gz"):
+                filename = os.path.join(directory, name)
+                self.library.save_to_file(filename)
+                self.assertEqual(os.listdir(directory).count(name + ".tmp"), 0)
+                self.assertEqual(len(Library.load_from_file(filename).books), 13)
+
+                with ShardedLibrary.load_from_file(filename, num_shards=2) as loaded:
+                    self.assertEqual(len(loaded.books), 13)
+                    self.assertEqual(len(loaded.members), 6)
+                    self.assertEqual(loaded.get_borrower(self.cross[1]).member_id, self.cross[0])
+                    self.assertEqual(loaded.get_loan_history(self.cross[1]),
+                                     self.library.get_loan_history(self.cross[1]))
+
+    def test_load_in_batches(self):
+        """Test loading sends records in batches, whatever the file's format or order"""
+        library = Library("Plain")
+        library.add_books([Book(f"ISBN{index}", "Title", "Author", 2000) for index in range(20)])
+        library.add_members([Member(f"M{index}", "Name", "name@example.com") for index in range(5)])
+        for index in range(10):
+            library.borrow_book(f"M{index % 5}", f"ISBN{index}")
+        library.return_book("M0", "ISBN0")
+
+        with tempfile.TemporaryDirectory() as directory:
+            filenames = [os.path.join(directory, name) for name in ("library.json", "library.bin", "old.json")]
+            library.save_to_file(filenames[0])
+            library.save_to_file(filenames[1])
+            with open(filenames[0]) as file:
+                data = json.load(file)
+            with open(filenames[2], 'w') as file:
+                # Loans listed after the books, as saved before the ledger came first
+                json.dump({key: data[key] for key in ("name", "books", "members", "loans")}, file)
+
+            for filename in filenames:
+                with mock.patch("sharding.IMPORT_BATCH", 2), \
+                        ShardedLibrary.load_from_file(filename, num_shards=2) as loaded:
+                    self.assertEqual(loaded.name, "Plain")
+                    self.assertEqual(len(loaded.books), 20)
+                    self.assertEqual(len(loaded.members), 5)
+                    self.assertEqual(loaded.count_borrowed_books(), 9)
+                    self.assertEqual(loaded.get_borrower("ISBN6").member_id, "M1")
+                    self.assertEqual(loaded.get_loan_history("ISBN0"), library.get_loan_history("ISBN0"))
+                    self.assertEqual(loaded.get_loan_history("ISBN6"), library.get_loan_history("ISBN6"))
+
+    def test_loan_history_across_shards(self):
+        """Test loan history is kept on the book's shard and gathered for members"""
+        member_id, isbn = self.cross
+        self.library.borrow_book(member_id, isbn)
+        self.library.return_book(member_id, isbn)
+
+        loan = self.library.get_loan_history(isbn)[-1]
+        self.assertEqual(loan.member_id, member_id)
+        self.assertIsNotNone(loan.returned)
+        self.assertIn(isbn, [loan.isbn for loan in self.library.get_member_loan_history(member_id)])
+        self.assertGreaterEqual(sum(self.library.get_loans_per_month().values()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,139 @@
+"""
+Week 8: Unit Tests for Shared Library Files
+Tests for several libraries (and processes) using one file through a shared journal
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from journal import journal_path, read_journal
+from library import Library
+from books import Book
+from members import Member
+
+
+def open_shared(filename, lazy=False):
+    """Load a library file and share it, as main.py does"""
+    library = Library.load_from_file(filename, lazy=lazy)
+    library.open_journal(filename, shared=True)
+    return library
+
+
+def add_and_borrow(filename, worker, count):
+    """Run in a worker process: add members and have each borrow its own book"""
+    library = open_shared(filename)
+    for index in range(count):
+        member_id = f"W{worker}-{index}"
+        library.add_member(Member(member_id, "Worker", "worker@example.com"))
+        success, message = library.borrow_book(member_id, f"ISBN{worker * count + index}")
+        assert success, message
+    # Everyone tries for the same book; only one can get it
+    success, _ = library.borrow_book(f"W{worker}-0", "CONTESTED")
+    library.close_journal()
+    return success
+
+
+class TestSharedLibrary(unittest.TestCase):
+    """Test cases for open_journal(shared=True)"""
+
+    def setUp(self):
+        """Save a small library and open it twice, as two processes would"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "library.json")
+
+        library = Library("Shared")
+        library.add_books([Book(f"ISBN{index}", "Title", "Author", 2000) for index in range(40)])
+        library.add_book(Book("CONTESTED", "Popular", "Author", 2020))
+        library.add_member(Member("M001", "John Doe", "john@example.com"))
+        library.open_journal(self.filename, shared=True)
+        self.first = library
+        self.second = open_shared(self.filename)
+
+    def tearDown(self):
+        """Stop journaling and remove the files"""
+        self.first.close_journal()
+        self.second.close_journal()
+        self.directory.cleanup()
+
+    def test_changes_seen_by_other_library(self):
+        """Test a change in one library is applied in the other"""
+        self.assertFalse(self.second.refresh())
+        self.first.add_member(Member("M002", "Jane", "jane@example.com"))
+        self.assertTrue(self.second.refresh())
+        self.assertIn("M002", self.second.members)
+
+        # A change catches up first, without refresh()
+        self.second.borrow_book("M002", "ISBN1")
+        self.assertEqual(self.first.borrow_book("M001", "ISBN1"), (False, "Book is already borrowed"))
+        self.assertEqual(self.first.get_borrower("ISBN1").member_id, "M002")
+        self.assertEqual([record[0] for record in read_journal(journal_path(self.filename))], [1, 2])
+
+    def test_reload_after_missed_saves(self):
+        """Test records folded into saves this library never read are reloaded"""
+        for index in range(3):
+            self.first.add_member(Member(f"N{index}", "New", "new@example.com"))
+            self.first.save_to_file(self.filename)
+        self.first.borrow_book("N2", "ISBN5")
+
+        self.assertTrue(self.second.refresh())
+        self.assertEqual(sorted(self.second.members), ["M001", "N0", "N1", "N2"])
+        self.assertEqual(self.second.get_borrower("ISBN5").member_id, "N2")
+        self.assertEqual(self.second._journal.seq, 4)
+
+        self.second.return_book("N2", "ISBN5")
+        self.first.refresh()
+        self.assertTrue(self.first.books["ISBN5"].is_available)
+
+    def test_open_after_another_save(self):
+        """Test opening a library loaded before another process saved reloads it"""
+        stale = Library.load_from_file(self.filename, lazy=True)
+        self.first.add_member(Member("M002", "Jane", "jane@example.com"))
+        self.first.save_to_file(self.filename)
+        stale.open_journal(self.filename, shared=True)
+        self.assertIn("M002", stale.members)
+        stale.close_journal()
+
+    def test_open_refused_with_unsaved_changes(self):
+        """Test a stale library with its own changes is not silently reloaded"""
+        stale = Library.load_from_file(self.filename)
+        stale.add_member(Member("M003", "Local", "local@example.com"))
+        self.first.add_member(Member("M002", "Jane", "jane@example.com"))
+        self.first.save_to_file(self.filename)
+
+        with self.assertRaises(ValueError):
+            stale.open_journal(self.filename, shared=True)
+        self.assertIn("M003", stale.members)
+        self.assertIsNone(stale._journal)
+
+    def test_half_written_record_dropped(self):
+        """Test a record cut short by a process that died is not built upon"""
+        with open(journal_path(self.filename), 'a') as file:
+            file.write('[1,"add_member",{"member_id":')
+        self.first.add_member(Member("M002", "Jane", "jane@example.com"))
+        self.second.refresh()
+        self.assertIn("M002", self.second.members)
+        self.assertEqual(len(list(read_journal(journal_path(self.filename)))), 1)
+
+    def test_processes_lose_no_updates(self):
+        """Test changes from several processes at once all reach the file"""
+        workers, count = 4, 10
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(add_and_borrow, [self.filename] * workers, range(workers),
+                                        [count] * workers))
+        self.assertEqual(results.count(True), 1)
+
+        self.first.refresh()
+        loaded = Library.load_from_file(self.filename)
+        for library in (self.first, loaded):
+            self.assertEqual(len(library.members), 1 + workers * count)
+            self.assertEqual(library.count_borrowed_books(), workers * count + 1)
+            self.assertEqual(len(library.ledger), workers * count + 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
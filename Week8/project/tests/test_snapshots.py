@@ -0,0 +1,105 @@
+"""
+Week 8: Unit Tests for Library Snapshots
+Tests for copy-on-write point-in-time views
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from library import Library
+from books import Book, EBook
+from members import Member, StudentMember
+from analytics import get_borrowing_statistics
+from reports import generate_statistics_by_type
+
+
+class TestLibrarySnapshot(unittest.TestCase):
+    """Test cases for Library.snapshot()"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.library = Library("Test Library")
+        self.book1 = Book("ISBN1", "Book 1", "Author 1", 2020)
+        self.book2 = EBook("ISBN2", "EBook 1", "Author 2", 2021, 3.5, "PDF")
+        self.member1 = Member("M001", "John Doe", "john@example.com")
+        self.member2 = StudentMember("S001", "Alice", "alice@uni.edu", "STU123", "CS")
+        self.library.add_book(self.book1)
+        self.library.add_book(self.book2)
+        self.library.add_member(self.member1)
+        self.library.add_member(self.member2)
+
+    def test_snapshot_shares_records(self):
+        """Test taking a snapshot does not copy the records"""
+        view = self.library.snapshot()
+        self.assertIs(view.books["ISBN1"], self.book1)
+        self.assertIs(view.members["M001"], self.member1)
+
+    def test_snapshot_unchanged_by_borrow(self):
+        """Test borrowing after a snapshot leaves the snapshot as it was"""
+        view = self.library.snapshot()
+        success, message = self.library.borrow_book("M001", "ISBN1")
+        self.assertTrue(success)
+
+        self.assertTrue(view.books["ISBN1"].is_available)
+        self.assertEqual(view.members["M001"].borrowed_count, 0)
+        self.assertEqual(view.count_borrowed_books(), 0)
+
+        self.assertFalse(self.library.books["ISBN1"].is_available)
+        self.assertIn("ISBN1", self.library.members["M001"].borrowed_books)
+        self.assertEqual(self.library.get_borrowed_books(), [self.library.books["ISBN1"]])
+
+    def test_unshared_records_change_in_place(self):
+        """Test members are only copied while a snapshot shares them"""
+        member = self.library.members["M001"]
+        view = self.library.snapshot()
+        del view
+        self.library.borrow_book("M001", "ISBN1")
+        self.assertIs(self.library.members["M001"], member)
+        self.assertIn("ISBN1", member.borrowed_books)
+
+    def test_borrow_replaces_stored_book(self):
+        """Test a loan stores a new version of the book instead of changing it"""
+        self.library.borrow_book("M001", "ISBN1")
+        self.assertIsNot(self.library.books["ISBN1"], self.book1)
+        self.assertTrue(self.book1.is_available)
+        self.assertEqual(self.library.books["ISBN1"].borrowed_by, "M001")
+
+    def test_snapshot_unchanged_by_add_and_remove(self):
+        """Test adding and removing records does not affect a snapshot"""
+        view = self.library.snapshot()
+        self.library.add_book(Book("ISBN3", "Book 3", "Author 3", 2022))
+        self.library.remove_member("S001")
+
+        self.assertNotIn("ISBN3", view.books)
+        self.assertIn("S001", view.members)
+        self.assertEqual(view.count_members_by_type("Student"), 1)
+
+    def test_snapshot_queries(self):
+        """Test snapshots answer the same queries as the library"""
+        self.library.borrow_book("M001", "ISBN2")
+        view = self.library.snapshot()
+        self.library.return_book("M001", "ISBN2")
+
+        self.assertEqual(view.count_books_by_type("EBook", available=False), 1)
+        self.assertEqual([book.isbn for book in view.get_overdue_books(as_of="9999-12-31")], ["ISBN2"])
+        self.assertEqual([book.isbn for book in view.get_member_borrowed_books("M001")], ["ISBN2"])
+        self.assertEqual(view.get_borrower("ISBN2").member_id, "M001")
+        self.assertEqual(len(view.search_books("ebook")), 1)
+        self.assertEqual(len(view.search_books("ebook 1", mode="token")), 1)
+
+        self.assertEqual(get_borrowing_statistics(view)["total_books_borrowed"], 1)
+        stats = {stat["type"]: stat for stat in generate_statistics_by_type(view)}
+        self.assertEqual(stats["EBook"]["borrowed"], 1)
+
+    def test_snapshot_is_read_only(self):
+        """Test the snapshot maps cannot be changed"""
+        view = self.library.snapshot()
+        with self.assertRaises(TypeError):
+            view.books["ISBN9"] = self.book1
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
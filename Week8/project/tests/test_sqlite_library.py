@@ -0,0 +1,157 @@
+"""
+Week 8: Unit Tests for the SQLite Library
+Reruns the Library tests on SQLiteLibrary, plus tests for the database itself
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tests.test_concurrency as concurrency_tests
+import tests.test_library as library_tests
+from sqlite_library import SQLiteLibrary
+from library import Library
+from books import Book, EBook, PhysicalBook
+from members import Member, StudentMember, TeacherMember
+from analytics import (calculate_total_file_size, filter_books_by_year, get_borrowing_statistics,
+                       get_members_with_max_books, get_popular_authors)
+
+
+class TestSQLiteLibraryAsLibrary(library_tests.TestLibrary):
+    """The Library test cases, run on SQLiteLibrary"""
+
+    library_class = SQLiteLibrary
+
+
+class TestSQLiteLibraryConcurrency(concurrency_tests.TestLibraryConcurrency):
+    """The Library concurrency tests, run on SQLiteLibrary"""
+
+    library_class = SQLiteLibrary
+
+
+class TestSQLiteLibrary(unittest.TestCase):
+    """Test cases for the database behind SQLiteLibrary"""
+
+    def setUp(self):
+        """Create a database file with a small catalog"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.database = os.path.join(self.directory.name, "library.db")
+
+        self.library = SQLiteLibrary("SQL Library", self.database)
+        self.library.add_books([
+            Book("ISBN1", "Python Basics", "Author A", 2000),
+            EBook("ISBN2", "Data Science", "Author B", 2010, 3.5, "PDF"),
+            PhysicalBook("ISBN3", "Python Patterns", "Author A", 2020, "A-1", "Good"),
+        ])
+        self.library.add_members([
+            Member("M001", "John Doe", "john@example.com"),
+            TeacherMember("T001", "Dr. Smith", "smith@uni.edu", "FAC1", "Math"),
+        ])
+
+    def tearDown(self):
+        """Close the database and remove the files"""
+        self.library.close()
+        self.directory.cleanup()
+
+    def test_database_uses_wal(self):
+        """Test the database file is opened in WAL mode"""
+        self.assertEqual(self.library._query("PRAGMA journal_mode")[0][0], "wal")
+        self.assertTrue(os.path.exists(self.database + "-wal"))
+        with self.assertRaises(ValueError):
+            SQLiteLibrary("Bad", synchronous="SOMETIMES")
+
+    def test_records_survive_reopening(self):
+        """Test books, members and loans are read back from the file"""
+        self.library.borrow_book("T001", "ISBN2")
+        self.library.close()
+
+        with SQLiteLibrary("SQL Library", self.database) as reopened:
+            book = reopened.books["ISBN2"]
+            self.assertIsInstance(book, EBook)
+            self.assertEqual(book.file_format, "PDF")
+            self.assertEqual(book.borrowed_by, "T001")
+
+            teacher = reopened.members["T001"]
+            self.assertIsInstance(teacher, TeacherMember)
+            self.assertEqual(list(teacher.borrowed_books), ["ISBN2"])
+            self.assertEqual(reopened.get_member_loan_history("T001")[0].isbn, "ISBN2")
+            self.assertEqual(list(reopened.books), ["ISBN1", "ISBN2", "ISBN3"])
+
+        self.library = SQLiteLibrary("SQL Library", self.database)
+
+    def test_searches_run_in_sql(self):
+        """Test each search mode finds the same books"""
+        for mode in ("substring", "token", "scan"):
+            self.assertEqual([book.isbn for book in self.library.search_books("python", mode)],
+                             ["ISBN1", "ISBN3"])
+        self.assertEqual(self.library.search_books("pyth", "token"), [])
+        self.assertEqual([book.isbn for book in self.library.search_books("ata sci")], ["ISBN2"])
+
+        # A removed book leaves no tokens behind
+        self.library.remove_book("ISBN3")
+        self.assertEqual(self.library._query("SELECT count(*) FROM book_tokens WHERE token = 'patterns'"),
+                         [(0,)])
+
+    def test_queries_use_indexes(self):
+        """Test filters are answered from an index rather than a table scan"""
+        for sql, params in [
+            ("SELECT seq FROM books WHERE is_available = ?", (1,)),
+            ("SELECT seq FROM books WHERE type = ? AND is_available = ?", ("EBook", 1)),
+            ("SELECT seq FROM books WHERE due < ?", (0,)),
+            ("SELECT id FROM loans WHERE member_id = ? AND returned IS NULL", ("M001",)),
+        ]:
+            plan = " ".join(row[-1] for row in self.library._query(f"EXPLAIN QUERY PLAN {sql}", params))
+            self.assertIn("USING", plan, sql)
+
+    def test_analytics_pushed_down(self):
+        """Test the analytics functions get the same answers from SQL"""
+        self.library.borrow_book("M001", "ISBN1")
+        self.library.borrow_book("M001", "ISBN2")
+        self.library.borrow_book("M001", "ISBN3")
+
+        self.assertEqual(get_popular_authors(self.library, 1), [("Author A", 2)])
+        self.assertEqual([book.isbn for book in filter_books_by_year(self.library, 2005, 2020)],
+                         ["ISBN2", "ISBN3"])
+        self.assertEqual(calculate_total_file_size(self.library), 3.5)
+        self.assertEqual([member.member_id for member in get_members_with_max_books(self.library)],
+                         ["M001"])
+        self.assertEqual(get_borrowing_statistics(self.library)["total_books_borrowed"], 3)
+
+    def test_overdue_and_due_dates(self):
+        """Test due date queries read the due column"""
+        self.library.borrow_book("M001", "ISBN1")
+        self.library.borrow_book("T001", "ISBN2")
+
+        self.assertEqual(self.library.get_overdue_books(), [])
+        overdue = self.library.get_overdue_books(as_of="2999-01-01")
+        self.assertEqual([book.isbn for book in overdue], ["ISBN1", "ISBN2"])
+        self.assertEqual(self.library.count_books_by_type("EBook", available=False), 1)
+
+    def test_json_round_trip(self):
+        """Test a JSON save moves between Library and SQLiteLibrary"""
+        self.library.borrow_book("T001", "ISBN3")
+        self.library.return_book("T001", "ISBN3")
+        self.library.borrow_book("M001", "ISBN1")
+        filename = os.path.join(self.directory.name, "data", "library.json")
+        self.library.save_to_file(filename)
+
+        loaded = Library.load_from_file(filename)
+        self.assertEqual(loaded.get_borrower("ISBN1").member_id, "M001")
+        self.assertEqual(len(loaded.get_loan_history("ISBN3")), 1)
+
+        loaded.add_member(StudentMember("S001", "Alice", "alice@uni.edu", "STU1", "CS"))
+        loaded.save_to_file(filename)
+        with SQLiteLibrary.load_from_file(filename) as imported:
+            self.assertEqual(len(imported.members), 3)
+            self.assertEqual(imported.get_borrower("ISBN1").member_id, "M001")
+            self.assertEqual(imported.get_loan_history("ISBN3"), loaded.get_loan_history("ISBN3"))
+            self.assertEqual(imported.get_loans_per_month(), loaded.get_loans_per_month())
+
+        self.assertIsNone(SQLiteLibrary.load_from_file(filename + ".missing"))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)